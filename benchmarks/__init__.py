@@ -0,0 +1,5 @@
+"""
+End-to-end performance benchmarks for buildzr.
+
+Run with `python -m benchmarks --help`. See `benchmarks/README.md`.
+"""
@@ -0,0 +1,158 @@
+import itertools
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+from buildzr.dsl import (
+    Workspace,
+    SoftwareSystem,
+    Container,
+    DeploymentEnvironment,
+    Explorer,
+    SystemLandscapeView,
+    SystemContextView,
+    ContainerView,
+    ComponentView,
+    DeploymentView,
+    DynamicView,
+    CustomView,
+)
+from buildzr.testing import SyntheticConfig, generate_workspace
+
+CUSTOM_ELEMENTS_PER_100_ELEMENTS = 1
+
+# A benchmark case is set up for a given workspace size and a scratch
+# directory, and returns the operation to be measured.
+Operation = Callable[[], Any]
+Setup = Callable[[int, str], Operation]
+
+@dataclass
+class Case:
+    """
+    A benchmarked operation.
+
+    Attributes:
+        name: Unique name of the case, used as the key in the results.
+        setup: Prepares the inputs of the operation (not measured) and
+            returns the operation.
+        repeatable: Whether the returned operation can be run several times
+            with the same cost. If not, the case is set up again before each
+            run.
+        optional: Optional cases only run when explicitly selected (e.g.,
+            those that need the JVM).
+    """
+
+    name: str
+    setup: Setup
+    repeatable: bool=True
+    optional: bool=False
+
+def build_workspace(size: int) -> Workspace:
+
+    """
+    Builds the benchmarked workspace of approximately `size` model elements:
+    a synthetic workspace (see `buildzr.testing.synthetic`) with one
+    deployment environment, and a chain of custom elements.
+    """
+
+    w = generate_workspace(
+        SyntheticConfig.for_size(size, deployment_environments=1),
+        name='benchmark',
+    )
+    names = [f"element {i}" for i in range(max(2, size * CUSTOM_ELEMENTS_PER_100_ELEMENTS // 100))]
+    w.bulk_load(
+        elements={'type': ['element'] * len(names), 'name': names, 'metadata': ['Hardware'] * len(names)},
+        relationships={'source': names[:-1], 'destination': names[1:], 'description': ["Sends data to"] * (len(names) - 1)},
+    )
+    return w
+
+def count_elements(w: Workspace) -> int:
+    return sum(1 for _ in Explorer(w).walk_elements())
+
+def _software_system(w: Workspace) -> SoftwareSystem:
+    return next(e for e in Explorer(w).walk_elements(max_depth=1) if isinstance(e, SoftwareSystem))
+
+def _container(w: Workspace) -> Container:
+    return next(e for e in Explorer(w).walk_elements() if isinstance(e, Container))
+
+def _build_model(size: int, tmpdir: str) -> Operation:
+    return lambda: build_workspace(size)
+
+def _imply_relationships(size: int, tmpdir: str) -> Operation:
+    w = build_workspace(size)
+    w._use_implied_relationships = True
+    return w._imply_relationships
+
+def _view_on_added(make_view: Callable[[Workspace], Any]) -> Setup:
+    def setup(size: int, tmpdir: str) -> Operation:
+        w = build_workspace(size)
+        # Views created outside of a workspace context are not applied, so
+        # only `_on_added` itself is measured.
+        view = make_view(w)
+        return lambda: view._on_added(w)
+    return setup
+
+def _to_json(size: int, tmpdir: str) -> Operation:
+    w = build_workspace(size)
+    return w.to_json
+
+def _json_loader_load(size: int, tmpdir: str) -> Operation:
+    from buildzr.loaders import JsonLoader
+    w = build_workspace(size)
+    path = w.save(format='json', path=os.path.join(tmpdir, f"load_{size}.json"))
+    assert isinstance(path, str)
+    loader = JsonLoader()
+    return lambda: loader.load(path)
+
+def _merge_models(size: int, tmpdir: str) -> Operation:
+    from buildzr.dsl import Workspace, SoftwareSystem
+    path = build_workspace(size).save(format='json', path=os.path.join(tmpdir, f"extend_{size}.json"))
+    assert isinstance(path, str)
+    with Workspace('child', extend=path) as w:
+        SoftwareSystem('child system')
+    assert w._extended_model is not None
+    extended_model = w._extended_model
+    return lambda: w._merge_models(extended_model, w.model)
+
+def _plantuml_sink(size: int, tmpdir: str) -> Operation:
+    from buildzr.sinks.plantuml_sink import PlantUmlSink, PlantUmlSinkConfig
+    w = build_workspace(size)
+    w.apply_view(SystemLandscapeView(key='landscape', description=""))
+    w.apply_view(ContainerView(_software_system(w), key='containers', description=""))
+    merged = w._merged_workspace()
+    config = PlantUmlSinkConfig(path=os.path.join(tmpdir, f"plantuml_{size}"))
+    sink = PlantUmlSink()
+    return lambda: sink.write(merged, config)
+
+CASES: List[Case] = [
+    Case('build_model', _build_model),
+    Case('imply_relationships', _imply_relationships, repeatable=False),
+    Case('system_landscape_view', _view_on_added(
+        lambda w: SystemLandscapeView(key='landscape', description="")
+    )),
+    Case('system_context_view', _view_on_added(
+        lambda w: SystemContextView(_software_system(w), key='context', description="")
+    )),
+    Case('container_view', _view_on_added(
+        lambda w: ContainerView(_software_system(w), key='containers', description="")
+    )),
+    Case('component_view', _view_on_added(
+        lambda w: ComponentView(_container(w), key='components', description="")
+    )),
+    Case('deployment_view', _view_on_added(
+        # Only the name of the environment is used by the view.
+        lambda w: DeploymentView(DeploymentEnvironment('environment 0'), key='deployment')
+    )),
+    Case('dynamic_view', _view_on_added(
+        lambda w: DynamicView(key='dynamic', steps=list(itertools.islice(Explorer(w).walk_relationships(), 10)))
+    )),
+    Case('custom_view', _view_on_added(
+        lambda w: CustomView(key='custom')
+    )),
+    Case('to_json', _to_json),
+    Case('json_loader_load', _json_loader_load),
+    Case('merge_models', _merge_models),
+    Case('plantuml_sink', _plantuml_sink, optional=True),
+]
+
+CASES_BY_NAME: Dict[str, Case] = {case.name: case for case in CASES}
@@ -0,0 +1,328 @@
+"""
+Runs the benchmarks and compares the results against a baseline.
+
+Examples:
+    Record a baseline:
+
+        python -m benchmarks run --output benchmarks/baseline.json
+
+    Run a subset of the cases at smaller sizes, and compare against the
+    baseline (exits with status 1 if there are regressions):
+
+        python -m benchmarks run --sizes 100 1000 --cases to_json json_loader_load \\
+            --compare benchmarks/baseline.json
+
+    Compare two result files:
+
+        python -m benchmarks compare benchmarks/baseline.json results.json
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence
+
+from benchmarks.cases import CASES, CASES_BY_NAME, Case, build_workspace, count_elements
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+
+Results = Dict[str, Any]
+
+def measure(case: Case, size: int, repeat: int, tmpdir: str) -> Dict[str, Any]:
+
+    """
+    Measures a case at the given size.
+
+    The wall time is the best of `repeat` runs. The allocations are measured
+    with `tracemalloc` in a separate run, since tracing slows down the
+    operation considerably.
+
+    Returns:
+        A dictionary with the best wall time (`time_s`), all the wall times
+        (`times_s`), the peak size of the memory allocated during the
+        operation (`peak_bytes`), and the size of the memory it left allocated
+        (`retained_bytes`).
+    """
+
+    times: List[float] = []
+    operation = case.setup(size, tmpdir)
+    for i in range(repeat):
+        if i > 0 and not case.repeatable:
+            operation = case.setup(size, tmpdir)
+        gc.collect()
+        start = time.perf_counter()
+        operation()
+        times.append(time.perf_counter() - start)
+
+    operation = case.setup(size, tmpdir)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = operation()
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'time_s': min(times),
+        'times_s': times,
+        'peak_bytes': peak_bytes - baseline_bytes,
+        'retained_bytes': current_bytes - baseline_bytes,
+    }
+
+def scaling_exponent(sizes: Sequence[int], times: Sequence[float]) -> Optional[float]:
+
+    """
+    Returns the exponent `k` of the best fit of `time = c * size ** k` (the
+    slope of the least-squares line in log-log space), or `None` if there
+    are fewer than two measurements.
+
+    An exponent of about 1 means the operation scales linearly, and about 2
+    means it scales quadratically.
+    """
+
+    points = [
+        (math.log(size), math.log(t))
+        for size, t in zip(sizes, times)
+        if size > 0 and t > 0
+    ]
+    if len(points) < 2:
+        return None
+
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    if sxx == 0:
+        return None
+    return sxy / sxx
+
+def run(
+    cases: Sequence[Case],
+    sizes: Sequence[int],
+    repeat: int=3,
+    verbose: bool=True,
+) -> Results:
+
+    """
+    Runs the `cases` at each of the `sizes`, and returns the results in the
+    format written to (and read from) the JSON baseline.
+    """
+
+    from buildzr.__about__ import VERSION
+
+    # The sizes are approximate, so the actual number of elements of each
+    # size is recorded with the results.
+    element_counts = {size: count_elements(build_workspace(size)) for size in sizes}
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for case in cases:
+            measured_sizes: Dict[str, Any] = {}
+            for size in sizes:
+                if verbose:
+                    print(f"{case.name} @ {size} ...", end=' ', flush=True, file=sys.stderr)
+                try:
+                    measured_sizes[str(size)] = {
+                        'elements': element_counts[size],
+                        **measure(case, size, repeat, tmpdir),
+                    }
+                except ImportError as e:
+                    # Optional dependencies, e.g., jpype1 for the PlantUML sink.
+                    if verbose:
+                        print(f"skipped ({e})", file=sys.stderr)
+                    break
+                if verbose:
+                    print(f"{measured_sizes[str(size)]['time_s']:.4f}s", file=sys.stderr)
+
+            if not measured_sizes:
+                continue
+
+            results[case.name] = {
+                'sizes': measured_sizes,
+                'exponent': scaling_exponent(
+                    [int(size) for size in measured_sizes],
+                    [m['time_s'] for m in measured_sizes.values()],
+                ),
+            }
+
+    return {
+        'metadata': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'buildzr': VERSION,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+def compare(
+    baseline: Results,
+    current: Results,
+    time_threshold: float=0.25,
+    memory_threshold: float=0.25,
+    exponent_threshold: float=0.2,
+    min_time: float=0.001,
+) -> List[str]:
+
+    """
+    Compares the `current` results against the `baseline`, and returns the
+    regressions found (as human-readable lines).
+
+    Args:
+        time_threshold: Flag a case if it is slower than the baseline by more
+            than this fraction (e.g., 0.25 for 25%).
+        memory_threshold: Flag a case if its peak allocation is larger than
+            the baseline by more than this fraction.
+        exponent_threshold: Flag a case if its scaling exponent grows by more
+            than this amount.
+        min_time: Ignore the wall times of measurements faster than this (in
+            seconds) in the baseline, as they're dominated by noise.
+    """
+
+    regressions: List[str] = []
+
+    for name, current_case in current['results'].items():
+        baseline_case = baseline['results'].get(name)
+        if baseline_case is None:
+            continue
+
+        for size, m in current_case['sizes'].items():
+            b = baseline_case['sizes'].get(size)
+            if b is None:
+                continue
+
+            if b['time_s'] >= min_time and \
+               m['time_s'] > b['time_s'] * (1 + time_threshold):
+                regressions.append(
+                    f"{name} @ {size}: time {b['time_s']:.4f}s -> {m['time_s']:.4f}s "
+                    f"(+{(m['time_s'] / b['time_s'] - 1) * 100:.0f}%)"
+                )
+
+            if b['peak_bytes'] > 0 and \
+               m['peak_bytes'] > b['peak_bytes'] * (1 + memory_threshold):
+                regressions.append(
+                    f"{name} @ {size}: peak memory {b['peak_bytes']} B -> {m['peak_bytes']} B "
+                    f"(+{(m['peak_bytes'] / b['peak_bytes'] - 1) * 100:.0f}%)"
+                )
+
+        b_exponent = baseline_case.get('exponent')
+        m_exponent = current_case.get('exponent')
+        if b_exponent is not None and m_exponent is not None and \
+           m_exponent > b_exponent + exponent_threshold:
+            regressions.append(
+                f"{name}: scaling exponent {b_exponent:.2f} -> {m_exponent:.2f}"
+            )
+
+    return regressions
+
+def format_table(results: Results) -> str:
+
+    """
+    Formats the results as a plain-text table, one row per case and size.
+    """
+
+    rows = [('case', 'size', 'elements', 'time (s)', 'peak (KiB)', 'retained (KiB)', 'exponent')]
+    for name, case in results['results'].items():
+        exponent = case.get('exponent')
+        for size, m in case['sizes'].items():
+            rows.append((
+                name,
+                size,
+                str(m['elements']),
+                f"{m['time_s']:.4f}",
+                f"{m['peak_bytes'] / 1024:.0f}",
+                f"{m['retained_bytes'] / 1024:.0f}",
+                f"{exponent:.2f}" if exponent is not None else '-',
+            ))
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return '\n'.join(
+        '  '.join(cell.ljust(width) for cell, width in zip(row, widths))
+        for row in rows
+    )
+
+def _load(path: str) -> Results:
+    with open(path, 'r', encoding='utf-8') as f:
+        results: Results = json.load(f)
+    return results
+
+def _report(regressions: List[str]) -> int:
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+def main(argv: Optional[Sequence[str]]=None) -> int:
+
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description="Benchmarks for buildzr.",
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Run the benchmarks.")
+    run_parser.add_argument(
+        '--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+        help="Approximate numbers of elements in the benchmarked workspaces.",
+    )
+    run_parser.add_argument(
+        '--cases', nargs='+', choices=sorted(CASES_BY_NAME),
+        help="Cases to run. Defaults to all cases, except the optional ones.",
+    )
+    run_parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement.")
+    run_parser.add_argument('--output', help="Write the results to this JSON file.")
+    run_parser.add_argument('--compare', metavar='BASELINE', help="Compare the results against this JSON file.")
+
+    compare_parser = subparsers.add_parser('compare', help="Compare two result files.")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+
+    for p in (run_parser, compare_parser):
+        p.add_argument('--time-threshold', type=float, default=0.25)
+        p.add_argument('--memory-threshold', type=float, default=0.25)
+        p.add_argument('--exponent-threshold', type=float, default=0.2)
+
+    args = parser.parse_args(argv)
+
+    def thresholds() -> Dict[str, float]:
+        return {
+            'time_threshold': args.time_threshold,
+            'memory_threshold': args.memory_threshold,
+            'exponent_threshold': args.exponent_threshold,
+        }
+
+    if args.command == 'compare':
+        return _report(compare(_load(args.baseline), _load(args.current), **thresholds()))
+
+    if args.cases:
+        cases = [CASES_BY_NAME[name] for name in args.cases]
+    else:
+        cases = [case for case in CASES if not case.optional]
+
+    results = run(cases, sorted(args.sizes), repeat=args.repeat)
+    print(format_table(results))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        return _report(compare(_load(args.compare), results, **thresholds()))
+
+    return 0
@@ -0,0 +1,83 @@
+"""The `buildzr` command-line interface."""
+
+import argparse
+from typing import Optional, Sequence
+
+def _watch(args: argparse.Namespace) -> int:
+    from buildzr.cli.watch import Watcher
+    watcher = Watcher(args.paths, out=args.out, format=args.format, interval=args.interval)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def _build(args: argparse.Namespace) -> int:
+    from buildzr.cli.build import Builder
+    builder = Builder(
+        out=args.out,
+        formats=args.format or ['json'],
+        pretty=args.pretty,
+        manifest_path=args.manifest,
+        force=args.force,
+    )
+    builder.build(args.paths)
+    return 0
+
+def _parser() -> argparse.ArgumentParser:
+
+    parser = argparse.ArgumentParser(
+        prog='buildzr',
+        description="Build the workspaces defined with buildzr.",
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser(
+        'build',
+        help="Export the workspaces defined by Python files, rewriting only the outputs that changed.",
+    )
+    build.add_argument('paths', nargs='+', help="The Python files defining the workspaces.")
+    build.add_argument('--out', default='.', help="The output directory (default: the current directory).")
+    build.add_argument(
+        '--format',
+        action='append',
+        choices=['json', 'plantuml', 'svg', 'png'],
+        help="An output format. Can be repeated (default: json).",
+    )
+    build.add_argument('--pretty', action='store_true', help="Indent the JSON output.")
+    build.add_argument(
+        '--manifest',
+        default=None,
+        help="The path to the build manifest (default: .buildzr-manifest.json in the output directory).",
+    )
+    build.add_argument('--force', action='store_true', help="Export all the workspaces, even if they didn't change.")
+    build.set_defaults(handler=_build)
+
+    watch = commands.add_parser(
+        'watch',
+        help="Export the workspaces defined by Python files each time the files change.",
+    )
+    watch.add_argument('paths', nargs='+', help="The Python files defining the workspaces.")
+    watch.add_argument('--out', default='.', help="The output directory (default: the current directory).")
+    watch.add_argument(
+        '--format',
+        choices=['json', 'plantuml', 'svg', 'png'],
+        default='plantuml',
+        help="The output format (default: plantuml).",
+    )
+    watch.add_argument(
+        '--interval',
+        type=float,
+        default=0.5,
+        help="The interval, in seconds, between the checks for changes (default: 0.5).",
+    )
+    watch.set_defaults(handler=_watch)
+
+    return parser
+
+def main(argv: Optional[Sequence[str]]=None) -> int:
+    """CLI entry point."""
+    args = _parser().parse_args(argv)
+    return int(args.handler(args))
+
+__all__ = ['main']
@@ -0,0 +1,218 @@
+"""The `buildzr build` command."""
+
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+)
+
+from buildzr.cli.definitions import load_definition
+from buildzr.cli.outputs import atomic_write, diagram_file_name, file_sha256, sha256
+from buildzr.dsl import Workspace
+
+BuildFormat = Literal['json', 'plantuml', 'svg', 'png']
+
+MANIFEST_NAME = '.buildzr-manifest.json'
+MANIFEST_VERSION = 2
+
+@dataclass
+class BuildResult:
+
+    """
+    The outputs of a build, as paths relative to the output directory.
+
+    Attributes:
+        written: The outputs written, because they're new or changed.
+        unchanged: The outputs that already had the right content.
+        removed: The outputs of the previous build that are no longer
+            produced (e.g., of a view that was removed), and were deleted.
+        skipped: The workspace and format pairs that weren't exported at
+            all, because their model and views didn't change since the
+            previous build.
+    """
+
+    written: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+
+class Builder:
+
+    """
+    Exports the workspaces defined by Python files with `Workspace.save`,
+    incrementally.
+
+    A manifest in the output directory records, for each workspace and
+    format, the hash of the workspace's JSON, and the hash, size and
+    modification time of each output. A workspace isn't exported again in a
+    format (and its diagrams aren't rendered again) if its JSON and its
+    outputs didn't change. Otherwise, it's saved to a staging directory, and
+    only the outputs whose content changed replace the previous ones,
+    atomically.
+
+    The JSON output of a workspace is named after the workspace, and its
+    diagrams after the workspace and the view key (e.g.,
+    `my_workspace-context.svg`).
+
+    Example:
+        >>> Builder(out='dist/', formats=['json', 'svg']).build(['model.py'])
+    """
+
+    def __init__(
+        self,
+        out: str,
+        formats: Sequence[BuildFormat]=('json',),
+        pretty: bool=False,
+        manifest_path: Optional[str]=None,
+        force: bool=False,
+        log: Callable[[str], None]=print,
+    ) -> None:
+        self._out = out
+        self._formats = list(formats)
+        self._pretty = pretty
+        self._manifest_path = manifest_path or os.path.join(out, MANIFEST_NAME)
+        self._force = force
+        self._log = log
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self._manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {'version': MANIFEST_VERSION, 'entries': {}}
+        if manifest.get('version') != MANIFEST_VERSION:
+            return {'version': MANIFEST_VERSION, 'entries': {}}
+        return dict(manifest)
+
+    def _is_up_to_date(self, entry: Optional[Dict[str, Any]], fingerprint: str) -> bool:
+        if self._force or entry is None or entry.get('input') != fingerprint:
+            return False
+        for output, recorded in entry.get('outputs', {}).items():
+            path = os.path.join(self._out, output)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return False
+            # The outputs can be large images: they're only hashed if their
+            # size or modification time changed.
+            if (stat.st_size, stat.st_mtime_ns) == (recorded['size'], recorded['mtime_ns']):
+                continue
+            if file_sha256(path) != recorded['sha256']:
+                return False
+            recorded.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        return True
+
+    def _output_name(self, name: str, format: BuildFormat, file: str) -> str:
+        if format == 'json':
+            return file
+        view_key, extension = os.path.splitext(file)
+        return diagram_file_name(name, view_key, extension[1:])
+
+    def _save(
+        self,
+        workspace: Workspace,
+        format: BuildFormat,
+        name: str,
+        result: BuildResult,
+    ) -> Dict[str, Dict[str, Any]]:
+
+        """
+        Saves the `workspace` in the `format` to a staging directory, and
+        moves the outputs that changed to the output directory. Returns the
+        hash, size and modification time of each output.
+        """
+
+        os.makedirs(self._out, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self._out, prefix='.buildzr-')
+        try:
+            if format == 'json':
+                workspace.save(format='json', path=os.path.join(staging, f"{name}.json"), pretty=self._pretty)
+            else:
+                workspace.save(format=format, path=staging)
+
+            outputs: Dict[str, Dict[str, Any]] = {}
+            for file in sorted(os.listdir(staging)):
+                staged = os.path.join(staging, file)
+                output = self._output_name(name, format, file)
+                path = os.path.join(self._out, output)
+                digest = file_sha256(staged)
+                if os.path.exists(path) and file_sha256(path) == digest:
+                    result.unchanged.append(output)
+                else:
+                    # Same file system, so the file is replaced atomically.
+                    os.replace(staged, path)
+                    result.written.append(output)
+                stat = os.stat(path)
+                outputs[output] = {'sha256': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+            return outputs
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def build(self, paths: Sequence[str]) -> BuildResult:
+
+        """
+        Runs the Python files at `paths`, and exports their workspaces in each
+        format.
+        """
+
+        # All the workspaces are loaded, and their names checked, before
+        # anything is written.
+        workspaces: Dict[str, Workspace] = {}
+        for path in paths:
+            for workspace in load_definition(path).workspaces:
+                name = workspace._sanitize_name(workspace.model.name or 'workspace')
+                if name in workspaces:
+                    raise ValueError(f"More than one workspace is named '{workspace.model.name}'.")
+                workspaces[name] = workspace
+
+        manifest = self._load_manifest()
+        # The entries of the workspaces not built this time are kept.
+        entries: Dict[str, Any] = dict(manifest['entries'])
+        built: Dict[str, Any] = {}
+        result = BuildResult()
+
+        for name, workspace in workspaces.items():
+            content = workspace.to_json(pretty=False).encode('utf-8')
+
+            for format in self._formats:
+                key = f"{name}:{format}"
+                fingerprint = sha256(f"{format}:{self._pretty}:".encode('utf-8') + content)
+
+                entry = entries.get(key)
+                if self._is_up_to_date(entry, fingerprint):
+                    built[key] = entry
+                    result.skipped.append(key)
+                    continue
+
+                outputs = self._save(workspace, format, name, result)
+                built[key] = {'input': fingerprint, 'outputs': outputs}
+
+                # Remove the outputs that are no longer produced.
+                for output in (entry or {}).get('outputs', {}):
+                    stale = os.path.join(self._out, output)
+                    if output not in outputs and os.path.exists(stale):
+                        os.remove(stale)
+                        result.removed.append(output)
+
+        entries.update(built)
+        manifest['entries'] = entries
+        atomic_write(self._manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+        for output in result.written:
+            self._log(f"Written: {os.path.join(self._out, output)}")
+        for output in result.removed:
+            self._log(f"Removed: {os.path.join(self._out, output)}")
+        self._log(
+            f"{len(result.written)} written, {len(result.unchanged)} unchanged, "
+            f"{len(result.removed)} removed, {len(result.skipped)} up to date."
+        )
+        return result
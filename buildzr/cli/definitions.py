@@ -0,0 +1,70 @@
+"""Loading the workspaces defined by Python files."""
+
+import os
+import runpy
+import sys
+from dataclasses import dataclass, field
+from typing import List
+
+from buildzr.dsl import Workspace
+from buildzr.dsl.factory import GenerateId
+
+@dataclass
+class Definition:
+
+    """
+    The workspaces defined by a Python file.
+
+    Attributes:
+        path: The path to the file.
+        workspaces: The workspaces assigned to the module-level variables of
+            the file, in order of definition.
+        dependencies: The file, and the files of the modules it imported
+            from its own directory (or its subdirectories).
+    """
+
+    path: str
+    workspaces: List[Workspace] = field(default_factory=list)
+    dependencies: List[str] = field(default_factory=list)
+
+def load_definition(path: str) -> Definition:
+
+    """
+    Runs the Python file at `path`, and returns the workspaces it defines.
+
+    The file is run with `__name__` set to `'__buildzr__'`, so the code under
+    `if __name__ == '__main__':` isn't run. The element IDs are generated
+    from 1, so running the same file twice gives the same workspaces. The
+    modules imported from the directory of the file are unloaded afterwards,
+    so that running the file again picks up their changes.
+
+    Raises:
+        ValueError: If the file doesn't define any workspace.
+    """
+
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    modules_before = set(sys.modules)
+
+    GenerateId.reset()
+    sys.path.insert(0, directory)
+    try:
+        namespace = runpy.run_path(path, run_name='__buildzr__')
+    finally:
+        sys.path.remove(directory)
+        dependencies = [path]
+        for name in set(sys.modules) - modules_before:
+            module_file = getattr(sys.modules[name], '__file__', None)
+            if module_file and os.path.abspath(module_file).startswith(directory + os.sep):
+                dependencies.append(os.path.abspath(module_file))
+                del sys.modules[name]
+
+    definition = Definition(path=path, dependencies=sorted(set(dependencies)))
+    for value in namespace.values():
+        if isinstance(value, Workspace) and all(value is not w for w in definition.workspaces):
+            definition.workspaces.append(value)
+
+    if not definition.workspaces:
+        raise ValueError(f"No workspace is defined in {path}.")
+
+    return definition
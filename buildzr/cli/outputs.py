@@ -0,0 +1,41 @@
+"""Writing the output files of the commands."""
+
+import hashlib
+import os
+import tempfile
+
+def diagram_file_name(workspace_name: str, view_key: str, extension: str) -> str:
+    """
+    The name of the file of a diagram. The view keys are only unique within a
+    workspace, so the name starts with the (sanitized) name of the workspace.
+    """
+    return f"{workspace_name}-{view_key}.{extension}"
+
+def sha256(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+def file_sha256(path: str) -> str:
+    with open(path, 'rb') as f:
+        return sha256(f.read())
+
+def atomic_write(path: str, content: bytes) -> None:
+
+    """
+    Writes the `content` to the file at `path` atomically: the content is
+    written to a temporary file in the same directory, which then replaces
+    the file. Readers see either the previous or the new content, never a
+    partially written file.
+    """
+
+    directory = os.path.dirname(path) or os.curdir
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
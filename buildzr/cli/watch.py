@@ -0,0 +1,201 @@
+"""The `buildzr watch` command."""
+
+import os
+import time
+import traceback
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from buildzr.cli.definitions import load_definition
+from buildzr.cli.outputs import atomic_write, diagram_file_name, sha256
+from buildzr.dsl import Workspace
+
+WatchFormat = Literal['json', 'plantuml', 'svg', 'png']
+
+_FileState = Optional[Tuple[int, int]]
+
+class Watcher:
+
+    """
+    Exports the workspaces defined by Python files every time the files
+    change.
+
+    The process is kept warm between the changes: the JVM used to export the
+    diagrams is started once, and the files are only run again when they (or
+    the local modules they import) change. The workspaces whose JSON didn't
+    change aren't exported again. For the others, the PlantUML of all their
+    views is exported again, but only the outputs whose content changed are
+    written, and only the views whose PlantUML changed are rendered again.
+
+    The diagram files are named after the workspace and the view key (e.g.,
+    `my_workspace-context.svg`), so the views of different workspaces with
+    the same key don't overwrite each other.
+
+    Example:
+        >>> Watcher(['model.py'], out='diagrams/', format='svg').run()
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[str],
+        out: str,
+        format: WatchFormat='plantuml',
+        interval: float=0.5,
+        log: Callable[[str], None]=print,
+    ) -> None:
+        self._paths = [os.path.abspath(path) for path in paths]
+        self._out = out
+        self._format = format
+        self._interval = interval
+        self._log = log
+
+        self._watched: Dict[str, _FileState] = {path: None for path in self._paths}
+
+        # The hash of the JSON of each workspace exported, to skip the export
+        # of the diagrams when the model and the views didn't change at all.
+        self._fingerprints: Dict[str, str] = {}
+
+        # The hash of the content of each output written.
+        self._outputs: Dict[str, str] = {}
+
+        self._sink: Optional[Any] = None
+
+    def _plantuml_sink(self) -> Any:
+
+        """
+        Returns the sink exporting the diagrams, starting the JVM the first
+        time.
+        """
+
+        if self._sink is None:
+            try:
+                from buildzr.sinks.plantuml_sink import PlantUmlSink, PlantUmlSinkConfig
+                sink = PlantUmlSink()
+                sink._ensure_jvm_started(PlantUmlSinkConfig(path=''))
+            except ImportError as e:
+                raise ImportError(
+                    "jpype1 is required for diagram export. "
+                    "Install with: pip install buildzr[export-plantuml]"
+                ) from e
+            self._sink = sink
+        return self._sink
+
+    def _state(self, path: str) -> _FileState:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def changed(self) -> List[str]:
+        """
+        Returns the watched files that changed since the last build.
+        """
+        return [
+            path for path, state in self._watched.items()
+            if self._state(path) != state
+        ]
+
+    def _write(self, path: str, content: bytes) -> bool:
+
+        """
+        Writes the `content` to the file at `path`, unless the file already
+        has this content. Returns `True` if the file was written.
+        """
+
+        digest = sha256(content)
+        if self._outputs.get(path) == digest and os.path.exists(path):
+            return False
+        atomic_write(path, content)
+        self._outputs[path] = digest
+        return True
+
+    def _export(self, workspace: Workspace) -> List[str]:
+
+        from buildzr.encoders.encoder import JsonEncoder
+
+        name = workspace._sanitize_name(workspace.model.name or 'workspace')
+        merged = workspace._merged_workspace()
+        json_content = JsonEncoder(indent=2).encode(merged)
+
+        if self._format == 'json':
+            path = os.path.join(self._out, f"{name}.json")
+            return [path] if self._write(path, json_content.encode('utf-8')) else []
+
+        fingerprint = sha256(json_content.encode('utf-8'))
+        if self._fingerprints.get(name) == fingerprint:
+            return []
+
+        sink = self._plantuml_sink()
+        written: List[str] = []
+        for view_key, puml in sink.export_to_dict(merged).items():
+            puml_path = os.path.join(self._out, diagram_file_name(name, view_key, 'puml'))
+            puml_changed = self._write(puml_path, puml.encode('utf-8'))
+            if puml_changed:
+                written.append(puml_path)
+
+            if self._format in ('svg', 'png'):
+                image_path = os.path.join(self._out, diagram_file_name(name, view_key, self._format))
+                if puml_changed or not os.path.exists(image_path):
+                    self._write(image_path, sink.render(puml, self._format))
+                    written.append(image_path)
+
+        self._fingerprints[name] = fingerprint
+        return written
+
+    def rebuild(self) -> List[str]:
+
+        """
+        Runs the watched files, and exports their workspaces.
+
+        Returns:
+            The paths to the files written.
+        """
+
+        # The states are recorded before the files are run, so that a change
+        # made while they're running is picked up by the next build.
+        self._watched = {path: self._state(path) for path in self._watched}
+
+        written: List[str] = []
+        for path in self._paths:
+            definition = load_definition(path)
+            for dependency in definition.dependencies:
+                self._watched.setdefault(dependency, self._state(dependency))
+            for workspace in definition.workspaces:
+                written.extend(self._export(workspace))
+        return written
+
+    def run(self, max_builds: Optional[int]=None) -> None:
+
+        """
+        Builds the workspaces, and builds them again each time the watched
+        files change, until interrupted (or after `max_builds` builds).
+        """
+
+        builds = 0
+        while max_builds is None or builds < max_builds:
+            if builds == 0 or self.changed():
+                builds += 1
+                started = time.perf_counter()
+                try:
+                    written = self.rebuild()
+                except Exception:
+                    self._log(traceback.format_exc())
+                    self._log("Build failed. Waiting for changes...")
+                else:
+                    for path in written:
+                        self._log(f"Written: {path}")
+                    self._log(
+                        f"Built in {time.perf_counter() - started:.2f}s "
+                        f"({len(written)} files written). Waiting for changes..."
+                    )
+                continue
+            time.sleep(self._interval)
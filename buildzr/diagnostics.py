@@ -0,0 +1,293 @@
+"""
+Diagnostics of the resources used by a workspace.
+
+Example:
+    >>> from buildzr.diagnostics import memory_report
+    >>> report = memory_report(workspace)
+    >>> print(report.format())
+    >>> json.dump(report.to_dict(), f)  # Track the report over time.
+"""
+
+import sys
+import types
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from enum import Enum
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Set,
+)
+
+from buildzr.dsl.dsl import Workspace
+from buildzr.dsl.explorer import Explorer
+
+# Objects that are shared by the whole process rather than owned by the
+# workspace, and aren't counted.
+_SHARED_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    types.CodeType,
+    Enum,
+    bool,
+    type(None),
+)
+
+class _Sizer:
+
+    """
+    Sums the `sys.getsizeof` of the objects reachable from the measured
+    objects. Each object is counted once: objects already counted by a
+    previous measurement count for nothing, so the order of the measurements
+    decides which part of the report an object shared by several parts is
+    attributed to.
+    """
+
+    def __init__(self) -> None:
+        self._seen: Set[int] = set()
+        self._boundaries: Set[int] = set()
+
+    def add_boundaries(self, objects: Iterable[Any]) -> None:
+        """
+        The traversal stops at these objects, unless they're measured
+        directly.
+        """
+        self._boundaries.update(id(obj) for obj in objects)
+
+    def measure(self, *objects: Any) -> int:
+        roots = {id(obj) for obj in objects}
+        total = 0
+        stack: deque = deque(objects)
+        while stack:
+            obj = stack.pop()
+            obj_id = id(obj)
+            if obj_id in self._seen or isinstance(obj, _SHARED_TYPES):
+                continue
+            if obj_id in self._boundaries and obj_id not in roots:
+                continue
+            self._seen.add(obj_id)
+            total += sys.getsizeof(obj)
+
+            if isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+                stack.extend(obj)
+            elif isinstance(obj, (str, bytes, int, float)):
+                continue
+
+            if hasattr(obj, '__dict__'):
+                stack.append(vars(obj))
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, '__slots__', ()):
+                    if slot not in ('__dict__', '__weakref__') and hasattr(obj, slot):
+                        stack.append(getattr(obj, slot))
+        return total
+
+@dataclass
+class ElementTypeUsage:
+
+    """
+    The memory retained by the elements of a type, in bytes.
+
+    Attributes:
+        count: The number of elements.
+        wrappers: The DSL objects (e.g., `buildzr.dsl.SoftwareSystem`),
+            including their lists of sources and destinations.
+        models: The `buildzr.models` dataclasses of the elements.
+        tags: The tag sets of the DSL objects and the tag strings of the
+            models.
+        relationships: The relationships from the elements, both the DSL
+            objects and the models.
+    """
+
+    count: int = 0
+    wrappers: int = 0
+    models: int = 0
+    tags: int = 0
+    relationships: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.wrappers + self.models + self.tags + self.relationships
+
+@dataclass
+class ViewUsage:
+
+    """
+    The memory retained by a view, in bytes, with the number of elements and
+    relationships in the view.
+    """
+
+    type: str
+    elements: int
+    relationships: int
+    size: int
+
+@dataclass
+class MemoryReport:
+
+    """
+    The memory retained by a workspace, in bytes.
+
+    Attributes:
+        element_types: The elements, by type (e.g., `'SoftwareSystem'`).
+        views: The views, by key.
+        subsystems: The parts of the workspace:
+            - `elements`: the elements and their relationships (the sum of
+              `element_types`).
+            - `views`: the views (the sum of `views`).
+            - `styles`: the styles, themes and other configuration of the
+              views.
+            - `extended_model`: the parts of the workspace loaded with
+              `Workspace(..., extend=...)` that aren't elements of this
+              workspace.
+            - `workspace`: the rest of the workspace.
+            - `merged_model`: the copy made by `Workspace._merge_models`
+              when exporting an extended workspace, if it's included.
+    """
+
+    element_types: Dict[str, ElementTypeUsage] = field(default_factory=dict)
+    views: Dict[str, ViewUsage] = field(default_factory=dict)
+    subsystems: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.subsystems.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'subsystems': dict(self.subsystems),
+            'element_types': {
+                name: {**asdict(usage), 'total': usage.total}
+                for name, usage in self.element_types.items()
+            },
+            'views': {key: asdict(usage) for key, usage in self.views.items()},
+        }
+
+    def format(self) -> str:
+
+        """
+        Returns the report as plain-text tables, largest first.
+        """
+
+        def kib(size: int) -> str:
+            return f"{size / 1024:>12.1f}"
+
+        lines = [f"{'subsystem':<32} {'KiB':>12}"]
+        for name, size in sorted(self.subsystems.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"{name:<32} {kib(size)}")
+        lines.append(f"{'total':<32} {kib(self.total)}")
+
+        lines.append('')
+        lines.append(
+            f"{'element type':<32} {'count':>8} {'wrappers':>12} {'models':>12} "
+            f"{'tags':>12} {'relations':>12} {'KiB':>12}"
+        )
+        for name, usage in sorted(self.element_types.items(), key=lambda item: item[1].total, reverse=True):
+            lines.append(
+                f"{name:<32} {usage.count:>8} {kib(usage.wrappers)} {kib(usage.models)} "
+                f"{kib(usage.tags)} {kib(usage.relationships)} {kib(usage.total)}"
+            )
+
+        if self.views:
+            lines.append('')
+            lines.append(f"{'view':<32} {'type':<20} {'elements':>8} {'relations':>9} {'KiB':>12}")
+            for key, view in sorted(self.views.items(), key=lambda item: item[1].size, reverse=True):
+                lines.append(
+                    f"{key:<32} {view.type:<20} {view.elements:>8} {view.relationships:>9} {kib(view.size)}"
+                )
+
+        return '\n'.join(lines)
+
+def _view_models(workspace: Workspace) -> List[Any]:
+    views = workspace.model.views
+    if views is None:
+        return []
+    return [
+        view
+        for view_list in (
+            views.systemLandscapeViews,
+            views.systemContextViews,
+            views.containerViews,
+            views.componentViews,
+            views.dynamicViews,
+            views.deploymentViews,
+            views.filteredViews,
+            views.customViews,
+            views.imageViews,
+        )
+        for view in view_list or []
+    ]
+
+def memory_report(workspace: Workspace, include_merged: bool=False) -> MemoryReport:
+
+    """
+    Returns the memory retained by the `workspace`, broken down by element
+    type, by view and by subsystem.
+
+    The sizes are the sums of `sys.getsizeof` of the objects reachable from
+    each part, with each object counted once, in the first part that reaches
+    it. Objects shared by the whole process (e.g., classes, functions and
+    enumeration members) aren't counted.
+
+    Args:
+        workspace: The workspace to measure.
+        include_merged: Whether to measure the copy of the model made by
+            `Workspace._merge_models` when exporting a workspace that extends
+            another one. This merges the models, which also updates the views
+            and implies the relationships, as exporting does.
+
+    Returns:
+        The report. Use `MemoryReport.to_dict` to save it.
+    """
+
+    sizer = _Sizer()
+    report = MemoryReport()
+
+    elements = list(Explorer(workspace).walk_elements())
+    views = _view_models(workspace)
+    sizer.add_boundaries([workspace, workspace.model])
+    sizer.add_boundaries(elements)
+    sizer.add_boundaries(element.model for element in elements)
+    sizer.add_boundaries(views)
+
+    # The tags and the relationships are measured first, so that they aren't
+    # counted with the wrappers and the models that refer to them.
+    for element in elements:
+        usage = report.element_types.setdefault(type(element).__name__, ElementTypeUsage())
+        usage.count += 1
+        usage.tags += sizer.measure(element.tags, element.model.tags)
+        usage.relationships += sizer.measure(*element.relationships, *(element.model.relationships or []))
+
+    for element in elements:
+        usage = report.element_types[type(element).__name__]
+        usage.wrappers += sizer.measure(element)
+        usage.models += sizer.measure(element.model)
+
+    # The DSL objects of the views that are kept up to date, by key.
+    live_views = {view.model.key: view for view in workspace._views}
+    for view in views:
+        report.views[view.key] = ViewUsage(
+            type=type(view).__name__,
+            elements=len(getattr(view, 'elements', None) or []),
+            relationships=len(getattr(view, 'relationships', None) or []),
+            size=sizer.measure(view, *([live_views[view.key]] if view.key in live_views else [])),
+        )
+
+    report.subsystems['elements'] = sum(usage.total for usage in report.element_types.values())
+    report.subsystems['views'] = sum(view.size for view in report.views.values())
+    report.subsystems['styles'] = sizer.measure(workspace.model.views) if workspace.model.views else 0
+    report.subsystems['extended_model'] = sizer.measure(workspace._extended_model) if workspace._extended_model else 0
+    report.subsystems['workspace'] = sizer.measure(workspace)
+
+    if include_merged and workspace._extended_model:
+        report.subsystems['merged_model'] = sizer.measure(workspace._merged_workspace())
+
+    return report
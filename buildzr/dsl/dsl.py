@@ -6,6 +6,10 @@ from typing_extensions import (
     Self,
     TypeIs,
 )
+import contextlib
+import contextvars
+import functools
+import threading
 from collections import deque
 from contextvars import ContextVar
 from typing import (
@@ -23,6 +27,10 @@ from typing import (
     Literal,
     cast,
     Type,
+    Mapping,
+    Sequence,
+    TYPE_CHECKING,
+    ContextManager,
     overload
 )
 
@@ -35,21 +43,67 @@ from buildzr.dsl.interfaces import (
     DslInfrastructureNodeElement,
     DslDeploymentNodeElement,
     DslElementInstance,
+    ElementList,
+    RelationshipSet,
+    element_ids,
+    join_tags,
 )
 from buildzr.dsl.relations import (
     DslElementRelationOverrides,
     DslRelationship,
     _Relationship,
+    _UsesData,
+    _find_workspace,
 )
 from buildzr.dsl.color import Color
+from buildzr.profiling import SpanRecorder, collecting, span, traced
+
+if TYPE_CHECKING:
+    from buildzr.dsl.expression import Expression
 
 # Type alias for save() format parameter
-SaveFormat = Literal['json', 'plantuml', 'svg', 'png']
+SaveFormat = Literal['json', 'plantuml', 'svg', 'png', 'mermaid']
 
 
 def _child_name_transform(name: str) -> str:
     return name.lower().replace(' ', '_')
 
+BulkRecords = Union[Iterable[Mapping[str, Any]], Mapping[str, Sequence[Any]]]
+
+def _bulk_records(records: BulkRecords) -> List[Mapping[str, Any]]:
+    """
+    Returns the records as a list of mappings. The records can either be an
+    iterable of mappings, or columns (a mapping of field names to sequences of
+    values).
+    """
+    if isinstance(records, Mapping):
+        fields = list(records.keys())
+        return [
+            dict(zip(fields, values))
+            for values in zip(*(records[field] for field in fields))
+        ]
+    return list(records)
+
+def _bulk_tags(tags: Optional[Union[str, Iterable[str]]]) -> Set[str]:
+    if not tags:
+        return set()
+    if isinstance(tags, str):
+        return {tag.strip() for tag in tags.split(',') if tag.strip()}
+    return set(tags)
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+def _profiled(method: F) -> F:
+    """
+    Records the spans of a method of a workspace created with `profile=True`
+    in its profiler.
+    """
+    @functools.wraps(method)
+    def wrapper(self: 'Workspace', *args: Any, **kwargs: Any) -> Any:
+        with self._profiling():
+            return method(self, *args, **kwargs)
+    return cast(F, wrapper)
+
 TypedModel = TypeVar('TypedModel')
 class TypedDynamicAttribute(Generic[TypedModel]):
 
@@ -59,12 +113,95 @@ class TypedDynamicAttribute(Generic[TypedModel]):
     def __getattr__(self, name: str) -> TypedModel:
         return cast(TypedModel, self._dynamic_attributes.get(name))
 
+class _LazyWrappers(Dict[str, Any]):
+
+    """
+    The DSL wrappers of the elements of an extended workspace, by their
+    (transformed) names. Each wrapper is only created when it's first looked
+    up, or when the elements are walked (see `wrap_into`), so that extending a
+    large workspace doesn't wrap the elements the child workspace never uses.
+
+    Other values can be set like in any dictionary, replacing the wrappers
+    with the same name.
+
+    The wrappers are created under a lock, since the views may read the
+    elements from several threads at once (see `Workspace.materialize_views`).
+    """
+
+    def __init__(self, wrap: Callable[[Any], Any]) -> None:
+        super().__init__()
+        self._wrap = wrap
+        self._models: List[Any] = []
+        self._pending: Dict[str, Any] = {}
+        self._wrappers: Dict[int, Any] = {}
+        self._wrapped_all = False
+        self._lock = threading.RLock()
+
+    def add(self, name: str, model: Any) -> None:
+        """Adds the model of an element, to be wrapped when it's looked up."""
+        self._models.append(model)
+        self._pending[name] = model
+        super().pop(name, None)
+
+    def wrapper(self, model: Any) -> Any:
+        with self._lock:
+            wrapper = self._wrappers.get(id(model))
+            if wrapper is None:
+                wrapper = self._wrappers[id(model)] = self._wrap(model)
+            return wrapper
+
+    def wrap_into(self, children: Optional[List[Any]]) -> None:
+        """
+        Inserts the wrappers of all the models added, in order, before the
+        other `children` of their parent. Only the first call does.
+        """
+        if self._wrapped_all or children is None:
+            return
+        with self._lock:
+            # Another thread may have wrapped them while this one waited.
+            if self._wrapped_all:
+                return
+            children[:0] = [self.wrapper(model) for model in self._models]
+            self._wrapped_all = True
+
+    def __missing__(self, name: str) -> Any:
+        with self._lock:
+            # Another thread may have wrapped it while this one waited.
+            if super().__contains__(name):
+                return super().__getitem__(name)
+            wrapper = self.wrapper(self._pending.pop(name))
+            super().__setitem__(name, wrapper)
+            return wrapper
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        with self._lock:
+            self._pending.pop(name, None)
+            super().__setitem__(name, value)
+
+    def __contains__(self, name: object) -> bool:
+        with self._lock:
+            return super().__contains__(name) or name in self._pending
+
+    def get(self, name: str, default: Any=None) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def keys(self) -> Any:
+        with self._lock:
+            return dict.fromkeys([*super().keys(), *self._pending]).keys()
+
+# The DSL context state is per context (thread or asyncio task), and the
+# stacks are immutable tuples: entering a group or a deployment node sets a new
+# tuple instead of modifying the current one, so that concurrent builds don't
+# share any state.
 _current_workspace: ContextVar[Optional['Workspace']] = ContextVar('current_workspace', default=None)
-_current_group_stack: ContextVar[List['Group']] = ContextVar('current_group', default=[])
+_current_group_stack: ContextVar[Tuple['Group', ...]] = ContextVar('current_group', default=())
 _current_software_system: ContextVar[Optional['SoftwareSystem']] = ContextVar('current_software_system', default=None)
 _current_container: ContextVar[Optional['Container']] = ContextVar('current_container', default=None)
 _current_deployment_environment: ContextVar[Optional['DeploymentEnvironment']] = ContextVar('current_deployment_environment', default=None)
-_current_deployment_node_stack: ContextVar[List['DeploymentNode']] = ContextVar('current_deployment_node', default=[])
+_current_deployment_node_stack: ContextVar[Tuple['DeploymentNode', ...]] = ContextVar('current_deployment_node', default=())
 
 class Workspace(DslWorkspaceElement):
     """
@@ -81,6 +218,10 @@ class Workspace(DslWorkspaceElement):
 
     @property
     def children(self) -> Optional[List[Union['Person', 'SoftwareSystem', 'DeploymentNode', 'Element']]]:
+        if self._lazy_children is not None:
+            # The elements are walked: wrap the ones of the extended
+            # workspace that haven't been yet.
+            self._lazy_children.wrap_into(self._children)
         return self._children
 
     def __init__(
@@ -91,22 +232,65 @@ class Workspace(DslWorkspaceElement):
             implied_relationships: bool=False,
             group_separator: str='/',
             extend: Optional[str]=None,
+            profile: bool=False,
+            defer_views: bool=False,
+            layout: bool=False,
         ) -> None:
 
+        # Profiling is enabled first, so that loading the extended workspace is
+        # profiled too. The profiler only collects the spans of the workspace:
+        # those of its `with` block, and of its methods (see `_profiling`).
+        self._profiler: Optional[SpanRecorder] = SpanRecorder() if profile else None
+        self._profiling_scope = contextlib.ExitStack()
+
         self._m = buildzr.models.Workspace()
         self._parent = None
         self._children: Optional[List[Union['Person', 'SoftwareSystem', 'DeploymentNode', 'Element']]] = []
         self._dynamic_attrs: Dict[str, Union['Person', 'SoftwareSystem', 'Element']] = {}
+        self._lazy_children: Optional[_LazyWrappers] = None
         self._use_implied_relationships = implied_relationships
         self._group_separator = group_separator
 
+        # Views that are kept up to date as the model changes, and the
+        # elements and relationships added since they were last updated.
+        self._views: List['LiveView'] = []
+        self._added_elements: List[DslElement] = []
+        self._added_relationships: List[DslRelationship] = []
+
+        # With `defer_views`, the views are only computed when the workspace
+        # is exported (see `materialize_views`).
+        self._defer_views = defer_views
+        self._deferred_views: List['AnyView'] = []
+
+        # With `layout`, the elements of the views are positioned when the
+        # workspace is exported (see `buildzr.layout`), in a copy of the
+        # workspace that's reused until the workspace changes.
+        self._layout = layout
+        self._laid_out: Optional[Tuple[int, buildzr.models.Workspace]] = None
+
+        # Bumped on every change to the workspace: when it's entered, and when
+        # elements, relationships, views or styles are added to it.
+        self._revision = 0
+
+        # The Java workspace, and the diagrams exported from it, reused as long
+        # as the workspace doesn't change (see `_export_plantuml`).
+        self._export_revision: Optional[int] = None
+        self._java_workspace: Any = None
+        self._plantuml_cache: Dict[str, str] = {}
+        self._svg_cache: Dict[str, Tuple[str, str]] = {}
+
         # Workspace extension support - store extended model for merging
         self._extended_model: Optional[buildzr.models.Workspace] = None
 
         if extend:
-            from buildzr.loaders import JsonLoader
-            loader = JsonLoader()
-            self._extended_model = loader.load(extend)
+            import urllib.parse
+            from buildzr.loaders import DslLoader, JsonLoader
+            # Structurizr DSL workspaces are parsed, the others are loaded
+            # from their JSON.
+            is_dsl = urllib.parse.urlparse(extend).path.lower().endswith('.dsl')
+            loader: Union[DslLoader, JsonLoader] = DslLoader() if is_dsl else JsonLoader()
+            with self._profiling():
+                self._extended_model = loader.load(extend)
             # Set ID counter to avoid collisions with extended workspace IDs
             max_id = loader.get_max_element_id(self._extended_model)
             GenerateId.set_offset(max_id)
@@ -144,37 +328,65 @@ class Workspace(DslWorkspaceElement):
         }
 
     def _wrap_parent_elements(self) -> None:
-        """Wrap parent workspace elements with DSL classes for direct access."""
+        """
+        Make the parent workspace elements accessible on the workspace. They
+        are wrapped with DSL classes when they're first accessed, or when the
+        elements of the workspace are walked (e.g., by a view).
+        """
         if self._extended_model is None or self._extended_model.model is None:
             return
 
-        # Wrap software systems from parent
-        if self._extended_model.model.softwareSystems:
-            for ss_model in self._extended_model.model.softwareSystems:
-                ss = SoftwareSystem._from_model(ss_model)
-                ss._parent = self
-                self._children.append(ss)
-                self._add_dynamic_attr(ss_model.name or '', ss)
-
-        # Wrap people from parent
-        if self._extended_model.model.people:
-            for person_model in self._extended_model.model.people:
-                person = Person._from_model(person_model)
-                person._parent = self
-                self._children.append(person)
-                self._add_dynamic_attr(person_model.name or '', person)
+        wrappers = _LazyWrappers(self._wrap_parent_element)
+        for ss_model in self._extended_model.model.softwareSystems or []:
+            wrappers.add(_child_name_transform(ss_model.name or ''), ss_model)
+        for person_model in self._extended_model.model.people or []:
+            wrappers.add(_child_name_transform(person_model.name or ''), person_model)
+
+        self._dynamic_attrs = wrappers
+        self._lazy_children = wrappers
+
+    def _wrap_parent_element(
+        self,
+        model: Union[buildzr.models.SoftwareSystem, buildzr.models.Person],
+    ) -> Union['SoftwareSystem', 'Person']:
+        """Wrap a parent workspace element with its DSL class."""
+        element: Union[SoftwareSystem, Person]
+        if isinstance(model, buildzr.models.Person):
+            element = Person._from_model(model)
+        else:
+            element = SoftwareSystem._from_model(model)
+        # Relationships from the element are recorded by the workspace, and
+        # added to the parent model that's merged on export.
+        element._parent = self
+        return element
 
     def __enter__(self) -> Self:
         """Enter the workspace context."""
         self._token = _current_workspace.set(self)
+        # The elements may be changed within the context.
+        self._revision += 1
+        self._profiling_scope.enter_context(self._profiling())
         return self
 
     def __exit__(self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException], traceback: Optional[Any]) -> None:
 
-        if self._use_implied_relationships:
-            self._imply_relationships()
+        try:
+            if self._use_implied_relationships:
+                self._imply_relationships()
 
-        _current_workspace.reset(self._token)
+            self.update_views()
+        finally:
+            self._profiling_scope.close()
+            _current_workspace.reset(self._token)
+
+    def _profiling(self) -> ContextManager[None]:
+        """
+        Returns a context manager that records the spans of the enclosed
+        code in the profiler of the workspace, if it has one.
+        """
+        if self._profiler is None:
+            return contextlib.nullcontext()
+        return collecting(self._profiler)
 
     def _is_descendant_of(self, element: 'DslElement', potential_ancestor: 'DslElement') -> bool:
         """Check if element is a descendant (child, grandchild, etc.) of potential_ancestor."""
@@ -185,6 +397,15 @@ class Workspace(DslWorkspaceElement):
             current = current.parent
         return False
 
+    @property
+    def profiler(self) -> Optional[SpanRecorder]:
+        """
+        The spans recorded by the workspace created with `profile=True`, or
+        `None` if profiling isn't enabled. See `buildzr.profiling`.
+        """
+        return self._profiler
+
+    @traced()
     def _imply_relationships( self,
     ) -> None:
 
@@ -320,21 +541,347 @@ class Workspace(DslWorkspaceElement):
         else:
             raise ValueError('Invalid element type: Trying to add an element of type {} to a workspace.'.format(type(model)))
 
-    def apply_view( self,
-        view: Union[
-            'SystemLandscapeView',
-            'SystemContextView',
-            'ContainerView',
-            'ComponentView',
-            'DeploymentView',
-            'DynamicView',
-            'CustomView',
+        self._record_element(model)
+
+    def _record_element(self, element: DslElement) -> None:
+        """
+        Records that the `element`, together with its descendants and their
+        relationships, has been added to the workspace, so that the views can
+        be updated with them in `update_views`.
+        """
+
+        self._revision += 1
+        if not self._views:
+            return
+
+        pending = deque([element])
+        while pending:
+            e = pending.popleft()
+            self._added_elements.append(e)
+            self._added_relationships.extend(e.relationships or ())
+            pending.extend(e.children or ())
+
+    def _record_relationship(self, relationship: DslRelationship) -> None:
+        self._revision += 1
+        if self._views:
+            self._added_relationships.append(relationship)
+
+    def _discard_relationship(self, relationship_id: str) -> None:
+        """
+        Forgets a relationship that has been removed from the model (e.g., the
+        duplicate of an existing relationship created by a dynamic view step),
+        so that the views don't refer to it.
+        """
+
+        self._revision += 1
+        self._added_relationships = [
+            r for r in self._added_relationships if r.model.id != relationship_id
         ]
-    ) -> None:
+        for view in self._views:
+            if view.model.relationships:
+                view.model.relationships = [
+                    r for r in view.model.relationships if r.id != relationship_id
+                ]
+
+    @_profiled
+    @traced()
+    def update_views(self) -> None:
+
+        """
+        Updates the views with the elements and relationships added to the
+        workspace since the views were last updated.
+
+        Each view only evaluates its filters against the added elements and
+        relationships (and the elements at both ends of the added
+        relationships), and updates its element and relationship lists in
+        place. This is done automatically when a view is applied, when the
+        workspace context exits, and before the workspace is exported.
+        """
+
+        if not self._added_elements and not self._added_relationships:
+            return
 
         self._imply_relationships()
 
-        view._on_added(self)
+        elements, self._added_elements = self._added_elements, []
+        relationships, self._added_relationships = self._added_relationships, []
+
+        for view in self._views:
+            view._on_changed(self, elements, relationships)
+
+    @_profiled
+    def bulk_load(
+        self,
+        elements: 'BulkRecords'=(),
+        relationships: 'BulkRecords'=(),
+    ) -> Dict[str, Union['Person', 'SoftwareSystem', 'Container', 'Component', 'Element']]:
+
+        """
+        Add many elements and relationships to the workspace at once.
+
+        This is meant for generating workspaces from catalogs (e.g., a service
+        catalog with thousands of systems and dependencies), where building
+        the workspace element by element with the `with` blocks and the `>>`
+        operators is slow. The IDs are allocated in blocks, and the models and
+        the DSL elements are built directly, in one pass over the records.
+
+        Both `elements` and `relationships` can be given either as an
+        iterable of records (mappings), or as columns (a mapping of the field
+        name to a sequence of values, one per record).
+
+        The fields of an element record are:
+            - `type`: One of `'person'`, `'software_system'`, `'container'`,
+              `'component'`, or `'element'`, or the corresponding DSL class.
+            - `name`: The name of the element.
+            - `key` (optional): The key used to refer to the element from
+              other records. Defaults to the `name`.
+            - `parent` (optional): For containers and components, the key of
+              the parent software system or container, or the parent DSL
+              element itself.
+            - `description`, `technology`, `metadata`, `group`, `tags`, and
+              `properties` (optional).
+
+        The fields of a relationship record are:
+            - `source`, `destination`: The keys of the elements, or the DSL
+              elements themselves.
+            - `description`, `technology`, `tags`, `properties`, and `url`
+              (optional).
+
+        Returns:
+            A dictionary mapping the key of each loaded element to its DSL
+            element.
+
+        Example:
+            >>> w.bulk_load(
+            ...     elements={
+            ...         'type': ['software_system', 'software_system'],
+            ...         'name': ['Orders', 'Payments'],
+            ...     },
+            ...     relationships=[
+            ...         {'source': 'Orders', 'destination': 'Payments', 'description': 'Pays with'},
+            ...     ],
+            ... )
+        """
+
+        element_types: Dict[str, Type[Union['Person', 'SoftwareSystem', 'Container', 'Component', 'Element']]] = {
+            'person': Person,
+            'software_system': SoftwareSystem,
+            'container': Container,
+            'component': Component,
+            'element': Element,
+        }
+
+        default_tags: Dict[type, Set[str]] = {
+            Person: {'Element', 'Person'},
+            SoftwareSystem: {'Element', 'Software System'},
+            Container: {'Element', 'Container'},
+            Component: {'Element', 'Component'},
+            Element: {'Element'},
+        }
+
+        element_records = _bulk_records(elements)
+        relationship_records = _bulk_records(relationships)
+
+        # Nothing is added to the workspace until all the records are checked:
+        # an invalid record doesn't leave the workspace half loaded.
+        record_classes: List[type] = []
+        for index, record in enumerate(element_records):
+            if 'name' not in record:
+                raise ValueError(f"Element record {index} has no name.")
+            element_type = record.get('type')
+            cls = element_types.get(element_type) if isinstance(element_type, str) else element_type
+            if cls not in default_tags:
+                raise ValueError(f"Invalid element type: Trying to bulk load element '{record['name']}' of type {element_type!r}.")
+            record_classes.append(cls)
+
+        # Phase 1: Build the models of all the elements.
+        ids = GenerateId.for_elements(len(element_records))
+        keys: List[str] = []
+        classes: Dict[str, type] = {}
+        models: Dict[str, Any] = {}
+        parents: Dict[str, Any] = {}
+
+        for element_id, cls, record in zip(ids, record_classes, element_records):
+            name = record['name']
+            key = str(record.get('key', name))
+            if key in models:
+                raise ValueError(f"Duplicate element key: '{key}'.")
+
+            tags = join_tags(default_tags[cls].union(_bulk_tags(record.get('tags'))))
+            properties = record.get('properties') or {}
+            description = record.get('description') or ""
+
+            model: Any
+            if cls is Person:
+                model = buildzr.models.Person(
+                    id=element_id,
+                    name=name,
+                    description=description,
+                    tags=tags,
+                    properties=properties,
+                    relationships=[],
+                    location=buildzr.models.Location.Unspecified,
+                    group=record.get('group'),
+                )
+            elif cls is SoftwareSystem:
+                model = buildzr.models.SoftwareSystem(
+                    id=element_id,
+                    name=name,
+                    description=description,
+                    tags=tags,
+                    properties=properties,
+                    relationships=[],
+                    containers=[],
+                    location=buildzr.models.Location1.Unspecified,
+                    documentation=buildzr.models.Documentation(),
+                    group=record.get('group'),
+                )
+            elif cls is Container:
+                model = buildzr.models.Container(
+                    id=element_id,
+                    name=name,
+                    description=description,
+                    technology=record.get('technology') or "",
+                    tags=tags,
+                    properties=properties,
+                    relationships=[],
+                    components=[],
+                    group=record.get('group'),
+                )
+            elif cls is Component:
+                model = buildzr.models.Component(
+                    id=element_id,
+                    name=name,
+                    description=description,
+                    technology=record.get('technology') or "",
+                    tags=tags,
+                    properties=properties,
+                    relationships=[],
+                    group=record.get('group'),
+                )
+            else:
+                model = buildzr.models.CustomElement(
+                    id=element_id,
+                    name=name,
+                    metadata=record.get('metadata') or "",
+                    description=description,
+                    tags=tags,
+                    properties=properties,
+                    relationships=[],
+                )
+
+            keys.append(key)
+            classes[key] = cls
+            models[key] = model
+            parents[key] = record.get('parent')
+
+        # Phase 2: Link the models of the containers and components to their
+        # parents' models in the batch. The ones whose parents are existing
+        # DSL elements are attached after being wrapped.
+        attach_to_existing: List[str] = []
+        for key in keys:
+            cls = classes[key]
+            parent = parents[key]
+            if cls in (Person, SoftwareSystem, Element):
+                if parent is not None:
+                    raise ValueError(f"Element '{key}' of type {cls.__name__} cannot have a parent.")
+                continue
+
+            parent_cls = SoftwareSystem if cls is Container else Container
+            if isinstance(parent, DslElement):
+                if not isinstance(parent, parent_cls):
+                    raise ValueError(f"The parent of {cls.__name__} '{key}' must be a {parent_cls.__name__}.")
+                attach_to_existing.append(key)
+            elif parent is not None and classes.get(str(parent)) is parent_cls:
+                parent_model = models[str(parent)]
+                if cls is Container:
+                    parent_model.containers.append(models[key])
+                else:
+                    parent_model.components.append(models[key])
+            else:
+                raise ValueError(f"The parent of {cls.__name__} '{key}' must be the key of a {parent_cls.__name__}.")
+
+        for index, record in enumerate(relationship_records):
+            for end in ('source', 'destination'):
+                ref = record.get(end)
+                if not isinstance(ref, DslElement) and (ref is None or str(ref) not in models):
+                    raise ValueError(f"Unknown {end} element key in relationship {index}: '{ref}'.")
+
+        # Phase 3: Wrap the models with the DSL classes. Wrapping a top-level
+        # element also wraps all of its descendants.
+        wrapped: Dict[str, Union['Person', 'SoftwareSystem', 'Container', 'Component', 'Element']] = {}
+
+        def register(element: Union['SoftwareSystem', 'Container', 'Component']) -> None:
+            wrapped[str(element.model.id)] = element
+            for child in element.children or []:
+                register(child)
+
+        for key in keys:
+            cls = classes[key]
+            if cls is Person:
+                person = Person._from_model(models[key])
+                self.add_model(person)
+                wrapped[str(person.model.id)] = person
+            elif cls is SoftwareSystem:
+                software_system = SoftwareSystem._from_model(models[key])
+                self.add_model(software_system)
+                register(software_system)
+            elif cls is Element:
+                element = Element._from_model(models[key])
+                self.add_model(element)
+                wrapped[str(element.model.id)] = element
+
+        for key in attach_to_existing:
+            parent = parents[key]
+            if classes[key] is Container:
+                container = Container._from_model(models[key], parent)
+                parent.add_container(container)
+                register(container)
+            else:
+                component = Component._from_model(models[key], parent)
+                parent.add_component(component)
+                register(component)
+
+        loaded = {key: wrapped[str(models[key].id)] for key in keys}
+
+        # Phase 4: Create the relationships.
+        def resolve(ref: Any) -> DslElement:
+            return ref if isinstance(ref, DslElement) else loaded[str(ref)]
+
+        relationship_ids = GenerateId.for_relationships(len(relationship_records))
+        for relationship_id, record in zip(relationship_ids, relationship_records):
+            source = resolve(record['source'])
+            destination = resolve(record['destination'])
+            _Relationship(
+                _UsesData(
+                    relationship=buildzr.models.Relationship(
+                        id=relationship_id,
+                        description=record.get('description') or "",
+                        technology=record.get('technology') or "",
+                        sourceId=str(source.model.id),
+                        properties=record.get('properties'),
+                        url=record.get('url'),
+                    ),
+                    source=source,
+                ),
+                destination,
+                tags=_bulk_tags(record.get('tags')),
+            )
+
+        return loaded
+
+    @_profiled
+    def apply_view( self,
+        view: 'AnyView',
+    ) -> None:
+
+        self._revision += 1
+        if self._defer_views:
+            self._deferred_views.append(view)
+        else:
+            self.update_views()
+            self._imply_relationships()
+            self._materialize_view(view)
 
         if not self.model.views:
             self.model.views = buildzr.models.Views()
@@ -383,10 +930,77 @@ class Workspace(DslWorkspaceElement):
         else:
             raise NotImplementedError("The view {0} is currently not supported", type(view))
 
+    def _compute_view(self, view: 'AnyView') -> None:
+        with span(f"{type(view).__name__}._on_added", key=view.model.key):
+            view._on_added(self)
+
+    def _materialize_view(self, view: 'AnyView') -> None:
+
+        self._compute_view(view)
+
+        # Dynamic views are made of explicit steps, so they don't need to
+        # be updated when the model changes.
+        if not isinstance(view, DynamicView):
+            self._views.append(view)
+
+    @_profiled
+    def materialize_views(self, jobs: Optional[int]=None) -> None:
+
+        """
+        Computes the views applied to a workspace created with
+        `defer_views=True` since the views were last materialized.
+
+        The views are computed together, after the relationships are implied
+        once, and include all the elements and relationships in the workspace
+        at this point, including those added after the views were declared.
+        Once materialized, the views are kept up to date as the model changes.
+        This is done automatically before the workspace is exported.
+
+        Args:
+            jobs: The number of threads computing the views. Computing a view
+                only reads the model, so the views (except the dynamic views,
+                which are computed first, one at a time) can be computed in
+                parallel. This is faster on free-threaded Python builds.
+        """
+
+        if not self._deferred_views:
+            return
+
+        self.update_views()
+        self._imply_relationships()
+
+        views, self._deferred_views = self._deferred_views, []
+
+        # Dynamic views may remove the duplicates of existing relationships
+        # from the model, so they're computed before the other views read it.
+        for view in views:
+            if isinstance(view, DynamicView):
+                self._compute_view(view)
+        live_views = [view for view in views if not isinstance(view, DynamicView)]
+
+        if jobs is not None and jobs > 1 and len(live_views) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                # Each view is computed in a copy of the current context, so
+                # that its spans reach the profiler of the workspace.
+                futures = [
+                    executor.submit(contextvars.copy_context().run, self._compute_view, view)
+                    for view in live_views
+                ]
+                # Waited for to re-raise the errors of the views.
+                for future in futures:
+                    future.result()
+        else:
+            for view in live_views:
+                self._compute_view(view)
+
+        self._views.extend(live_views)
+
     def apply_style( self,
         style: Union['StyleElements', 'StyleRelationships'],
     ) -> None:
 
+        self._revision += 1
         style._parent = self
 
         if not self.model.views:
@@ -411,16 +1025,35 @@ class Workspace(DslWorkspaceElement):
         """
         Get the merged workspace model, combining extended workspace if present.
 
-        This method handles implied relationships and workspace extension merging.
+        This method handles implied relationships, workspace extension
+        merging, and the layout of the views with `layout=True`. The views
+        are laid out in a copy of the workspace, once per change to the
+        workspace.
 
         Returns:
             The merged workspace model ready for export.
         """
         self._imply_relationships()
+        self.materialize_views()
+        self.update_views()
 
+        merged = self._m
         if self._extended_model:
-            return self._merge_models(self._extended_model, self._m)
-        return self._m
+            merged = self._merge_models(self._extended_model, self._m)
+        if self._layout:
+            # The views of the workspace are laid out in a copy, since the
+            # layout would otherwise change the live views (which the merged
+            # workspace shares too).
+            if self._laid_out is None or self._laid_out[0] != self._revision:
+                import copy
+                from buildzr.layout import layout_workspace
+                laid_out = copy.deepcopy(merged)
+                layout_workspace(laid_out)
+                self._laid_out = (self._revision, laid_out)
+            return self._laid_out[1]
+        return merged
+
+    @_profiled
     def to_dict(self) -> Dict[str, Any]:
         """
         Return workspace as a JSON-serializable dictionary.
@@ -444,6 +1077,7 @@ class Workspace(DslWorkspaceElement):
         """Sanitize workspace name for use as filename."""
         return name.lower().replace(' ', '_')
 
+    @_profiled
     def save(
         self,
         format: SaveFormat = 'json',
@@ -459,6 +1093,8 @@ class Workspace(DslWorkspaceElement):
                 - 'plantuml': PlantUML .puml files (one per view)
                 - 'svg': SVG image files (one per view)
                 - 'png': PNG image files (one per view)
+                - 'mermaid': Mermaid C4 .mmd files (one per view). Doesn't
+                  require Java.
             path: Output path. Behavior depends on format:
                 - For 'json': file path (defaults to '{cwd}/{workspace_name}.json')
                 - For diagram formats: directory path (defaults to '{cwd}/')
@@ -478,18 +1114,21 @@ class Workspace(DslWorkspaceElement):
             >>> w.save(format='json', path='output/arch.json', pretty=True)
             >>> w.save(format='plantuml', path='diagrams/')
             >>> w.save(format='svg')  # Saves to ./
+            >>> w.save(format='mermaid', path='docs/diagrams/')
         """
         merged = self._merged_workspace()
         workspace_name = self._sanitize_name(self.model.name or 'workspace')
 
         if format == 'json':
             return self._save_json(merged, path, workspace_name, pretty)
+        elif format == 'mermaid':
+            return self._save_mermaid(merged, path)
         elif format in ('plantuml', 'svg', 'png'):
             return self._save_diagrams(merged, path, format)
         else:
             raise ValueError(
                 f"Unsupported format: {format}. "
-                f"Use one of: 'json', 'plantuml', 'svg', 'png'"
+                f"Use one of: 'json', 'plantuml', 'svg', 'png', 'mermaid'"
             )
 
     def _save_json(
@@ -585,6 +1224,145 @@ class Workspace(DslWorkspaceElement):
 
         return created_files
 
+    def _save_mermaid(
+        self,
+        workspace: 'buildzr.models.Workspace',
+        path: Optional[Union[str, Path]],
+    ) -> List[str]:
+        """Save workspace views as Mermaid files."""
+        from buildzr.sinks.mermaid_sink import MermaidSink, MermaidSinkConfig
+        from buildzr.sinks.model_index import iter_views
+
+        if path is None:
+            path = Path.cwd()
+
+        path = Path(path)
+
+        MermaidSink().write(workspace=workspace, config=MermaidSinkConfig(path=str(path)))
+
+        return [str(path / f"{view.key}.mmd") for _, view in iter_views(workspace)]
+
+    @_profiled
+    def save_many(
+        self,
+        formats: Sequence[SaveFormat] = ('json', 'plantuml', 'svg', 'png'),
+        path: Optional[Union[str, Path]] = None,
+        pretty: bool = False,
+        jobs: Optional[int] = None,
+    ) -> Dict[str, Union[str, List[str]]]:
+        """
+        Save workspace to files in several formats at once.
+
+        Unlike calling `save` once per format, the workspace is merged once,
+        converted to the Java workspace once, and the PlantUML of each view is
+        exported once and rendered to every requested image format. The JSON,
+        Mermaid and PlantUML files are written concurrently, while the images
+        are rendered one at a time.
+
+        Args:
+            formats: The output formats, among 'json', 'plantuml', 'svg',
+                'png' and 'mermaid'. Only the files of these formats are
+                written (e.g., the .puml files aren't written unless
+                'plantuml' is requested).
+            path: Output directory (defaults to '{cwd}/'). The JSON file is
+                named '{workspace_name}.json', and the diagram files are named
+                after the view keys.
+            pretty: For 'json' format only, whether to indent output.
+            jobs: The maximum number of threads writing the JSON, Mermaid and
+                PlantUML files. Defaults to the
+                `concurrent.futures.ThreadPoolExecutor` default.
+
+        Returns:
+            For each format, the path to the written file ('json') or the list
+            of paths to the written files (diagram formats).
+
+        Raises:
+            ImportError: If a PlantUML diagram format is requested but jpype1
+                is not installed. Install with: pip install buildzr[export-plantuml]
+            ValueError: If a format is not recognized.
+
+        Example:
+            >>> w.save_many(formats=['json', 'svg', 'png'], path='output/')
+        """
+        import os
+        from concurrent.futures import Future, ThreadPoolExecutor
+        from buildzr.encoders.encoder import JsonEncoder
+
+        unsupported = [f for f in formats if f not in ('json', 'plantuml', 'svg', 'png', 'mermaid')]
+        if unsupported:
+            raise ValueError(
+                f"Unsupported format: {unsupported[0]}. "
+                f"Use one of: 'json', 'plantuml', 'svg', 'png', 'mermaid'"
+            )
+
+        directory = Path.cwd() if path is None else Path(path)
+        os.makedirs(directory, exist_ok=True)
+
+        merged = self._merged_workspace()
+        workspace_name = self._sanitize_name(self.model.name or 'workspace')
+
+        diagrams: Dict[str, str] = {}
+        sink: Any = None
+        if any(f not in ('json', 'mermaid') for f in formats):
+            try:
+                from buildzr.sinks.plantuml_sink import PlantUmlSink
+            except ImportError as e:
+                raise ImportError(
+                    "jpype1 is required for diagram export. "
+                    "Install with: pip install buildzr[export-plantuml]"
+                ) from e
+            sink = PlantUmlSink()
+            diagrams = self._export_plantuml(merged)
+
+        def write_json() -> str:
+            file_path = directory / f"{workspace_name}.json"
+            indent = 2 if pretty else None
+            file_path.write_text(JsonEncoder(indent=indent).encode(merged), encoding='utf-8')
+            return str(file_path)
+
+        def write_plantuml(view_key: str) -> str:
+            file_path = directory / f"{view_key}.puml"
+            file_path.write_text(diagrams[view_key], encoding='utf-8')
+            return str(file_path)
+
+        def write_image(view_key: str, format: str) -> str:
+            file_path = directory / f"{view_key}.{format}"
+            file_path.write_bytes(sink.render(diagrams[view_key], format))
+            return str(file_path)
+
+        written: Dict[str, Union[str, List[str]]] = {}
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+
+            def submit(fn: Callable[..., Any], *args: Any) -> 'Future[Any]':
+                # In a copy of the current context, so that the spans reach
+                # the profiler of the workspace.
+                return executor.submit(contextvars.copy_context().run, fn, *args)
+
+            futures: Dict[str, Any] = {}
+            if 'json' in formats:
+                futures['json'] = submit(write_json)
+            if 'mermaid' in formats:
+                futures['mermaid'] = submit(self._save_mermaid, merged, directory)
+            if 'plantuml' in formats:
+                futures['plantuml'] = [submit(write_plantuml, view_key) for view_key in diagrams]
+
+            # PlantUML isn't known to be safe to use from several threads at
+            # once: the images are rendered one at a time, in this thread,
+            # while the other files are written.
+            for format in dict.fromkeys(formats):
+                if format in ('svg', 'png'):
+                    written[format] = [write_image(view_key, format) for view_key in diagrams]
+
+            for key, future in futures.items():
+                if isinstance(future, list):
+                    written[key] = [f.result() for f in future]
+                else:
+                    written[key] = future.result()
+
+        result: Dict[str, Union[str, List[str]]] = {format: written[format] for format in dict.fromkeys(formats)}
+        return result
+
+    @_profiled
     def to_json(self, pretty: bool = True) -> str:
         """
         Return workspace as a JSON string.
@@ -604,6 +1382,7 @@ class Workspace(DslWorkspaceElement):
         indent = 2 if pretty else None
         return JsonEncoder(indent=indent).encode(merged)
 
+    @_profiled
     def _repr_json_(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         """
         Jupyter notebook JSON representation.
@@ -616,6 +1395,7 @@ class Workspace(DslWorkspaceElement):
         """
         return self.to_dict(), {"expanded": False, "root": "workspace"}
 
+    @_profiled
     def to_plantuml(self) -> Dict[str, str]:
         """
         Return PlantUML source for all views as a dictionary.
@@ -635,11 +1415,9 @@ class Workspace(DslWorkspaceElement):
             >>> for key, puml in diagrams.items():
             ...     print(f"{key}: {len(puml)} chars")
         """
-        from buildzr.sinks.plantuml_sink import PlantUmlSink
-        merged = self._merged_workspace()
-        sink = PlantUmlSink()
-        return sink.export_to_dict(merged)
+        return self._export_plantuml(self._merged_workspace())
 
+    @_profiled
     def to_svg(self) -> Dict[str, str]:
         """
         Return SVG content for all views as a dictionary.
@@ -659,11 +1437,51 @@ class Workspace(DslWorkspaceElement):
             >>> with open('diagram.svg', 'w') as f:
             ...     f.write(svgs['SystemContext'])
         """
+        return self._render_svg(self._export_plantuml(self._merged_workspace()))
+
+    def _export_plantuml(self, merged: 'buildzr.models.Workspace') -> Dict[str, str]:
+        """
+        Export the PlantUML of each view of the `merged` workspace.
+
+        The Java workspace and the PlantUML of the views are cached, and
+        reused until the workspace changes (i.e., until it's entered again, or
+        elements, relationships, views or styles are added to it). Displaying
+        an unchanged workspace again (e.g., in a notebook) then doesn't convert
+        it to Java again.
+
+        Changes made to the models directly (e.g., through the `model`
+        property of an element) outside of the workspace context aren't
+        detected.
+        """
         from buildzr.sinks.plantuml_sink import PlantUmlSink
-        merged = self._merged_workspace()
+
+        if self._export_revision != self._revision:
+            sink = PlantUmlSink()
+            self._java_workspace = sink.to_java(merged)
+            self._plantuml_cache = sink.export_java(self._java_workspace)
+            self._export_revision = self._revision
+
+        return dict(self._plantuml_cache)
+
+    def _render_svg(self, diagrams: Dict[str, str]) -> Dict[str, str]:
+        """
+        Render the PlantUML `diagrams` to SVG, reusing the SVG of the views
+        whose PlantUML didn't change since they were last rendered.
+        """
+        from buildzr.sinks.plantuml_sink import PlantUmlSink
+
         sink = PlantUmlSink()
-        return sink.render_to_svg_dict(merged)
+        svg_cache: Dict[str, Tuple[str, str]] = {}
+        for view_key, puml in diagrams.items():
+            cached = self._svg_cache.get(view_key)
+            if cached is None or cached[0] != puml:
+                cached = (puml, sink.render(puml, 'svg').decode('utf-8'))
+            svg_cache[view_key] = cached
 
+        self._svg_cache = svg_cache
+        return {view_key: svg for view_key, (_, svg) in svg_cache.items()}
+
+    @_profiled
     def _repr_html_(self) -> str:
         """
         Jupyter notebook HTML representation with embedded SVG diagrams.
@@ -698,6 +1516,7 @@ class Workspace(DslWorkspaceElement):
 
         return '\n'.join(html_parts)
 
+    @traced()
     def _merge_models(
         self,
         parent: buildzr.models.Workspace,
@@ -859,6 +1678,8 @@ class SoftwareSystem(DslElementRelationOverrides[
 
     @property
     def children(self) -> Optional[List['Container']]:
+        if self._lazy_children is not None:
+            self._lazy_children.wrap_into(self._children)
         return self._children
 
     @property
@@ -882,17 +1703,18 @@ class SoftwareSystem(DslElementRelationOverrides[
         self.model.containers = []
         self._parent: Optional[Workspace] = None
         self._children: Optional[List['Container']] = []
-        self._sources: List[DslElement] = []
-        self._destinations: List[DslElement] = []
-        self._relationships: Set[DslRelationship] = set()
+        self._sources: List[DslElement] = ElementList()
+        self._destinations: List[DslElement] = ElementList()
+        self._relationships: Set[DslRelationship] = RelationshipSet()
         self._tags = {'Element', 'Software System'}.union(tags)
         self._dynamic_attrs: Dict[str, 'Container'] = {}
+        self._lazy_children: Optional[_LazyWrappers] = None
         self._label: Optional[str] = None
         self.model.id = GenerateId.for_element()
         self.model.name = name
         self.model.description = description
         self.model.relationships = []
-        self.model.tags = ','.join(self._tags)
+        self.model.tags = join_tags(self._tags)
         self.model.properties = properties
         # Note: location is deprecated in Structurizr - use tags instead for styling
         self.model.location = buildzr.models.Location1.Unspecified
@@ -914,23 +1736,22 @@ class SoftwareSystem(DslElementRelationOverrides[
         instance._m = model
         instance._parent = None
         instance._children = []
-        instance._sources = []
-        instance._destinations = []
-        instance._relationships = set()
+        instance._sources = ElementList()
+        instance._destinations = ElementList()
+        instance._relationships = RelationshipSet()
         instance._tags = set(model.tags.split(',')) if model.tags else {'Element', 'Software System'}
-        instance._dynamic_attrs = {}
         instance._label = None
 
         # Ensure containers list is initialized for adding new containers
         if instance._m.containers is None:
             instance._m.containers = []
 
-        # Wrap child containers
-        if model.containers:
-            for container_model in model.containers:
-                container = Container._from_model(container_model, instance)
-                instance._children.append(container)
-                instance._dynamic_attrs[_child_name_transform(container_model.name or '')] = container
+        # Child containers are wrapped when they're first accessed
+        wrappers = _LazyWrappers(lambda container_model: Container._from_model(container_model, instance))
+        for container_model in model.containers:
+            wrappers.add(_child_name_transform(container_model.name or ''), container_model)
+        instance._dynamic_attrs = wrappers
+        instance._lazy_children = wrappers
 
         return instance
 
@@ -950,6 +1771,9 @@ class SoftwareSystem(DslElementRelationOverrides[
             container._parent = self
             self._add_dynamic_attr(container.model.name, container)
             self._children.append(container)
+            workspace = _find_workspace(self)
+            if workspace is not None:
+                workspace._record_element(container)
         else:
             raise ValueError('Invalid element type: Trying to add an element of type {} to a software system.'.format(type(container)))
 
@@ -1026,16 +1850,16 @@ class Person(DslElementRelationOverrides[
     def __init__(self, name: str, description: str="", tags: Set[str]=set(), properties: Dict[str, Any]=dict()) -> None:
         self._m = buildzr.models.Person()
         self._parent: Optional[Workspace] = None
-        self._sources: List[DslElement] = []
-        self._destinations: List[DslElement] = []
-        self._relationships: Set[DslRelationship] = set()
+        self._sources: List[DslElement] = ElementList()
+        self._destinations: List[DslElement] = ElementList()
+        self._relationships: Set[DslRelationship] = RelationshipSet()
         self._tags = {'Element', 'Person'}.union(tags)
         self._label: Optional[str] = None
         self.model.id = GenerateId.for_element()
         self.model.name = name
         self.model.description = description
         self.model.relationships = []
-        self.model.tags = ','.join(self._tags)
+        self.model.tags = join_tags(self._tags)
         self.model.properties = properties
         # Note: location is deprecated in Structurizr - use tags instead for styling
         self.model.location = buildzr.models.Location.Unspecified
@@ -1061,9 +1885,9 @@ class Person(DslElementRelationOverrides[
         instance = object.__new__(cls)
         instance._m = model
         instance._parent = None
-        instance._sources = []
-        instance._destinations = []
-        instance._relationships = set()
+        instance._sources = ElementList()
+        instance._destinations = ElementList()
+        instance._relationships = RelationshipSet()
         instance._tags = set(model.tags.split(',')) if model.tags else {'Element', 'Person'}
         instance._label = None
         return instance
@@ -1132,9 +1956,9 @@ class Element(DslElementRelationOverrides[
     ) -> None:
         self._m = buildzr.models.CustomElement()
         self._parent: Optional[Workspace] = None
-        self._sources: List[DslElement] = []
-        self._destinations: List[DslElement] = []
-        self._relationships: Set[DslRelationship] = set()
+        self._sources: List[DslElement] = ElementList()
+        self._destinations: List[DslElement] = ElementList()
+        self._relationships: Set[DslRelationship] = RelationshipSet()
         self._tags = {'Element'}.union(tags)
         self._label: Optional[str] = None
         self.model.id = GenerateId.for_element()
@@ -1142,7 +1966,7 @@ class Element(DslElementRelationOverrides[
         self.model.metadata = metadata
         self.model.description = description
         self.model.relationships = []
-        self.model.tags = ','.join(self._tags)
+        self.model.tags = join_tags(self._tags)
         self.model.properties = properties
 
         workspace = _current_workspace.get()
@@ -1165,9 +1989,9 @@ class Element(DslElementRelationOverrides[
         instance = object.__new__(cls)
         instance._m = model
         instance._parent = None
-        instance._sources = []
-        instance._destinations = []
-        instance._relationships = set()
+        instance._sources = ElementList()
+        instance._destinations = ElementList()
+        instance._relationships = RelationshipSet()
         instance._tags = set(model.tags.split(',')) if model.tags else {'Element'}
         instance._label = None
         return instance
@@ -1197,6 +2021,8 @@ class Container(DslElementRelationOverrides[
 
     @property
     def children(self) -> Optional[List['Component']]:
+        if self._lazy_children is not None:
+            self._lazy_children.wrap_into(self._children)
         return self._children
 
     @property
@@ -1220,18 +2046,19 @@ class Container(DslElementRelationOverrides[
         self.model.components = []
         self._parent: Optional[SoftwareSystem] = None
         self._children: Optional[List['Component']] = []
-        self._sources: List[DslElement] = []
-        self._destinations: List[DslElement] = []
-        self._relationships: Set[DslRelationship] = set()
+        self._sources: List[DslElement] = ElementList()
+        self._destinations: List[DslElement] = ElementList()
+        self._relationships: Set[DslRelationship] = RelationshipSet()
         self._tags = {'Element', 'Container'}.union(tags)
         self._dynamic_attrs: Dict[str, 'Component'] = {}
+        self._lazy_children: Optional[_LazyWrappers] = None
         self._label: Optional[str] = None
         self.model.id = GenerateId.for_element()
         self.model.name = name
         self.model.description = description
         self.model.relationships = []
         self.model.technology = technology
-        self.model.tags = ','.join(self._tags)
+        self.model.tags = join_tags(self._tags)
         self.model.properties = properties
 
         software_system = _current_software_system.get()
@@ -1250,23 +2077,22 @@ class Container(DslElementRelationOverrides[
         instance._m = model
         instance._parent = parent
         instance._children = []
-        instance._sources = []
-        instance._destinations = []
-        instance._relationships = set()
+        instance._sources = ElementList()
+        instance._destinations = ElementList()
+        instance._relationships = RelationshipSet()
         instance._tags = set(model.tags.split(',')) if model.tags else {'Element', 'Container'}
-        instance._dynamic_attrs = {}
         instance._label = None
 
         # Ensure components list is initialized for adding new components
         if instance._m.components is None:
             instance._m.components = []
 
-        # Wrap child components
-        if model.components:
-            for component_model in model.components:
-                component = Component._from_model(component_model, instance)
-                instance._children.append(component)
-                instance._dynamic_attrs[_child_name_transform(component_model.name or '')] = component
+        # Child components are wrapped when they're first accessed
+        wrappers = _LazyWrappers(lambda component_model: Component._from_model(component_model, instance))
+        for component_model in model.components:
+            wrappers.add(_child_name_transform(component_model.name or ''), component_model)
+        instance._dynamic_attrs = wrappers
+        instance._lazy_children = wrappers
 
         return instance
 
@@ -1293,6 +2119,9 @@ class Container(DslElementRelationOverrides[
             component._parent = self
             self._add_dynamic_attr(component.model.name, component)
             self._children.append(component)
+            workspace = _find_workspace(self)
+            if workspace is not None:
+                workspace._record_element(component)
         else:
             raise ValueError('Invalid element type: Trying to add an element of type {} to a container.'.format(type(component)))
 
@@ -1358,9 +2187,9 @@ class Component(DslElementRelationOverrides[
     def __init__(self, name: str, description: str="", technology: str="", tags: Set[str]=set(), properties: Dict[str, Any]=dict()) -> None:
         self._m = buildzr.models.Component()
         self._parent: Optional[Container] = None
-        self._sources: List[DslElement] = []
-        self._destinations: List[DslElement] = []
-        self._relationships: Set[DslRelationship] = set()
+        self._sources: List[DslElement] = ElementList()
+        self._destinations: List[DslElement] = ElementList()
+        self._relationships: Set[DslRelationship] = RelationshipSet()
         self._tags = {'Element', 'Component'}.union(tags)
         self._label: Optional[str] = None
         self.model.id = GenerateId.for_element()
@@ -1368,7 +2197,7 @@ class Component(DslElementRelationOverrides[
         self.model.description = description
         self.model.technology = technology
         self.model.relationships = []
-        self.model.tags = ','.join(self._tags)
+        self.model.tags = join_tags(self._tags)
         self.model.properties = properties
 
         container = _current_container.get()
@@ -1393,9 +2222,9 @@ class Component(DslElementRelationOverrides[
         instance = object.__new__(cls)
         instance._m = model
         instance._parent = parent
-        instance._sources = []
-        instance._destinations = []
-        instance._relationships = set()
+        instance._sources = ElementList()
+        instance._destinations = ElementList()
+        instance._relationships = RelationshipSet()
         instance._tags = set(model.tags.split(',')) if model.tags else {'Element', 'Component'}
         instance._label = None
         return instance
@@ -1423,9 +2252,7 @@ class Group:
         if self._group_separator in self._name:
             raise ValueError('Group name cannot contain the group separator.')
 
-        stack = _current_group_stack.get()
-        new_stack = stack.copy()
-        new_stack.extend([self])
+        new_stack = _current_group_stack.get() + (self,)
 
         self._full_name = self._group_separator.join([group._name for group in new_stack])
 
@@ -1447,8 +2274,7 @@ class Group:
 
     def __enter__(self) -> Self:
         stack = _current_group_stack.get() # stack: a/b
-        stack.extend([self]) # stack: a/b -> a/b/self
-        self._token = _current_group_stack.set(stack)
+        self._token = _current_group_stack.set(stack + (self,)) # stack: a/b -> a/b/self
         return self
 
     def __exit__(
@@ -1457,9 +2283,7 @@ class Group:
         exc_value: Optional[BaseException],
         traceback: Optional[Any]
     ) -> None:
-        stack = _current_group_stack.get()
-        stack.pop() # stack: a/b/self -> a/b
-        _current_group_stack.reset(self._token)
+        _current_group_stack.reset(self._token) # stack: a/b/self -> a/b
 
 _RankDirection = Literal['tb', 'bt', 'lr', 'rl']
 
@@ -1510,7 +2334,7 @@ class DeploymentEnvironment(DslDeploymentEnvironment):
 
     def _imply_software_system_instance_relationships(self, workspace: Workspace) -> None:
 
-        from buildzr.dsl.expression import Expression
+        from buildzr.dsl.explorer import Explorer
 
         """
         Process implied instance relationships. For example, if we have a
@@ -1526,9 +2350,10 @@ class DeploymentEnvironment(DslDeploymentEnvironment):
         """
 
         software_instances = [
-            cast('SoftwareSystemInstance', e) for e in Expression(include_elements=[
-                lambda w, e: e.type == SoftwareSystemInstance,
-            ]).elements(workspace)
+            cast('SoftwareSystemInstance', e) for e in Explorer(workspace).walk_elements(
+                types=SoftwareSystemInstance,
+                prune=lambda e: isinstance(e, SoftwareSystem),
+            )
         ]
 
         software_instance_map: Dict[str, List['SoftwareSystemInstance']] = {}
@@ -1538,10 +2363,12 @@ class DeploymentEnvironment(DslDeploymentEnvironment):
                 software_instance_map[software_id] = []
             software_instance_map[software_id].append(software_instance)
 
+        # Software systems are always at the top level of the workspace.
         softwares = [
-            cast('SoftwareSystem', e) for e in Expression(include_elements=[
-                lambda w, e: e.type == SoftwareSystem,
-            ]).elements(workspace)
+            cast('SoftwareSystem', e) for e in Explorer(workspace).walk_elements(
+                types=SoftwareSystem,
+                max_depth=1,
+            )
         ]
 
         for software in softwares:
@@ -1643,12 +2470,14 @@ class DeploymentEnvironment(DslDeploymentEnvironment):
         instances are considered to be in the same default group.
         """
 
-        from buildzr.dsl.expression import Expression
+        from buildzr.dsl.explorer import Explorer
 
         container_instances = [
-            cast('ContainerInstance', e) for e in Expression(include_elements=[
-                lambda w, e: e.type == ContainerInstance,
-        ]).elements(workspace)]
+            cast('ContainerInstance', e) for e in Explorer(workspace).walk_elements(
+                types=ContainerInstance,
+                prune=lambda e: isinstance(e, SoftwareSystem),
+            )
+        ]
 
         container_instance_map: Dict[str, List['ContainerInstance']] = {}
         for container_instance in container_instances:
@@ -1657,10 +2486,13 @@ class DeploymentEnvironment(DslDeploymentEnvironment):
                 container_instance_map[container_id] = []
             container_instance_map[container_id].append(container_instance)
 
+        # Containers are always the children of top-level software systems.
         containers = [
-            cast('ContainerInstance', e) for e in Expression(include_elements=[
-                lambda w, e: e.type == Container,
-        ]).elements(workspace)]
+            cast('Container', e) for e in Explorer(workspace).walk_elements(
+                types=Container,
+                max_depth=2,
+            )
+        ]
 
         for container in containers:
 
@@ -1739,11 +2571,11 @@ class DeploymentNode(DslDeploymentNodeElement, DslElementRelationOverrides[
                 'DeploymentNode']]
             ] = []
         self._tags = {'Element', 'Deployment Node'}.union(tags)
-        self._m.tags = ','.join(self._tags)
+        self._m.tags = join_tags(self._tags)
 
-        self._sources: List[DslElement] = []
-        self._destinations: List[DslElement] = []
-        self._relationships: Set[DslRelationship] = set()
+        self._sources: List[DslElement] = ElementList()
+        self._destinations: List[DslElement] = ElementList()
+        self._relationships: Set[DslRelationship] = RelationshipSet()
 
         # If the deployment stack is not empty, then we're inside the context of
         # another deployment node. Otherwise, we're at the root of the
@@ -1792,8 +2624,7 @@ class DeploymentNode(DslDeploymentNodeElement, DslElementRelationOverrides[
 
     def __enter__(self) -> Self:
         stack = _current_deployment_node_stack.get()
-        stack.extend([self])
-        self._token = _current_deployment_node_stack.set(stack)
+        self._token = _current_deployment_node_stack.set(stack + (self,))
         return self
 
     def __exit__(
@@ -1802,13 +2633,12 @@ class DeploymentNode(DslDeploymentNodeElement, DslElementRelationOverrides[
         exc_value: Optional[BaseException],
         traceback: Optional[Any]
     ) -> None:
-        stack = _current_deployment_node_stack.get()
-        stack.pop()
         _current_deployment_node_stack.reset(self._token)
 
     def add_infrastructure_node(self, node: 'InfrastructureNode') -> None:
         self._m.infrastructureNodes.append(node.model)
         self._children.append(node)
+        self._record_child(node)
 
     def add_element_instance(self, instance: Union['SoftwareSystemInstance', 'ContainerInstance']) -> None:
         if isinstance(instance, SoftwareSystemInstance):
@@ -1816,10 +2646,17 @@ class DeploymentNode(DslDeploymentNodeElement, DslElementRelationOverrides[
         elif isinstance(instance, ContainerInstance):
             self._m.containerInstances.append(instance.model)
         self._children.append(instance)
+        self._record_child(instance)
 
     def add_deployment_node(self, node: 'DeploymentNode') -> None:
         self._m.children.append(node.model)
         self._children.append(node)
+        self._record_child(node)
+
+    def _record_child(self, child: DslElement) -> None:
+        workspace = _find_workspace(self)
+        if workspace is not None:
+            workspace._record_element(child)
 
 class InfrastructureNode(DslInfrastructureNodeElement, DslElementRelationOverrides[
     'InfrastructureNode',
@@ -1840,11 +2677,11 @@ class InfrastructureNode(DslInfrastructureNodeElement, DslElementRelationOverrid
         self._m.properties = properties
         self._parent: Optional[DeploymentNode] = None
         self._tags = {'Element', 'Infrastructure Node'}.union(tags)
-        self._m.tags = ','.join(self._tags)
+        self._m.tags = join_tags(self._tags)
 
-        self._sources: List[DslElement] = []
-        self._destinations: List[DslElement] = []
-        self._relationships: Set[DslRelationship] = set()
+        self._sources: List[DslElement] = ElementList()
+        self._destinations: List[DslElement] = ElementList()
+        self._relationships: Set[DslRelationship] = RelationshipSet()
 
         stack = _current_deployment_node_stack.get()
         if stack:
@@ -1904,11 +2741,11 @@ class SoftwareSystemInstance(DslElementInstance, DslElementRelationOverrides[
         self._element = software_system
         self._m.deploymentGroups = [g.name for g in deployment_groups] if deployment_groups else ["Default"]
         self._tags = {'Software System Instance'}.union(tags)
-        self._m.tags = ','.join(self._tags)
+        self._m.tags = join_tags(self._tags)
 
-        self._sources: List[DslElement] = []
-        self._destinations: List[DslElement] = []
-        self._relationships: Set[DslRelationship] = set()
+        self._sources: List[DslElement] = ElementList()
+        self._destinations: List[DslElement] = ElementList()
+        self._relationships: Set[DslRelationship] = RelationshipSet()
 
         stack = _current_deployment_node_stack.get()
         if stack:
@@ -1973,11 +2810,11 @@ class ContainerInstance(DslElementInstance, DslElementRelationOverrides[
         self._element = container
         self._m.deploymentGroups = [g.name for g in deployment_groups] if deployment_groups else ["Default"]
         self._tags = {'Container Instance'}.union(tags)
-        self._m.tags = ','.join(self._tags)
+        self._m.tags = join_tags(self._tags)
 
-        self._sources: List[DslElement] = []
-        self._destinations: List[DslElement] = []
-        self._relationships: Set[DslRelationship] = set()
+        self._sources: List[DslElement] = ElementList()
+        self._destinations: List[DslElement] = ElementList()
+        self._relationships: Set[DslRelationship] = RelationshipSet()
 
         stack = _current_deployment_node_stack.get()
         if stack:
@@ -2090,6 +2927,111 @@ def _auto_layout_to_model(auto_layout: _AutoLayout) -> buildzr.models.AutomaticL
 
     return model
 
+def _with_related_element_ids(elements: Iterable[DslElement]) -> Set[str]:
+    """
+    Returns the ids of the `elements`, together with the ids of all the
+    elements that are the source or the destination of a relationship with any
+    of them.
+
+    Since the `sources` and `destinations` of every element are kept in sync
+    (if `a` is in `b.sources`, then `b` is in `a.destinations`), this is the
+    same as checking each element of the workspace for a source or destination
+    among `elements`, but is computed through set unions of the cached id-sets
+    instead.
+    """
+
+    ids: Set[str] = set()
+    for element in elements:
+        ids.add(str(element.model.id))
+        ids.update(element_ids(element.sources))
+        ids.update(element_ids(element.destinations))
+    return ids
+
+def _update_view_model(
+    view_model: Union[
+        buildzr.models.SystemLandscapeView,
+        buildzr.models.SystemContextView,
+        buildzr.models.ContainerView,
+        buildzr.models.ComponentView,
+        buildzr.models.CustomView,
+    ],
+    workspace: Workspace,
+    expression: 'Expression',
+    elements: Iterable[DslElement],
+    relationships: Iterable[DslRelationship],
+    prune: Optional[Callable[[DslElement], bool]]=None,
+) -> None:
+    """
+    Updates the element and relationship views of `view_model` in place, with
+    the `elements` and `relationships` that were added to the workspace after
+    the view was computed.
+
+    Whether an element is in a view may depend on its relationships (e.g., a
+    system context view includes the elements related to the software
+    system), so the elements at both ends of the added relationships are
+    re-evaluated too. Elements and relationships that are no longer included
+    are removed.
+
+    The `prune` predicate is the same as the one the view was computed with:
+    the descendants of the elements for which it returns `True` (and their
+    relationships) are not evaluated.
+    """
+
+    from buildzr.models import ElementView, RelationshipView
+
+    def is_pruned(element: DslElement) -> bool:
+        if prune is None:
+            return False
+        parent = element.parent
+        while isinstance(parent, DslElement):
+            if prune(parent):
+                return True
+            parent = parent.parent
+        return False
+
+    relationships = list(relationships)
+
+    candidates: Dict[str, DslElement] = {}
+    for element in elements:
+        candidates[str(element.model.id)] = element
+    for relationship in relationships:
+        candidates.setdefault(str(relationship.source.model.id), relationship.source)
+        candidates.setdefault(str(relationship.destination.model.id), relationship.destination)
+
+    element_views = view_model.elements if view_model.elements is not None else []
+    view_element_ids = { str(element_view.id) for element_view in element_views }
+    removed_element_ids: Set[str] = set()
+    for element_id, element in candidates.items():
+        if is_pruned(element):
+            continue
+        if expression.includes_element(workspace, element):
+            if element_id not in view_element_ids:
+                # Add x, y coordinates (required by Structurizr for rendering)
+                element_views.append(ElementView(id=element_id, x=0, y=0))
+                view_element_ids.add(element_id)
+        elif element_id in view_element_ids:
+            removed_element_ids.add(element_id)
+    if removed_element_ids:
+        element_views[:] = [e for e in element_views if e.id not in removed_element_ids]
+    view_model.elements = element_views
+
+    relationship_views = view_model.relationships if view_model.relationships is not None else []
+    view_relationship_ids = { str(relationship_view.id) for relationship_view in relationship_views }
+    removed_relationship_ids: Set[str] = set()
+    for relationship in relationships:
+        relationship_id = str(relationship.model.id)
+        if is_pruned(relationship.source):
+            continue
+        if expression.includes_relationship(workspace, relationship):
+            if relationship_id not in view_relationship_ids:
+                relationship_views.append(RelationshipView(id=relationship_id))
+                view_relationship_ids.add(relationship_id)
+        elif relationship_id in view_relationship_ids:
+            removed_relationship_ids.add(relationship_id)
+    if removed_relationship_ids:
+        relationship_views[:] = [r for r in relationship_views if r.id not in removed_relationship_ids]
+    view_model.relationships = relationship_views
+
 class SystemLandscapeView(DslViewElement):
 
     from buildzr.dsl.expression import Expression, WorkspaceExpression, ElementExpression, RelationshipExpression
@@ -2167,14 +3109,22 @@ class SystemLandscapeView(DslViewElement):
             exclude_relationships=self._exclude_relationships,
         )
 
+        # Containers and components are always excluded from this view, so
+        # there's no need to visit the inside of the software systems.
+        def prune(e: DslElement) -> bool:
+            return isinstance(e, SoftwareSystem)
+
+        self._expression = expression
+        self._prune = prune
+
         element_ids = map(
             lambda x: str(x.model.id),
-            expression.elements(workspace)
+            expression.elements(workspace, prune=prune)
         )
 
         relationship_ids = map(
             lambda x: str(x.model.id),
-            expression.relationships(workspace)
+            expression.relationships(workspace, prune=prune)
         )
 
         self._m.elements = []
@@ -2186,6 +3136,14 @@ class SystemLandscapeView(DslViewElement):
         for relationship_id in relationship_ids:
             self._m.relationships.append(RelationshipView(id=relationship_id))
 
+    def _on_changed(
+        self,
+        workspace: Workspace,
+        elements: Iterable[DslElement],
+        relationships: Iterable[DslRelationship],
+    ) -> None:
+        _update_view_model(self._m, workspace, self._expression, elements, relationships, prune=self._prune)
+
 class SystemContextView(DslViewElement):
 
     """
@@ -2266,6 +3224,8 @@ class SystemContextView(DslViewElement):
             exclude_relationships=self._exclude_relationships,
         )
 
+        self._expression = expression
+
         element_ids = map(
             lambda x: str(x.model.id),
             expression.elements(workspace)
@@ -2285,6 +3245,14 @@ class SystemContextView(DslViewElement):
         for relationship_id in relationship_ids:
             self._m.relationships.append(RelationshipView(id=relationship_id))
 
+    def _on_changed(
+        self,
+        workspace: Workspace,
+        elements: Iterable[DslElement],
+        relationships: Iterable[DslRelationship],
+    ) -> None:
+        _update_view_model(self._m, workspace, self._expression, elements, relationships)
+
 class ContainerView(DslViewElement):
 
     from buildzr.dsl.expression import Expression, WorkspaceExpression, ElementExpression, RelationshipExpression
@@ -2336,17 +3304,23 @@ class ContainerView(DslViewElement):
             software_system = self._selector(WorkspaceExpression(workspace))
         self._m.softwareSystemId = software_system.model.id
 
-        container_ids = { container.model.id for container in software_system.children}
+        containers = software_system.children or []
+        container_ids = { str(container.model.id) for container in containers }
+
+        view_element_ids = _with_related_element_ids(containers)
+
+        # Kept to update the view when the model changes (see `_on_changed`).
+        self._software_system = software_system
+        self._container_ids = container_ids
+        self._view_element_ids = view_element_ids
 
         view_elements_filter: List[Union[DslElement, Callable[[WorkspaceExpression, ElementExpression], bool]]] = [
-            lambda w, e: e.parent == software_system,
-            lambda w, e: any(container_ids.intersection({ id for id in e.sources.ids })),
-            lambda w, e: any(container_ids.intersection({ id for id in e.destinations.ids })),
+            lambda w, e: e.id in view_element_ids,
         ]
 
         view_relationships_filter: List[Union[DslElement, Callable[[WorkspaceExpression, RelationshipExpression], bool]]] = [
-            lambda w, r: software_system == r.source.parent,
-            lambda w, r: software_system == r.destination.parent,
+            lambda w, r: r.source.id in container_ids,
+            lambda w, r: r.destination.id in container_ids,
         ]
 
         expression = Expression(
@@ -2356,6 +3330,8 @@ class ContainerView(DslViewElement):
             exclude_relationships=self._exclude_relationships,
         )
 
+        self._expression = expression
+
         element_ids = map(
             lambda x: str(x.model.id),
             expression.elements(workspace)
@@ -2375,6 +3351,26 @@ class ContainerView(DslViewElement):
         for relationship_id in relationship_ids:
             self._m.relationships.append(RelationshipView(id=relationship_id))
 
+    def _on_changed(
+        self,
+        workspace: Workspace,
+        elements: Iterable[DslElement],
+        relationships: Iterable[DslRelationship],
+    ) -> None:
+        # The filters of the view refer to these sets, so they're updated
+        # in place before evaluating the added elements and relationships.
+        for element in elements:
+            if element.parent is self._software_system:
+                self._container_ids.add(str(element.model.id))
+                self._view_element_ids.update(_with_related_element_ids([element]))
+        for relationship in relationships:
+            if str(relationship.source.model.id) in self._container_ids:
+                self._view_element_ids.add(str(relationship.destination.model.id))
+            if str(relationship.destination.model.id) in self._container_ids:
+                self._view_element_ids.add(str(relationship.source.model.id))
+
+        _update_view_model(self._m, workspace, self._expression, elements, relationships)
+
 class ComponentView(DslViewElement):
 
     from buildzr.dsl.expression import Expression, WorkspaceExpression, ElementExpression, RelationshipExpression
@@ -2427,17 +3423,23 @@ class ComponentView(DslViewElement):
             container = self._selector(WorkspaceExpression(workspace))
         self._m.containerId = container.model.id
 
-        component_ids = { component.model.id for component in container.children or [] }
+        components = container.children or []
+        component_ids = { str(component.model.id) for component in components }
+
+        view_element_ids = _with_related_element_ids(components)
+
+        # Kept to update the view when the model changes (see `_on_changed`).
+        self._container = container
+        self._component_ids = component_ids
+        self._view_element_ids = view_element_ids
 
         view_elements_filter: List[Union[DslElement, Callable[[WorkspaceExpression, ElementExpression], bool]]] = [
-            lambda w, e: e.parent == container,
-            lambda w, e: any(component_ids.intersection({ id for id in e.sources.ids })),
-            lambda w, e: any(component_ids.intersection({ id for id in e.destinations.ids })),
+            lambda w, e: e.id in view_element_ids,
         ]
 
         view_relationships_filter: List[Union[DslElement, Callable[[WorkspaceExpression, RelationshipExpression], bool]]] = [
-            lambda w, r: container == r.source.parent,
-            lambda w, r: container == r.destination.parent,
+            lambda w, r: r.source.id in component_ids,
+            lambda w, r: r.destination.id in component_ids,
         ]
 
         expression = Expression(
@@ -2447,6 +3449,8 @@ class ComponentView(DslViewElement):
             exclude_relationships=self._exclude_relationships,
         )
 
+        self._expression = expression
+
         element_ids = map(
             lambda x: str(x.model.id),
             expression.elements(workspace)
@@ -2466,6 +3470,26 @@ class ComponentView(DslViewElement):
         for relationship_id in relationship_ids:
             self._m.relationships.append(RelationshipView(id=relationship_id))
 
+    def _on_changed(
+        self,
+        workspace: Workspace,
+        elements: Iterable[DslElement],
+        relationships: Iterable[DslRelationship],
+    ) -> None:
+        # The filters of the view refer to these sets, so they're updated
+        # in place before evaluating the added elements and relationships.
+        for element in elements:
+            if element.parent is self._container:
+                self._component_ids.add(str(element.model.id))
+                self._view_element_ids.update(_with_related_element_ids([element]))
+        for relationship in relationships:
+            if str(relationship.source.model.id) in self._component_ids:
+                self._view_element_ids.add(str(relationship.destination.model.id))
+            if str(relationship.destination.model.id) in self._component_ids:
+                self._view_element_ids.add(str(relationship.source.model.id))
+
+        _update_view_model(self._m, workspace, self._expression, elements, relationships)
+
 class DeploymentView(DslViewElement):
 
     from buildzr.dsl.expression import Expression, WorkspaceExpression, ElementExpression, RelationshipExpression
@@ -2708,6 +3732,27 @@ class DeploymentView(DslViewElement):
         for relationship_id in relationship_ids:
             self._m.relationships.append(RelationshipView(id=relationship_id))
 
+    def _on_changed(
+        self,
+        workspace: Workspace,
+        elements: Iterable[DslElement],
+        relationships: Iterable[DslRelationship],
+    ) -> None:
+        # Which deployment nodes are in the view depends on all of their
+        # descendants, so the view is recomputed if any of the changes are in
+        # its deployment environment (or are containers, which changes how
+        # the container instances are grouped).
+        deployment_element_types = (DeploymentNode, InfrastructureNode, SoftwareSystemInstance, ContainerInstance)
+
+        def is_changed(element: DslElement) -> bool:
+            if isinstance(element, Container):
+                return True
+            return isinstance(element, deployment_element_types) and \
+                element.model.environment == self._environment.name
+
+        if any(is_changed(element) for element in elements) or \
+           any(is_changed(r.source) or is_changed(r.destination) for r in relationships):
+            self._on_added(workspace)
 
 class DynamicView(DslViewElement):
 
@@ -2752,6 +3797,10 @@ class DynamicView(DslViewElement):
     ) -> Optional[DslRelationship]:
         """Find an existing relationship between source and destination, excluding a specific ID.
 
+        The relationships are looked up in the destination ID index of the
+        source element's relationships, and filtered by `technology`, so this
+        doesn't need to walk all the relationships in the workspace.
+
         Args:
             workspace: The workspace containing relationships.
             source: The source element of the relationship.
@@ -2760,28 +3809,36 @@ class DynamicView(DslViewElement):
             technology: If specified, only match relationships with this exact technology.
                        This follows Structurizr behavior where technology acts as a selector.
         """
-        from buildzr.dsl.explorer import Explorer
+        relationships = source.relationships
+        if isinstance(relationships, RelationshipSet):
+            candidates: Iterable[DslRelationship] = relationships.find(
+                str(destination.model.id),
+                technology,
+            )
+        else:
+            candidates = [
+                rel for rel in relationships
+                if rel.destination.model.id == destination.model.id and
+                   (technology is None or rel.model.technology == technology)
+            ]
 
-        explorer = Explorer(workspace)
-        for rel in explorer.walk_relationships():
-            if rel.source.model.id == source.model.id and \
-               rel.destination.model.id == destination.model.id and \
-               rel.model.id != exclude_id:
-                # If technology is specified, it must match exactly
-                if technology is not None:
-                    if rel.model.technology == technology:
-                        return rel
-                    # Continue searching for a relationship with matching technology
-                else:
-                    return rel
+        for rel in candidates:
+            if rel.model.id != exclude_id:
+                return rel
         return None
 
     def _remove_relationship_from_model(
         self,
+        workspace: Workspace,
         source: DslElement,
         rel_id: str,
     ) -> None:
-        """Remove a relationship from both the source element's model and DSL relationships."""
+        """Remove a relationship from both the source element's model and DSL relationships.
+
+        Discarding the relationship from the source element's relationships
+        also removes it from their destination ID index. The views of the
+        `workspace` that already include the relationship forget it too.
+        """
         # Remove from model relationships
         if hasattr(source.model, 'relationships') and source.model.relationships:
             source.model.relationships = [
@@ -2795,6 +3852,7 @@ class DynamicView(DslViewElement):
                 break
         if to_remove is not None:
             source.relationships.discard(to_remove)
+        workspace._discard_relationship(rel_id)
 
     def _on_added(self, workspace: Workspace) -> None:
         from buildzr.dsl.expression import WorkspaceExpression
@@ -2857,7 +3915,7 @@ class DynamicView(DslViewElement):
                 # This is a view-specific relationship - use original's ID
                 # and remove the duplicate from the model
                 rel_description = rel.model.description
-                self._remove_relationship_from_model(source, rel.model.id)
+                self._remove_relationship_from_model(workspace, source, rel.model.id)
                 rel_id = original_rel.model.id
             elif rel.model.id not in pre_existing_rel_ids:
                 # This relationship was created during DynamicView argument evaluation
@@ -2979,6 +4037,8 @@ class CustomView(DslViewElement):
             exclude_relationships=self._exclude_relationships,
         )
 
+        self._expression = expression
+
         element_ids = map(
             lambda x: str(x.model.id),
             expression.elements(workspace)
@@ -2998,6 +4058,27 @@ class CustomView(DslViewElement):
         for relationship_id in relationship_ids:
             self._m.relationships.append(RelationshipView(id=relationship_id))
 
+    def _on_changed(
+        self,
+        workspace: Workspace,
+        elements: Iterable[DslElement],
+        relationships: Iterable[DslRelationship],
+    ) -> None:
+        _update_view_model(self._m, workspace, self._expression, elements, relationships)
+
+LiveView = Union[
+    SystemLandscapeView,
+    SystemContextView,
+    ContainerView,
+    ComponentView,
+    DeploymentView,
+    CustomView,
+]
+
+AnyView = Union[
+    LiveView,
+    DynamicView,
+]
 
 class StyleElements:
 
@@ -19,8 +19,16 @@ from typing import (
     Union,
     Generator,
     Iterable,
+    Optional,
+    Callable,
+    Literal,
+    Tuple,
+    Type,
+    Set,
+    Deque,
     cast,
 )
+from collections import deque
 
 from buildzr.dsl.dsl import (
     Workspace,
@@ -30,6 +38,27 @@ from buildzr.dsl.interfaces import (
     DslRelationship,
 )
 
+ExplorerElement = Union[
+    Person,
+    SoftwareSystem,
+    Container,
+    Component,
+    DeploymentNode,
+    InfrastructureNode,
+    SoftwareSystemInstance,
+    ContainerInstance,
+    Element,
+]
+
+WalkOrder = Literal['dfs', 'bfs']
+
+_DEPLOYMENT_ELEMENT_TYPES = (
+    DeploymentNode,
+    InfrastructureNode,
+    SoftwareSystemInstance,
+    ContainerInstance,
+)
+
 class Explorer:
 
     def __init__(
@@ -49,32 +78,122 @@ class Explorer:
     ):
         self._workspace_or_element = workspace_or_element
 
-    def walk_elements(self) -> Generator[Union[
-        Person,
-        SoftwareSystem,
-        Container,
-        Component,
-        DeploymentNode,
-        InfrastructureNode,
-        SoftwareSystemInstance,
-        ContainerInstance,
-        Element,
-    ], None, None]:
-        if self._workspace_or_element.children:
-            for child in self._workspace_or_element.children:
-                explorer = Explorer(child).walk_elements()
-                yield child
-                yield from explorer
-
-    def walk_relationships(self) -> Generator[DslRelationship, None, None]:
-
-        if self._workspace_or_element.children:
-
-            for child in self._workspace_or_element.children:
-
-                if child.relationships:
-                    for relationship in child.relationships:
-                        yield cast(_Relationship, relationship) # TODO: Temporary fix. Use a better approach - Generics?
-
-                explorer = Explorer(child).walk_relationships()
-                yield from explorer
\ No newline at end of file
+    def walk_elements(
+        self,
+        types: Optional[Union[Type[ExplorerElement], Tuple[Type[ExplorerElement], ...]]]=None,
+        max_depth: Optional[int]=None,
+        prune: Optional[Callable[[ExplorerElement], bool]]=None,
+        environment: Optional[str]=None,
+        order: WalkOrder='dfs',
+    ) -> Generator[ExplorerElement, None, None]:
+
+        """
+        Walks the descendants of the workspace (or element) without recursion.
+
+        The default walk is a depth-first, pre-order walk where the children of
+        each element are visited in the order they were added.
+
+        Args:
+            types: Only yield elements that are instances of these types.
+                Elements of other types are still descended into.
+            max_depth: Do not descend below this depth. The direct children
+                of the explored workspace (or element) are at depth 1.
+            prune: If this predicate returns `True` for an element, the
+                element is still yielded (subject to `types`), but none of its
+                descendants are visited.
+            environment: Skip deployment nodes, infrastructure nodes, and
+                element instances (and their descendants) that do not belong
+                to this deployment environment. Model elements are unaffected.
+            order: `'dfs'` for a depth-first walk, or `'bfs'` for a
+                breadth-first (level by level) walk.
+        """
+
+        if order not in ('dfs', 'bfs'):
+            raise ValueError(f"Invalid walk order: '{order}'. Use 'dfs' or 'bfs'.")
+
+        children = self._workspace_or_element.children
+        if not children:
+            return
+
+        pending: Deque[Tuple[ExplorerElement, int]] = deque(
+            (cast(ExplorerElement, child), 1) for child in children
+        )
+
+        while pending:
+            element, depth = pending.popleft()
+
+            if environment is not None and \
+               isinstance(element, _DEPLOYMENT_ELEMENT_TYPES) and \
+               element.model.environment != environment:
+                continue
+
+            if types is None or isinstance(element, types):
+                yield element
+
+            if max_depth is not None and depth >= max_depth:
+                continue
+
+            if prune is not None and prune(element):
+                continue
+
+            element_children = element.children
+            if not element_children:
+                continue
+
+            if order == 'dfs':
+                # Push the children in front of the queue, keeping their
+                # original order, so that they're visited before the siblings
+                # of `element`.
+                pending.extendleft(
+                    (cast(ExplorerElement, child), depth + 1)
+                    for child in reversed(element_children)
+                )
+            else:
+                pending.extend(
+                    (cast(ExplorerElement, child), depth + 1)
+                    for child in element_children
+                )
+
+    def walk_relationships(
+        self,
+        types: Optional[Union[Type[ExplorerElement], Tuple[Type[ExplorerElement], ...]]]=None,
+        max_depth: Optional[int]=None,
+        prune: Optional[Callable[[ExplorerElement], bool]]=None,
+        environment: Optional[str]=None,
+        order: WalkOrder='dfs',
+        between_included: bool=False,
+    ) -> Generator[DslRelationship, None, None]:
+
+        """
+        Walks the relationships of the elements visited by `walk_elements`.
+
+        The relationships of each element are yielded when the element itself
+        is visited. The arguments `types`, `max_depth`, `prune`, `environment`
+        and `order` select the source elements exactly as in `walk_elements`.
+
+        Args:
+            between_included: If `True`, only yield the relationships whose
+                source and destination are both among the walked elements.
+        """
+
+        elements: Iterable[ExplorerElement] = self.walk_elements(
+            types=types,
+            max_depth=max_depth,
+            prune=prune,
+            environment=environment,
+            order=order,
+        )
+
+        included_ids: Optional[Set[str]] = None
+        if between_included:
+            elements = list(elements)
+            included_ids = {str(element.model.id) for element in elements}
+
+        for element in elements:
+            if not element.relationships:
+                continue
+            for relationship in element.relationships:
+                if included_ids is not None and \
+                   str(relationship.destination.model.id) not in included_ids:
+                    continue
+                yield cast(_Relationship, relationship) # TODO: Temporary fix. Use a better approach - Generics?
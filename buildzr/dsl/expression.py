@@ -2,6 +2,7 @@ from buildzr.dsl.interfaces import (
     DslWorkspaceElement,
     DslElement,
     DslRelationship,
+    element_ids,
 )
 
 from buildzr.dsl.dsl import (
@@ -21,7 +22,7 @@ from buildzr.dsl.dsl import (
 from buildzr.dsl.relations import _Relationship
 
 import buildzr
-from typing import Set, Union, Optional, List, Dict, Any, Callable, Tuple, Sequence, Iterable, cast, Type
+from typing import Set, AbstractSet, Union, Optional, List, Dict, Any, Callable, Tuple, Sequence, Iterable, cast, Type
 from typing_extensions import TypeIs
 
 def _has_technology_attribute(obj: DslElement) -> TypeIs[Union[Container, Component]]:
@@ -53,11 +54,14 @@ class FlattenElement:
         self._elements = elements
 
     @property
-    def ids(self) -> Set[Union[str]]:
+    def ids(self) -> AbstractSet[str]:
         # Note that the `element.model` can also be a `Workspace`, whose `id` is
         # of type `int`. But since we know that these are all `DslElements` (`id` of type `str`),
         # we can safely cast all the `id`s as `str` for the type checker to be happy.
-        return set([str(element.model.id) for element in self._elements])
+        #
+        # The `sources` and `destinations` of the DSL elements keep a cached set
+        # of their ids, which is reused here instead of being rebuilt.
+        return element_ids(self._elements)
 
     @property
     def names(self) -> Set[Union[str]]:
@@ -276,32 +280,27 @@ class Expression:
     def elements(
         self,
         workspace: Workspace,
+        prune: Optional[Callable[[DslElement], bool]]=None,
     ) -> List[DslElement]:
 
-        filtered_elements: List[DslElement] = []
+        """
+        Returns the elements that are included as defined in `include_elements`
+        and not excluded as defined in `exclude_elements`.
 
-        workspace_elements = buildzr.dsl.Explorer(workspace).walk_elements()
-        for element in workspace_elements:
-            includes: List[bool] = []
-            excludes: List[bool] = []
-            for f in self._include_elements:
-                if isinstance(f, DslElement):
-                    includes.append(f == element)
-                else:
-                    includes.append(f(WorkspaceExpression(workspace), ElementExpression(element)))
-            for f in self._exclude_elements:
-                if isinstance(f, DslElement):
-                    excludes.append(f == element)
-                else:
-                    excludes.append(f(WorkspaceExpression(workspace), ElementExpression(element)))
-            if any(includes) and not any(excludes):
-                filtered_elements.append(element)
+        If `prune` is given, the descendants of the elements for which it
+        returns `True` are not evaluated at all.
+        """
 
-        return filtered_elements
+        workspace_elements = buildzr.dsl.Explorer(workspace).walk_elements(prune=prune)
+        return [
+            element for element in workspace_elements
+            if self.includes_element(workspace, element)
+        ]
 
     def relationships(
         self,
-        workspace: Workspace
+        workspace: Workspace,
+        prune: Optional[Callable[[DslElement], bool]]=None,
     ) -> List[DslRelationship]:
 
         """
@@ -310,9 +309,49 @@ class Expression:
         `exclude_relationships`. Any relationships that directly works on
         elements that are excluded as defined in `exclude_elements` will also be
         excluded.
+
+        If `prune` is given, the relationships of the descendants of the
+        elements for which it returns `True` are not evaluated at all.
+        """
+
+        workspace_relationships = buildzr.dsl.Explorer(workspace).walk_relationships(prune=prune)
+        return [
+            relationship for relationship in workspace_relationships
+            if self.includes_relationship(workspace, relationship)
+        ]
+
+    def includes_element(self, workspace: Workspace, element: DslElement) -> bool:
+
+        """
+        Returns `True` if the `element` is included as defined in
+        `include_elements` and not excluded as defined in `exclude_elements`.
+
+        This evaluates a single element, which allows views to be updated
+        with only the elements added since they were last computed.
         """
 
-        filtered_relationships: List[DslRelationship] = []
+        includes: List[bool] = []
+        excludes: List[bool] = []
+        for f in self._include_elements:
+            if isinstance(f, DslElement):
+                includes.append(f == element)
+            else:
+                includes.append(f(WorkspaceExpression(workspace), ElementExpression(element)))
+        for f in self._exclude_elements:
+            if isinstance(f, DslElement):
+                excludes.append(f == element)
+            else:
+                excludes.append(f(WorkspaceExpression(workspace), ElementExpression(element)))
+        return any(includes) and not any(excludes)
+
+    def includes_relationship(self, workspace: Workspace, relationship: DslRelationship) -> bool:
+
+        """
+        Returns `True` if the `relationship` is included as defined in
+        `include_relationships`, and is neither excluded as defined in
+        `exclude_relationships`, nor a relationship of an element excluded as
+        defined in `exclude_elements`.
+        """
 
         def _is_relationship_of_excluded_elements(
             workspace: WorkspaceExpression,
@@ -328,36 +367,29 @@ class Expression:
                         return True
             return False
 
-        workspace_relationships = buildzr.dsl.Explorer(workspace).walk_relationships()
-
-        for relationship in workspace_relationships:
-
-            includes: List[bool] = []
-            excludes: List[bool] = []
-
-            for f in self._include_relationships:
-                if isinstance(f, DslElement):
-                    includes.append(f == relationship)
-                else:
-                    includes.append(f(WorkspaceExpression(workspace), RelationshipExpression(relationship)))
-
-            for f in self._exclude_relationships:
-                if isinstance(f, DslElement):
-                    excludes.append(f == relationship)
-                else:
-                    excludes.append(f(WorkspaceExpression(workspace), RelationshipExpression(relationship)))
-
-            # Also exclude relationships whose source or destination elements
-            # are excluded.
-            excludes.append(
-                _is_relationship_of_excluded_elements(
-                    WorkspaceExpression(workspace),
-                    RelationshipExpression(relationship),
-                    self._exclude_elements,
-                )
+        includes: List[bool] = []
+        excludes: List[bool] = []
+
+        for f in self._include_relationships:
+            if isinstance(f, DslElement):
+                includes.append(f == relationship)
+            else:
+                includes.append(f(WorkspaceExpression(workspace), RelationshipExpression(relationship)))
+
+        for f in self._exclude_relationships:
+            if isinstance(f, DslElement):
+                excludes.append(f == relationship)
+            else:
+                excludes.append(f(WorkspaceExpression(workspace), RelationshipExpression(relationship)))
+
+        # Also exclude relationships whose source or destination elements
+        # are excluded.
+        excludes.append(
+            _is_relationship_of_excluded_elements(
+                WorkspaceExpression(workspace),
+                RelationshipExpression(relationship),
+                self._exclude_elements,
             )
+        )
 
-            if any(includes) and not any(excludes):
-                filtered_relationships.append(relationship)
-
-        return filtered_relationships
\ No newline at end of file
+        return any(includes) and not any(excludes)
\ No newline at end of file
@@ -1,7 +1,12 @@
-from typing import Dict
+import threading
+from typing import Dict, List
 
 class GenerateId:
 
+    # The counters are shared by all the workspaces of the process, and may be
+    # incremented from several threads building workspaces at the same time.
+    _lock = threading.Lock()
+
     _data: Dict[int, int] = {
         0: 0,
         1: 0,
@@ -9,18 +14,46 @@ class GenerateId:
 
     @staticmethod
     def for_workspace() -> int:
-        GenerateId._data[0] = GenerateId._data[0] + 1
-        return GenerateId._data[0]
+        with GenerateId._lock:
+            GenerateId._data[0] = GenerateId._data[0] + 1
+            return GenerateId._data[0]
 
     @staticmethod
     def for_element() -> str:
-        GenerateId._data[1] = GenerateId._data[1] + 1
-        return str(GenerateId._data[1])
+        with GenerateId._lock:
+            GenerateId._data[1] = GenerateId._data[1] + 1
+            return str(GenerateId._data[1])
 
     @staticmethod
     def for_relationship() -> str:
-        GenerateId._data[1] = GenerateId._data[1] + 1
-        return str(GenerateId._data[1])
+        with GenerateId._lock:
+            GenerateId._data[1] = GenerateId._data[1] + 1
+            return str(GenerateId._data[1])
+
+    @staticmethod
+    def for_elements(count: int) -> List[str]:
+        """
+        Allocate a block of `count` consecutive element/relationship IDs at once.
+
+        Args:
+            count: The number of IDs to allocate.
+
+        Returns:
+            The allocated IDs, in increasing order.
+        """
+        with GenerateId._lock:
+            start = GenerateId._data[1] + 1
+            GenerateId._data[1] = GenerateId._data[1] + count
+        return [str(i) for i in range(start, start + count)]
+
+    @staticmethod
+    def for_relationships(count: int) -> List[str]:
+        """
+        Allocate a block of `count` consecutive relationship IDs at once.
+
+        Relationships share the ID counter with the elements.
+        """
+        return GenerateId.for_elements(count)
 
     @staticmethod
     def set_offset(offset: int) -> None:
@@ -28,13 +61,16 @@ class GenerateId:
         Set the element/relationship ID counter to start after the given offset.
 
         This is used when extending a workspace to ensure new element IDs
-        don't collide with IDs from the extended (parent) workspace.
+        don't collide with IDs from the extended (parent) workspace. The
+        counter never goes back, so that the IDs being generated for other
+        workspaces built at the same time don't collide either.
 
         Args:
             offset: The highest ID from the parent workspace. New IDs will
-                    start at offset + 1.
+                    be greater than offset.
         """
-        GenerateId._data[1] = offset
+        with GenerateId._lock:
+            GenerateId._data[1] = max(GenerateId._data[1], offset)
 
     @staticmethod
     def reset() -> None:
@@ -43,5 +79,6 @@ class GenerateId:
 
         Primarily used in testing to ensure clean state between tests.
         """
-        GenerateId._data[0] = 0
-        GenerateId._data[1] = 0
\ No newline at end of file
+        with GenerateId._lock:
+            GenerateId._data[0] = 0
+            GenerateId._data[1] = 0
\ No newline at end of file
@@ -7,6 +7,11 @@ from .interfaces import (
     DslInfrastructureNodeElement,
     DslDeploymentNodeElement,
     DslElementInstance,
+    ElementList,
+    RelationshipSet,
+    element_ids,
+    join_tags,
+    relationship_ids,
     BindLeft,
     BindRight,
     BindLeftLate,
@@ -12,6 +12,10 @@ from typing import (
     overload,
     Sequence,
     MutableSet,
+    AbstractSet,
+    Iterable,
+    SupportsIndex,
+    Dict,
     cast,
 )
 from typing_extensions import (
@@ -99,6 +103,20 @@ class DslWorkspaceElement(ABC):
     def __contains__(self, other: 'DslElement') -> bool:
         return self.model.id == other.parent.model.id
 
+    def _record_element(self, element: 'DslElement') -> None:
+        """
+        Called when an element is added to (an element of) this workspace.
+        Does nothing by default.
+        """
+        pass
+
+    def _record_relationship(self, relationship: 'DslRelationship') -> None:
+        """
+        Called when a relationship is created between the elements of this
+        workspace. Does nothing by default.
+        """
+        pass
+
 class DslElement(BindRight[TSrc, TDst]):
     """An abstract class used to label classes that are part of the buildzr DSL"""
 
@@ -147,7 +165,7 @@ class DslElement(BindRight[TSrc, TDst]):
         """
         self.tags.update(tags)
         if not isinstance(self.model, buildzr.models.Workspace):
-            self.model.tags = ','.join(self.tags)
+            self.model.tags = join_tags(self.tags)
 
     def uses(
         self,
@@ -160,6 +178,112 @@ class DslElement(BindRight[TSrc, TDst]):
     def __contains__(self, other: 'DslElement') -> bool:
         return self.model.id == other.parent.model.id
 
+class ElementList(List['DslElement']):
+    """
+    A list of `DslElement`s that keeps a cached set of the ids of its
+    elements.
+
+    This is used for the `sources` and `destinations` of the DSL elements, so
+    that checking whether an element is related to another element doesn't
+    require rebuilding the set of ids every time. Appending to the list
+    updates the cached set, while any other mutation invalidates it.
+    """
+
+    def __init__(self, elements: Iterable['DslElement']=()) -> None:
+        super().__init__(elements)
+        self._ids: Optional[Set[str]] = None
+
+    @property
+    def ids(self) -> AbstractSet[str]:
+        # The set is built before being stored, so that concurrent readers
+        # either build the same set or get the complete one, and never see a
+        # partially built set.
+        ids = self._ids
+        if ids is None:
+            ids = {str(element.model.id) for element in self}
+            self._ids = ids
+        return ids
+
+    def append(self, element: 'DslElement') -> None:
+        super().append(element)
+        if self._ids is not None:
+            self._ids.add(str(element.model.id))
+
+    def extend(self, elements: Iterable['DslElement']) -> None:
+        elements = list(elements)
+        super().extend(elements)
+        if self._ids is not None:
+            self._ids.update(str(element.model.id) for element in elements)
+
+    def __iadd__(self, elements: Iterable['DslElement']) -> Self: # type: ignore[override,misc]
+        self.extend(elements)
+        return self
+
+    def insert(self, index: SupportsIndex, element: 'DslElement') -> None:
+        super().insert(index, element)
+        self._ids = None
+
+    def remove(self, element: 'DslElement') -> None:
+        super().remove(element)
+        self._ids = None
+
+    def pop(self, index: SupportsIndex=-1) -> 'DslElement':
+        self._ids = None
+        return super().pop(index)
+
+    def clear(self) -> None:
+        super().clear()
+        self._ids = None
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        super().__setitem__(index, value)
+        self._ids = None
+
+    def __delitem__(self, index: Any) -> None:
+        super().__delitem__(index)
+        self._ids = None
+
+    def __imul__(self, n: SupportsIndex) -> Self:
+        super().__imul__(n)
+        self._ids = None
+        return self
+
+# The tags Structurizr gives to each kind of element and relationship, in the
+# order it lists them.
+_BUILT_IN_TAGS = [
+    'Element',
+    'Relationship',
+    'Person',
+    'Software System',
+    'Container',
+    'Component',
+    'Deployment Node',
+    'Infrastructure Node',
+    'Software System Instance',
+    'Container Instance',
+]
+
+def join_tags(tags: Iterable[str]) -> str:
+    """
+    Returns the comma-separated `tags` of a model, in a stable order: the
+    built-in tags first, in the order Structurizr lists them (so that the
+    styles of the more specific tags take precedence), then the other tags
+    sorted. The tags are kept in sets, whose order changes from one process
+    to another.
+    """
+    tags = set(tags)
+    built_in = [tag for tag in _BUILT_IN_TAGS if tag in tags]
+    return ','.join(built_in + sorted(tags.difference(built_in)))
+
+def element_ids(elements: Iterable['DslElement']) -> AbstractSet[str]:
+    """
+    Returns the set of ids of the `elements`, using the cached set if
+    `elements` is an `ElementList`.
+    """
+    if isinstance(elements, ElementList):
+        return elements.ids
+    return {str(element.model.id) for element in elements}
+
 class DslRelationship(ABC, Generic[TSrc, TDst]):
     """
     An abstract class specially used to label classes that are part of the
@@ -191,11 +315,153 @@ class DslRelationship(ABC, Generic[TSrc, TDst]):
         Adds tags to the relationship.
         """
         self.tags.update(tags)
-        self.model.tags = ','.join(self.tags)
+        self.model.tags = join_tags(self.tags)
 
     def __contains__(self, other: 'DslElement') -> bool:
         return self.source.model.id == other.model.id or self.destination.model.id == other.model.id
 
+class RelationshipSet(Set['DslRelationship']):
+    """
+    A set of `DslRelationship`s of a single source element, indexed by the
+    destination id of each relationship.
+
+    Together with the id of the source element owning the set, this forms a
+    `(sourceId, destinationId)` index of the relationships that lets the
+    relationships between two elements be looked up without walking all the
+    relationships in the workspace. Adding and discarding relationships keeps
+    the index up to date, in the order the relationships were added, together
+    with the set of the relationship ids.
+    """
+
+    def __init__(self, relationships: Iterable['DslRelationship']=()) -> None:
+        super().__init__()
+        self._index: Dict[str, List['DslRelationship']] = {}
+        self._ids: Dict[str, int] = {}
+        for relationship in relationships:
+            self.add(relationship)
+
+    @property
+    def ids(self) -> AbstractSet[str]:
+        return self._ids.keys()
+
+    @staticmethod
+    def _key(relationship: 'DslRelationship') -> str:
+        return str(relationship.model.destinationId)
+
+    def find(
+        self,
+        destination_id: str,
+        technology: Optional[str]=None,
+    ) -> List['DslRelationship']:
+        """
+        Returns the relationships to the element with the `destination_id`, in
+        the order they were added. If `technology` is given, only the
+        relationships with exactly that technology are returned.
+        """
+        relationships = self._index.get(destination_id, [])
+        if technology is None:
+            return list(relationships)
+        return [r for r in relationships if r.model.technology == technology]
+
+    def add(self, relationship: 'DslRelationship') -> None:
+        if relationship in self:
+            return
+        super().add(relationship)
+        self._index.setdefault(self._key(relationship), []).append(relationship)
+        self._count_id(relationship, 1)
+
+    def _count_id(self, relationship: 'DslRelationship', n: int) -> None:
+        rel_id = str(relationship.model.id)
+        count = self._ids.get(rel_id, 0) + n
+        if count > 0:
+            self._ids[rel_id] = count
+        else:
+            self._ids.pop(rel_id, None)
+
+    def discard(self, relationship: 'DslRelationship') -> None:
+        if relationship not in self:
+            return
+        super().discard(relationship)
+        key = self._key(relationship)
+        relationships = self._index.get(key, [])
+        if relationship in relationships:
+            relationships.remove(relationship)
+        if not relationships:
+            self._index.pop(key, None)
+        self._count_id(relationship, -1)
+
+    def remove(self, relationship: 'DslRelationship') -> None:
+        if relationship not in self:
+            raise KeyError(relationship)
+        self.discard(relationship)
+
+    def pop(self) -> 'DslRelationship':
+        relationship = super().pop()
+        super().add(relationship)
+        self.discard(relationship)
+        return relationship
+
+    def clear(self) -> None:
+        super().clear()
+        self._index.clear()
+        self._ids.clear()
+
+    def update(self, *others: Iterable['DslRelationship']) -> None:
+        for other in others:
+            for relationship in other:
+                self.add(relationship)
+
+    def __ior__(self, other: AbstractSet['DslRelationship']) -> Self: # type: ignore[override,misc]
+        self.update(other)
+        return self
+
+    def _rebuild_index(self) -> None:
+        # The relationships still in the set keep their order, and the new
+        # ones come after them.
+        ordered = [r for relationships in self._index.values() for r in relationships if r in self]
+        ordered.extend(self - set(ordered))
+        self._index.clear()
+        self._ids.clear()
+        for relationship in ordered:
+            self._index.setdefault(self._key(relationship), []).append(relationship)
+            self._count_id(relationship, 1)
+
+    def difference_update(self, *others: Iterable[Any]) -> None:
+        super().difference_update(*others)
+        self._rebuild_index()
+
+    def intersection_update(self, *others: Iterable[Any]) -> None:
+        super().intersection_update(*others)
+        self._rebuild_index()
+
+    def symmetric_difference_update(self, other: Iterable['DslRelationship']) -> None:
+        super().symmetric_difference_update(other)
+        self._rebuild_index()
+
+    def __isub__(self, other: AbstractSet[Any]) -> Self: # type: ignore[misc]
+        super().__isub__(other)
+        self._rebuild_index()
+        return self
+
+    def __iand__(self, other: AbstractSet[Any]) -> Self: # type: ignore[misc]
+        super().__iand__(other)
+        self._rebuild_index()
+        return self
+
+    def __ixor__(self, other: AbstractSet['DslRelationship']) -> Self: # type: ignore[override,misc]
+        super().__ixor__(other)
+        self._rebuild_index()
+        return self
+
+def relationship_ids(relationships: Iterable['DslRelationship']) -> AbstractSet[str]:
+    """
+    Returns the set of ids of the `relationships`, using the index if
+    `relationships` is a `RelationshipSet`.
+    """
+    if isinstance(relationships, RelationshipSet):
+        return relationships.ids
+    return {str(relationship.model.id) for relationship in relationships}
+
 class DslViewElement(ABC):
 
     ViewModel = Union[
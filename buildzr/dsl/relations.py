@@ -21,10 +21,23 @@ from buildzr.dsl.interfaces import (
     DslElement,
     DslWorkspaceElement,
     TSrc, TDst,
+    element_ids,
+    join_tags,
+    relationship_ids,
 )
 from buildzr.dsl.factory import GenerateId
 import buildzr
 
+def _find_workspace(element: DslElement) -> Optional[DslWorkspaceElement]:
+    """
+    Returns the workspace the `element` belongs to, or `None` if the element
+    (or one of its ancestors) has not been added to a workspace yet.
+    """
+    current: Union[None, DslWorkspaceElement, DslElement] = element.parent
+    while current is not None and not isinstance(current, DslWorkspaceElement):
+        current = current.parent
+    return current
+
 @dataclass
 class With:
     tags: Optional[Set[str]] = None
@@ -90,20 +103,20 @@ class _Relationship(DslRelationship[TSrc, TDst]):
         self._tags = {'Relationship'}.union(tags)
         self._src = uses_data.source
         self._dst = destination
-        self.model.tags = ','.join(self._tags)
+        self.model.tags = join_tags(self._tags)
 
         uses_data.relationship.destinationId = str(destination.model.id)
 
         if not isinstance(uses_data.source.model, buildzr.models.Workspace):
 
             # Prevent any duplicate sources/destinations, especially when creating implied relationships.
-            if not any([self._dst.model.id == dest.model.id for dest in uses_data.source.destinations]):
+            if str(self._dst.model.id) not in element_ids(uses_data.source.destinations):
                 uses_data.source.destinations.append(self._dst)
-            if not any([self._src.model.id == src.model.id for src in self._dst.sources]):
+            if str(self._src.model.id) not in element_ids(self._dst.sources):
                 self._dst.sources.append(self._src)
 
             # Make this relationship accessible from the source element.
-            if not any([r.model.id == self.model.id for r in self._src.relationships]):
+            if str(self.model.id) not in relationship_ids(self._src.relationships):
                 self._src.relationships.add(self)
 
             if _include_in_model:
@@ -112,6 +125,10 @@ class _Relationship(DslRelationship[TSrc, TDst]):
                 else:
                     uses_data.source.model.relationships = [uses_data.relationship]
 
+                workspace = _find_workspace(self._src)
+                if workspace is not None:
+                    workspace._record_relationship(self)
+
         # Used to pass the `_UsesData` object as reference to the `__or__`
         # operator overloading method.
         self._ref: Tuple[_UsesData] = (uses_data,)
@@ -137,7 +154,7 @@ class _Relationship(DslRelationship[TSrc, TDst]):
         """
         if tags:
             self._tags = self._tags.union(tags)
-            self._ref[0].relationship.tags = ",".join(self._tags)
+            self._ref[0].relationship.tags = join_tags(self._tags)
         if properties:
             self._ref[0].relationship.properties = properties
         if url:
@@ -3,6 +3,7 @@ import dataclasses, json
 import enum
 import humps
 from buildzr.dsl.interfaces import DslElement, DslWorkspaceElement
+from buildzr.profiling import traced
 from typing import Union, List, TYPE_CHECKING, Type, Any, Dict, cast
 from typing_extensions import TypeGuard
 
@@ -44,6 +45,11 @@ def _remove_nones(d: Union[dict[str, Any], List[Any]]) -> Union[dict[str, Any],
     return d
 
 class JsonEncoder(json.JSONEncoder):
+
+    @traced()
+    def encode(self, o: Any) -> str:
+        return super().encode(o)
+
     def default(self, obj: JsonEncodable) -> Union[str, list, dict]:
         # Handle the default encoder the nicely wrapped DSL elements.
         if isinstance(obj, DslElement) or isinstance(obj, DslWorkspaceElement):
@@ -4,6 +4,8 @@ from typing import Dict, Any, Optional, Union, TYPE_CHECKING
 import jpype  # type: ignore
 import jpype.imports  # type: ignore
 
+from buildzr.profiling import traced
+
 if TYPE_CHECKING:
     from typing import Any as JavaAny  # Placeholder for Java types during type checking
 
@@ -78,6 +80,7 @@ class WorkspaceConverter:
         # Maps to track ID -> Java object for relationship resolution
         self._element_map: Dict[str, Any] = {}
 
+    @traced()
     def to_java(self, workspace: Workspace) -> Any:
         """
         Convert Python workspace to Java Workspace object.
@@ -0,0 +1,658 @@
+"""
+Layered (Sugiyama-style) layout of the views, without Structurizr or
+Graphviz.
+
+The elements of a view are laid out in four steps:
+    1. Cycle breaking: the relationships closing a cycle are reversed, so the
+       graph is acyclic.
+    2. Layer assignment: each element is put in a layer (a rank) after the
+       elements it depends on, and relationships spanning several layers are
+       split by virtual nodes, one per layer crossed.
+    3. Crossing reduction: the elements of each layer are ordered by the
+       barycenter of their neighbours in the adjacent layer, sweeping down and
+       up the layers, and the order with the fewest crossings is kept.
+    4. Coordinate assignment: the elements are placed as close as possible to
+       their neighbours, at least `nodeSeparation` pixels apart, and the
+       layers are `rankSeparation` pixels apart.
+
+The virtual nodes become the vertices (bends) of the relationships. The
+barycenter sweeps, the crossing counts and the placement of the elements are
+vectorized with NumPy when it's installed.
+
+Example:
+    >>> from buildzr.layout import layout_workspace
+    >>> layout_workspace(workspace)  # Fills in the x/y of the element views.
+
+    Or, to lay out the views each time the workspace is exported:
+
+    >>> with Workspace('w', layout=True) as w:
+    ...     ...
+"""
+
+import bisect
+import itertools
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from buildzr.models.models import (
+    ElementStyle,
+    Vertex,
+    Workspace,
+)
+from buildzr.profiling import span, traced
+
+DEFAULT_WIDTH = 450
+DEFAULT_HEIGHT = 300
+DEFAULT_SEPARATION = 300
+
+# The space around the laid out elements.
+MARGIN = 50
+
+# The number of segments compared at once when counting crossings with NumPy.
+_CROSSINGS_BLOCK = 1024
+
+# The number of down and up passes that center the nodes between their
+# neighbours.
+_ALIGN_PASSES = 4
+
+@dataclass
+class Layout:
+
+    """
+    The result of `layered_layout`.
+
+    Attributes:
+        positions: The top-left corner of each node.
+        vertices: For each edge, in the order given, the bends of the edge
+            from its source to its destination.
+        crossings: The number of edge crossings between adjacent layers.
+    """
+
+    positions: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    vertices: List[List[Tuple[float, float]]] = field(default_factory=list)
+    crossings: int = 0
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+class _LayeredGraph:
+
+    """
+    The acyclic, layered graph being laid out. The real nodes are numbered
+    from 0 in the order given, followed by the virtual nodes.
+    """
+
+    def __init__(self, node_count: int, edges: Sequence[Tuple[int, int]]) -> None:
+        self.node_count = node_count
+        self.edges = edges
+        self.reversed = [False] * len(edges)
+        self.layer: List[int] = [0] * node_count
+        self.chains: List[List[int]] = [[] for _ in edges]
+        self.layers: List[List[int]] = []
+        # The segments between adjacent layers: (upper node, lower node).
+        self.segments: List[List[Tuple[int, int]]] = []
+
+    def break_cycles(self) -> None:
+
+        """
+        Reverses the edges going back to a node on the current path of a
+        depth-first search, so the graph is acyclic.
+        """
+
+        successors: List[List[Tuple[int, int]]] = [[] for _ in range(self.node_count)]
+        for index, (source, destination) in enumerate(self.edges):
+            if source != destination:
+                successors[source].append((destination, index))
+
+        state = [0] * self.node_count  # 0: not visited, 1: on the path, 2: done.
+        for start in range(self.node_count):
+            if state[start]:
+                continue
+            state[start] = 1
+            stack = [(start, iter(successors[start]))]
+            while stack:
+                node, remaining = stack[-1]
+                for destination, index in remaining:
+                    if state[destination] == 1:
+                        self.reversed[index] = True
+                    elif state[destination] == 0:
+                        state[destination] = 1
+                        stack.append((destination, iter(successors[destination])))
+                        break
+                else:
+                    state[node] = 2
+                    stack.pop()
+
+    def directed_edges(self) -> List[Tuple[int, int, int]]:
+        """
+        Returns the edges of the acyclic graph, as (upper, lower, edge index),
+        without the self-loops.
+        """
+        result = []
+        for index, (source, destination) in enumerate(self.edges):
+            if source == destination:
+                continue
+            if self.reversed[index]:
+                source, destination = destination, source
+            result.append((source, destination, index))
+        return result
+
+    def assign_layers(self) -> None:
+
+        """
+        Puts each node one layer below the lowest of its predecessors (the
+        longest path from the sources), and then moves each source just above
+        its highest successor, so the edges are as short as possible.
+        """
+
+        edges = self.directed_edges()
+        successors: List[List[int]] = [[] for _ in range(self.node_count)]
+        in_degree = [0] * self.node_count
+        for upper, lower, _ in edges:
+            successors[upper].append(lower)
+            in_degree[lower] += 1
+
+        order = [node for node in range(self.node_count) if in_degree[node] == 0]
+        remaining = list(in_degree)
+        for node in order:
+            for successor in successors[node]:
+                self.layer[successor] = max(self.layer[successor], self.layer[node] + 1)
+                remaining[successor] -= 1
+                if remaining[successor] == 0:
+                    order.append(successor)
+
+        for node in reversed(order):
+            if in_degree[node] == 0 and successors[node]:
+                self.layer[node] = min(self.layer[s] for s in successors[node]) - 1
+
+        layer_count = max(self.layer, default=-1) + 1
+        self.layers = [[] for _ in range(layer_count)]
+        for node in range(self.node_count):
+            self.layers[self.layer[node]].append(node)
+        self.segments = [[] for _ in range(max(layer_count - 1, 0))]
+
+        # The edges spanning several layers are split by virtual nodes.
+        next_node = self.node_count
+        for upper, lower, index in edges:
+            previous = upper
+            for layer in range(self.layer[upper] + 1, self.layer[lower]):
+                self.layers[layer].append(next_node)
+                self.layer.append(layer)
+                self.chains[index].append(next_node)
+                self.segments[layer - 1].append((previous, next_node))
+                previous = next_node
+                next_node += 1
+            self.segments[self.layer[lower] - 1].append((previous, lower))
+
+    @property
+    def total_nodes(self) -> int:
+        return len(self.layer)
+
+def _count_crossings(segments: Sequence[Tuple[int, int]], position: Sequence[int]) -> int:
+    """
+    Counts the crossings between the segments of two adjacent layers, as the
+    inversions of the lower positions sorted by upper position.
+    """
+    pairs = sorted((position[upper], position[lower]) for upper, lower in segments)
+    seen: List[int] = []
+    crossings = 0
+    for _, lower in pairs:
+        # The segments already seen that end to the right of this one.
+        crossings += len(seen) - bisect.bisect_right(seen, lower)
+        bisect.insort(seen, lower)
+    return crossings
+
+class _PythonSweeps:
+
+    """Barycenter sweeps in pure Python."""
+
+    def __init__(self, graph: _LayeredGraph) -> None:
+        self.graph = graph
+        self.position = [0] * graph.total_nodes
+        for nodes in graph.layers:
+            for index, node in enumerate(nodes):
+                self.position[node] = index
+
+    def order(self, layer: int, downwards: bool) -> None:
+        graph = self.graph
+        position = self.position
+        if downwards:
+            segments = graph.segments[layer - 1]
+            pairs = [(lower, position[upper]) for upper, lower in segments]
+        else:
+            segments = graph.segments[layer]
+            pairs = [(upper, position[lower]) for upper, lower in segments]
+
+        sums: Dict[int, float] = {}
+        counts: Dict[int, int] = {}
+        for node, neighbour_position in pairs:
+            sums[node] = sums.get(node, 0.0) + neighbour_position
+            counts[node] = counts.get(node, 0) + 1
+
+        nodes = graph.layers[layer]
+        barycenters = [
+            sums[node] / counts[node] if node in counts else float(position[node])
+            for node in nodes
+        ]
+        ordered = [node for _, _, node in sorted(
+            (barycenter, position[node], node) for barycenter, node in zip(barycenters, nodes)
+        )]
+        graph.layers[layer] = ordered
+        for index, node in enumerate(ordered):
+            position[node] = index
+
+    def crossings(self) -> int:
+        return sum(_count_crossings(segments, self.position) for segments in self.graph.segments)
+
+    def align(self, offsets: List[List[float]]) -> List[float]:
+        """
+        Places the nodes of each layer, in order, centered between their
+        neighbours in the adjacent layers (see `_place`).
+
+        Args:
+            offsets: For each layer, the minimum distance of the center of
+                each node from the center of the first one.
+
+        Returns:
+            The center of each node along the layers.
+        """
+        graph = self.graph
+        neighbours: List[List[int]] = [[] for _ in range(graph.total_nodes)]
+        for segments in graph.segments:
+            for upper, lower in segments:
+                neighbours[upper].append(lower)
+                neighbours[lower].append(upper)
+
+        x: List[float] = [0.0] * graph.total_nodes
+        layer_indices = list(range(len(graph.layers)))
+        for _ in range(_ALIGN_PASSES):
+            for layers in (layer_indices, layer_indices[::-1]):
+                for layer in layers:
+                    layer_nodes = graph.layers[layer]
+                    desired = [
+                        sum(map(x.__getitem__, neighbours[node])) / len(neighbours[node])
+                        if neighbours[node] else x[node]
+                        for node in layer_nodes
+                    ]
+                    for node, center in zip(layer_nodes, _place(desired, offsets[layer])):
+                        x[node] = center
+        return x
+
+    def restore(self, layers: List[List[int]]) -> None:
+        self.graph.layers = [list(nodes) for nodes in layers]
+        for nodes in self.graph.layers:
+            for index, node in enumerate(nodes):
+                self.position[node] = index
+
+class _NumpySweeps(_PythonSweeps):
+
+    """Barycenter sweeps vectorized with NumPy."""
+
+    def __init__(self, graph: _LayeredGraph, numpy: Any) -> None:
+        super().__init__(graph)
+        self.np = numpy
+        self.array_position = numpy.array(self.position, dtype=float)
+        self.arrays = [
+            (
+                numpy.array([upper for upper, _ in segments], dtype=numpy.intp),
+                numpy.array([lower for _, lower in segments], dtype=numpy.intp),
+            )
+            for segments in graph.segments
+        ]
+
+    def order(self, layer: int, downwards: bool) -> None:
+        np = self.np
+        graph = self.graph
+        position = self.array_position
+        nodes = np.array(graph.layers[layer], dtype=np.intp)
+        if len(nodes) == 0:
+            return
+
+        if downwards:
+            fixed, free = self.arrays[layer - 1]
+        else:
+            free, fixed = self.arrays[layer]
+
+        # Renumber the nodes of the layer from 0, to sum by node.
+        local = np.full(graph.total_nodes, -1, dtype=np.intp)
+        local[nodes] = np.arange(len(nodes))
+        sums = np.bincount(local[free], weights=position[fixed], minlength=len(nodes))
+        counts = np.bincount(local[free], minlength=len(nodes))
+        current = position[nodes]
+        barycenters = np.where(counts > 0, sums / np.maximum(counts, 1), current)
+
+        ordered = nodes[np.lexsort((current, barycenters))]
+        graph.layers[layer] = ordered.tolist()
+        position[ordered] = np.arange(len(ordered))
+
+    def crossings(self) -> int:
+        np = self.np
+        position = self.array_position
+        crossings = 0
+        for uppers, lowers in self.arrays:
+            if len(uppers) < 2:
+                continue
+            upper = position[uppers]
+            lower = position[lowers]
+            # Two segments cross when one starts to the right of the other
+            # and ends to its left. The segments are compared by blocks to
+            # bound the memory.
+            for start in range(0, len(upper), _CROSSINGS_BLOCK):
+                block = slice(start, start + _CROSSINGS_BLOCK)
+                crossings += int(np.count_nonzero(
+                    (upper[None, :] > upper[block, None]) & (lower[None, :] < lower[block, None])
+                ))
+        return crossings
+
+    def align(self, offsets: List[List[float]]) -> List[float]:
+        np = self.np
+        graph = self.graph
+
+        # For each layer, the neighbours of its nodes, and the index in the
+        # layer of the node each neighbour belongs to.
+        local = np.zeros(graph.total_nodes, dtype=np.intp)
+        for nodes in graph.layers:
+            local[nodes] = np.arange(len(nodes))
+        neighbourhoods = []
+        for layer, nodes in enumerate(graph.layers):
+            owners: List[Any] = []
+            neighbours: List[Any] = []
+            if layer > 0:
+                uppers, lowers = self.arrays[layer - 1]
+                owners.append(local[lowers])
+                neighbours.append(uppers)
+            if layer < len(graph.layers) - 1:
+                uppers, lowers = self.arrays[layer]
+                owners.append(local[uppers])
+                neighbours.append(lowers)
+            owner = np.concatenate(owners) if owners else np.zeros(0, dtype=np.intp)
+            neighbour = np.concatenate(neighbours) if neighbours else np.zeros(0, dtype=np.intp)
+            degree = np.bincount(owner, minlength=len(nodes))
+            neighbourhoods.append((
+                np.array(nodes, dtype=np.intp),
+                owner,
+                neighbour,
+                degree,
+                np.array(offsets[layer], dtype=float),
+            ))
+
+        x = np.zeros(graph.total_nodes, dtype=float)
+        layer_indices = list(range(len(graph.layers)))
+        for _ in range(_ALIGN_PASSES):
+            for layers in (layer_indices, layer_indices[::-1]):
+                for layer in layers:
+                    nodes, owner, neighbour, degree, layer_offsets = neighbourhoods[layer]
+                    if len(nodes) == 0:
+                        continue
+                    sums = np.bincount(owner, weights=x[neighbour], minlength=len(nodes))
+                    desired = np.where(degree > 0, sums / np.maximum(degree, 1), x[nodes])
+                    shifted = desired - layer_offsets
+                    from_left = np.maximum.accumulate(shifted)
+                    from_right = np.minimum.accumulate(shifted[::-1])[::-1]
+                    x[nodes] = (from_left + from_right) / 2 + layer_offsets
+        return [float(center) for center in x]
+
+    def restore(self, layers: List[List[int]]) -> None:
+        self.graph.layers = [list(nodes) for nodes in layers]
+        for nodes in self.graph.layers:
+            self.array_position[nodes] = self.np.arange(len(nodes))
+
+def _sweeps(graph: _LayeredGraph, use_numpy: Optional[bool]) -> _PythonSweeps:
+
+    """Returns the sweeps of the `graph`, vectorized with NumPy when asked or available."""
+
+    numpy = _numpy() if use_numpy is not False else None
+    if use_numpy and numpy is None:
+        raise ImportError("NumPy is required for use_numpy=True. Install with: pip install numpy")
+    return _NumpySweeps(graph, numpy) if numpy is not None else _PythonSweeps(graph)
+
+def _reduce_crossings(sweeps: _PythonSweeps, iterations: int) -> int:
+
+    """
+    Orders the nodes of each layer with barycenter sweeps, down and up the
+    layers, and keeps the orders with the fewest crossings.
+
+    Returns:
+        The number of crossings.
+    """
+
+    graph = sweeps.graph
+    best = sweeps.crossings()
+    best_layers = [list(nodes) for nodes in graph.layers]
+    down = [(layer, True) for layer in range(1, len(graph.layers))]
+    up = [(layer, False) for layer in range(len(graph.layers) - 2, -1, -1)]
+    for _ in range(iterations):
+        improved = False
+        for sweep in (down, up):
+            if best == 0:
+                break
+            for layer, downwards in sweep:
+                sweeps.order(layer, downwards)
+            current = sweeps.crossings()
+            if current < best:
+                best = current
+                best_layers = [list(nodes) for nodes in graph.layers]
+                improved = True
+        if not improved:
+            break
+    sweeps.restore(best_layers)
+    return best
+
+def _place(desired: Sequence[float], offsets: Sequence[float]) -> List[float]:
+
+    """
+    Places the nodes of a layer, in order, as close as possible to their
+    `desired` centers without overlapping: the average of the placement
+    packed from the left, and the one packed from the right.
+
+    Args:
+        desired: The desired center of each node.
+        offsets: The minimum distance of the center of each node from the
+            center of the first one.
+    """
+
+    shifted = [d - o for d, o in zip(desired, offsets)]
+    from_left = itertools.accumulate(shifted, max)
+    from_right = reversed(list(itertools.accumulate(reversed(shifted), min)))
+    return [(a + b) / 2 + o for a, b, o in zip(from_left, from_right, offsets)]
+
+def layered_layout(
+    nodes: Sequence[str],
+    edges: Sequence[Tuple[str, str]],
+    sizes: Optional[Mapping[str, Tuple[float, float]]]=None,
+    rank_direction: str='TopBottom',
+    rank_separation: float=DEFAULT_SEPARATION,
+    node_separation: float=DEFAULT_SEPARATION,
+    iterations: int=12,
+    use_numpy: Optional[bool]=None,
+) -> Layout:
+
+    """
+    Lays out a directed graph in layers.
+
+    Args:
+        nodes: The IDs of the nodes.
+        edges: The (source, destination) edges. The edges to or from nodes
+            that aren't in `nodes` are ignored.
+        sizes: The (width, height) of each node, in pixels. Defaults to the
+            Structurizr default of 450x300.
+        rank_direction: The direction of the edges: 'TopBottom',
+            'BottomTop', 'LeftRight' or 'RightLeft'.
+        rank_separation: The space between the layers, in pixels.
+        node_separation: The space between the nodes of a layer, in pixels.
+        iterations: The maximum number of down and up barycenter sweeps.
+        use_numpy: Whether to vectorize the sweeps with NumPy. Defaults to
+            using NumPy when it's installed.
+
+    Returns:
+        The positions of the nodes, and the bends of the edges.
+    """
+
+    sizes = sizes or {}
+    ids = {node: index for index, node in enumerate(nodes)}
+    indexed_edges = [
+        (ids[source], ids[destination])
+        for source, destination in edges
+        if source in ids and destination in ids
+    ]
+    kept = [
+        index for index, (source, destination) in enumerate(edges)
+        if source in ids and destination in ids
+    ]
+
+    graph = _LayeredGraph(len(nodes), indexed_edges)
+    graph.break_cycles()
+    graph.assign_layers()
+    sweeps = _sweeps(graph, use_numpy)
+    crossings = _reduce_crossings(sweeps, iterations)
+
+    # Lay out top to bottom, with the order axis as x and the rank axis as y,
+    # and transform at the end.
+    horizontal = rank_direction in ('LeftRight', 'RightLeft')
+    widths: List[float] = [0.0] * graph.total_nodes
+    heights: List[float] = [0.0] * graph.total_nodes
+    for node_id, index in ids.items():
+        width, height = sizes.get(node_id, (DEFAULT_WIDTH, DEFAULT_HEIGHT))
+        widths[index], heights[index] = (height, width) if horizontal else (width, height)
+
+    def gap(left: int, right: int) -> float:
+        # The virtual nodes are packed closer.
+        if left < graph.node_count and right < graph.node_count:
+            return node_separation
+        return node_separation / 2
+
+    rank: List[float] = [0.0] * graph.total_nodes
+    top = 0.0
+    for layer_nodes in graph.layers:
+        thickness = max((heights[node] for node in layer_nodes), default=0.0)
+        for node in layer_nodes:
+            rank[node] = top + thickness / 2
+        top += thickness + rank_separation
+
+    offsets: List[List[float]] = []
+    for layer_nodes in graph.layers:
+        layer_offsets = [0.0]
+        for previous, node in zip(layer_nodes, layer_nodes[1:]):
+            layer_offsets.append(layer_offsets[-1] + widths[previous] / 2 + gap(previous, node) + widths[node] / 2)
+        offsets.append(layer_offsets)
+
+    x = sweeps.align(offsets)
+
+    left = min((x[node] - widths[node] / 2 for node in range(graph.total_nodes)), default=0.0)
+    extent_rank = max(top - rank_separation, 0.0)
+
+    def center(node: int) -> Tuple[float, float]:
+        order_axis = x[node] - left
+        rank_axis = rank[node]
+        if rank_direction in ('BottomTop', 'RightLeft'):
+            rank_axis = extent_rank - rank_axis
+        if horizontal:
+            return (MARGIN + rank_axis, MARGIN + order_axis)
+        return (MARGIN + order_axis, MARGIN + rank_axis)
+
+    layout = Layout(crossings=crossings)
+    for node_id, index in ids.items():
+        cx, cy = center(index)
+        width, height = sizes.get(node_id, (DEFAULT_WIDTH, DEFAULT_HEIGHT))
+        layout.positions[node_id] = (round(cx - width / 2), round(cy - height / 2))
+
+    layout.vertices = [[] for _ in edges]
+    for edge_index, original in enumerate(kept):
+        chain = [center(node) for node in graph.chains[edge_index]]
+        if graph.reversed[edge_index]:
+            chain.reverse()
+        layout.vertices[original] = [(round(vx), round(vy)) for vx, vy in chain]
+
+    return layout
+
+def layout_view(index: Any, view: Any, use_numpy: Optional[bool]=None) -> Layout:
+
+    """
+    Lays out a view with `layered_layout`, and sets the `x`/`y` of its
+    element views and the `vertices` of its relationship views.
+
+    The rank direction and separations are the ones of the automatic layout
+    of the view, if any. The sizes of the elements are the ones set by their
+    styles, defaulting to 450x300.
+
+    Args:
+        index: The `buildzr.sinks.model_index.ModelIndex` of the workspace.
+        view: The view to lay out.
+        use_numpy: See `layered_layout`.
+    """
+
+    element_views = [element for element in view.elements or [] if element.id]
+    nodes = [element.id for element in element_views]
+
+    sizes: Dict[str, Tuple[float, float]] = {}
+    default_style = ElementStyle(tag='Element', width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT)
+    for node in nodes:
+        element = index.elements.get(node)
+        style = index.element_style(element, default_style) if element else default_style
+        sizes[node] = (float(style.width or DEFAULT_WIDTH), float(style.height or DEFAULT_HEIGHT))
+
+    relationship_views = []
+    edges: List[Tuple[str, str]] = []
+    for relationship_view in view.relationships or []:
+        relationship = index.relationships.get(relationship_view.id)
+        if relationship is None or relationship.sourceId is None or relationship.destinationId is None:
+            continue
+        relationship_views.append(relationship_view)
+        edges.append((relationship.sourceId, relationship.destinationId))
+
+    automatic_layout = getattr(view, 'automaticLayout', None)
+    rank_direction = 'TopBottom'
+    rank_separation: float = DEFAULT_SEPARATION
+    node_separation: float = DEFAULT_SEPARATION
+    if automatic_layout is not None:
+        if automatic_layout.rankDirection is not None:
+            rank_direction = automatic_layout.rankDirection.value
+        if automatic_layout.rankSeparation is not None:
+            rank_separation = automatic_layout.rankSeparation
+        if automatic_layout.nodeSeparation is not None:
+            node_separation = automatic_layout.nodeSeparation
+
+    layout = layered_layout(
+        nodes,
+        edges,
+        sizes=sizes,
+        rank_direction=rank_direction,
+        rank_separation=rank_separation,
+        node_separation=node_separation,
+        use_numpy=use_numpy,
+    )
+
+    for element_view in element_views:
+        element_view.x, element_view.y = layout.positions[element_view.id]
+    for relationship_view, vertices in zip(relationship_views, layout.vertices):
+        relationship_view.vertices = [Vertex(x=vx, y=vy) for vx, vy in vertices] or None
+    return layout
+
+@traced()
+def layout_workspace(workspace: Workspace, use_numpy: Optional[bool]=None) -> None:
+
+    """
+    Lays out every view of the `workspace` (see `layout_view`).
+
+    Filtered views and image views have no element views of their own, and
+    aren't laid out.
+    """
+
+    from buildzr.sinks.model_index import ModelIndex, iter_views
+
+    index = ModelIndex(workspace)
+    for _, view in iter_views(workspace):
+        with span('layout_view', key=view.key):
+            layout_view(index, view, use_numpy=use_numpy)
@@ -1,3 +1,5 @@
+from buildzr.loaders.http_cache import HttpCache
 from buildzr.loaders.json_loader import JsonLoader
+from buildzr.loaders.dsl_loader import DslLoader, DslSyntaxError
 
-__all__ = ['JsonLoader']
+__all__ = ['JsonLoader', 'DslLoader', 'DslSyntaxError', 'HttpCache']
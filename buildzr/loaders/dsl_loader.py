@@ -0,0 +1,1531 @@
+"""
+Structurizr DSL loader for parsing workspace.dsl files into buildzr models,
+without the Structurizr CLI (and the JVM).
+
+The DSL is parsed in two steps: each file is split into statements (lines of
+tokens, with the statements of their `{ ... }` block) by a hand-written
+tokenizer, then the statements are run to build the workspace. The
+statements of each file are cached by path and modification time, so loading
+a multi-file workspace again only parses the files that changed.
+
+Example:
+    >>> from buildzr.loaders import DslLoader
+    >>> workspace = DslLoader().load('workspace.dsl')
+
+    Or, to extend a DSL workspace with buildzr:
+
+    >>> with Workspace('w', extend='workspace.dsl') as w:
+    ...     ...
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import urllib.parse
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+import buildzr.models
+from buildzr.models.models import (
+    AutomaticLayout,
+    Border,
+    Branding,
+    ComponentView,
+    Configuration,
+    ContainerInstance,
+    ContainerView,
+    CustomView,
+    DeploymentNode,
+    DeploymentView,
+    DynamicView,
+    ElementStyle,
+    ElementView,
+    FilteredView,
+    Font,
+    HttpHealthCheck,
+    Implementation,
+    InfrastructureNode,
+    Mode,
+    Model,
+    Perspective,
+    RankDirection,
+    Relationship,
+    RelationshipStyle,
+    RelationshipView,
+    Routing1,
+    Scope,
+    Shape,
+    SoftwareSystemInstance,
+    Styles,
+    SystemContextView,
+    SystemLandscapeView,
+    Terminology,
+    Views,
+    Workspace,
+    WorkspaceConfiguration,
+)
+from buildzr.loaders.http_cache import HttpCache
+from buildzr.profiling import span, traced
+
+E = TypeVar('E', bound=Enum)
+
+
+class DslSyntaxError(ValueError):
+    """
+    Raised when a Structurizr DSL file can't be parsed, or uses a feature the
+    loader doesn't support.
+
+    Attributes:
+        path: The file the error is in, if known.
+        line: The line the error is on, if known.
+    """
+
+    def __init__(self, message: str, path: Optional[str]=None, line: Optional[int]=None) -> None:
+        location = f"{path}:{line}: " if path and line else f"{path}: " if path else ""
+        super().__init__(f"{location}{message}")
+        self.path = path
+        self.line = line
+
+
+@dataclass
+class _Statement:
+    """
+    A statement of a DSL file: its tokens, with the statements of its block
+    if it opens one.
+    """
+
+    tokens: List[str]
+    path: str
+    line: int
+    children: Optional[List['_Statement']] = None
+
+    @property
+    def keyword(self) -> str:
+        return self.tokens[0].lower() if self.tokens else ''
+
+    def error(self, message: str) -> DslSyntaxError:
+        return DslSyntaxError(message, self.path, self.line)
+
+
+def _split(line: str, lines: List[str], index: int, path: str, line_number: int) -> Tuple[List[Tuple[str, bool]], int]:
+
+    """
+    Splits a line into (token, quoted) pairs. A text block (`\"\"\"`) may span
+    the next lines.
+
+    Returns:
+        The tokens, and the index of the next line to read.
+    """
+
+    tokens: List[Tuple[str, bool]] = []
+    position = 0
+    length = len(line)
+    while position < length:
+        char = line[position]
+        if char.isspace():
+            position += 1
+        elif line.startswith('"""', position):
+            text = line[position + 3:]
+            block: List[str] = []
+            while '"""' not in text:
+                block.append(text)
+                if index >= len(lines):
+                    raise DslSyntaxError("Unterminated text block", path, line_number)
+                text = lines[index]
+                index += 1
+            end = text.index('"""')
+            block.append(text[:end])
+            tokens.append((_dedent(block), True))
+            line, position, length = text, end + 3, len(text)
+        elif char == '"':
+            value: List[str] = []
+            position += 1
+            while True:
+                if position >= length:
+                    raise DslSyntaxError("Unterminated string", path, line_number)
+                char = line[position]
+                if char == '\\' and position + 1 < length and line[position + 1] in '"\\':
+                    value.append(line[position + 1])
+                    position += 2
+                elif char == '"':
+                    position += 1
+                    break
+                else:
+                    value.append(char)
+                    position += 1
+            tokens.append((''.join(value), True))
+        else:
+            end = position
+            while end < length and not line[end].isspace():
+                end += 1
+            tokens.append((line[position:end], False))
+            position = end
+    return tokens, index
+
+
+def _dedent(block: List[str]) -> str:
+    """Removes the common indentation of the lines of a text block."""
+    lines = [line for line in block]
+    while lines and not lines[0].strip():
+        lines.pop(0)
+    while lines and not lines[-1].strip():
+        lines.pop()
+    indents = [len(line) - len(line.lstrip()) for line in lines if line.strip()]
+    indent = min(indents, default=0)
+    return '\n'.join(line[indent:] for line in lines)
+
+
+def _parse(text: str, path: str) -> List[_Statement]:
+
+    """
+    Splits a DSL file into statements, nesting the statements of each block
+    in the statement that opens it.
+    """
+
+    root: List[_Statement] = []
+    stack: List[List[_Statement]] = [root]
+    lines = text.splitlines()
+    index = 0
+    in_comment = False
+    while index < len(lines):
+        line_number = index + 1
+        line = lines[index]
+        index += 1
+
+        stripped = line.strip()
+        if in_comment:
+            in_comment = '*/' not in stripped
+            continue
+        if stripped.startswith('/*'):
+            in_comment = '*/' not in stripped[2:]
+            continue
+        if not stripped or stripped.startswith(('#', '//')):
+            continue
+
+        # Lines ending with a backslash continue on the next line.
+        while line.rstrip().endswith('\\') and index < len(lines):
+            line = line.rstrip()[:-1] + ' ' + lines[index]
+            index += 1
+
+        pairs, index = _split(line, lines, index, path, line_number)
+        if pairs == [('}', False)]:
+            if len(stack) == 1:
+                raise DslSyntaxError("Unexpected '}'", path, line_number)
+            stack.pop()
+            continue
+
+        opens = bool(pairs) and pairs[-1] == ('{', False)
+        tokens = [token for token, _ in (pairs[:-1] if opens else pairs)]
+        statement = _Statement(tokens, path, line_number, [] if opens else None)
+        stack[-1].append(statement)
+        if statement.children is not None:
+            stack.append(statement.children)
+
+    if len(stack) > 1:
+        raise DslSyntaxError("Missing '}'", path, len(lines))
+    return root
+
+
+def _is_url(source: str) -> bool:
+    return source.startswith(('http://', 'https://'))
+
+
+class DslLoader:
+    """
+    Loads a Structurizr workspace.dsl file and parses it into buildzr models.
+
+    Supports loading from:
+    - Local file paths
+    - HTTP/HTTPS URLs
+
+    The `!include` directive includes files, directories (all the files in
+    them) and URLs, relative to the including file. The statements of each
+    local file are cached by path and modification time, and shared by all
+    the loaders.
+
+    The model (including groups, deployment environments and implied
+    relationships), the views and their styles, themes, branding,
+    terminology and configuration are supported. Documentation,
+    architecture decision records, image views, animations, scripts and
+    plugins aren't.
+
+    Args:
+        http_cache: The cache of the downloaded files. Defaults to the one
+            configured by the environment (see `HttpCache`).
+    """
+
+    _cache: Dict[str, Tuple[Tuple[int, int], List[_Statement]]] = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, http_cache: Optional[HttpCache]=None) -> None:
+        self._http_cache = http_cache
+
+    @traced()
+    def load(self, source: str) -> buildzr.models.Workspace:
+        """
+        Load a workspace from a local file or URL.
+
+        Args:
+            source: Path to local file or URL (http:// or https://)
+
+        Returns:
+            A Workspace model
+
+        Raises:
+            DslSyntaxError: If the DSL can't be parsed.
+        """
+        builder = _DslBuilder(self)
+        with span('DslLoader.build', source=source):
+            builder.run_file(source)
+        return builder.finish()
+
+    def get_max_element_id(self, workspace: buildzr.models.Workspace) -> int:
+        """
+        Find the highest numeric element ID in the workspace.
+
+        See `JsonLoader.get_max_element_id`.
+        """
+        from buildzr.loaders.json_loader import JsonLoader
+        return JsonLoader().get_max_element_id(workspace)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Forget the statements parsed from the files so far."""
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    def _statements(self, source: str) -> List[_Statement]:
+        """Returns the statements of a file or URL, parsing it if needed."""
+        if _is_url(source):
+            http_cache = self._http_cache or HttpCache.from_environment()
+            return _parse(http_cache.fetch(source).decode('utf-8'), source)
+
+        path = os.path.abspath(source)
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._cache_lock:
+            cached = self._cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        with span('DslLoader.parse', path=path):
+            with open(path, 'r', encoding='utf-8') as f:
+                statements = _parse(f.read(), path)
+        with self._cache_lock:
+            self._cache[path] = (key, statements)
+        return statements
+
+    def _resolve_include(self, statement: _Statement, target: str) -> List[str]:
+        """Returns the files or URLs included by an `!include` statement."""
+        if _is_url(target):
+            return [target]
+        if _is_url(statement.path):
+            return [urllib.parse.urljoin(statement.path, target)]
+
+        base = os.path.dirname(statement.path)
+        path = target if os.path.isabs(target) else os.path.join(base, target)
+        if os.path.isdir(path):
+            files: List[str] = []
+            for directory, directories, names in os.walk(path):
+                directories[:] = sorted(d for d in directories if not d.startswith('.'))
+                files.extend(os.path.join(directory, name) for name in sorted(names) if not name.startswith('.'))
+            return files
+        if not os.path.exists(path):
+            raise statement.error(f"The included file {target!r} doesn't exist")
+        return [path]
+
+
+_DEFAULT_TAGS: Dict[str, List[str]] = {
+    'Person': ['Element', 'Person'],
+    'SoftwareSystem': ['Element', 'Software System'],
+    'Container': ['Element', 'Container'],
+    'Component': ['Element', 'Component'],
+    'DeploymentNode': ['Element', 'Deployment Node'],
+    'InfrastructureNode': ['Element', 'Infrastructure Node'],
+    'SoftwareSystemInstance': ['Software System Instance'],
+    'ContainerInstance': ['Container Instance'],
+    'CustomElement': ['Element'],
+}
+
+_TYPE_NAMES: Dict[str, str] = {
+    'person': 'Person',
+    'softwaresystem': 'SoftwareSystem',
+    'container': 'Container',
+    'component': 'Component',
+    'deploymentnode': 'DeploymentNode',
+    'infrastructurenode': 'InfrastructureNode',
+    'softwaresysteminstance': 'SoftwareSystemInstance',
+    'containerinstance': 'ContainerInstance',
+    'element': 'CustomElement',
+    'customelement': 'CustomElement',
+}
+
+_RANK_DIRECTIONS: Dict[str, RankDirection] = {
+    'tb': RankDirection.TopBottom,
+    'bt': RankDirection.BottomTop,
+    'lr': RankDirection.LeftRight,
+    'rl': RankDirection.RightLeft,
+}
+
+# The statements that are accepted and ignored.
+_IGNORED = {'!docs', '!adrs', 'animation', 'users', 'visibility', 'image'}
+
+
+def _enum(cls: Type[E], value: str, statement: _Statement) -> E:
+    """Finds the member of an enum by name or value, ignoring the case."""
+    for member in cls:
+        if value.lower() in (member.name.lower(), str(member.value).lower()):
+            return member
+    raise statement.error(f"Unknown {cls.__name__} {value!r}")
+
+
+def _number(value: str, statement: _Statement) -> float:
+    try:
+        number = float(value)
+    except ValueError:
+        raise statement.error(f"Expected a number, got {value!r}") from None
+    return int(number) if number.is_integer() else number
+
+
+def _boolean(value: str) -> bool:
+    return value.lower() == 'true'
+
+
+def _color(value: str) -> str:
+    from buildzr.dsl.color import Color
+    return Color(value).to_hex() if Color.is_valid_color(value) else value
+
+
+def _strip_arrows(expression: str) -> Tuple[bool, str, bool]:
+    """Splits `->x->` into whether it starts with an arrow, x, and whether it ends with one."""
+    incoming = expression.startswith('->')
+    outgoing = expression.endswith('->') and len(expression) > 2
+    return incoming, expression[2 if incoming else 0:len(expression) - 2 if outgoing else None], outgoing
+
+
+def _split_tags(tokens: Iterable[str]) -> List[str]:
+    return [tag.strip() for token in tokens for tag in token.split(',') if tag.strip()]
+
+
+@dataclass
+class _Context:
+    """Where a statement is run: the element of the block, and its group."""
+
+    element: Any = None
+    kind: Optional[str] = None
+    prefix: str = ''
+    group: Optional[str] = None
+    environment: Optional[str] = None
+
+
+@dataclass
+class _ViewState:
+    """The elements and relationships included in and excluded from a view."""
+
+    kind: str
+    model: Any
+    statement: _Statement
+    includes: List[str] = field(default_factory=list)
+    excludes: Set[str] = field(default_factory=set)
+    relationship_includes: List[str] = field(default_factory=list)
+    relationship_excludes: Set[str] = field(default_factory=set)
+    steps: List[Tuple[str, Optional[str]]] = field(default_factory=list)
+
+
+class _DslBuilder:
+
+    """Runs the statements of a workspace, building its model."""
+
+    def __init__(self, loader: DslLoader) -> None:
+        self.loader = loader
+        self.workspace = Workspace(
+            name='Workspace',
+            description='',
+            model=Model(people=[], softwareSystems=[], deploymentNodes=[]),
+            views=Views(configuration=Configuration(styles=Styles(elements=[], relationships=[]))),
+            documentation=buildzr.models.Documentation(),
+        )
+        self.next_id = 1
+        self.identifiers: Dict[str, Any] = {}
+        self.constants: Dict[str, str] = {}
+        self.hierarchical = False
+        self.implied_relationships = True
+
+        # The elements by ID, with their type and parent.
+        self.elements: Dict[str, Any] = {}
+        self.kinds: Dict[str, str] = {}
+        self.parents: Dict[str, Optional[str]] = {}
+        self.environments: Dict[str, str] = {}
+        self.relationships: List[Relationship] = []
+        self.instance_counts: Dict[Tuple[str, str, str], int] = {}
+        self.view_keys: Dict[str, int] = {}
+        self.including: List[str] = []
+
+    # Running statements.
+
+    def run_file(self, source: str, context: Optional[_Context]=None, handler: Optional[Callable[[_Statement, _Context], None]]=None) -> None:
+        key = source if _is_url(source) else os.path.abspath(source)
+        if key in self.including:
+            raise DslSyntaxError(f"{source} includes itself", self.including[-1] if self.including else None)
+        self.including.append(key)
+        try:
+            self.run(self.loader._statements(source), context or _Context(), handler or self.top_level)
+        finally:
+            self.including.pop()
+
+    def run(self, statements: List[_Statement], context: _Context, handler: Callable[[_Statement, _Context], None]) -> None:
+        for statement in statements:
+            statement = self.substitute(statement)
+            keyword = statement.keyword
+            if keyword == '!include':
+                if len(statement.tokens) < 2:
+                    raise statement.error("Expected: !include <file|directory|url>")
+                for source in self.loader._resolve_include(statement, statement.tokens[1]):
+                    self.run_file(source, context, handler)
+            elif keyword in ('!const', '!constant', '!var'):
+                if len(statement.tokens) != 3:
+                    raise statement.error(f"Expected: {statement.tokens[0]} <name> <value>")
+                self.constants[statement.tokens[1]] = statement.tokens[2]
+            elif keyword == '!identifiers':
+                self.hierarchical = len(statement.tokens) > 1 and statement.tokens[1].lower() == 'hierarchical'
+            elif keyword == '!impliedrelationships':
+                self.implied_relationships = len(statement.tokens) < 2 or statement.tokens[1].lower() not in ('false', '0')
+            elif keyword in ('!script', '!plugin', '!ref', 'archetypes'):
+                raise statement.error(f"{statement.tokens[0]} isn't supported")
+            elif keyword in _IGNORED:
+                continue
+            else:
+                handler(statement, context)
+
+    def substitute(self, statement: _Statement) -> _Statement:
+        if not self.constants or not any('${' in token for token in statement.tokens):
+            return statement
+        tokens = [
+            re.sub(r'\$\{([A-Za-z0-9_-]+)\}', lambda m: self.constants.get(str(m.group(1)), str(m.group(0))), token)
+            for token in statement.tokens
+        ]
+        return _Statement(tokens, statement.path, statement.line, statement.children)
+
+    def block(self, statement: _Statement, context: _Context, handler: Callable[[_Statement, _Context], None]) -> None:
+        if statement.children is not None:
+            self.run(statement.children, context, handler)
+
+    def top_level(self, statement: _Statement, context: _Context) -> None:
+        if statement.keyword != 'workspace':
+            raise statement.error(f"Expected 'workspace', got {statement.tokens[0]!r}")
+        arguments = statement.tokens[1:]
+        if arguments and arguments[0].lower() == 'extends':
+            raise statement.error("'workspace extends' isn't supported; extend the workspace with Workspace(extend=...) instead")
+        if arguments:
+            self.workspace.name = arguments[0]
+        if len(arguments) > 1:
+            self.workspace.description = arguments[1]
+        self.block(statement, context, self.workspace_statement)
+
+    def workspace_statement(self, statement: _Statement, context: _Context) -> None:
+        keyword = statement.keyword
+        if keyword == 'name':
+            self.workspace.name = self.argument(statement, 1)
+        elif keyword == 'description':
+            self.workspace.description = self.argument(statement, 1)
+        elif keyword == 'properties':
+            self.workspace.properties = self.properties(statement)
+        elif keyword == 'model':
+            self.block(statement, context, self.model_statement)
+            self.finish_model()
+        elif keyword == 'views':
+            self.block(statement, context, self.views_statement)
+        elif keyword == 'configuration':
+            self.block(statement, context, self.configuration_statement)
+        else:
+            raise statement.error(f"Unexpected {statement.tokens[0]!r} in workspace")
+
+    # Helpers.
+
+    def argument(self, statement: _Statement, index: int) -> str:
+        if len(statement.tokens) <= index:
+            raise statement.error(f"Missing argument after {statement.tokens[0]!r}")
+        return statement.tokens[index]
+
+    def properties(self, statement: _Statement) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        for child in statement.children or []:
+            child = self.substitute(child)
+            if len(child.tokens) != 2:
+                raise child.error("Expected: <name> <value>")
+            result[child.tokens[0]] = child.tokens[1]
+        return result
+
+    def perspectives(self, statement: _Statement) -> List[Perspective]:
+        result: List[Perspective] = []
+        for child in statement.children or []:
+            child = self.substitute(child)
+            if not 2 <= len(child.tokens) <= 3:
+                raise child.error("Expected: <name> <description> [value]")
+            result.append(Perspective(
+                name=child.tokens[0],
+                description=child.tokens[1],
+                value=child.tokens[2] if len(child.tokens) > 2 else None,
+            ))
+        return result
+
+    def generate_id(self) -> str:
+        value = str(self.next_id)
+        self.next_id += 1
+        return value
+
+    def register(self, identifier: Optional[str], target: Any, context: _Context, statement: _Statement) -> None:
+        if identifier is None:
+            return
+        if not re.fullmatch(r'[A-Za-z0-9_-]+', identifier):
+            raise statement.error(f"Invalid identifier {identifier!r}")
+        name = f"{context.prefix}{identifier}".lower() if self.hierarchical else identifier.lower()
+        if name in self.identifiers:
+            raise statement.error(f"The identifier {identifier!r} is already in use")
+        self.identifiers[name] = target
+
+    def lookup(self, identifier: str, statement: _Statement, context: Optional[_Context]=None) -> Any:
+        name = identifier.lower()
+        if name == 'this' and context is not None and context.element is not None:
+            return context.element
+        if self.hierarchical and context is not None and context.prefix:
+            # Identifiers are looked up from the current scope outwards.
+            parts = context.prefix.lower().rstrip('.').split('.')
+            for depth in range(len(parts), 0, -1):
+                candidate = '.'.join(parts[:depth]) + '.' + name
+                if candidate in self.identifiers:
+                    return self.identifiers[candidate]
+        if name in self.identifiers:
+            return self.identifiers[name]
+        raise statement.error(f"The element or relationship {identifier!r} doesn't exist")
+
+    def lookup_element(self, identifier: str, statement: _Statement, context: Optional[_Context]=None) -> Any:
+        target = self.lookup(identifier, statement, context)
+        if isinstance(target, Relationship):
+            raise statement.error(f"{identifier!r} is a relationship, not an element")
+        return target
+
+    def group_name(self, context: _Context, name: str, statement: _Statement) -> str:
+        if context.group is None:
+            return name
+        properties = (self.workspace.model.properties if self.workspace.model else None) or {}
+        separator = properties.get('structurizr.groupSeparator')
+        if not separator:
+            raise statement.error("To use nested groups, define the model property 'structurizr.groupSeparator'")
+        return f"{context.group}{separator}{name}"
+
+    # Model.
+
+    def model_statement(self, statement: _Statement, context: _Context) -> None:
+        keyword = statement.keyword
+        identifier, tokens = self.assignment(statement)
+        element_keyword = tokens[0].lower() if tokens else ''
+
+        if '->' in tokens:
+            self.relationship(statement, context, identifier, tokens)
+        elif element_keyword == 'person':
+            self.element(statement, context, identifier, tokens, 'Person')
+        elif element_keyword == 'softwaresystem':
+            self.element(statement, context, identifier, tokens, 'SoftwareSystem')
+        elif element_keyword == 'element':
+            self.element(statement, context, identifier, tokens, 'CustomElement')
+        elif keyword == 'group' and identifier is None:
+            group = _Context(prefix=context.prefix, group=self.group_name(context, self.argument(statement, 1), statement))
+            self.block(statement, group, self.model_statement)
+        elif keyword == 'enterprise':
+            if self.workspace.model is not None:
+                self.workspace.model.enterprise = buildzr.models.Enterprise(name=self.argument(statement, 1))
+            self.block(statement, context, self.model_statement)
+        elif element_keyword == 'deploymentenvironment':
+            environment = self.argument(statement, len(statement.tokens) - len(tokens) + 1)
+            self.register(identifier, environment, context, statement)
+            self.block(statement, _Context(environment=environment), self.deployment_statement)
+        elif keyword in ('!extend', '!element'):
+            target = self.lookup_element(self.argument(statement, 1), statement, context)
+            self.block(statement, self.element_context(target, context), self.element_statement)
+        elif keyword == 'properties' and self.workspace.model is not None:
+            self.workspace.model.properties = {**(self.workspace.model.properties or {}), **self.properties(statement)}
+        else:
+            raise statement.error(f"Unexpected {statement.tokens[0]!r} in model")
+
+    def assignment(self, statement: _Statement) -> Tuple[Optional[str], List[str]]:
+        """Splits `identifier = ...` statements."""
+        if len(statement.tokens) > 2 and statement.tokens[1] == '=':
+            return statement.tokens[0], statement.tokens[2:]
+        return None, statement.tokens
+
+    def element_context(self, element: Any, context: _Context) -> _Context:
+        kind = self.kinds[element.id]
+        identifier = next((name for name, target in self.identifiers.items() if target is element), None)
+        prefix = f"{identifier}." if self.hierarchical and identifier else context.prefix
+        return _Context(
+            element=element,
+            kind=kind,
+            prefix=prefix,
+            environment=self.environments.get(element.id, context.environment),
+        )
+
+    def element(
+        self,
+        statement: _Statement,
+        context: _Context,
+        identifier: Optional[str],
+        tokens: List[str],
+        kind: str,
+    ) -> Any:
+
+        """Creates an element, and runs the statements of its block."""
+
+        arguments = tokens[1:]
+        if not arguments:
+            raise statement.error(f"Expected a name after {tokens[0]!r}")
+        positions = {
+            'Person': ('description', 'tags'),
+            'SoftwareSystem': ('description', 'tags'),
+            'Container': ('description', 'technology', 'tags'),
+            'Component': ('description', 'technology', 'tags'),
+            'DeploymentNode': ('description', 'technology', 'tags', 'instances'),
+            'InfrastructureNode': ('description', 'technology', 'tags'),
+            'CustomElement': ('metadata', 'description', 'tags'),
+        }[kind]
+        values = dict(zip(positions, arguments[1:]))
+        if len(arguments) - 1 > len(positions):
+            raise statement.error(f"Too many arguments for {tokens[0]!r}")
+
+        element_id = self.generate_id()
+        tags = ','.join(_DEFAULT_TAGS[kind] + [t for t in _split_tags([values.get('tags', '')]) if t not in _DEFAULT_TAGS[kind]])
+        common: Dict[str, Any] = {
+            'id': element_id,
+            'name': arguments[0],
+            'description': values.get('description', ''),
+            'tags': tags,
+            'relationships': [],
+        }
+
+        model = self.workspace.model
+        assert model is not None
+        parent = context.element
+        element: Any
+        if kind == 'Person':
+            element = buildzr.models.Person(**common, location=buildzr.models.Location.Unspecified, group=context.group)
+            model.people = model.people if model.people is not None else []
+            model.people.append(element)
+        elif kind == 'SoftwareSystem':
+            element = buildzr.models.SoftwareSystem(**common, location=buildzr.models.Location1.Unspecified, group=context.group, containers=[])
+            model.softwareSystems = model.softwareSystems if model.softwareSystems is not None else []
+            model.softwareSystems.append(element)
+        elif kind == 'CustomElement':
+            element = buildzr.models.CustomElement(**common, metadata=values.get('metadata', ''))
+            model.customElements = model.customElements if model.customElements is not None else []
+            model.customElements.append(element)
+        elif kind == 'Container':
+            element = buildzr.models.Container(**common, technology=values.get('technology', ''), group=context.group, components=[])
+            parent.containers = parent.containers if parent.containers is not None else []
+            parent.containers.append(element)
+        elif kind == 'Component':
+            element = buildzr.models.Component(**common, technology=values.get('technology', ''), group=context.group)
+            parent.components = parent.components if parent.components is not None else []
+            parent.components.append(element)
+        elif kind == 'DeploymentNode':
+            instances = values.get('instances', '1')
+            element = DeploymentNode(
+                **common,
+                technology=values.get('technology', ''),
+                environment=context.environment,
+                instances=instances,
+                children=[],
+                infrastructureNodes=[],
+                softwareSystemInstances=[],
+                containerInstances=[],
+            )
+            if parent is None:
+                model.deploymentNodes = model.deploymentNodes if model.deploymentNodes is not None else []
+                model.deploymentNodes.append(element)
+            else:
+                parent.children.append(element)
+        else:
+            element = InfrastructureNode(**common, technology=values.get('technology', ''), environment=context.environment)
+            parent.infrastructureNodes.append(element)
+
+        self.add_element(element, kind, parent, context)
+        self.register(identifier, element, context, statement)
+        self.block(statement, self.element_context(element, context), self.element_statement)
+        return element
+
+    def add_element(self, element: Any, kind: str, parent: Any, context: _Context) -> None:
+        self.elements[element.id] = element
+        self.kinds[element.id] = kind
+        self.parents[element.id] = parent.id if parent is not None else None
+        if context.environment is not None:
+            self.environments[element.id] = context.environment
+
+    def element_statement(self, statement: _Statement, context: _Context) -> None:
+
+        """Runs a statement of the block of an element."""
+
+        element = context.element
+        kind = context.kind
+        keyword = statement.keyword
+        identifier, tokens = self.assignment(statement)
+        element_keyword = tokens[0].lower() if tokens else ''
+
+        if '->' in tokens:
+            self.relationship(statement, context, identifier, tokens)
+        elif keyword == 'description':
+            element.description = self.argument(statement, 1)
+        elif keyword == 'technology' and hasattr(element, 'technology'):
+            element.technology = self.argument(statement, 1)
+        elif keyword in ('tags', 'tag'):
+            existing = _split_tags([element.tags or ''])
+            element.tags = ','.join(existing + [t for t in _split_tags(statement.tokens[1:]) if t not in existing])
+        elif keyword == 'url':
+            element.url = self.argument(statement, 1)
+        elif keyword == 'properties':
+            element.properties = {**(element.properties or {}), **self.properties(statement)}
+        elif keyword == 'perspectives':
+            element.perspectives = (element.perspectives or []) + self.perspectives(statement)
+        elif keyword == 'group' and identifier is None and kind in ('SoftwareSystem', 'Container'):
+            group = _Context(
+                element=element,
+                kind=kind,
+                prefix=context.prefix,
+                group=self.group_name(context, self.argument(statement, 1), statement),
+            )
+            self.block(statement, group, self.element_statement)
+        elif element_keyword == 'container' and kind == 'SoftwareSystem':
+            self.element(statement, context, identifier, tokens, 'Container')
+        elif element_keyword == 'component' and kind == 'Container':
+            self.element(statement, context, identifier, tokens, 'Component')
+        elif element_keyword == 'deploymentnode' and kind == 'DeploymentNode':
+            self.element(statement, context, identifier, tokens, 'DeploymentNode')
+        elif element_keyword == 'infrastructurenode' and kind == 'DeploymentNode':
+            self.element(statement, context, identifier, tokens, 'InfrastructureNode')
+        elif element_keyword in ('softwaresysteminstance', 'containerinstance') and kind == 'DeploymentNode':
+            self.instance(statement, context, identifier, tokens)
+        elif keyword == 'instances' and kind == 'DeploymentNode':
+            element.instances = self.argument(statement, 1)
+        elif keyword == 'healthcheck' and kind in ('SoftwareSystemInstance', 'ContainerInstance'):
+            arguments = statement.tokens[1:]
+            if len(arguments) < 2:
+                raise statement.error("Expected: healthCheck <name> <url> [interval] [timeout]")
+            element.healthChecks = (element.healthChecks or []) + [HttpHealthCheck(
+                name=arguments[0],
+                url=arguments[1],
+                interval=_number(arguments[2], statement) if len(arguments) > 2 else 60,
+                timeout=_number(arguments[3], statement) if len(arguments) > 3 else 0,
+            )]
+        else:
+            raise statement.error(f"Unexpected {statement.tokens[0]!r} in {kind}")
+
+    # Deployment.
+
+    def deployment_statement(self, statement: _Statement, context: _Context) -> None:
+        identifier, tokens = self.assignment(statement)
+        element_keyword = tokens[0].lower() if tokens else ''
+        if '->' in tokens:
+            self.relationship(statement, context, identifier, tokens)
+        elif element_keyword == 'deploymentnode':
+            self.element(statement, context, identifier, tokens, 'DeploymentNode')
+        elif element_keyword == 'deploymentgroup':
+            self.register(identifier, self.argument(statement, len(statement.tokens) - len(tokens) + 1), context, statement)
+        elif statement.keyword == 'group' and identifier is None:
+            # Groups of deployment nodes are drawn by Structurizr only; the
+            # nodes are added to the environment.
+            self.block(statement, context, self.deployment_statement)
+        else:
+            raise statement.error(f"Unexpected {statement.tokens[0]!r} in deploymentEnvironment")
+
+    def instance(self, statement: _Statement, context: _Context, identifier: Optional[str], tokens: List[str]) -> None:
+        kind = _TYPE_NAMES[tokens[0].lower()]
+        if len(tokens) < 2:
+            raise statement.error(f"Expected an identifier after {tokens[0]!r}")
+        instantiated = self.lookup_element(tokens[1], statement, context)
+        expected = 'SoftwareSystem' if kind == 'SoftwareSystemInstance' else 'Container'
+        if self.kinds.get(instantiated.id) != expected:
+            raise statement.error(f"{tokens[1]!r} is not a {expected}")
+
+        deployment_groups = ['Default']
+        if len(tokens) > 2 and tokens[2]:
+            names = [self.lookup(name, statement, context) for name in _split_tags([tokens[2]])]
+            deployment_groups = [str(name) for name in names]
+        extra_tags = [t for t in _split_tags(tokens[3:4]) if t not in _DEFAULT_TAGS[kind]]
+
+        node = context.element
+        environment = context.environment or ''
+        count_key = (environment, node.id, instantiated.id)
+        self.instance_counts[count_key] = self.instance_counts.get(count_key, 0) + 1
+
+        common: Dict[str, Any] = {
+            'id': self.generate_id(),
+            'instanceId': self.instance_counts[count_key],
+            'environment': context.environment,
+            'tags': ','.join(_DEFAULT_TAGS[kind] + extra_tags),
+            'relationships': [],
+            'deploymentGroups': deployment_groups,
+        }
+        element: Any
+        if kind == 'SoftwareSystemInstance':
+            element = SoftwareSystemInstance(**common, softwareSystemId=instantiated.id)
+            node.softwareSystemInstances.append(element)
+        else:
+            element = ContainerInstance(**common, containerId=instantiated.id)
+            node.containerInstances.append(element)
+
+        self.add_element(element, kind, node, context)
+        self.register(identifier, element, context, statement)
+        self.block(statement, self.element_context(element, context), self.element_statement)
+
+    # Relationships.
+
+    def relationship(self, statement: _Statement, context: _Context, identifier: Optional[str], tokens: List[str]) -> Relationship:
+
+        """Creates a relationship: `[identifier =] [source] -> destination [description] [technology] [tags]`."""
+
+        arrow = tokens.index('->')
+        if arrow == 0:
+            if context.element is None:
+                raise statement.error("A relationship needs a source outside of an element")
+            source = context.element
+        elif arrow == 1:
+            source = self.lookup_element(tokens[0], statement, context)
+        else:
+            raise statement.error("Expected: <source> -> <destination>")
+        arguments = tokens[arrow + 1:]
+        if not arguments:
+            raise statement.error("Expected a destination after '->'")
+        destination = self.lookup_element(arguments[0], statement, context)
+        if len(arguments) > 4:
+            raise statement.error("Too many arguments for the relationship")
+
+        relationship = self.add_relationship(
+            source,
+            destination,
+            description=arguments[1] if len(arguments) > 1 else '',
+            technology=arguments[2] if len(arguments) > 2 else '',
+            tags=_split_tags(arguments[3:4]),
+        )
+        self.register(identifier, relationship, context, statement)
+        self.block(statement, _Context(element=relationship, kind='Relationship', prefix=context.prefix), self.relationship_statement)
+        return relationship
+
+    def add_relationship(
+        self,
+        source: Any,
+        destination: Any,
+        description: Optional[str]='',
+        technology: Optional[str]='',
+        tags: Optional[List[str]]=None,
+        linked_relationship_id: Optional[str]=None,
+    ) -> Relationship:
+        relationship = Relationship(
+            id=self.generate_id(),
+            description=description,
+            technology=technology,
+            tags=','.join(['Relationship'] + [tag for tag in tags or [] if tag != 'Relationship']),
+            sourceId=source.id,
+            destinationId=destination.id,
+            linkedRelationshipId=linked_relationship_id,
+        )
+        source.relationships = source.relationships if source.relationships is not None else []
+        source.relationships.append(relationship)
+        self.relationships.append(relationship)
+        return relationship
+
+    def relationship_statement(self, statement: _Statement, context: _Context) -> None:
+        relationship = context.element
+        keyword = statement.keyword
+        if keyword == 'description':
+            relationship.description = self.argument(statement, 1)
+        elif keyword == 'technology':
+            relationship.technology = self.argument(statement, 1)
+        elif keyword in ('tags', 'tag'):
+            existing = _split_tags([relationship.tags or ''])
+            relationship.tags = ','.join(existing + [t for t in _split_tags(statement.tokens[1:]) if t not in existing])
+        elif keyword == 'url':
+            relationship.url = self.argument(statement, 1)
+        elif keyword == 'properties':
+            relationship.properties = {**(relationship.properties or {}), **self.properties(statement)}
+        elif keyword == 'perspectives':
+            relationship.perspectives = (relationship.perspectives or []) + self.perspectives(statement)
+        else:
+            raise statement.error(f"Unexpected {statement.tokens[0]!r} in relationship")
+
+    def ancestors(self, element_id: str) -> List[str]:
+        """The IDs of the element and its ancestors, from the element outwards."""
+        result = [element_id]
+        parent = self.parents.get(element_id)
+        while parent is not None:
+            result.append(parent)
+            parent = self.parents.get(parent)
+        return result
+
+    def finish_model(self) -> None:
+
+        """
+        Adds the relationships Structurizr implies from the ones of the model:
+        between the ancestors of the elements of each relationship, unless a
+        relationship already connects them, and between the instances of the
+        related software systems and containers in each deployment
+        environment.
+        """
+
+        connected: Set[Tuple[str, str]] = {
+            (r.sourceId or '', r.destinationId or '') for r in self.relationships
+        }
+        explicit = [r for r in self.relationships if r.linkedRelationshipId is None]
+
+        if self.implied_relationships:
+            for relationship in explicit:
+                source_ids = self.ancestors(relationship.sourceId or '')
+                destination_ids = self.ancestors(relationship.destinationId or '')
+                for source_id in source_ids:
+                    for destination_id in destination_ids:
+                        if source_id in destination_ids or destination_id in source_ids:
+                            continue
+                        if (source_id, destination_id) in connected:
+                            continue
+                        if self.kinds.get(source_id) in ('DeploymentNode',) or self.kinds.get(destination_id) in ('DeploymentNode',):
+                            continue
+                        connected.add((source_id, destination_id))
+                        self.add_relationship(
+                            self.elements[source_id],
+                            self.elements[destination_id],
+                            description=relationship.description,
+                            technology=relationship.technology,
+                            linked_relationship_id=relationship.id,
+                        )
+
+        # The instances of each element, by deployment environment.
+        instances: Dict[Tuple[str, str], List[Any]] = {}
+        for element_id, kind in self.kinds.items():
+            if kind in ('SoftwareSystemInstance', 'ContainerInstance'):
+                element = self.elements[element_id]
+                instantiated = element.softwareSystemId if kind == 'SoftwareSystemInstance' else element.containerId
+                instances.setdefault((element.environment or '', instantiated), []).append(element)
+
+        for relationship in explicit:
+            for (environment, instantiated), sources in list(instances.items()):
+                if instantiated != relationship.sourceId:
+                    continue
+                for source in sources:
+                    for destination in instances.get((environment, relationship.destinationId or ''), []):
+                        if not set(source.deploymentGroups or []) & set(destination.deploymentGroups or []):
+                            continue
+                        self.add_relationship(
+                            source,
+                            destination,
+                            description=relationship.description,
+                            technology=relationship.technology,
+                            linked_relationship_id=relationship.id,
+                        )
+
+    # Views.
+
+    def views_statement(self, statement: _Statement, context: _Context) -> None:
+        keyword = statement.keyword
+        views = self.workspace.views
+        assert views is not None and views.configuration is not None and views.configuration.styles is not None
+        configuration = views.configuration
+
+        if keyword in ('systemlandscape', 'systemcontext', 'container', 'component', 'dynamic', 'deployment', 'custom'):
+            self.view(statement, keyword)
+        elif keyword == 'filtered':
+            arguments = statement.tokens[1:]
+            if len(arguments) < 3:
+                raise statement.error("Expected: filtered <baseKey> <include|exclude> <tags> [key] [description]")
+            view = FilteredView(
+                baseViewKey=arguments[0],
+                mode=_enum(Mode, arguments[1], statement),
+                tags=_split_tags([arguments[2]]),
+                key=arguments[3] if len(arguments) > 3 else self.view_key('Filtered'),
+                description=arguments[4] if len(arguments) > 4 else '',
+            )
+            self.block(statement, context, lambda child, _: self.view_property(child, view))
+            views.filteredViews = (views.filteredViews or []) + [view]
+        elif keyword == 'styles':
+            self.block(statement, context, self.styles_statement)
+        elif keyword in ('theme', 'themes'):
+            configuration.themes = (configuration.themes or []) + statement.tokens[1:]
+        elif keyword == 'branding':
+            branding = configuration.branding or Branding()
+            for child in statement.children or []:
+                child = self.substitute(child)
+                if child.keyword == 'logo':
+                    branding.logo = self.argument(child, 1)
+                elif child.keyword == 'font':
+                    branding.font = Font(name=self.argument(child, 1), url=child.tokens[2] if len(child.tokens) > 2 else None)
+                else:
+                    raise child.error(f"Unexpected {child.tokens[0]!r} in branding")
+            configuration.branding = branding
+        elif keyword == 'terminology':
+            terminology = configuration.terminology or Terminology()
+            names = {f.lower(): f for f in vars(Terminology()).keys()}
+            for child in statement.children or []:
+                child = self.substitute(child)
+                if child.keyword not in names:
+                    raise child.error(f"Unexpected {child.tokens[0]!r} in terminology")
+                setattr(terminology, names[child.keyword], self.argument(child, 1))
+            configuration.terminology = terminology
+        elif keyword == 'properties':
+            configuration.properties = {**(configuration.properties or {}), **self.properties(statement)}
+        else:
+            raise statement.error(f"Unexpected {statement.tokens[0]!r} in views")
+
+    def view_key(self, kind: str) -> str:
+        """Generates a key for a view without one, like Structurizr does."""
+        self.view_keys[kind] = self.view_keys.get(kind, 0) + 1
+        return f"{kind}-{self.view_keys[kind]:03d}"
+
+    def view(self, statement: _Statement, keyword: str) -> None:
+
+        """Creates a view, and computes its elements and relationships."""
+
+        views = self.workspace.views
+        assert views is not None
+        arguments = statement.tokens[1:]
+
+        def scope(index: int, allow_any: bool=False) -> Optional[Any]:
+            if len(arguments) <= index:
+                raise statement.error(f"Expected the scope of the {statement.tokens[0]} view")
+            if allow_any and arguments[index] == '*':
+                return None
+            return self.lookup_element(arguments[index], statement)
+
+        def key_and_description(index: int, kind: str) -> Dict[str, Any]:
+            return {
+                'key': arguments[index] if len(arguments) > index else self.view_key(kind),
+                'description': arguments[index + 1] if len(arguments) > index + 1 else '',
+            }
+
+        model: Any
+        if keyword == 'systemlandscape':
+            model = SystemLandscapeView(**key_and_description(0, 'SystemLandscape'), enterpriseBoundaryVisible=True)
+            views.systemLandscapeViews = (views.systemLandscapeViews or []) + [model]
+            kind = 'SystemLandscape'
+        elif keyword == 'systemcontext':
+            software_system = scope(0)
+            model = SystemContextView(**key_and_description(1, 'SystemContext'), softwareSystemId=software_system.id, enterpriseBoundaryVisible=True)
+            views.systemContextViews = (views.systemContextViews or []) + [model]
+            kind = 'SystemContext'
+        elif keyword == 'container':
+            software_system = scope(0)
+            model = ContainerView(**key_and_description(1, 'Container'), softwareSystemId=software_system.id, externalSoftwareSystemBoundariesVisible=False)
+            views.containerViews = (views.containerViews or []) + [model]
+            kind = 'Container'
+        elif keyword == 'component':
+            container = scope(0)
+            model = ComponentView(**key_and_description(1, 'Component'), containerId=container.id, externalContainerBoundariesVisible=False)
+            views.componentViews = (views.componentViews or []) + [model]
+            kind = 'Component'
+        elif keyword == 'dynamic':
+            element = scope(0, allow_any=True)
+            model = DynamicView(**key_and_description(1, 'Dynamic'), elementId=element.id if element else None, externalBoundariesVisible=False)
+            views.dynamicViews = (views.dynamicViews or []) + [model]
+            kind = 'Dynamic'
+        elif keyword == 'deployment':
+            software_system = scope(0, allow_any=True)
+            if len(arguments) < 2:
+                raise statement.error("Expected: deployment <*|software system> <environment> [key] [description]")
+            environment = self.identifiers.get(arguments[1].lower(), arguments[1])
+            model = DeploymentView(
+                **key_and_description(2, 'Deployment'),
+                softwareSystemId=software_system.id if software_system else None,
+                environment=str(environment),
+            )
+            views.deploymentViews = (views.deploymentViews or []) + [model]
+            kind = 'Deployment'
+        else:
+            model = CustomView(
+                key=arguments[0] if arguments else self.view_key('Custom'),
+                title=arguments[1] if len(arguments) > 1 else None,
+                description=arguments[2] if len(arguments) > 2 else '',
+            )
+            views.customViews = (views.customViews or []) + [model]
+            kind = 'Custom'
+
+        state = _ViewState(kind=kind, model=model, statement=statement)
+        self.block(statement, _Context(), lambda child, _: self.view_statement(child, state))
+        with span('DslLoader.view', key=model.key):
+            self.finish_view(state)
+
+    def view_property(self, statement: _Statement, view: Any) -> None:
+        """Runs the statements common to all the views."""
+        keyword = statement.keyword
+        if keyword == 'title':
+            view.title = self.argument(statement, 1)
+        elif keyword == 'description':
+            view.description = self.argument(statement, 1)
+        elif keyword == 'properties':
+            view.properties = {**(view.properties or {}), **self.properties(statement)}
+        elif keyword == 'default':
+            views = self.workspace.views
+            assert views is not None and views.configuration is not None
+            views.configuration.defaultView = view.key
+        elif keyword in _IGNORED:
+            pass
+        else:
+            raise statement.error(f"Unexpected {statement.tokens[0]!r} in view")
+
+    def view_statement(self, statement: _Statement, state: _ViewState) -> None:
+        keyword = statement.keyword
+        model = state.model
+        if keyword in ('include', 'exclude'):
+            if state.kind == 'Dynamic':
+                raise statement.error(f"{statement.tokens[0]!r} isn't supported in dynamic views")
+            for expression in self.expressions(statement.tokens[1:]):
+                is_relationship = '->' in _strip_arrows(expression)[1]
+                if keyword == 'include':
+                    (state.relationship_includes if is_relationship else state.includes).append(expression)
+                else:
+                    (state.relationship_excludes if is_relationship else state.excludes).add(expression)
+        elif keyword == 'autolayout':
+            arguments = statement.tokens[1:]
+            model.automaticLayout = AutomaticLayout(
+                implementation=Implementation.Graphviz,
+                rankDirection=_RANK_DIRECTIONS.get(arguments[0].lower(), RankDirection.TopBottom) if arguments else RankDirection.TopBottom,
+                rankSeparation=_number(arguments[1], statement) if len(arguments) > 1 else 300,
+                nodeSeparation=_number(arguments[2], statement) if len(arguments) > 2 else 300,
+                edgeSeparation=0,
+                vertices=False,
+            )
+        elif state.kind == 'Dynamic' and ('->' in statement.tokens or statement.children is not None and not statement.tokens):
+            self.dynamic_step(statement, state)
+        elif state.kind == 'Dynamic' and len(statement.tokens) <= 2 and statement.keyword not in ('title', 'description', 'default', 'properties'):
+            # A step referring to a relationship by its identifier.
+            self.dynamic_step(statement, state)
+        else:
+            self.view_property(statement, model)
+
+    @staticmethod
+    def expressions(tokens: List[str]) -> List[str]:
+        """Joins `a -> b` into one expression."""
+        result: List[str] = []
+        index = 0
+        while index < len(tokens):
+            if index + 2 < len(tokens) and tokens[index + 1] == '->':
+                result.append(f"{tokens[index]}->{tokens[index + 2]}")
+                index += 3
+            else:
+                result.append(tokens[index].replace(' ', ''))
+                index += 1
+        return result
+
+    def dynamic_step(self, statement: _Statement, state: _ViewState) -> None:
+        if not statement.tokens and statement.children is not None:
+            # A parallel sequence: its steps are numbered like the others.
+            self.run(statement.children, _Context(), lambda child, _: self.dynamic_step(child, state))
+            return
+        identifier, tokens = self.assignment(statement)
+        if '->' not in tokens:
+            target = self.lookup(tokens[0], statement)
+            if not isinstance(target, Relationship):
+                raise statement.error(f"{tokens[0]!r} is not a relationship")
+            description = tokens[1] if len(tokens) > 1 else None
+            state.steps.append((target.id or '', description))
+            return
+
+        arrow = tokens.index('->')
+        if arrow != 1 or len(tokens) < 3:
+            raise statement.error("Expected: <source> -> <destination> [description] [technology]")
+        source = self.lookup_element(tokens[0], statement)
+        destination = self.lookup_element(tokens[2], statement)
+        description = tokens[3] if len(tokens) > 3 else None
+        technology = tokens[4] if len(tokens) > 4 else None
+
+        candidates = [
+            r for r in source.relationships or []
+            if r.destinationId == destination.id and (not technology or r.technology == technology)
+        ]
+        response = False
+        if not candidates:
+            # A response to a relationship in the other direction.
+            candidates = [r for r in destination.relationships or [] if r.destinationId == source.id]
+            response = bool(candidates)
+        if not candidates:
+            raise statement.error(f"A relationship between {tokens[0]!r} and {tokens[2]!r} doesn't exist")
+        chosen = next((r for r in candidates if description and r.description == description), candidates[0])
+        state.steps.append((chosen.id or '', description if description != chosen.description else None))
+        if response:
+            state.steps[-1] = (state.steps[-1][0], description or chosen.description)
+            state.relationship_excludes.add(f"response:{len(state.steps)}")
+        self.register(identifier, chosen, _Context(), statement)
+
+    def default_elements(self, state: _ViewState) -> List[str]:
+
+        """The elements included by `include *`, for each type of view."""
+
+        model = state.model
+        kind = state.kind
+        people_and_systems = [
+            element_id for element_id, element_kind in self.kinds.items()
+            if element_kind in ('Person', 'SoftwareSystem')
+        ]
+        if kind == 'SystemLandscape':
+            return people_and_systems
+        if kind == 'Custom':
+            return [element_id for element_id, element_kind in self.kinds.items() if element_kind == 'CustomElement']
+        if kind == 'Deployment':
+            result: List[str] = []
+            software_system_id = model.softwareSystemId
+            for element_id, element_kind in self.kinds.items():
+                if self.environments.get(element_id) != model.environment:
+                    continue
+                element = self.elements[element_id]
+                if element_kind == 'SoftwareSystemInstance':
+                    include = software_system_id in (None, element.softwareSystemId)
+                elif element_kind == 'ContainerInstance':
+                    include = software_system_id in (None, self.parents.get(element.containerId))
+                elif element_kind == 'InfrastructureNode':
+                    include = True
+                else:
+                    continue
+                if include:
+                    for ancestor in reversed(self.ancestors(element_id)):
+                        if ancestor not in result:
+                            result.append(ancestor)
+            return result
+
+        if kind == 'SystemContext':
+            scope_id = model.softwareSystemId
+            inner = [scope_id]
+            neighbour_kinds: Tuple[str, ...] = ('Person', 'SoftwareSystem')
+        elif kind == 'Container':
+            scope_id = model.softwareSystemId
+            inner = [element_id for element_id, parent in self.parents.items() if parent == scope_id and self.kinds[element_id] == 'Container']
+            neighbour_kinds = ('Person', 'SoftwareSystem', 'Container')
+        elif kind == 'Component':
+            scope_id = model.containerId
+            inner = [element_id for element_id, parent in self.parents.items() if parent == scope_id and self.kinds[element_id] == 'Component']
+            neighbour_kinds = ('Person', 'SoftwareSystem', 'Container', 'Component')
+        else:
+            return []
+
+        inner_set = set(inner)
+        result = list(inner)
+        for relationship in self.relationships:
+            for near, far in ((relationship.sourceId, relationship.destinationId), (relationship.destinationId, relationship.sourceId)):
+                if near in inner_set and far not in result and self.kinds.get(far or '') in neighbour_kinds:
+                    result.append(far or '')
+        return result
+
+    def element_expression(self, expression: str, state: _ViewState) -> List[str]:
+        """Evaluates an element expression of an `include`/`exclude` statement."""
+        statement = state.statement
+        if expression in ('*', '*?'):
+            return self.default_elements(state)
+        match = re.fullmatch(r'element\.(tag|type|parent)(==|!=)(.+)', expression, re.IGNORECASE)
+        if match:
+            attribute, operator, values = match.group(1).lower(), match.group(2), _split_tags([match.group(3)])
+
+            def test(element_id: str) -> bool:
+                if attribute == 'tag':
+                    tags = set(_split_tags([self.elements[element_id].tags or '']))
+                    return any(value in tags for value in values)
+                if attribute == 'type':
+                    return self.kinds[element_id].lower() in {_TYPE_NAMES.get(v.lower(), v).lower() for v in values}
+                parents = {self.lookup_element(value, statement).id for value in values}
+                return self.parents.get(element_id) in parents
+
+            return [element_id for element_id in self.elements if test(element_id) == (operator == '==')]
+
+        incoming, identifier, outgoing = _strip_arrows(expression)
+        if incoming or outgoing:
+            # `->x`, `x->` and `->x->`: the element, with the elements it's
+            # related to in those directions.
+            element = self.lookup_element(identifier, statement)
+            result = [element.id]
+            for relationship in self.relationships:
+                if incoming and relationship.destinationId == element.id:
+                    result.append(relationship.sourceId or '')
+                if outgoing and relationship.sourceId == element.id:
+                    result.append(relationship.destinationId or '')
+            return result
+
+        target = self.lookup(expression, statement)
+        if isinstance(target, Relationship):
+            return [target.sourceId or '', target.destinationId or '']
+        if isinstance(target, str):
+            raise statement.error(f"{expression!r} is not an element")
+        return [target.id]
+
+    def relationship_expression(self, expression: str, state: _ViewState) -> Set[str]:
+        """Evaluates a relationship expression of an `include`/`exclude` statement."""
+        statement = state.statement
+        if expression.startswith('response:'):
+            return set()
+        match = re.fullmatch(r'relationship\.tag(==|!=)(.+)', expression, re.IGNORECASE)
+        if match:
+            values = set(_split_tags([match.group(2)]))
+            return {
+                r.id or '' for r in self.relationships
+                if bool(values & set(_split_tags([r.tags or '']))) == (match.group(1) == '==')
+            }
+        if expression.lower() == 'relationship==*':
+            expression = '*->*'
+        if expression.lower().startswith('relationship=='):
+            expression = expression[len('relationship=='):]
+
+        source, _, destination = expression.partition('->')
+        source_ids = None if source == '*' else {self.lookup_element(source, statement).id}
+        destination_ids = None if destination == '*' else {self.lookup_element(destination, statement).id}
+        return {
+            r.id or '' for r in self.relationships
+            if (source_ids is None or r.sourceId in source_ids)
+            and (destination_ids is None or r.destinationId in destination_ids)
+        }
+
+    def finish_view(self, state: _ViewState) -> None:
+
+        """Sets the element and relationship views of a view."""
+
+        model = state.model
+        if state.kind == 'Dynamic':
+            element_ids: List[str] = []
+            relationship_views: List[RelationshipView] = []
+            relationships = {r.id: r for r in self.relationships}
+            for order, (relationship_id, description) in enumerate(state.steps, start=1):
+                relationship = relationships[relationship_id]
+                response = f"response:{order}" in state.relationship_excludes
+                relationship_views.append(RelationshipView(
+                    id=relationship_id,
+                    description=description,
+                    order=str(order),
+                    response=True if response else None,
+                ))
+                for element_id in (relationship.sourceId, relationship.destinationId):
+                    if element_id and element_id not in element_ids:
+                        element_ids.append(element_id)
+            model.elements = [ElementView(id=element_id) for element_id in element_ids]
+            model.relationships = relationship_views
+            return
+
+        included: List[str] = []
+        seen: Set[str] = set()
+        for expression in state.includes:
+            for element_id in self.element_expression(expression, state):
+                if element_id not in seen:
+                    seen.add(element_id)
+                    included.append(element_id)
+
+        included_relationships: Set[str] = set()
+        for expression in state.relationship_includes:
+            for relationship_id in self.relationship_expression(expression, state):
+                included_relationships.add(relationship_id)
+        relationships_by_id = {r.id: r for r in self.relationships}
+        for relationship_id in sorted(included_relationships, key=int):
+            relationship = relationships_by_id[relationship_id]
+            for element_id in (relationship.sourceId or '', relationship.destinationId or ''):
+                if element_id not in seen:
+                    seen.add(element_id)
+                    included.append(element_id)
+
+        excluded: Set[str] = set()
+        for expression in state.excludes:
+            excluded.update(self.element_expression(expression, state))
+        excluded_relationships: Set[str] = set()
+        for expression in state.relationship_excludes:
+            excluded_relationships.update(self.relationship_expression(expression, state))
+
+        # The scope of a container or component view is drawn as a boundary,
+        # not as an element.
+        boundary_id = model.softwareSystemId if state.kind == 'Container' else model.containerId if state.kind == 'Component' else None
+        element_ids = [element_id for element_id in included if element_id not in excluded and element_id != boundary_id]
+        in_view = set(element_ids)
+
+        model.elements = [ElementView(id=element_id) for element_id in element_ids]
+        model.relationships = [
+            RelationshipView(id=r.id)
+            for r in self.relationships
+            if r.sourceId in in_view and r.destinationId in in_view and r.id not in excluded_relationships
+        ]
+
+    # Styles.
+
+    def styles_statement(self, statement: _Statement, context: _Context) -> None:
+        keyword = statement.keyword
+        views = self.workspace.views
+        assert views is not None and views.configuration is not None and views.configuration.styles is not None
+        styles = views.configuration.styles
+        if keyword in ('light', 'dark'):
+            self.block(statement, context, self.styles_statement)
+        elif keyword == 'element':
+            style = ElementStyle(tag=self.argument(statement, 1))
+            for child in statement.children or []:
+                self.element_style(self.substitute(child), style)
+            styles.elements = (styles.elements or []) + [style]
+        elif keyword == 'relationship':
+            relationship_style = RelationshipStyle(tag=self.argument(statement, 1))
+            for child in statement.children or []:
+                self.relationship_style(self.substitute(child), relationship_style)
+            styles.relationships = (styles.relationships or []) + [relationship_style]
+        else:
+            raise statement.error(f"Unexpected {statement.tokens[0]!r} in styles")
+
+    def element_style(self, statement: _Statement, style: ElementStyle) -> None:
+        keyword = statement.keyword
+        value = self.argument(statement, 1) if keyword != 'properties' else ''
+        if keyword == 'shape':
+            style.shape = _enum(Shape, value, statement)
+        elif keyword == 'border':
+            style.border = _enum(Border, value, statement)
+        elif keyword in ('background', 'stroke'):
+            setattr(style, keyword, _color(value))
+        elif keyword in ('color', 'colour'):
+            style.color = _color(value)
+        elif keyword in ('width', 'height', 'strokewidth', 'fontsize', 'opacity'):
+            setattr(style, {'strokewidth': 'strokeWidth', 'fontsize': 'fontSize'}.get(keyword, keyword), _number(value, statement))
+        elif keyword in ('metadata', 'description'):
+            setattr(style, keyword, _boolean(value))
+        elif keyword == 'icon':
+            style.icon = value
+        elif keyword == 'properties':
+            pass
+        else:
+            raise statement.error(f"Unexpected {statement.tokens[0]!r} in element style")
+
+    def relationship_style(self, statement: _Statement, style: RelationshipStyle) -> None:
+        keyword = statement.keyword
+        value = self.argument(statement, 1) if keyword != 'properties' else ''
+        if keyword in ('color', 'colour'):
+            style.color = _color(value)
+        elif keyword in ('thickness', 'fontsize', 'width', 'position', 'opacity'):
+            setattr(style, 'fontSize' if keyword == 'fontsize' else keyword, _number(value, statement))
+        elif keyword == 'dashed':
+            style.dashed = _boolean(value)
+        elif keyword == 'style':
+            style.dashed = value.lower() != 'solid'
+        elif keyword == 'routing':
+            style.routing = _enum(Routing1, value, statement)
+        elif keyword == 'properties':
+            pass
+        else:
+            raise statement.error(f"Unexpected {statement.tokens[0]!r} in relationship style")
+
+    # Configuration.
+
+    def configuration_statement(self, statement: _Statement, context: _Context) -> None:
+        if statement.keyword == 'scope':
+            value = self.argument(statement, 1).lower()
+            scope = None if value == 'none' else _enum(Scope, value, statement)
+            self.workspace.configuration = WorkspaceConfiguration(scope=scope)
+        elif statement.keyword == 'properties':
+            self.workspace.properties = {**(self.workspace.properties or {}), **self.properties(statement)}
+        else:
+            raise statement.error(f"Unexpected {statement.tokens[0]!r} in configuration")
+
+    def finish(self) -> Workspace:
+        return self.workspace
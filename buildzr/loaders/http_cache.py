@@ -0,0 +1,188 @@
+"""
+A local cache for the workspaces downloaded by the loaders, like the ones of
+`Workspace(extend='https://...')`.
+
+Each download is stored with its `ETag` and `Last-Modified` headers, and is
+revalidated with a conditional request the next time it's needed: if the
+server answers `304 Not Modified`, the cached copy is used without
+downloading it again. Responses may be gzip-compressed.
+
+When the server can't be reached, the cached copy is used (with a warning).
+In offline mode, cached copies are used without contacting the server at all.
+
+The cache is configured with environment variables:
+    - `BUILDZR_HTTP_CACHE`: The cache directory. Defaults to
+      `$XDG_CACHE_HOME/buildzr/http` (`~/.cache/buildzr/http`). Set it to an
+      empty string to disable the cache.
+    - `BUILDZR_OFFLINE`: Set it to `1` to use the cached copies without
+      revalidating them.
+
+Example:
+    >>> from buildzr.loaders import HttpCache, JsonLoader
+    >>> loader = JsonLoader(http_cache=HttpCache('.cache', offline=True))
+    >>> workspace = loader.load('https://example.com/workspace.json')
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import urllib.error
+import urllib.request
+import warnings
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from buildzr.profiling import span
+
+DIRECTORY_ENVIRONMENT_VARIABLE = 'BUILDZR_HTTP_CACHE'
+OFFLINE_ENVIRONMENT_VARIABLE = 'BUILDZR_OFFLINE'
+
+DEFAULT_TIMEOUT = 30.0
+
+
+@dataclass
+class _Entry:
+    """A cached response: its metadata, and where its body is stored."""
+
+    url: str
+    path: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class HttpCache:
+    """
+    Downloads URLs, keeping a copy of each response in a local directory to
+    send conditional requests for it later.
+
+    Args:
+        directory: The cache directory. If `None`, the responses aren't
+            cached, and URLs are always downloaded.
+        timeout: The timeout of each request, in seconds.
+        offline: Whether to use the cached copies without contacting the
+            server. URLs that aren't cached can't be loaded in offline mode.
+    """
+
+    def __init__(self, directory: Optional[str], timeout: float=DEFAULT_TIMEOUT, offline: bool=False) -> None:
+        self.directory = directory
+        self.timeout = timeout
+        self.offline = offline
+
+    @classmethod
+    def from_environment(cls) -> 'HttpCache':
+        """
+        Creates the cache configured by the `BUILDZR_HTTP_CACHE` and
+        `BUILDZR_OFFLINE` environment variables.
+        """
+        directory = os.environ.get(DIRECTORY_ENVIRONMENT_VARIABLE)
+        if directory is None:
+            cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+            directory = os.path.join(cache_home, 'buildzr', 'http')
+        offline = os.environ.get(OFFLINE_ENVIRONMENT_VARIABLE, '').lower() in ('1', 'true', 'yes')
+        return cls(directory or None, offline=offline)
+
+    def fetch(self, url: str) -> bytes:
+        """
+        Returns the body of the response to a GET request to `url`, from the
+        cache if the server says it hasn't changed.
+
+        Raises:
+            urllib.error.URLError: If the URL can't be downloaded, and it isn't
+                cached.
+            OSError: If the request times out, and the URL isn't cached.
+        """
+
+        entry = self._entry(url)
+        if entry is not None and self.offline:
+            return self._read(entry)
+        if self.offline:
+            raise urllib.error.URLError(f"{url} isn't cached, and buildzr is offline ({OFFLINE_ENVIRONMENT_VARIABLE} is set)")
+
+        headers = {'Accept-Encoding': 'gzip'}
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+
+        with span('HttpCache.fetch', url=url, conditional=entry is not None):
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=self.timeout) as response:
+                    body: bytes = response.read()
+                    if response.headers.get('Content-Encoding', '').lower() == 'gzip':
+                        body = gzip.decompress(body)
+                    etag = response.headers.get('ETag')
+                    last_modified = response.headers.get('Last-Modified')
+            except urllib.error.HTTPError as e:
+                if e.code == 304 and entry is not None:
+                    return self._read(entry)
+                if e.code < 500 or entry is None:
+                    raise
+                warnings.warn(f"Couldn't download {url} ({e}), using the cached copy", stacklevel=2)
+                return self._read(entry)
+            except OSError as e:
+                # Connection errors and timeouts: the cached copy is better
+                # than nothing.
+                if entry is None:
+                    raise
+                warnings.warn(f"Couldn't download {url} ({e}), using the cached copy", stacklevel=2)
+                return self._read(entry)
+
+        if self.directory is not None:
+            self._store(url, body, etag, last_modified)
+        return body
+
+    def _paths(self, url: str) -> Dict[str, str]:
+        assert self.directory is not None
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return {
+            'metadata': os.path.join(self.directory, f"{key}.json"),
+            'body': os.path.join(self.directory, f"{key}.body"),
+        }
+
+    def _entry(self, url: str) -> Optional[_Entry]:
+        """The cached response to `url`, if any."""
+        if self.directory is None:
+            return None
+        paths = self._paths(url)
+        try:
+            with open(paths['metadata'], 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if metadata.get('url') != url or not os.path.exists(paths['body']):
+            return None
+        return _Entry(url=url, path=paths['body'], etag=metadata.get('etag'), last_modified=metadata.get('last_modified'))
+
+    def _read(self, entry: _Entry) -> bytes:
+        with open(entry.path, 'rb') as f:
+            return f.read()
+
+    def _store(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]) -> None:
+
+        """
+        Stores a response. Responses without validators are stored too, so
+        they can be used when the server can't be reached.
+
+        The files are replaced atomically, so that concurrent builds sharing
+        the cache never read a partial response. The body is written first:
+        metadata always describes a complete body.
+        """
+
+        assert self.directory is not None
+        os.makedirs(self.directory, exist_ok=True)
+        paths = self._paths(url)
+        metadata = json.dumps({'url': url, 'etag': etag, 'last_modified': last_modified}).encode('utf-8')
+        for content, path in ((body, paths['body']), (metadata, paths['metadata'])):
+            fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content)
+                os.replace(temporary, path)
+            except BaseException:
+                if os.path.exists(temporary):
+                    os.unlink(temporary)
+                raise
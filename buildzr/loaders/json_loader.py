@@ -4,12 +4,17 @@ from __future__ import annotations
 
 import dataclasses
 import json
+import mmap
+import os
+import re
 import sys
-import urllib.request
+import warnings
 from enum import Enum
-from typing import Any, Dict, List, Optional, Type, TypeVar, Union, get_type_hints, get_origin, get_args
+from typing import Any, Collection, Dict, List, Optional, Type, TypeVar, Union, get_type_hints, get_origin, get_args
 
 import buildzr.models
+from buildzr.loaders.http_cache import HttpCache
+from buildzr.profiling import span, traced
 
 # Python 3.10+ uses types.UnionType for X | Y syntax
 if sys.version_info >= (3, 10):
@@ -20,6 +25,119 @@ else:
 
 T = TypeVar('T')
 
+SNAPSHOTS_ENVIRONMENT_VARIABLE = 'BUILDZR_SNAPSHOTS'
+
+# The tokens of the JSON scanner used to skip the sections that aren't
+# loaded.
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRUCTURE = re.compile(rb'["{}\[\]]')
+_SCALAR = re.compile(rb'[^,}\]\s]*')
+
+
+def _skip_whitespace(data: Any, position: int) -> int:
+    match = _WHITESPACE.match(data, position)
+    return match.end() if match else position
+
+
+def _skip_string(data: Any, position: int) -> int:
+    """
+    Returns the position after the JSON string starting at `position`.
+
+    The closing quote is found with `find`, so long strings (like the base64
+    images embedded in the documentation) are skipped at memory speed.
+    """
+    end = position + 1
+    while True:
+        end = data.find(b'"', end)
+        if end < 0:
+            raise ValueError(f"Unterminated string at {position}")
+        # The quote is escaped if it follows an odd number of backslashes.
+        backslashes = 0
+        while data[end - 1 - backslashes] == 0x5c:
+            backslashes += 1
+        end += 1
+        if backslashes % 2 == 0:
+            return end
+
+
+def _skip_value(data: Any, position: int) -> int:
+    """
+    Returns the position after the JSON value at `position`, without
+    decoding it.
+
+    Raises:
+        ValueError: If the value is truncated.
+    """
+    first = data[position:position + 1]
+    if first == b'"':
+        return _skip_string(data, position)
+    if first not in (b'{', b'['):
+        match = _SCALAR.match(data, position)
+        assert match is not None
+        return match.end()
+
+    depth = 0
+    while True:
+        match = _STRUCTURE.search(data, position)
+        if match is None:
+            raise ValueError(f"Unterminated object or array at {position}")
+        token = match.group()
+        if token == b'"':
+            position = _skip_string(data, match.start())
+            continue
+        position = match.end()
+        depth += 1 if token in (b'{', b'[') else -1
+        if depth == 0:
+            return position
+
+
+def _select_sections(data: Any, sections: Collection[str]) -> Dict[str, Any]:
+
+    """
+    Decodes the top-level members of a JSON object that are in `sections`,
+    or that are plain values (like the name of the workspace). The other
+    members are skipped by a tokenizer that doesn't build Python objects for
+    them.
+
+    Args:
+        data: The JSON document, as bytes or a memory map.
+        sections: The names of the object and array members to decode.
+
+    Returns:
+        The decoded members.
+
+    Raises:
+        ValueError: If the document isn't a JSON object.
+    """
+
+    result: Dict[str, Any] = {}
+    position = _skip_whitespace(data, 0)
+    if data[position:position + 1] != b'{':
+        raise ValueError("The workspace isn't a JSON object")
+    position = _skip_whitespace(data, position + 1)
+    if data[position:position + 1] == b'}':
+        return result
+
+    while True:
+        if data[position:position + 1] != b'"':
+            raise ValueError(f"Expected a member name at {position}")
+        key_end = _skip_string(data, position)
+        key = json.loads(data[position:key_end])
+        position = _skip_whitespace(data, key_end)
+        if data[position:position + 1] != b':':
+            raise ValueError(f"Expected ':' at {position}")
+        start = _skip_whitespace(data, position + 1)
+        end = _skip_value(data, start)
+        if key in sections or data[start:start + 1] not in (b'{', b'['):
+            result[key] = json.loads(data[start:end])
+        position = _skip_whitespace(data, end)
+        separator = data[position:position + 1]
+        if separator == b'}':
+            return result
+        if separator != b',':
+            raise ValueError(f"Expected ',' or '}}' at {position}")
+        position = _skip_whitespace(data, position + 1)
+
 
 class JsonLoader:
     """
@@ -27,19 +145,59 @@ class JsonLoader:
 
     Supports loading from:
     - Local file paths
-    - HTTP/HTTPS URLs
+    - HTTP/HTTPS URLs, through an `HttpCache`
+
+    Args:
+        http_cache: The cache of the downloaded workspaces. Defaults to the
+            one configured by the environment (see `HttpCache`).
+        snapshots: Whether to keep a binary snapshot of each local workspace
+            file next to it (see `buildzr.loaders.snapshot`), to load it
+            again without parsing its JSON while it doesn't change. Defaults
+            to the `BUILDZR_SNAPSHOTS` environment variable.
     """
 
-    def load(self, source: str) -> buildzr.models.Workspace:
+    def __init__(self, http_cache: Optional[HttpCache]=None, snapshots: Optional[bool]=None) -> None:
+        self._http_cache = http_cache
+        if snapshots is None:
+            snapshots = os.environ.get(SNAPSHOTS_ENVIRONMENT_VARIABLE, '').lower() in ('1', 'true', 'yes')
+        self._snapshots = snapshots
+
+    @traced()
+    def load(self, source: str, sections: Optional[Collection[str]]=None) -> buildzr.models.Workspace:
         """
         Load a workspace from a local file or URL.
 
         Args:
             source: Path to local file or URL (http:// or https://)
+            sections: The top-level sections of the workspace to load, like
+                `{'model'}` or `{'model', 'views'}`. The other sections
+                (for example the documentation, with its embedded images)
+                are skipped without being decoded, and are `None` in the
+                returned model. The name, description and other plain
+                values of the workspace are always loaded. By default, the
+                whole workspace is loaded.
 
         Returns:
             A deserialized Workspace model
+
+        Raises:
+            ValueError: If a section isn't a section of a workspace.
         """
+        if sections is not None:
+            fields = {field.name for field in dataclasses.fields(buildzr.models.Workspace)}
+            unknown = set(sections) - fields
+            if unknown:
+                raise ValueError(f"Unknown workspace sections: {', '.join(sorted(unknown))}")
+
+        if self._snapshots and not source.startswith(('http://', 'https://')):
+            return self._load_with_snapshot(source, sections)
+        return self._load_json(source, sections)
+
+    def _load_json(self, source: str, sections: Optional[Collection[str]]) -> buildzr.models.Workspace:
+        """Load a workspace from its JSON."""
+        if sections is not None:
+            return self._load_sections(source, sections)
+
         if source.startswith(('http://', 'https://')):
             data = self._fetch_url(source)
         else:
@@ -47,6 +205,57 @@ class JsonLoader:
 
         return self._deserialize(data, buildzr.models.Workspace)
 
+    def _load_with_snapshot(self, source: str, sections: Optional[Collection[str]]) -> buildzr.models.Workspace:
+
+        """
+        Load a workspace from the snapshot of its file, or from its JSON if
+        the file changed since the snapshot was made. The snapshot is then
+        made again, from the whole workspace.
+        """
+
+        from buildzr.loaders import snapshot
+
+        source_hash = snapshot.content_hash(source)
+        path = snapshot.snapshot_path(source)
+        workspace = snapshot.read_snapshot(path, source_hash, sections)
+        if workspace is not None:
+            return workspace
+
+        workspace = self._load_json(source, None)
+        try:
+            snapshot.write_snapshot(workspace, path, source_hash)
+        except OSError:
+            # The snapshot is only an optimization: read-only directories
+            # just go without.
+            pass
+        except TypeError as e:
+            # Values the format can't encode are a bug of the format, so the
+            # workspace is loaded without a snapshot, but not silently.
+            warnings.warn(f"Couldn't snapshot {source} ({e}), it will be loaded from its JSON again", stacklevel=2)
+
+        if sections is not None:
+            for field in dataclasses.fields(workspace):
+                value = getattr(workspace, field.name)
+                if field.name not in sections and (isinstance(value, (list, dict)) or dataclasses.is_dataclass(value)):
+                    setattr(workspace, field.name, None)
+        return workspace
+
+    def _load_sections(self, source: str, sections: Collection[str]) -> buildzr.models.Workspace:
+        """Load the given sections of a workspace from a local file or URL."""
+        with span('JsonLoader.select_sections', sections=','.join(sorted(sections))):
+            if source.startswith(('http://', 'https://')):
+                data = _select_sections(self._download(source), sections)
+            else:
+                with open(source, 'rb') as f:
+                    if f.seek(0, 2) == 0:
+                        raise ValueError(f"{source} is empty")
+                    # The file is mapped rather than read, so that the
+                    # skipped sections are never copied into memory.
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        data = _select_sections(mapped, sections)
+
+        return self._deserialize(data, buildzr.models.Workspace)
+
     def _read_file(self, path: str) -> Dict[str, Any]:
         """Read and parse JSON from a local file."""
         with open(path, 'r') as f:
@@ -54,8 +263,11 @@ class JsonLoader:
 
     def _fetch_url(self, url: str) -> Dict[str, Any]:
         """Fetch and parse JSON from a URL."""
-        with urllib.request.urlopen(url) as response:
-            return json.loads(response.read().decode('utf-8')) # type: ignore[no-any-return]
+        return json.loads(self._download(url).decode('utf-8')) # type: ignore[no-any-return]
+
+    def _download(self, url: str) -> bytes:
+        """Download a URL, or get it from the cache if it hasn't changed."""
+        return (self._http_cache or HttpCache.from_environment()).fetch(url)
 
     def _deserialize(self, data: Any, cls: Type[T]) -> T:
         """
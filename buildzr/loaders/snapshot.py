@@ -0,0 +1,346 @@
+"""
+A compact binary snapshot format for `buildzr.models.Workspace`, to reload
+the workspaces loaded by the `JsonLoader` without parsing and deserializing
+their JSON again.
+
+The encoding is derived from the dataclasses and enums of `buildzr.models`:
+a dataclass is written as its class number followed by the values of its
+fields, in order, so the field names aren't repeated for each object. The
+strings are interned in a table at the end of the file. A snapshot records
+the version of the format, a fingerprint of the models, and the SHA-256 of
+the source it was made from, and is ignored if any of them don't match.
+
+Snapshots are read with `mmap`, and only the top-level sections of the
+workspace (the model, the views, the documentation, ...) that are loaded are
+decoded. A loaded section is decoded eagerly, in full, into plain model
+objects; only the sections that aren't loaded are skipped, along with the
+strings that only they refer to.
+
+Layout (little-endian):
+    - Header: magic, format version (u16), models fingerprint (16 bytes),
+      source SHA-256 (32 bytes), number of sections (u16), offset of the
+      string table (u64).
+    - Section table: for each field of `Workspace`, its name (u8 length +
+      UTF-8), whether its value is plain (u8), and the offset and length of
+      its value (u64 each).
+    - The values of the sections.
+    - String table: number of strings (u32), their end offsets (u64 each),
+      and their UTF-8 bytes.
+
+A value is a tag byte followed by its payload: nothing (None, False, True),
+an i64, a float64, a string number (u32), the decimal string of an integer
+that doesn't fit in an i64, an enum (class u16, member u16), a list or dict
+(u32 length, then the items, or the keys and values), or a dataclass (class
+u16, then its fields).
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from enum import Enum
+from typing import Any, Collection, Dict, List, Optional, Tuple, Type
+
+import buildzr.models
+import buildzr.models.models
+from buildzr.profiling import span
+
+FORMAT_VERSION = 1
+
+_MAGIC = b'BZRSNAP\x00'
+_HEADER = struct.Struct('<8sH16s32sHQ')
+_SECTION = struct.Struct('<BQQ')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_ENUM = struct.Struct('<HH')
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BIG_INT, _ENUM_TAG, _LIST, _DICT, _DATACLASS = range(11)
+
+
+class _Schema:
+
+    """
+    The dataclasses and enums of `buildzr.models`, numbered by name, with a
+    fingerprint of their fields and members.
+    """
+
+    def __init__(self) -> None:
+        types = [
+            value for value in vars(buildzr.models.models).values()
+            if isinstance(value, type) and value.__module__ == buildzr.models.models.__name__
+            and (dataclasses.is_dataclass(value) or issubclass(value, Enum))
+        ]
+        types.sort(key=lambda t: t.__name__)
+
+        self.dataclasses: List[Tuple[Type[Any], Tuple[str, ...]]] = []
+        self.enums: List[Tuple[Type[Enum], List[Enum]]] = []
+        self.dataclass_numbers: Dict[Type[Any], int] = {}
+        self.enum_numbers: Dict[Type[Enum], Tuple[int, Dict[Enum, int]]] = {}
+
+        fingerprint = hashlib.sha256(f"buildzr snapshot {FORMAT_VERSION}".encode('utf-8'))
+        for t in types:
+            if issubclass(t, Enum):
+                members = list(t)
+                self.enum_numbers[t] = (len(self.enums), {member: i for i, member in enumerate(members)})
+                self.enums.append((t, members))
+                description = ','.join(repr(member.value) for member in members)
+            else:
+                names = tuple(field.name for field in dataclasses.fields(t))
+                self.dataclass_numbers[t] = len(self.dataclasses)
+                self.dataclasses.append((t, names))
+                description = ','.join(names)
+            fingerprint.update(f"{t.__name__}({description});".encode('utf-8'))
+        self.fingerprint = fingerprint.digest()[:16]
+
+
+_schema: Optional[_Schema] = None
+
+
+def _get_schema() -> _Schema:
+    global _schema
+    if _schema is None:
+        _schema = _Schema()
+    return _schema
+
+
+class _Encoder:
+
+    def __init__(self, schema: _Schema) -> None:
+        self.schema = schema
+        self.out = bytearray()
+        self.strings: Dict[str, int] = {}
+
+    def value(self, value: Any) -> None:
+        out = self.out
+        if value is None:
+            out.append(_NONE)
+        elif value is True:
+            out.append(_TRUE)
+        elif value is False:
+            out.append(_FALSE)
+        elif isinstance(value, Enum):
+            number, members = self.schema.enum_numbers[type(value)]
+            out.append(_ENUM_TAG)
+            out += _ENUM.pack(number, members[value])
+        elif isinstance(value, str):
+            index = self.strings.get(value)
+            if index is None:
+                index = self.strings[value] = len(self.strings)
+            out.append(_STR)
+            out += _U32.pack(index)
+        elif isinstance(value, int):
+            if -2**63 <= value < 2**63:
+                out.append(_INT)
+                out += _I64.pack(value)
+            else:
+                out.append(_BIG_INT)
+                self.value(str(value))
+        elif isinstance(value, float):
+            out.append(_FLOAT)
+            out += _F64.pack(value)
+        elif isinstance(value, list):
+            out.append(_LIST)
+            out += _U32.pack(len(value))
+            for item in value:
+                self.value(item)
+        elif isinstance(value, dict):
+            out.append(_DICT)
+            out += _U32.pack(len(value))
+            for key, item in value.items():
+                self.value(key)
+                self.value(item)
+        elif type(value) in self.schema.dataclass_numbers:
+            number = self.schema.dataclass_numbers[type(value)]
+            out.append(_DATACLASS)
+            out += _U16.pack(number)
+            for name in self.schema.dataclasses[number][1]:
+                self.value(getattr(value, name))
+        else:
+            raise TypeError(f"Can't encode {type(value).__name__} values in a snapshot")
+
+
+class _Decoder:
+
+    """Decodes the values of a snapshot, and the strings they refer to."""
+
+    def __init__(self, data: Any, schema: _Schema, strings_offset: int) -> None:
+        self.data = data
+        self.schema = schema
+        self.position = 0
+        (count,) = _U32.unpack_from(data, strings_offset)
+        self.string_ends = strings_offset + 4
+        self.string_base = self.string_ends + 8 * count
+        self.strings: List[Optional[str]] = [None] * count
+
+    def string(self, index: int) -> str:
+        value = self.strings[index]
+        if value is None:
+            start = _U64.unpack_from(self.data, self.string_ends + 8 * (index - 1))[0] if index else 0
+            (end,) = _U64.unpack_from(self.data, self.string_ends + 8 * index)
+            value = self.strings[index] = self.data[self.string_base + start:self.string_base + end].decode('utf-8')
+        return value
+
+    def value(self) -> Any:
+        data = self.data
+        position = self.position
+        tag = data[position]
+        position += 1
+        if tag == _STR:
+            self.position = position + 4
+            return self.string(_U32.unpack_from(data, position)[0])
+        if tag == _NONE:
+            self.position = position
+            return None
+        if tag == _DATACLASS:
+            self.position = position + 2
+            cls, names = self.schema.dataclasses[_U16.unpack_from(data, position)[0]]
+            # The fields are set directly: the models are plain dataclasses,
+            # and all their fields are in the snapshot.
+            obj = cls.__new__(cls)
+            fields = obj.__dict__
+            for name in names:
+                fields[name] = self.value()
+            return obj
+        if tag == _LIST:
+            self.position = position + 4
+            return [self.value() for _ in range(_U32.unpack_from(data, position)[0])]
+        if tag in (_TRUE, _FALSE):
+            self.position = position
+            return tag == _TRUE
+        if tag == _INT:
+            self.position = position + 8
+            return _I64.unpack_from(data, position)[0]
+        if tag == _FLOAT:
+            self.position = position + 8
+            return _F64.unpack_from(data, position)[0]
+        if tag == _ENUM_TAG:
+            self.position = position + 4
+            number, member = _ENUM.unpack_from(data, position)
+            return self.schema.enums[number][1][member]
+        if tag == _DICT:
+            self.position = position + 4
+            result = {}
+            for _ in range(_U32.unpack_from(data, position)[0]):
+                key = self.value()
+                result[key] = self.value()
+            return result
+        if tag == _BIG_INT:
+            self.position = position
+            return int(self.value())
+        raise ValueError(f"Invalid snapshot value at {position - 1}")
+
+
+def snapshot_path(source: str) -> str:
+    """The path of the snapshot of a workspace file: a hidden file next to it."""
+    directory, name = os.path.split(os.path.abspath(source))
+    return os.path.join(directory, f".{name}.snapshot")
+
+
+def content_hash(path: str) -> bytes:
+    """The SHA-256 of the contents of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.digest()
+
+
+def write_snapshot(workspace: buildzr.models.Workspace, path: str, source_hash: bytes) -> None:
+
+    """
+    Writes a snapshot of a workspace, made from the source with the given
+    SHA-256. The snapshot is replaced atomically.
+
+    Raises:
+        TypeError: If the workspace has values that can't be encoded.
+    """
+
+    schema = _get_schema()
+    encoder = _Encoder(schema)
+    sections: List[Tuple[str, bool, int, int]] = []
+    with span('Snapshot.encode'):
+        for field in dataclasses.fields(buildzr.models.Workspace):
+            start = len(encoder.out)
+            value = getattr(workspace, field.name)
+            encoder.value(value)
+            plain = not isinstance(value, (list, dict)) and not dataclasses.is_dataclass(value)
+            sections.append((field.name, plain, start, len(encoder.out) - start))
+
+    names = [name.encode('utf-8') for name, _, _, _ in sections]
+    table_size = sum(1 + len(name) + _SECTION.size for name in names)
+    values_offset = _HEADER.size + table_size
+    strings_offset = values_offset + len(encoder.out)
+
+    header = bytearray(_HEADER.pack(_MAGIC, FORMAT_VERSION, schema.fingerprint, source_hash, len(sections), strings_offset))
+    for name, (_, plain, start, length) in zip(names, sections):
+        header.append(len(name))
+        header += name
+        header += _SECTION.pack(plain, values_offset + start, length)
+
+    strings = [s.encode('utf-8') for s in encoder.strings]
+    ends = bytearray()
+    end = 0
+    for s in strings:
+        end += len(s)
+        ends += _U64.pack(end)
+
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.write(encoder.out)
+            f.write(_U32.pack(len(strings)))
+            f.write(ends)
+            for s in strings:
+                f.write(s)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+
+
+def read_snapshot(
+    path: str,
+    source_hash: bytes,
+    sections: Optional[Collection[str]]=None,
+) -> Optional[buildzr.models.Workspace]:
+
+    """
+    Reads a snapshot of a workspace, decoding only the given `sections` (see
+    `JsonLoader.load`), or all of them.
+
+    Returns:
+        The workspace, or `None` if there's no snapshot, or if it's invalid,
+        was made by another version of buildzr, or from another source.
+    """
+
+    schema = _get_schema()
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, version, fingerprint, snapshot_source_hash, count, strings_offset = _HEADER.unpack_from(data, 0)
+            if (magic, version, fingerprint, snapshot_source_hash) != (_MAGIC, FORMAT_VERSION, schema.fingerprint, source_hash):
+                return None
+
+            with span('Snapshot.decode', sections=','.join(sorted(sections)) if sections is not None else '*'):
+                decoder = _Decoder(data, schema, strings_offset)
+                workspace = buildzr.models.Workspace()
+                position = _HEADER.size
+                for _ in range(count):
+                    length = data[position]
+                    name = data[position + 1:position + 1 + length].decode('utf-8')
+                    plain, offset, _ = _SECTION.unpack_from(data, position + 1 + length)
+                    position += 1 + length + _SECTION.size
+                    if sections is None or name in sections or plain:
+                        decoder.position = offset
+                        setattr(workspace, name, decoder.value())
+            return workspace
+    except (OSError, ValueError, IndexError, KeyError, struct.error, UnicodeDecodeError):
+        return None
@@ -0,0 +1,329 @@
+"""
+Lightweight instrumentation of the buildzr pipeline.
+
+The slow phases of the pipeline (implying relationships, computing the views,
+encoding JSON, merging extended workspaces, converting to Java, exporting and
+rendering PlantUML) are wrapped in named spans. Spans are only recorded when
+at least one collector is registered; otherwise, entering a span costs a
+function call and a check of two empty tuples.
+
+Profiling can be enabled:
+    - For a workspace, with `Workspace(..., profile=True)`. The spans recorded
+      while the workspace is built, and by its methods (e.g., its exports),
+      are then available from `Workspace.profiler`. The spans of other
+      workspaces aren't recorded.
+    - For a block of code, with `collecting(collector)`. Only the spans of the
+      current thread (or asyncio task) are sent to the collector.
+    - For the whole process, with the `BUILDZR_PROFILE` environment variable.
+      If it's set to a path ending with `.json`, a Chrome trace is written to
+      that path when the process exits. Otherwise (e.g., `BUILDZR_PROFILE=1`),
+      a summary table is printed to the standard error.
+    - With a custom collector, registered with `add_collector`.
+
+Example:
+    >>> with Workspace('w', profile=True) as w:
+    ...     ...
+    >>> w.to_json()
+    >>> print(w.profiler.format_summary())
+    >>> w.profiler.write_chrome_trace('trace.json')  # Open with chrome://tracing or Perfetto.
+"""
+
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    cast,
+)
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+ENVIRONMENT_VARIABLE = 'BUILDZR_PROFILE'
+
+@dataclass
+class Span:
+
+    """
+    A timed phase of the pipeline.
+
+    Attributes:
+        name: The name of the phase, e.g., `'Workspace._imply_relationships'`.
+        start_ns: The start time, from `time.perf_counter_ns`.
+        end_ns: The end time, from `time.perf_counter_ns`.
+        thread_id: The identifier of the thread the phase ran in.
+        attributes: Extra information about the phase, e.g., the key of the
+            view being computed.
+    """
+
+    name: str
+    start_ns: int
+    end_ns: int
+    thread_id: int
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+class Collector(ABC):
+
+    """
+    Receives the spans as they end. Register with `add_collector`.
+    """
+
+    @abstractmethod
+    def on_span(self, span: Span) -> None:
+        pass
+
+class SpanRecorder(Collector):
+
+    """
+    A collector that keeps the spans in memory, and exports them as a Chrome
+    trace or as a summary table.
+    """
+
+    def __init__(self) -> None:
+        self._spans: List[Span] = []
+
+    @property
+    def spans(self) -> List[Span]:
+        return self._spans
+
+    def on_span(self, span: Span) -> None:
+        self._spans.append(span)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+
+        """
+        Returns the spans in the Chrome trace-event format, which can be
+        opened with `chrome://tracing` or https://ui.perfetto.dev.
+        """
+
+        pid = os.getpid()
+        return {
+            'traceEvents': [
+                {
+                    'name': span.name,
+                    'cat': 'buildzr',
+                    'ph': 'X',
+                    'ts': span.start_ns / 1000,
+                    'dur': span.duration_ns / 1000,
+                    'pid': pid,
+                    'tid': span.thread_id,
+                    'args': {k: str(v) for k, v in span.attributes.items()},
+                }
+                for span in self._spans
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+    def write_chrome_trace(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def summary(self) -> List[Dict[str, Any]]:
+
+        """
+        Returns one row per span name, with the number of spans (`count`), and
+        their total, mean and maximum durations in seconds, sorted by the
+        total duration (longest first).
+
+        Nested spans are counted in full in both the inner and the outer span.
+        """
+
+        rows: Dict[str, Dict[str, Any]] = {}
+        for span in self._spans:
+            duration = span.duration_ns / 1e9
+            row = rows.setdefault(span.name, {'name': span.name, 'count': 0, 'total': 0.0, 'max': 0.0})
+            row['count'] += 1
+            row['total'] += duration
+            row['max'] = max(row['max'], duration)
+        for row in rows.values():
+            row['mean'] = row['total'] / row['count']
+        return sorted(rows.values(), key=lambda row: row['total'], reverse=True)
+
+    def format_summary(self) -> str:
+
+        """
+        Returns the summary as a plain-text table.
+        """
+
+        lines = [f"{'span':<48} {'count':>7} {'total (s)':>10} {'mean (s)':>10} {'max (s)':>10}"]
+        for row in self.summary():
+            lines.append(
+                f"{row['name']:<48} {row['count']:>7} {row['total']:>10.4f} "
+                f"{row['mean']:>10.4f} {row['max']:>10.4f}"
+            )
+        return '\n'.join(lines)
+
+# Replaced rather than modified, so that the spans ending in other threads can
+# read it without a lock.
+_collectors: Tuple[Collector, ...] = ()
+_collectors_lock = threading.Lock()
+
+def add_collector(collector: Collector) -> None:
+    """Starts sending the spans to the `collector`."""
+    global _collectors
+    with _collectors_lock:
+        if collector not in _collectors:
+            _collectors = _collectors + (collector,)
+
+def remove_collector(collector: Collector) -> None:
+    """Stops sending the spans to the `collector`."""
+    global _collectors
+    with _collectors_lock:
+        _collectors = tuple(c for c in _collectors if c is not collector)
+
+# The collectors of the spans of the current context (thread or asyncio task),
+# see `collecting`.
+_context_collectors: ContextVar[Tuple[Collector, ...]] = ContextVar('buildzr_context_collectors', default=())
+
+@contextlib.contextmanager
+def collecting(collector: Collector) -> Iterator[None]:
+
+    """
+    Sends the spans of the current context (thread or asyncio task) to the
+    `collector` until the block exits. Unlike `add_collector`, the spans of
+    the other threads aren't sent to it.
+
+    Example:
+        >>> recorder = SpanRecorder()
+        >>> with collecting(recorder):
+        ...     w.to_json()
+    """
+
+    token = _context_collectors.set(_context_collectors.get() + (collector,))
+    try:
+        yield
+    finally:
+        _context_collectors.reset(token)
+
+def is_enabled() -> bool:
+    """
+    Returns `True` if there's at least one collector registered, or
+    collecting the spans of the current context.
+    """
+    return bool(_collectors or _context_collectors.get())
+
+class _NoopSpan:
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        return None
+
+_NOOP_SPAN = _NoopSpan()
+
+class _ActiveSpan(_NoopSpan):
+
+    def __init__(self, name: str, attributes: Dict[str, Any]) -> None:
+        self._name = name
+        self._attributes = attributes
+        self._start_ns = 0
+
+    def __enter__(self) -> None:
+        self._start_ns = time.perf_counter_ns()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        span = Span(
+            name=self._name,
+            start_ns=self._start_ns,
+            end_ns=time.perf_counter_ns(),
+            thread_id=threading.get_ident(),
+            attributes=self._attributes,
+        )
+        for collector in _collectors + _context_collectors.get():
+            collector.on_span(span)
+
+def span(name: str, **attributes: Any) -> _NoopSpan:
+
+    """
+    Returns a context manager that records the enclosed code as a span named
+    `name`, with the given `attributes`, if profiling is enabled.
+
+    Example:
+        >>> with span('C4PlantUMLExporter.export', view='SystemContext'):
+        ...     exporter.export(view)
+    """
+
+    if not _collectors and not _context_collectors.get():
+        return _NOOP_SPAN
+    return _ActiveSpan(name, attributes)
+
+def traced(name: Optional[str]=None) -> Callable[[F], F]:
+
+    """
+    Decorator that records each call to the decorated function as a span.
+    The span is named after the qualified name of the function, unless
+    `name` is given.
+    """
+
+    def decorator(func: F) -> F:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _collectors and not _context_collectors.get():
+                return func(*args, **kwargs)
+            with _ActiveSpan(span_name, {}):
+                return func(*args, **kwargs)
+
+        return cast(F, wrapper)
+
+    return decorator
+
+def _install_from_environment(value: Optional[str]) -> Optional[SpanRecorder]:
+
+    """
+    Registers a process-wide `SpanRecorder` if the `BUILDZR_PROFILE`
+    environment variable is set, and reports the spans when the process
+    exits.
+    """
+
+    if not value or value.lower() in ('0', 'false', 'no', 'off'):
+        return None
+
+    recorder = SpanRecorder()
+    add_collector(recorder)
+
+    def report() -> None:
+        if value.endswith('.json'):
+            recorder.write_chrome_trace(value)
+        else:
+            print(recorder.format_summary(), file=sys.stderr)
+
+    atexit.register(report)
+    return recorder
+
+_environment_recorder = _install_from_environment(os.environ.get(ENVIRONMENT_VARIABLE))
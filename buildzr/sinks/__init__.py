@@ -1,5 +1,8 @@
 """Sinks for exporting buildzr workspaces."""
 
 from buildzr.sinks.plantuml_sink import PlantUmlSink, PlantUmlSinkConfig
+from buildzr.sinks.dot_sink import DotSink, DotSinkConfig
+from buildzr.sinks.mermaid_sink import MermaidSink, MermaidSinkConfig
+from buildzr.sinks.structurizr_dsl_sink import StructurizrDslSink, StructurizrDslSinkConfig
 
-__all__ = ["PlantUmlSink", "PlantUmlSinkConfig"]
+__all__ = ["PlantUmlSink", "PlantUmlSinkConfig", "DotSink", "DotSinkConfig", "MermaidSink", "MermaidSinkConfig", "StructurizrDslSink", "StructurizrDslSinkConfig"]
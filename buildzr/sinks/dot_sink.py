@@ -0,0 +1,506 @@
+"""Graphviz sink for exporting workspaces to DOT diagrams, without the JVM."""
+
+import os
+import shutil
+import subprocess
+from dataclasses import dataclass
+from typing import (
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+)
+from buildzr.models.models import (
+    AutomaticLayout,
+    Border,
+    ElementStyle,
+    Relationship,
+    RelationshipStyle,
+    RelationshipView,
+    Routing1,
+    Shape,
+    Workspace,
+)
+from buildzr.sinks.interfaces import Sink
+from buildzr.sinks.model_index import (
+    ElementKind,
+    IndexedElement,
+    ModelIndex,
+    View,
+    ViewBoundary,
+    ViewKind,
+    iter_views,
+    nest_view,
+)
+from buildzr.profiling import span, traced
+
+
+@dataclass
+class DotSinkConfig:
+    """
+    Configuration for Graphviz export.
+
+    Attributes:
+        path: Output directory path where .dot files will be written
+        format: Output format - 'dot' for text files, 'svg'/'png' for images
+            rendered by the Graphviz `dot` program
+        dot_binary: The `dot` program used to render the images. Either a path,
+            or a name looked up in the PATH.
+    """
+
+    path: str
+    format: Literal["dot", "svg", "png"] = "dot"
+    dot_binary: str = "dot"
+
+
+# The C4 colours of the element types, used when no style sets them.
+_C4_COLORS: Dict[ElementKind, Tuple[str, str]] = {
+    'Person': ('#08427b', '#ffffff'),
+    'SoftwareSystem': ('#1168bd', '#ffffff'),
+    'Container': ('#438dd5', '#ffffff'),
+    'Component': ('#85bbf0', '#000000'),
+    'InfrastructureNode': ('#ffffff', '#000000'),
+    'CustomElement': ('#dddddd', '#000000'),
+}
+_C4_EXTERNAL_COLORS = ('#999999', '#ffffff')
+
+_TYPE_NAMES: Dict[ElementKind, str] = {
+    'Person': 'Person',
+    'SoftwareSystem': 'Software System',
+    'Container': 'Container',
+    'Component': 'Component',
+    'DeploymentNode': 'Deployment Node',
+    'InfrastructureNode': 'Infrastructure Node',
+    'SoftwareSystemInstance': 'Software System',
+    'ContainerInstance': 'Container',
+    'CustomElement': 'Element',
+}
+
+# Graphviz has no equivalent of some Structurizr shapes, so these are drawn
+# with the closest one.
+_SHAPES: Dict[Shape, Tuple[str, Optional[str]]] = {
+    Shape.Box: ('box', None),
+    Shape.RoundedBox: ('box', 'rounded'),
+    Shape.Component: ('component', None),
+    Shape.Circle: ('circle', None),
+    Shape.Ellipse: ('ellipse', None),
+    Shape.Hexagon: ('hexagon', None),
+    Shape.Diamond: ('diamond', None),
+    Shape.Folder: ('folder', None),
+    Shape.Cylinder: ('cylinder', None),
+    Shape.Pipe: ('cylinder', None),
+    Shape.WebBrowser: ('box', None),
+    Shape.Window: ('box', None),
+    Shape.MobileDevicePortrait: ('box', 'rounded'),
+    Shape.MobileDeviceLandscape: ('box', 'rounded'),
+    Shape.Person: ('box', 'rounded'),
+    Shape.Robot: ('box', 'rounded'),
+}
+
+_RANK_DIRECTIONS = {
+    'TopBottom': 'TB',
+    'BottomTop': 'BT',
+    'LeftRight': 'LR',
+    'RightLeft': 'RL',
+}
+
+_SPLINES = {
+    Routing1.Direct: 'line',
+    Routing1.Curved: 'curved',
+    Routing1.Orthogonal: 'ortho',
+}
+
+_DEFAULT_RELATIONSHIP_STYLE = RelationshipStyle(tag='Relationship', color='#707070', fontSize=24)
+
+# Structurizr measures in pixels, Graphviz in inches. The sizes of the
+# elements default to the ones of Structurizr, so they're in proportion with
+# the separations of the automatic layouts.
+_PIXELS_PER_INCH = 72.0
+_DEFAULT_WIDTH = 450
+_DEFAULT_HEIGHT = 300
+_DEFAULT_FONT_SIZE = 24
+
+
+def _quote(value: str) -> str:
+    """Quotes a DOT ID."""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _escape_html(value: str) -> str:
+    """Escapes text for a DOT HTML-like label."""
+    escaped = (
+        value
+        .replace('&', '&amp;')
+        .replace('<', '&lt;')
+        .replace('>', '&gt;')
+        .replace('"', '&quot;')
+    )
+    return '<br/>'.join(escaped.splitlines()) if '\n' in escaped else escaped
+
+
+def _attributes(attributes: Dict[str, str]) -> str:
+    parts = []
+    for name, value in attributes.items():
+        if value.startswith('<') and value.endswith('>'):
+            parts.append(f"{name}={value}")
+        else:
+            parts.append(f"{name}={_quote(value)}")
+    return ', '.join(parts)
+
+
+def _inches(pixels: float) -> str:
+    return f"{pixels / _PIXELS_PER_INCH:.2f}".rstrip('0').rstrip('.')
+
+
+class DotSink(Sink[DotSinkConfig]):
+    """
+    Sink for exporting workspace views to Graphviz DOT format.
+
+    The views are exported straight from the Python models, so unlike
+    `PlantUmlSink`, this sink doesn't need the JVM. The elements are drawn
+    with the C4 colours, overridden by the element and relationship styles of
+    the workspace. Groups, and the boundaries of the software systems,
+    containers and deployment nodes, are drawn as clusters, and the automatic
+    layout of each view sets its rank direction and separations.
+
+    Rendering to images requires the Graphviz `dot` program.
+
+    Examples:
+        >>> from buildzr.sinks.dot_sink import DotSink, DotSinkConfig
+        >>> sink = DotSink()
+        >>> config = DotSinkConfig(path='output/diagrams', format='svg')
+        >>> sink.write(workspace, config)
+    """
+
+    def export_to_dict(self, workspace: Workspace) -> Dict[str, str]:
+        """
+        Export workspace views to DOT strings without writing files.
+
+        Filtered views and image views are not exported.
+
+        Args:
+            workspace: The workspace to export
+
+        Returns:
+            Dictionary mapping view keys to DOT source strings.
+        """
+        index = ModelIndex(workspace)
+        diagrams: Dict[str, str] = {}
+        for kind, view in iter_views(workspace):
+            with span('DotSink.export', key=view.key):
+                diagrams[view.key] = self._export_view(index, kind, view)
+        return diagrams
+
+    def render_to_svg_dict(self, workspace: Workspace, dot_binary: str="dot") -> Dict[str, str]:
+        """
+        Export workspace views and render to SVG strings.
+
+        Args:
+            workspace: The workspace to export
+            dot_binary: The Graphviz `dot` program
+
+        Returns:
+            Dictionary mapping view keys to SVG content strings.
+
+        Raises:
+            FileNotFoundError: If the `dot` program cannot be found
+        """
+        return {
+            view_key: self._render_to_bytes(dot, "svg", dot_binary).decode('utf-8')
+            for view_key, dot in self.export_to_dict(workspace).items()
+        }
+
+    @traced()
+    def _render_to_bytes(self, dot_content: str, format: str, dot_binary: str="dot") -> bytes:
+        """
+        Render DOT content to image bytes with the Graphviz `dot` program.
+
+        Args:
+            dot_content: DOT source string
+            format: Output format ('svg' or 'png')
+            dot_binary: The Graphviz `dot` program
+
+        Returns:
+            Image content as bytes.
+
+        Raises:
+            FileNotFoundError: If the `dot` program cannot be found
+            RuntimeError: If the `dot` program fails
+        """
+        executable = shutil.which(dot_binary)
+        if executable is None:
+            raise FileNotFoundError(
+                f"Graphviz '{dot_binary}' program not found. "
+                "Install Graphviz (https://graphviz.org/download/) to render DOT diagrams."
+            )
+
+        completed = subprocess.run(
+            [executable, f"-T{format}"],
+            input=dot_content.encode('utf-8'),
+            capture_output=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(
+                f"Graphviz failed to render the diagram: {completed.stderr.decode('utf-8', 'replace').strip()}"
+            )
+        return completed.stdout
+
+    def write(self, workspace: Workspace, config: Optional[DotSinkConfig] = None) -> None:
+        """
+        Export workspace views to DOT files.
+
+        Args:
+            workspace: The workspace to export
+            config: Optional configuration. If None, uses default (dot format, current directory)
+
+        Raises:
+            FileNotFoundError: If images are requested and the `dot` program cannot be found
+            RuntimeError: If the `dot` program fails
+        """
+        if config is None:
+            config = DotSinkConfig(path=os.curdir)
+
+        os.makedirs(config.path, exist_ok=True)
+
+        for view_key, dot_content in self.export_to_dict(workspace).items():
+            dot_path = os.path.join(config.path, f"{view_key}.dot")
+            with open(dot_path, 'w', encoding='utf-8') as f:
+                f.write(dot_content)
+            print(f"Exported: {dot_path}")
+
+            if config.format in ['svg', 'png']:
+                image_path = os.path.join(config.path, f"{view_key}.{config.format}")
+                with open(image_path, 'wb') as image:
+                    image.write(self._render_to_bytes(dot_content, config.format, config.dot_binary))
+                print(f"Rendered: {image_path}")
+
+    def _export_view(self, index: ModelIndex, kind: ViewKind, view: View) -> str:
+
+        """
+        Export a view to a DOT digraph.
+
+        The boundaries of the view (see `nest_view`) are drawn as clusters
+        around their elements.
+        """
+
+        root = nest_view(index, kind, view)
+
+        # Edges can't be attached to clusters, so the edges of a boundary are
+        # attached to a node inside, and clipped at the cluster.
+        nodes: Set[str] = set()
+        boundaries: Dict[str, str] = {}
+        anchors: Dict[str, str] = {}
+        for boundary in root.walk():
+            nodes.update(element.id for element in boundary.elements)
+            if boundary.element is not None:
+                first = boundary.first_element()
+                boundaries[boundary.element.id] = f"cluster_{boundary.id}"
+                anchors[boundary.element.id] = first.id if first else f"{boundary.element.id}.anchor"
+
+        lines = [f"digraph {_quote(view.key)} {{"]
+        lines.extend(f"  {line};" for line in self._graph_attributes(index, view))
+        lines.append(f"  node [{_attributes({'fontname': 'Arial', 'margin': '0.2'})}];")
+        lines.append(f"  edge [{_attributes({'fontname': 'Arial'})}];")
+        lines.append("")
+        self._write_cluster(index, root, lines, indent=1)
+
+        lines.append("")
+        for relationship_view in view.relationships or []:
+            edge = self._edge(index, kind, relationship_view, nodes, boundaries, anchors)
+            if edge is not None:
+                lines.append(f"  {edge};")
+        lines.append("}")
+        return '\n'.join(lines) + '\n'
+
+    def _write_cluster(
+        self,
+        index: ModelIndex,
+        boundary: ViewBoundary,
+        lines: List[str],
+        indent: int,
+    ) -> None:
+        pad = '  ' * indent
+        for element in boundary.elements:
+            lines.append(f"{pad}{_quote(element.id)} [{_attributes(self._node_attributes(index, element))}];")
+        if boundary.element is not None and boundary.first_element() is None:
+            # Graphviz doesn't draw empty clusters.
+            lines.append(f"{pad}{_quote(boundary.element.id + '.anchor')} [shape=point, style=invis];")
+        for child in boundary.boundaries:
+            if child.element is not None:
+                label = self._boundary_label(child.element)
+                style = self._boundary_style(index, child.element)
+            else:
+                label = _escape_html(child.group or '')
+                style = {'style': 'dashed', 'color': '#666666', 'fontcolor': '#666666'}
+            lines.append(f"{pad}subgraph {_quote('cluster_' + child.id)} {{")
+            lines.append(f"{pad}  label=<{label}>;")
+            for name, value in style.items():
+                lines.append(f"{pad}  {name}={_quote(value)};")
+            self._write_cluster(index, child, lines, indent + 1)
+            lines.append(f"{pad}}}")
+
+    def _graph_attributes(self, index: ModelIndex, view: View) -> List[str]:
+        title = view.title or view.key
+        attributes = [
+            f"label=<{_escape_html(title)}>",
+            'labelloc="t"',
+            'fontname="Arial"',
+            'compound=true',
+        ]
+        layout: Optional[AutomaticLayout] = getattr(view, 'automaticLayout', None)
+        if layout is not None:
+            if layout.rankDirection is not None:
+                attributes.append(f'rankdir="{_RANK_DIRECTIONS[layout.rankDirection.value]}"')
+            if layout.rankSeparation is not None:
+                attributes.append(f'ranksep="{_inches(layout.rankSeparation)}"')
+            if layout.nodeSeparation is not None:
+                attributes.append(f'nodesep="{_inches(layout.nodeSeparation)}"')
+            if layout.edgeSeparation:
+                attributes.append(f'esep="{layout.edgeSeparation}"')
+        default_style = index.relationship_style(Relationship(tags='Relationship'))
+        if default_style.routing is not None:
+            attributes.append(f'splines="{_SPLINES[default_style.routing]}"')
+        return attributes
+
+    def _element_style(self, index: ModelIndex, element: IndexedElement) -> ElementStyle:
+        kind = index.instantiated_kind(element)
+        background, color = _C4_EXTERNAL_COLORS if element.external else _C4_COLORS.get(kind, ('#dddddd', '#000000'))
+        base = ElementStyle(
+            tag='Element',
+            width=_DEFAULT_WIDTH,
+            height=_DEFAULT_HEIGHT,
+            background=background,
+            stroke='#888888' if background == '#ffffff' else None,
+            color=color,
+            fontSize=_DEFAULT_FONT_SIZE,
+            shape=Shape.Person if kind == 'Person' else Shape.Box,
+        )
+        return index.element_style(element, base)
+
+    def _node_attributes(self, index: ModelIndex, element: IndexedElement) -> Dict[str, str]:
+        style = self._element_style(index, element)
+        shape, shape_style = _SHAPES.get(style.shape or Shape.Box, ('box', None))
+        styles = ['filled']
+        if shape_style:
+            styles.append(shape_style)
+        if style.border == Border.Dashed:
+            styles.append('dashed')
+        elif style.border == Border.Dotted:
+            styles.append('dotted')
+
+        fill = style.background or '#dddddd'
+        if style.opacity is not None and fill.startswith('#') and len(fill) == 7:
+            fill += f"{round(max(0, min(100, style.opacity)) * 255 / 100):02x}"
+
+        attributes = {
+            'id': element.id,
+            'shape': shape,
+            'style': ','.join(styles),
+            'fillcolor': fill,
+            'color': style.stroke or fill[:7],
+            'fontcolor': style.color or '#000000',
+            'label': f"<{self._element_label(index, element, style)}>",
+        }
+        if style.strokeWidth is not None:
+            attributes['penwidth'] = str(style.strokeWidth)
+        if style.fontSize is not None:
+            attributes['fontsize'] = str(style.fontSize)
+        if style.width is not None:
+            attributes['width'] = _inches(style.width)
+        if style.height is not None:
+            attributes['height'] = _inches(style.height)
+        return attributes
+
+    def _type_label(self, index: ModelIndex, element: IndexedElement) -> str:
+        if element.kind == 'CustomElement':
+            return f"[{element.technology}]" if element.technology else ''
+        type_name = _TYPE_NAMES[element.kind]
+        if element.technology and element.kind not in ('Person', 'SoftwareSystem', 'SoftwareSystemInstance'):
+            return f"[{type_name}: {element.technology}]"
+        return f"[{type_name}]"
+
+    def _element_label(self, index: ModelIndex, element: IndexedElement, style: ElementStyle) -> str:
+        parts = [f"<b>{_escape_html(element.name)}</b>"]
+        type_label = self._type_label(index, element)
+        if type_label and style.metadata is not False:
+            parts.append(f'<font point-size="{max(1, round((style.fontSize or _DEFAULT_FONT_SIZE) * 0.75))}">{_escape_html(type_label)}</font>')
+        if element.description and style.description is not False:
+            parts.append(f"<br/>{_escape_html(element.description)}")
+        return '<br/>'.join(parts)
+
+    def _boundary_label(self, element: IndexedElement) -> str:
+        type_name = _TYPE_NAMES[element.kind]
+        if element.technology and element.kind == 'DeploymentNode':
+            type_name = f"{type_name}: {element.technology}"
+        label = f"<b>{_escape_html(element.name)}</b><br/>[{_escape_html(type_name)}]"
+        instances = getattr(element.model, 'instances', None)
+        if element.kind == 'DeploymentNode' and instances and str(instances) != '1':
+            label += f" x{_escape_html(str(instances))}"
+        return label
+
+    def _boundary_style(self, index: ModelIndex, element: IndexedElement) -> Dict[str, str]:
+        style = index.element_style(element, ElementStyle(tag='Element'))
+        border = 'solid' if element.kind == 'DeploymentNode' else 'dashed'
+        if style.border == Border.Dotted:
+            border = 'dotted'
+        elif style.border == Border.Solid:
+            border = 'solid'
+        return {
+            'style': border,
+            'color': style.stroke or '#888888',
+            'fontcolor': style.color or '#000000',
+        }
+
+    def _edge(
+        self,
+        index: ModelIndex,
+        kind: ViewKind,
+        relationship_view: RelationshipView,
+        nodes: Set[str],
+        boundaries: Dict[str, str],
+        anchors: Dict[str, str],
+    ) -> Optional[str]:
+        relationship = index.relationships.get(relationship_view.id or '')
+        if relationship is None or relationship.sourceId is None or relationship.destinationId is None:
+            return None
+
+        source, destination = relationship.sourceId, relationship.destinationId
+        if relationship_view.response:
+            source, destination = destination, source
+
+        endpoints = []
+        attributes: Dict[str, str] = {'id': relationship.id or ''}
+        for element_id, attribute in ((source, 'ltail'), (destination, 'lhead')):
+            if element_id in boundaries:
+                # Edges can't be attached to clusters, so they're attached to
+                # a node inside, and clipped at the boundary of the cluster.
+                attributes[attribute] = boundaries[element_id]
+                endpoints.append(anchors[element_id])
+            elif element_id in nodes:
+                endpoints.append(element_id)
+            else:
+                return None
+
+        style = index.relationship_style(relationship, _DEFAULT_RELATIONSHIP_STYLE)
+        description = relationship_view.description or relationship.description or ''
+        if kind == 'Dynamic' and relationship_view.order:
+            description = f"{relationship_view.order}: {description}" if description else relationship_view.order
+        label = _escape_html(description)
+        if relationship.technology:
+            label += f'<br/><font point-size="{round((style.fontSize or _DEFAULT_FONT_SIZE) * 0.75)}">[{_escape_html(relationship.technology)}]</font>'
+        if label:
+            attributes['label'] = f"<{label}>"
+
+        attributes['style'] = 'dashed' if style.dashed is not False else 'solid'
+        if style.color:
+            attributes['color'] = style.color
+            attributes['fontcolor'] = style.color
+        if style.thickness is not None:
+            attributes['penwidth'] = str(style.thickness)
+        if style.fontSize is not None:
+            attributes['fontsize'] = str(style.fontSize)
+
+        return f"{_quote(endpoints[0])} -> {_quote(endpoints[1])} [{_attributes(attributes)}]"
+
@@ -0,0 +1,303 @@
+"""Mermaid sink for exporting workspaces to Mermaid C4 diagrams, without the JVM."""
+
+import io
+import os
+import re
+from dataclasses import dataclass
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+)
+from buildzr.models.models import (
+    ElementStyle,
+    RelationshipStyle,
+    RelationshipView,
+    Shape,
+    Workspace,
+)
+from buildzr.sinks.interfaces import Sink
+from buildzr.sinks.model_index import (
+    ElementKind,
+    IndexedElement,
+    ModelIndex,
+    View,
+    ViewBoundary,
+    ViewKind,
+    iter_views,
+    nest_view,
+)
+from buildzr.profiling import span
+
+
+@dataclass
+class MermaidSinkConfig:
+    """
+    Configuration for Mermaid export.
+
+    Attributes:
+        path: Output directory path where the .mmd files (one per view) will be written
+    """
+
+    path: str
+
+
+_DIAGRAM_TYPES: Dict[ViewKind, str] = {
+    'SystemLandscape': 'C4Context',
+    'SystemContext': 'C4Context',
+    'Container': 'C4Container',
+    'Component': 'C4Component',
+    'Dynamic': 'C4Dynamic',
+    'Deployment': 'C4Deployment',
+    'Custom': 'C4Context',
+}
+
+# Mermaid has no macro for infrastructure nodes and custom elements, so they
+# are drawn as containers and software systems.
+_MACROS: Dict[ElementKind, str] = {
+    'Person': 'Person',
+    'SoftwareSystem': 'System',
+    'Container': 'Container',
+    'Component': 'Component',
+    'InfrastructureNode': 'Container',
+    'CustomElement': 'System',
+}
+
+_BOUNDARY_MACROS: Dict[ElementKind, str] = {
+    'SoftwareSystem': 'System_Boundary',
+    'SoftwareSystemInstance': 'System_Boundary',
+    'Container': 'Container_Boundary',
+    'ContainerInstance': 'Container_Boundary',
+}
+
+_INDENT = '    '
+
+
+def _string(value: Optional[str]) -> str:
+    """Quotes a Mermaid string."""
+    text = ' '.join((value or '').split())
+    return '"' + text.replace('"', '#quot;') + '"'
+
+
+def _alias(element_id: str) -> str:
+    """The Mermaid alias of an element."""
+    return 'e' + re.sub(r'\W', '_', element_id)
+
+
+class MermaidSink(Sink[MermaidSinkConfig]):
+    """
+    Sink for exporting workspace views to Mermaid C4 diagrams.
+
+    The views are exported straight from the Python models, without the JVM.
+    System landscape, system context and custom views are exported as
+    `C4Context` diagrams, and container, component, dynamic and deployment
+    views as `C4Container`, `C4Component`, `C4Dynamic` and `C4Deployment`
+    diagrams. The colours set by the element and relationship styles of the
+    workspace are applied with `UpdateElementStyle` and `UpdateRelStyle`.
+
+    Each view is written to its file as it's exported, so the diagrams of a
+    workspace are never all held in memory.
+
+    Examples:
+        >>> from buildzr.sinks.mermaid_sink import MermaidSink, MermaidSinkConfig
+        >>> sink = MermaidSink()
+        >>> config = MermaidSinkConfig(path='docs/diagrams')
+        >>> sink.write(workspace, config)
+    """
+
+    def export_to_dict(self, workspace: Workspace) -> Dict[str, str]:
+        """
+        Export workspace views to Mermaid strings without writing files.
+
+        Filtered views and image views are not exported.
+
+        Args:
+            workspace: The workspace to export
+
+        Returns:
+            Dictionary mapping view keys to Mermaid source strings.
+        """
+        index = ModelIndex(workspace)
+        diagrams: Dict[str, str] = {}
+        for kind, view in iter_views(workspace):
+            out = io.StringIO()
+            self._write_view(index, kind, view, out)
+            diagrams[view.key] = out.getvalue()
+        return diagrams
+
+    def write(self, workspace: Workspace, config: Optional[MermaidSinkConfig] = None) -> None:
+        """
+        Export workspace views to Mermaid files, named after the view keys.
+
+        Args:
+            workspace: The workspace to export
+            config: Optional configuration. If None, writes to the current directory
+        """
+        if config is None:
+            config = MermaidSinkConfig(path=os.curdir)
+
+        os.makedirs(config.path, exist_ok=True)
+
+        # The model is indexed once for all the views.
+        index = ModelIndex(workspace)
+        for kind, view in iter_views(workspace):
+            mermaid_path = os.path.join(config.path, f"{view.key}.mmd")
+            with open(mermaid_path, 'w', encoding='utf-8') as f:
+                self._write_view(index, kind, view, f)
+            print(f"Exported: {mermaid_path}")
+
+    def _write_view(self, index: ModelIndex, kind: ViewKind, view: View, out: TextIO) -> None:
+
+        """
+        Write a view to `out` as a Mermaid C4 diagram, line by line.
+
+        The boundaries of the view (see `nest_view`) are written as
+        `System_Boundary`, `Container_Boundary`, `Deployment_Node` and
+        `Boundary` blocks around their elements.
+        """
+
+        with span('MermaidSink.export', key=view.key):
+            out.write(f"{_DIAGRAM_TYPES[kind]}\n")
+            out.write(f"{_INDENT}title {' '.join((view.title or view.key).split())}\n")
+
+            aliases: Set[str] = set()
+            styled: List[IndexedElement] = []
+            self._write_boundary(index, nest_view(index, kind, view), out, 1, aliases, styled)
+
+            relationship_views = list(view.relationships or [])
+            if kind == 'Dynamic':
+                relationship_views.sort(key=_order_key)
+
+            relationship_styles: List[str] = []
+            for relationship_view in relationship_views:
+                line, style = self._relationship(index, kind, relationship_view, aliases)
+                if line is not None:
+                    out.write(f"{_INDENT}{line}\n")
+                if style is not None:
+                    relationship_styles.append(style)
+
+            for element in styled:
+                style_line = self._element_style(index, element)
+                if style_line is not None:
+                    out.write(f"{_INDENT}{style_line}\n")
+            for style_line in relationship_styles:
+                out.write(f"{_INDENT}{style_line}\n")
+
+    def _write_boundary(
+        self,
+        index: ModelIndex,
+        boundary: ViewBoundary,
+        out: TextIO,
+        depth: int,
+        aliases: Set[str],
+        styled: List[IndexedElement],
+    ) -> None:
+        pad = _INDENT * depth
+        for element in boundary.elements:
+            out.write(f"{pad}{self._element(index, element)}\n")
+            aliases.add(element.id)
+            styled.append(element)
+        for child in boundary.boundaries:
+            out.write(f"{pad}{self._boundary(child)} {{\n")
+            if child.element is not None:
+                aliases.add(child.element.id)
+            self._write_boundary(index, child, out, depth + 1, aliases, styled)
+            out.write(f"{pad}}}\n")
+
+    def _element(self, index: ModelIndex, element: IndexedElement) -> str:
+        kind = index.instantiated_kind(element)
+        macro = _MACROS.get(kind, 'System')
+        shape = index.element_style(element).shape
+        if kind != 'Person':
+            if shape == Shape.Cylinder:
+                macro += 'Db'
+            elif shape == Shape.Pipe:
+                macro += 'Queue'
+        if element.external and kind in ('Person', 'SoftwareSystem', 'Container', 'Component'):
+            macro += '_Ext'
+
+        arguments = [_alias(element.id), _string(element.name)]
+        if macro.startswith(('Container', 'Component')):
+            arguments.append(_string(element.technology))
+        arguments.append(_string(element.description))
+        return f"{macro}({', '.join(arguments)})"
+
+    def _boundary(self, boundary: ViewBoundary) -> str:
+        element = boundary.element
+        if element is None:
+            alias = re.sub(r'\W', '_', boundary.id)
+            return f"Boundary({alias}, {_string(boundary.group)}, \"Group\")"
+        if element.kind == 'DeploymentNode':
+            name = element.name
+            instances = getattr(element.model, 'instances', None)
+            if instances and str(instances) != '1':
+                name = f"{name} (x{instances})"
+            return (
+                f"Deployment_Node({_alias(element.id)}, {_string(name)}, "
+                f"{_string(element.technology)}, {_string(element.description)})"
+            )
+        macro = _BOUNDARY_MACROS.get(element.kind, 'Boundary')
+        return f"{macro}({_alias(element.id)}, {_string(element.name)})"
+
+    def _relationship(
+        self,
+        index: ModelIndex,
+        kind: ViewKind,
+        relationship_view: RelationshipView,
+        aliases: Set[str],
+    ) -> Tuple[Optional[str], Optional[str]]:
+        relationship = index.relationships.get(relationship_view.id or '')
+        if relationship is None:
+            return None, None
+        source, destination = relationship.sourceId, relationship.destinationId
+        if relationship_view.response:
+            source, destination = destination, source
+        if source not in aliases or destination not in aliases:
+            return None, None
+
+        source_alias, destination_alias = _alias(source or ''), _alias(destination or '')
+        arguments = [
+            source_alias,
+            destination_alias,
+            _string(relationship_view.description or relationship.description),
+        ]
+        if relationship.technology:
+            arguments.append(_string(relationship.technology))
+        if kind == 'Dynamic' and relationship_view.order:
+            line = f"RelIndex({relationship_view.order}, {', '.join(arguments)})"
+        else:
+            line = f"Rel({', '.join(arguments)})"
+
+        style = index.relationship_style(relationship, RelationshipStyle(tag='Relationship'))
+        style_line = None
+        if style.color:
+            style_line = (
+                f"UpdateRelStyle({source_alias}, {destination_alias}, "
+                f"$textColor={_string(style.color)}, $lineColor={_string(style.color)})"
+            )
+        return line, style_line
+
+    def _element_style(self, index: ModelIndex, element: IndexedElement) -> Optional[str]:
+        style = index.element_style(element, ElementStyle(tag='Element'))
+        parameters = [
+            f"${name}={_string(value)}"
+            for name, value in (
+                ('fontColor', style.color),
+                ('bgColor', style.background),
+                ('borderColor', style.stroke),
+            )
+            if value
+        ]
+        if not parameters:
+            return None
+        return f"UpdateElementStyle({_alias(element.id)}, {', '.join(parameters)})"
+
+
+def _order_key(relationship_view: RelationshipView) -> Tuple[int, ...]:
+    """Sorts the steps of a dynamic view by their order, e.g., '1.2' before '1.10'."""
+    parts = re.findall(r'\d+', relationship_view.order or '')
+    return tuple(int(part) for part in parts)
+
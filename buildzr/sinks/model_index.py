@@ -0,0 +1,448 @@
+"""
+Lookups over a workspace's model, shared by the sinks that export the views
+themselves (i.e., without the JVM).
+"""
+
+import dataclasses
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
+from buildzr.models.models import (
+    ComponentView,
+    ContainerInstance,
+    ContainerView,
+    CustomView,
+    DeploymentNode,
+    DeploymentView,
+    DynamicView,
+    ElementStyle,
+    Person,
+    Relationship,
+    RelationshipStyle,
+    SoftwareSystem,
+    SoftwareSystemInstance,
+    SystemContextView,
+    SystemLandscapeView,
+    Workspace,
+)
+
+ElementKind = Literal[
+    'Person',
+    'SoftwareSystem',
+    'Container',
+    'Component',
+    'DeploymentNode',
+    'InfrastructureNode',
+    'SoftwareSystemInstance',
+    'ContainerInstance',
+    'CustomElement',
+]
+
+ViewKind = Literal[
+    'SystemLandscape',
+    'SystemContext',
+    'Container',
+    'Component',
+    'Dynamic',
+    'Deployment',
+    'Custom',
+]
+
+View = Union[
+    SystemLandscapeView,
+    SystemContextView,
+    ContainerView,
+    ComponentView,
+    DynamicView,
+    DeploymentView,
+    CustomView,
+]
+
+@dataclass
+class IndexedElement:
+
+    """
+    An element of the model, with what's needed to draw it.
+
+    For software system and container instances, the name, description,
+    technology and location are the ones of the instantiated element, and the
+    tags are the ones of the instantiated element followed by the ones of the
+    instance.
+
+    Attributes:
+        id: The ID of the element.
+        kind: The type of the element.
+        name: The name of the element.
+        description: The description of the element, if any.
+        technology: The technology of the element, if any.
+        tags: The tags of the element, in order.
+        group: The group of the element, if any.
+        parent_id: The ID of the parent element (e.g., the software system of
+            a container, or the deployment node of an instance), if any.
+        external: Whether the element is marked as external.
+        model: The model of the element.
+    """
+
+    id: str
+    kind: ElementKind
+    name: str
+    description: Optional[str] = None
+    technology: Optional[str] = None
+    tags: List[str] = field(default_factory=list)
+    group: Optional[str] = None
+    parent_id: Optional[str] = None
+    external: bool = False
+    model: Any = None
+
+def split_tags(tags: Optional[str]) -> List[str]:
+    """
+    Splits comma-separated tags, dropping the empty ones and the duplicates.
+    """
+    result: List[str] = []
+    for tag in (tags or '').split(','):
+        tag = tag.strip()
+        if tag and tag not in result:
+            result.append(tag)
+    return result
+
+def iter_views(workspace: Workspace) -> Iterator[Tuple[ViewKind, View]]:
+
+    """
+    Yields the views of the `workspace` that show elements, with their type.
+
+    Filtered views and image views are not yielded.
+    """
+
+    views = workspace.views
+    if views is None:
+        return
+
+    kinds: List[Tuple[ViewKind, Optional[List[Any]]]] = [
+        ('SystemLandscape', views.systemLandscapeViews),
+        ('SystemContext', views.systemContextViews),
+        ('Container', views.containerViews),
+        ('Component', views.componentViews),
+        ('Dynamic', views.dynamicViews),
+        ('Deployment', views.deploymentViews),
+        ('Custom', views.customViews),
+    ]
+    for kind, views_of_kind in kinds:
+        for view in views_of_kind or []:
+            yield kind, view
+
+def view_scope_id(view: View) -> Optional[str]:
+    """
+    Returns the ID of the element a view is scoped to (e.g., the software
+    system of a container view), if any.
+    """
+    if isinstance(view, (SystemContextView, ContainerView, DeploymentView)):
+        return view.softwareSystemId
+    if isinstance(view, ComponentView):
+        return view.containerId
+    if isinstance(view, DynamicView):
+        return view.elementId
+    return None
+
+class ModelIndex:
+
+    """
+    Indexes the elements, relationships and styles of a workspace by ID and
+    tag.
+
+    Example:
+        >>> index = ModelIndex(workspace)
+        >>> index.elements['1'].name
+        'User'
+        >>> index.element_style(index.elements['1']).background
+        '#08427b'
+    """
+
+    def __init__(self, workspace: Workspace) -> None:
+        self.workspace = workspace
+        self.elements: Dict[str, IndexedElement] = {}
+        self.relationships: Dict[str, Relationship] = {}
+
+        self.group_separator: Optional[str] = None
+        self._element_styles: Dict[str, List[ElementStyle]] = {}
+        self._relationship_styles: Dict[str, List[RelationshipStyle]] = {}
+
+        model = workspace.model
+        if model is not None:
+            properties = model.properties or {}
+            self.group_separator = properties.get('structurizr.groupSeparator')
+
+            for person in model.people or []:
+                self._add(self._element('Person', person, external=self._is_external(person)))
+            for software_system in model.softwareSystems or []:
+                self._add(self._element('SoftwareSystem', software_system, external=self._is_external(software_system)))
+                for container in software_system.containers or []:
+                    self._add(self._element('Container', container, parent_id=software_system.id))
+                    for component in container.components or []:
+                        self._add(self._element('Component', component, parent_id=container.id))
+            for custom_element in model.customElements or []:
+                self._add(self._element('CustomElement', custom_element, technology=custom_element.metadata))
+            for deployment_node in model.deploymentNodes or []:
+                self._add_deployment_node(deployment_node, None)
+
+        views = workspace.views
+        styles = views.configuration.styles if views and views.configuration else None
+        for element_style in (styles.elements if styles else None) or []:
+            if element_style.tag:
+                self._element_styles.setdefault(element_style.tag, []).append(element_style)
+        for relationship_style in (styles.relationships if styles else None) or []:
+            if relationship_style.tag:
+                self._relationship_styles.setdefault(relationship_style.tag, []).append(relationship_style)
+
+    @staticmethod
+    def _is_external(model: Union[Person, SoftwareSystem]) -> bool:
+        return model.location is not None and model.location.value == 'External'
+
+    @staticmethod
+    def _element(
+        kind: ElementKind,
+        model: Any,
+        parent_id: Optional[str]=None,
+        technology: Optional[str]=None,
+        external: bool=False,
+    ) -> IndexedElement:
+        return IndexedElement(
+            id=model.id,
+            kind=kind,
+            name=model.name or '',
+            description=model.description or None,
+            technology=technology or getattr(model, 'technology', None) or None,
+            tags=split_tags(model.tags),
+            group=getattr(model, 'group', None) or None,
+            parent_id=parent_id,
+            external=external,
+            model=model,
+        )
+
+    def _add(self, element: IndexedElement) -> None:
+        self.elements[element.id] = element
+        for relationship in element.model.relationships or []:
+            self.relationships[relationship.id] = relationship
+
+    def _add_deployment_node(self, deployment_node: DeploymentNode, parent_id: Optional[str]) -> None:
+        self._add(self._element('DeploymentNode', deployment_node, parent_id=parent_id))
+        for child in deployment_node.children or []:
+            self._add_deployment_node(child, deployment_node.id)
+        for infrastructure_node in deployment_node.infrastructureNodes or []:
+            self._add(self._element('InfrastructureNode', infrastructure_node, parent_id=deployment_node.id))
+        instances: List[Tuple[ElementKind, Union[SoftwareSystemInstance, ContainerInstance], Optional[str]]] = [
+            ('SoftwareSystemInstance', instance, instance.softwareSystemId)
+            for instance in deployment_node.softwareSystemInstances or []
+        ]
+        instances.extend(
+            ('ContainerInstance', instance, instance.containerId)
+            for instance in deployment_node.containerInstances or []
+        )
+        # The deployment nodes are indexed last, so the instantiated elements
+        # are already indexed.
+        for kind, instance, instantiated_id in instances:
+            instantiated = self.elements.get(instantiated_id or '')
+            self._add(IndexedElement(
+                id=instance.id,
+                kind=kind,
+                name=instantiated.name if instantiated else '',
+                description=instantiated.description if instantiated else None,
+                technology=instantiated.technology if instantiated else None,
+                tags=split_tags(','.join((instantiated.tags if instantiated else []) + split_tags(instance.tags))),
+                parent_id=deployment_node.id,
+                external=instantiated.external if instantiated else False,
+                model=instance,
+            ))
+
+    def ancestors(self, element_id: str) -> List[IndexedElement]:
+        """
+        Returns the ancestors of an element, from its parent to the
+        outermost one.
+        """
+        result: List[IndexedElement] = []
+        element = self.elements.get(element_id)
+        while element is not None and element.parent_id is not None:
+            element = self.elements.get(element.parent_id)
+            if element is not None:
+                result.append(element)
+        return result
+
+    def instantiated_kind(self, element: IndexedElement) -> ElementKind:
+        """
+        Returns the type of the element instantiated by a software system or
+        container instance, or the type of the `element` itself otherwise.
+        """
+        if element.kind == 'SoftwareSystemInstance':
+            return 'SoftwareSystem'
+        if element.kind == 'ContainerInstance':
+            return 'Container'
+        return element.kind
+
+    def element_style(self, element: IndexedElement, base: Optional[ElementStyle]=None) -> ElementStyle:
+
+        """
+        Returns the style of an element, combining the styles of its tags.
+
+        The styles are applied on top of `base` in the order of the tags of
+        the element, the `Element` tag first, so a style of a later tag
+        overrides the properties set by the styles of the earlier tags.
+        """
+
+        style = dataclasses.replace(base) if base else ElementStyle(tag='Element')
+        for tag in sorted(element.tags, key=lambda t: t != 'Element'):
+            for tag_style in self._element_styles.get(tag, []):
+                style = _apply(style, tag_style)
+        return style
+
+    def relationship_style(self, relationship: Relationship, base: Optional[RelationshipStyle]=None) -> RelationshipStyle:
+
+        """
+        Returns the style of a relationship, combining the styles of its tags,
+        the `Relationship` tag first.
+        """
+
+        style = dataclasses.replace(base) if base else RelationshipStyle(tag='Relationship')
+        tags = split_tags(relationship.tags)
+        if 'Relationship' not in tags:
+            tags.insert(0, 'Relationship')
+        for tag in sorted(tags, key=lambda t: t != 'Relationship'):
+            for tag_style in self._relationship_styles.get(tag, []):
+                style = _apply(style, tag_style)
+        return style
+
+    def group_path(self, element: IndexedElement) -> List[str]:
+        """
+        Returns the names of the nested groups of an element, from the
+        outermost one.
+        """
+        if not element.group:
+            return []
+        if not self.group_separator:
+            return [element.group]
+        return element.group.split(self.group_separator)
+
+def _apply(style: Any, override: Any) -> Any:
+    """
+    Returns a copy of `style` with the properties set by `override`.
+    """
+    changes = {
+        f.name: getattr(override, f.name)
+        for f in dataclasses.fields(override)
+        if f.name != 'tag' and getattr(override, f.name) is not None
+    }
+    return dataclasses.replace(style, **changes)
+
+@dataclass
+class ViewBoundary:
+
+    """
+    A boundary drawn around elements of a view: either an element containing
+    other elements of the view (e.g., a software system around its
+    containers), or a group.
+
+    Attributes:
+        key: The path of the boundary from the outermost one, unique in the
+            view, e.g., `('boundary', '2', 'group', 'Company')`.
+        element: The element the boundary is drawn for, or `None` for a group
+            (and for the root of the view).
+        group: The name of the group, for a group.
+        elements: The elements drawn directly inside the boundary.
+        boundaries: The boundaries nested directly inside the boundary.
+    """
+
+    key: Tuple[str, ...]
+    element: Optional[IndexedElement] = None
+    group: Optional[str] = None
+    elements: List[IndexedElement] = field(default_factory=list)
+    boundaries: List['ViewBoundary'] = field(default_factory=list)
+
+    @property
+    def id(self) -> str:
+        """The key of the boundary, as a string."""
+        return '_'.join(self.key)
+
+    def walk(self) -> Iterator['ViewBoundary']:
+        """Yields the boundary and the boundaries nested inside, depth first."""
+        yield self
+        for boundary in self.boundaries:
+            yield from boundary.walk()
+
+    def first_element(self) -> Optional[IndexedElement]:
+        """Returns the first element drawn inside the boundary, if any."""
+        for boundary in self.walk():
+            if boundary.elements:
+                return boundary.elements[0]
+        return None
+
+def nest_view(index: ModelIndex, kind: ViewKind, view: View) -> ViewBoundary:
+
+    """
+    Nests the elements of a view in their boundaries.
+
+    The elements that contain other elements of the view (e.g., a deployment
+    node and its instances) are drawn as boundaries around them, and so are
+    the element a container, component or dynamic view is scoped to and the
+    deployment nodes of the elements of a deployment view. Within each
+    boundary, the elements are nested in the boundaries of their groups.
+
+    Returns:
+        The root of the view, with no element.
+    """
+
+    element_ids = [element.id for element in view.elements or [] if element.id in index.elements]
+    in_view = set(element_ids)
+
+    boundary_ids: Set[str] = set()
+    for element_id in element_ids:
+        for ancestor in index.ancestors(element_id):
+            if ancestor.id in in_view or (kind == 'Deployment' and ancestor.kind == 'DeploymentNode'):
+                boundary_ids.add(ancestor.id)
+    scope_id = view_scope_id(view)
+    if kind in ('Container', 'Component', 'Dynamic') and scope_id in index.elements:
+        boundary_ids.add(cast(str, scope_id))
+
+    root = ViewBoundary(key=())
+    boundaries: Dict[Tuple[str, ...], ViewBoundary] = {(): root}
+
+    def boundary(parent: ViewBoundary, key: Tuple[str, ...], **fields: Any) -> ViewBoundary:
+        key = parent.key + key
+        if key not in boundaries:
+            boundaries[key] = ViewBoundary(key=key, **fields)
+            parent.boundaries.append(boundaries[key])
+        return boundaries[key]
+
+    def parent_of(element: IndexedElement) -> ViewBoundary:
+        # The innermost boundary of the element, and then its groups.
+        parent = root
+        for ancestor in index.ancestors(element.id):
+            if ancestor.id in boundary_ids:
+                parent = element_boundary(ancestor)
+                break
+        group_path: List[str] = []
+        for group in index.group_path(element):
+            group_path.append(group)
+            parent = boundary(parent, ('group', '/'.join(group_path)), group=group)
+        return parent
+
+    def element_boundary(element: IndexedElement) -> ViewBoundary:
+        return boundary(parent_of(element), ('boundary', element.id), element=element)
+
+    for element_id in element_ids:
+        element = index.elements[element_id]
+        if element_id in boundary_ids:
+            element_boundary(element)
+        else:
+            parent_of(element).elements.append(element)
+    for boundary_id in sorted(boundary_ids):
+        element_boundary(index.elements[boundary_id])
+
+    return root
@@ -1,10 +1,12 @@
 """PlantUML sink for exporting workspaces to PlantUML diagrams."""
 
 import os
+import threading
 from dataclasses import dataclass
 from typing import Optional, Literal, Any
 from buildzr.models.models import Workspace
 from buildzr.sinks.interfaces import Sink
+from buildzr.profiling import span, traced
 
 
 @dataclass
@@ -48,6 +50,25 @@ class PlantUmlSink(Sink[PlantUmlSinkConfig]):
         Returns:
             Dictionary mapping view keys to PlantUML source strings.
 
+        Raises:
+            ImportError: If jpype1 is not installed (install with: pip install buildzr[export-plantuml])
+            FileNotFoundError: If structurizr-export JAR cannot be found
+        """
+        return self.export_java(self.to_java(workspace))
+
+    def to_java(self, workspace: Workspace) -> Any:
+        """
+        Convert the workspace to a Java workspace, ready to be exported.
+
+        This starts the JVM if needed, and enables the C4-PlantUML tags in
+        the `workspace` (see `_ensure_c4plantuml_tags_enabled`).
+
+        Args:
+            workspace: The workspace to convert
+
+        Returns:
+            The Java com.structurizr.Workspace object.
+
         Raises:
             ImportError: If jpype1 is not installed (install with: pip install buildzr[export-plantuml])
             FileNotFoundError: If structurizr-export JAR cannot be found
@@ -69,9 +90,19 @@ class PlantUmlSink(Sink[PlantUmlSinkConfig]):
         # Convert workspace to Java
         from buildzr.exporters.workspace_converter import WorkspaceConverter
         converter = WorkspaceConverter()
-        java_workspace = converter.to_java(workspace)
+        return converter.to_java(workspace)
+
+    def export_java(self, java_workspace: Any) -> dict[str, str]:
+        """
+        Export the views of a Java workspace (see `to_java`) to PlantUML
+        strings.
+
+        Args:
+            java_workspace: Java com.structurizr.Workspace object
 
-        # Export and return
+        Returns:
+            Dictionary mapping view keys to PlantUML source strings.
+        """
         return self._export_workspace(java_workspace)
 
     def render_to_svg_dict(self, workspace: Workspace) -> dict[str, str]:
@@ -99,6 +130,31 @@ class PlantUmlSink(Sink[PlantUmlSinkConfig]):
 
         return result
 
+    # PlantUML isn't known to be safe to use from several threads at once.
+    _render_lock = threading.Lock()
+
+    def render(self, puml_content: str, format: str) -> bytes:
+        """
+        Render PlantUML content to an image, starting the JVM if needed.
+
+        The images are rendered one at a time, even when this is called from
+        several threads.
+
+        Args:
+            puml_content: PlantUML source string
+            format: Output format ('svg' or 'png')
+
+        Returns:
+            Image content as bytes.
+
+        Raises:
+            ImportError: If jpype1 is not installed (install with: pip install buildzr[export-plantuml])
+        """
+        self._ensure_jvm_started(PlantUmlSinkConfig(path=''))
+        with self._render_lock:
+            return self._render_to_bytes(puml_content, format)
+
+    @traced()
     def _render_to_bytes(self, puml_content: str, format: str) -> bytes:
         """
         Render PlantUML content to image bytes.
@@ -249,40 +305,19 @@ class PlantUmlSink(Sink[PlantUmlSinkConfig]):
         # Get all views from workspace
         views = java_workspace.getViews()
 
-        # Export system landscape views
-        for view in views.getSystemLandscapeViews():
-            diagram = exporter.export(view)
-            diagrams[str(view.getKey())] = str(diagram.getDefinition())
-
-        # Export system context views
-        for view in views.getSystemContextViews():
-            diagram = exporter.export(view)
-            diagrams[str(view.getKey())] = str(diagram.getDefinition())
-
-        # Export container views
-        for view in views.getContainerViews():
-            diagram = exporter.export(view)
-            diagrams[str(view.getKey())] = str(diagram.getDefinition())
-
-        # Export component views
-        for view in views.getComponentViews():
-            diagram = exporter.export(view)
-            diagrams[str(view.getKey())] = str(diagram.getDefinition())
-
-        # Export deployment views
-        for view in views.getDeploymentViews():
-            diagram = exporter.export(view)
-            diagrams[str(view.getKey())] = str(diagram.getDefinition())
-
-        # Export dynamic views
-        for view in views.getDynamicViews():
-            diagram = exporter.export(view)
-            diagrams[str(view.getKey())] = str(diagram.getDefinition())
-
-        # Export custom views
-        for view in views.getCustomViews():
-            diagram = exporter.export(view)
-            diagrams[str(view.getKey())] = str(diagram.getDefinition())
+        for java_views in (
+            views.getSystemLandscapeViews(),
+            views.getSystemContextViews(),
+            views.getContainerViews(),
+            views.getComponentViews(),
+            views.getDeploymentViews(),
+            views.getDynamicViews(),
+            views.getCustomViews(),
+        ):
+            for view in java_views:
+                with span('C4PlantUMLExporter.export', key=str(view.getKey())):
+                    diagram = exporter.export(view)
+                diagrams[str(view.getKey())] = str(diagram.getDefinition())
 
         return diagrams
 
@@ -0,0 +1,672 @@
+"""Structurizr DSL sink for exporting workspaces to `workspace.dsl` text."""
+
+import io
+import os
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+)
+from buildzr.models.models import (
+    AutomaticLayout,
+    DeploymentNode,
+    ElementStyle,
+    Model,
+    Relationship,
+    RelationshipStyle,
+    RelationshipView,
+    SoftwareSystemInstance,
+    Workspace,
+)
+from buildzr.sinks.interfaces import Sink
+from buildzr.sinks.model_index import (
+    View,
+    ViewKind,
+    iter_views,
+    split_tags,
+    view_scope_id,
+)
+from buildzr.profiling import span
+
+
+@dataclass
+class StructurizrDslSinkConfig:
+    """
+    Configuration for Structurizr DSL export.
+
+    Attributes:
+        path: Output file path, e.g., 'workspace.dsl'
+    """
+
+    path: str
+
+
+# The tags Structurizr adds to each type of element, left out of the DSL.
+_DEFAULT_TAGS: Dict[str, Set[str]] = {
+    'person': {'Element', 'Person'},
+    'softwareSystem': {'Element', 'Software System'},
+    'container': {'Element', 'Container'},
+    'component': {'Element', 'Component'},
+    'deploymentNode': {'Element', 'Deployment Node'},
+    'infrastructureNode': {'Element', 'Infrastructure Node'},
+    'softwareSystemInstance': {'Software System Instance'},
+    'containerInstance': {'Container Instance'},
+    'element': {'Element'},
+    'relationship': {'Relationship'},
+}
+
+# The keywords of the DSL, never used as identifiers.
+_KEYWORDS = {
+    'workspace', 'model', 'views', 'configuration', 'enterprise', 'group',
+    'person', 'softwaresystem', 'container', 'component', 'element',
+    'deploymentenvironment', 'deploymentgroup', 'deploymentnode',
+    'infrastructurenode', 'softwaresysteminstance', 'containerinstance',
+    'healthcheck', 'properties', 'perspectives', 'url', 'tags', 'tag',
+    'description', 'technology', 'instances', 'this', 'relationship',
+    'systemlandscape', 'systemcontext', 'filtered', 'dynamic', 'deployment',
+    'custom', 'image', 'include', 'exclude', 'autolayout', 'default',
+    'animation', 'title', 'styles', 'theme', 'themes', 'branding',
+    'terminology', 'users', 'scope', 'visibility', 'docs', 'adrs',
+    'identifiers', 'impliedrelationships', 'constant', 'ref', 'extend',
+}
+
+_RANK_DIRECTIONS = {
+    'TopBottom': 'tb',
+    'BottomTop': 'bt',
+    'LeftRight': 'lr',
+    'RightLeft': 'rl',
+}
+
+_VIEW_KEYWORDS: Dict[ViewKind, str] = {
+    'SystemLandscape': 'systemLandscape',
+    'SystemContext': 'systemContext',
+    'Container': 'container',
+    'Component': 'component',
+    'Dynamic': 'dynamic',
+    'Deployment': 'deployment',
+    'Custom': 'custom',
+}
+
+_INDENT = '    '
+
+
+def _string(value: Any) -> str:
+    """Quotes a DSL string, on a single line."""
+    text = ' '.join(str(value if value is not None else '').split())
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _number(value: float) -> str:
+    """Formats a number without a trailing `.0`."""
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _arguments(*values: Optional[str]) -> str:
+    """
+    Quotes the positional arguments of a statement, dropping the trailing
+    empty ones.
+    """
+    arguments = list(values)
+    while arguments and not arguments[-1]:
+        arguments.pop()
+    return ' '.join(_string(argument) for argument in arguments)
+
+
+def _order_key(relationship_view: RelationshipView) -> Tuple[int, ...]:
+    """Sorts the steps of a dynamic view by their order, e.g., '1.2' before '1.10'."""
+    parts = re.findall(r'\d+', relationship_view.order or '')
+    return tuple(int(part) for part in parts)
+
+
+class StructurizrDslSink(Sink[StructurizrDslSinkConfig]):
+    """
+    Sink for exporting a workspace to the Structurizr DSL (`workspace.dsl`).
+
+    The model, the views and the styles are written statement by statement
+    to the file, so the output is never held in memory: only the identifier
+    of each element is kept, to write the relationships and the views. The
+    identifiers are generated from the names of the elements (e.g., `api`,
+    `api_2`), in the order of the model, so the output diffs well.
+
+    The relationships implied by other relationships (see
+    `implied_relationships`) and the relationships of the deployment
+    instances, which Structurizr adds again when it parses the DSL, are left
+    out. The positions of the elements aren't written.
+
+    Examples:
+        >>> from buildzr.sinks.structurizr_dsl_sink import StructurizrDslSink, StructurizrDslSinkConfig
+        >>> sink = StructurizrDslSink()
+        >>> config = StructurizrDslSinkConfig(path='workspace.dsl')
+        >>> sink.write(workspace, config)
+    """
+
+    def export_to_string(self, workspace: Workspace) -> str:
+        """
+        Export the workspace to a Structurizr DSL string without writing files.
+
+        Args:
+            workspace: The workspace to export
+
+        Returns:
+            The Structurizr DSL source.
+        """
+        out = io.StringIO()
+        self.write_to(workspace, out)
+        return out.getvalue()
+
+    def write(self, workspace: Workspace, config: Optional[StructurizrDslSinkConfig] = None) -> None:
+        """
+        Export the workspace to a Structurizr DSL file.
+
+        Args:
+            workspace: The workspace to export
+            config: Optional configuration. If None, writes `workspace.dsl` to
+                the current directory
+        """
+        if config is None:
+            config = StructurizrDslSinkConfig(path=os.path.join(os.curdir, 'workspace.dsl'))
+
+        directory = os.path.dirname(config.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(config.path, 'w', encoding='utf-8') as f:
+            self.write_to(workspace, f)
+        print(f"Exported: {config.path}")
+
+    def write_to(self, workspace: Workspace, out: TextIO) -> None:
+        """
+        Write the workspace to `out` as Structurizr DSL, statement by statement.
+
+        Args:
+            workspace: The workspace to export
+            out: The text stream written to, e.g., an open file
+        """
+        with span('StructurizrDslSink.export'):
+            _DslWriter(workspace, out).write()
+
+
+class _DslWriter:
+
+    """Writes one workspace to one stream, keeping the identifiers generated."""
+
+    def __init__(self, workspace: Workspace, out: TextIO) -> None:
+        self.workspace = workspace
+        self.out = out
+        self.depth = 0
+        self.identifiers: Dict[str, str] = {}
+        self.taken: Set[str] = set()
+        # The next suffix to try for each name, so that many elements with
+        # the same name don't make generating identifiers quadratic.
+        self.suffixes: Dict[str, int] = {}
+
+        model = workspace.model
+        properties = (model.properties if model else None) or {}
+        self.group_separator: Optional[str] = properties.get('structurizr.groupSeparator')
+
+    # Output.
+
+    def line(self, text: str) -> None:
+        self.out.write(f"{_INDENT * self.depth}{text}\n")
+
+    def open(self, text: str) -> None:
+        self.line(f"{text} {{")
+        self.depth += 1
+
+    def close(self) -> None:
+        self.depth -= 1
+        self.line("}")
+
+    # Identifiers.
+
+    def identify(self, element_id: Optional[str], name: Optional[str]) -> str:
+        """
+        Generates the identifier of an element from its name, unique in the
+        workspace.
+        """
+        base = re.sub(r'[^a-z0-9]+', '_', (name or '').lower()).strip('_')
+        if not base or not base[0].isalpha():
+            base = f"element_{base}".rstrip('_')
+        identifier = base
+        suffix = self.suffixes.get(base, 2)
+        while identifier in self.taken or identifier in _KEYWORDS:
+            identifier = f"{base}_{suffix}"
+            suffix += 1
+        self.suffixes[base] = suffix
+        self.taken.add(identifier)
+        if element_id is not None:
+            self.identifiers[element_id] = identifier
+        return identifier
+
+    def identifier(self, element_id: Optional[str]) -> Optional[str]:
+        return self.identifiers.get(element_id or '')
+
+    # Workspace.
+
+    def write(self) -> None:
+        workspace = self.workspace
+        self.open(f"workspace {_arguments(workspace.name or 'Workspace', workspace.description)}")
+        if workspace.model is not None:
+            self.write_model(workspace.model)
+        if workspace.views is not None:
+            self.write_views()
+        scope = workspace.configuration.scope if workspace.configuration is not None else None
+        if scope is not None:
+            self.open("configuration")
+            self.line(f"scope {scope.value.lower()}")
+            self.close()
+        self.close()
+
+    def write_properties(self, properties: Optional[Dict[str, Any]]) -> None:
+        if not properties:
+            return
+        self.open("properties")
+        for name, value in properties.items():
+            self.line(f"{_string(name)} {_string(value)}")
+        self.close()
+
+    def write_element_block(self, element: Any) -> None:
+        if element.url:
+            self.line(f"url {_string(element.url)}")
+        self.write_properties(element.properties)
+        if element.perspectives:
+            self.open("perspectives")
+            for perspective in element.perspectives:
+                self.line(_arguments(perspective.name, perspective.description, perspective.value))
+            self.close()
+
+    @staticmethod
+    def has_block(element: Any, *children: Optional[List[Any]]) -> bool:
+        return bool(element.url or element.properties or element.perspectives or any(children))
+
+    @staticmethod
+    def tags(keyword: str, tags: Optional[str]) -> str:
+        """The tags of an element or a relationship, without the default ones."""
+        default = _DEFAULT_TAGS[keyword]
+        return ','.join(sorted(tag for tag in split_tags(tags) if tag not in default))
+
+    # Model.
+
+    def write_model(self, model: Model) -> None:
+        self.open("model")
+        self.write_properties(model.properties)
+
+        with self.grouped() as group:
+            for person in model.people or []:
+                group(person.group)
+                self.write_element('person', person, person.description, self.tags('person', person.tags))
+            for software_system in model.softwareSystems or []:
+                group(software_system.group)
+                self.write_software_system(software_system)
+            for custom_element in model.customElements or []:
+                group(None)
+                self.write_element('element', custom_element, custom_element.metadata, custom_element.description, self.tags('element', custom_element.tags))
+
+        environments: List[str] = []
+        for deployment_node in model.deploymentNodes or []:
+            environment = deployment_node.environment or 'Default'
+            if environment not in environments:
+                environments.append(environment)
+        for environment in environments:
+            self.write_deployment_environment(model, environment)
+
+        for relationship in self.relationships(model):
+            self.write_relationship(relationship)
+
+        self.close()
+
+    def grouped(self) -> '_Groups':
+        return _Groups(self)
+
+    def write_element(self, keyword: str, element: Any, *arguments: Optional[str]) -> None:
+        identifier = self.identify(element.id, element.name)
+        statement = f"{identifier} = {keyword} {_arguments(element.name, *arguments)}"
+        if self.has_block(element):
+            self.open(statement)
+            self.write_element_block(element)
+            self.close()
+        else:
+            self.line(statement)
+
+    def write_software_system(self, software_system: Any) -> None:
+        identifier = self.identify(software_system.id, software_system.name)
+        statement = f"{identifier} = softwareSystem {_arguments(software_system.name, software_system.description, self.tags('softwareSystem', software_system.tags))}"
+        if not self.has_block(software_system, software_system.containers):
+            self.line(statement)
+            return
+        self.open(statement)
+        self.write_element_block(software_system)
+        with self.grouped() as group:
+            for container in software_system.containers or []:
+                group(container.group)
+                self.write_container(container)
+        self.close()
+
+    def write_container(self, container: Any) -> None:
+        identifier = self.identify(container.id, container.name)
+        statement = f"{identifier} = container {_arguments(container.name, container.description, container.technology, self.tags('container', container.tags))}"
+        if not self.has_block(container, container.components):
+            self.line(statement)
+            return
+        self.open(statement)
+        self.write_element_block(container)
+        with self.grouped() as group:
+            for component in container.components or []:
+                group(component.group)
+                self.write_element('component', component, component.description, component.technology, self.tags('component', component.tags))
+        self.close()
+
+    def write_deployment_environment(self, model: Model, environment: str) -> None:
+        nodes = [node for node in model.deploymentNodes or [] if (node.environment or 'Default') == environment]
+
+        self.open(f"deploymentEnvironment {_string(environment)}")
+
+        # The deployment groups are declared before the instances in them.
+        deployment_groups: Dict[str, str] = {}
+        for element in (e for node in nodes for e in _deployment_elements(node)):
+            for deployment_group in getattr(element, 'deploymentGroups', None) or []:
+                if deployment_group != 'Default' and deployment_group not in deployment_groups:
+                    deployment_groups[deployment_group] = self.identify(None, deployment_group)
+                    self.line(f"{deployment_groups[deployment_group]} = deploymentGroup {_string(deployment_group)}")
+
+        for node in nodes:
+            self.write_deployment_node(node, deployment_groups)
+        self.close()
+
+    def write_deployment_node(self, node: DeploymentNode, deployment_groups: Dict[str, str]) -> None:
+        identifier = self.identify(node.id, node.name)
+        instances = node.instances if node.instances and str(node.instances) != '1' else None
+        statement = f"{identifier} = deploymentNode {_arguments(node.name, node.description, node.technology, self.tags('deploymentNode', node.tags), instances)}"
+        children: List[Optional[List[Any]]] = [node.children, node.infrastructureNodes, node.softwareSystemInstances, node.containerInstances]
+        if not self.has_block(node, *children):
+            self.line(statement)
+            return
+
+        self.open(statement)
+        self.write_element_block(node)
+        for child in node.children or []:
+            self.write_deployment_node(child, deployment_groups)
+        for infrastructure_node in node.infrastructureNodes or []:
+            self.write_element('infrastructureNode', infrastructure_node, infrastructure_node.description, infrastructure_node.technology, self.tags('infrastructureNode', infrastructure_node.tags))
+        for instance in _instances(node):
+            self.write_instance(instance, deployment_groups)
+        self.close()
+
+    def write_instance(self, instance: Any, deployment_groups: Dict[str, str]) -> None:
+        if isinstance(instance, SoftwareSystemInstance):
+            keyword, instantiated = 'softwareSystemInstance', self.identifier(instance.softwareSystemId)
+        else:
+            keyword, instantiated = 'containerInstance', self.identifier(instance.containerId)
+        if instantiated is None:
+            return
+
+        identifier = self.identify(instance.id, f"{instantiated}_instance")
+        groups = ','.join(
+            deployment_groups[deployment_group]
+            for deployment_group in instance.deploymentGroups or []
+            if deployment_group in deployment_groups
+        )
+        tags = self.tags(keyword, instance.tags)
+        statement = f"{identifier} = {keyword} {instantiated}"
+        if groups or tags:
+            statement += f" {_string(groups)}"
+        if tags:
+            statement += f" {_string(tags)}"
+
+        if instance.properties or instance.perspectives or instance.healthChecks:
+            self.open(statement)
+            self.write_properties(instance.properties)
+            for health_check in instance.healthChecks or []:
+                arguments = [_string(health_check.name), _string(health_check.url)]
+                if health_check.interval is not None:
+                    arguments.append(_number(health_check.interval))
+                if health_check.timeout is not None:
+                    arguments.append(_number(health_check.timeout))
+                self.line(f"healthCheck {' '.join(arguments)}")
+            self.close()
+        else:
+            self.line(statement)
+
+    def relationships(self, model: Model) -> Iterator[Relationship]:
+        """
+        Yields the relationships of the model, but the ones Structurizr
+        implies from other relationships.
+        """
+        for element in _elements(model):
+            for relationship in element.relationships or []:
+                if relationship.linkedRelationshipId is None:
+                    yield relationship
+
+    def write_relationship(self, relationship: Relationship) -> None:
+        source = self.identifier(relationship.sourceId)
+        destination = self.identifier(relationship.destinationId)
+        if source is None or destination is None:
+            return
+        statement = f"{source} -> {destination} {_arguments(relationship.description, relationship.technology, self.tags('relationship', relationship.tags))}".rstrip()
+        if relationship.url or relationship.properties or relationship.perspectives:
+            self.open(statement)
+            self.write_element_block(relationship)
+            self.close()
+        else:
+            self.line(statement)
+
+    # Views.
+
+    def write_views(self) -> None:
+        views = self.workspace.views
+        assert views is not None
+        self.open("views")
+
+        for kind, view in iter_views(self.workspace):
+            self.write_view(kind, view)
+
+        for filtered_view in views.filteredViews or []:
+            mode = filtered_view.mode.value.lower() if filtered_view.mode else 'include'
+            arguments = _arguments(filtered_view.key, filtered_view.description)
+            self.line(f"filtered {_string(filtered_view.baseViewKey)} {mode} {_string(','.join(filtered_view.tags or []))} {arguments}".rstrip())
+
+        configuration = views.configuration
+        if configuration is not None:
+            self.write_styles(configuration.styles.elements if configuration.styles else None, configuration.styles.relationships if configuration.styles else None)
+            if configuration.themes:
+                self.line(f"themes {' '.join(configuration.themes)}")
+            branding = configuration.branding
+            if branding is not None and (branding.logo or branding.font):
+                self.open("branding")
+                if branding.logo:
+                    self.line(f"logo {_string(branding.logo)}")
+                if branding.font:
+                    self.line(f"font {_arguments(branding.font.name, branding.font.url)}")
+                self.close()
+
+        self.close()
+
+    def write_view(self, kind: ViewKind, view: View) -> None:
+        keyword = _VIEW_KEYWORDS[kind]
+        if kind == 'Custom':
+            statement = f"{keyword} {_arguments(view.key, view.title, view.description)}"
+        else:
+            scope: List[str] = []
+            if kind in ('SystemContext', 'Container', 'Component', 'Dynamic', 'Deployment'):
+                scope.append(self.identifier(view_scope_id(view)) or '*')
+            if kind == 'Deployment':
+                scope.append(_string(getattr(view, 'environment', None) or 'Default'))
+            statement = ' '.join([keyword, *scope, _arguments(view.key, view.description)]).rstrip()
+
+        self.open(statement)
+        if kind != 'Custom' and view.title:
+            self.line(f"title {_string(view.title)}")
+
+        if kind == 'Dynamic':
+            self.write_steps(view)
+        else:
+            self.write_view_elements(view)
+
+        if view.automaticLayout is not None:
+            self.write_automatic_layout(view.automaticLayout)
+        self.close()
+
+    def write_view_elements(self, view: View) -> None:
+        element_ids: Set[str] = set()
+        for element_view in view.elements or []:
+            identifier = self.identifier(element_view.id)
+            if identifier is not None and element_view.id is not None:
+                element_ids.add(element_view.id)
+                self.line(f"include {identifier}")
+
+        # Structurizr shows the relationships between the elements included,
+        # so the ones the view leaves out are excluded.
+        model = self.workspace.model
+        if model is None:
+            return
+        relationship_ids = {relationship_view.id for relationship_view in view.relationships or []}
+        shown: Set[Tuple[str, str]] = set()
+        hidden: List[Tuple[str, str]] = []
+        for element in _elements(model):
+            for relationship in element.relationships or []:
+                if relationship.sourceId not in element_ids or relationship.destinationId not in element_ids:
+                    continue
+                pair = (relationship.sourceId, relationship.destinationId)
+                if relationship.id in relationship_ids:
+                    shown.add(pair)
+                elif relationship.linkedRelationshipId is None and pair not in hidden:
+                    hidden.append(pair)
+        for source, destination in hidden:
+            if (source, destination) not in shown:
+                self.line(f"exclude \"{self.identifier(source)} -> {self.identifier(destination)}\"")
+
+    def write_steps(self, view: View) -> None:
+        model = self.workspace.model
+        steps = sorted(view.relationships or [], key=_order_key)
+        wanted = {step.id for step in steps}
+        relationships: Dict[str, Relationship] = {}
+        if model is not None:
+            for element in _elements(model):
+                for relationship in element.relationships or []:
+                    if relationship.id in wanted and relationship.id is not None:
+                        relationships[relationship.id] = relationship
+
+        for step in steps:
+            relationship = relationships.get(step.id or '')
+            if relationship is None:
+                continue
+            source, destination = relationship.sourceId, relationship.destinationId
+            if step.response:
+                source, destination = destination, source
+            source_identifier, destination_identifier = self.identifier(source), self.identifier(destination)
+            if source_identifier is None or destination_identifier is None:
+                continue
+            arguments = _arguments(step.description or relationship.description, relationship.technology)
+            self.line(f"{source_identifier} -> {destination_identifier} {arguments}".rstrip())
+
+    def write_automatic_layout(self, automatic_layout: AutomaticLayout) -> None:
+        statement = "autoLayout"
+        if automatic_layout.rankDirection is not None:
+            statement += f" {_RANK_DIRECTIONS[automatic_layout.rankDirection.value]}"
+            if automatic_layout.rankSeparation is not None:
+                statement += f" {_number(automatic_layout.rankSeparation)}"
+                if automatic_layout.nodeSeparation is not None:
+                    statement += f" {_number(automatic_layout.nodeSeparation)}"
+        self.line(statement)
+
+    # Styles.
+
+    def write_styles(
+        self,
+        element_styles: Optional[List[ElementStyle]],
+        relationship_styles: Optional[List[RelationshipStyle]],
+    ) -> None:
+        if not element_styles and not relationship_styles:
+            return
+        self.open("styles")
+        for element_style in element_styles or []:
+            self.write_style('element', element_style)
+        for relationship_style in relationship_styles or []:
+            self.write_style('relationship', relationship_style)
+        self.close()
+
+    def write_style(self, keyword: str, style: Any) -> None:
+        self.open(f"{keyword} {_string(style.tag)}")
+        for name, value in vars(style).items():
+            if name == 'tag' or value is None:
+                continue
+            if isinstance(value, Enum):
+                text = value.value
+            elif isinstance(value, bool):
+                text = 'true' if value else 'false'
+            elif isinstance(value, (int, float)):
+                text = _number(value)
+            elif name in ('background', 'stroke', 'color') and str(value).startswith('#'):
+                text = str(value)
+            else:
+                text = _string(value)
+            self.line(f"{name} {text}")
+        self.close()
+
+
+class _Groups:
+
+    """
+    Opens and closes the `group` blocks around a run of elements, as the
+    group of the elements changes.
+    """
+
+    def __init__(self, writer: _DslWriter) -> None:
+        self.writer = writer
+        self.path: List[str] = []
+
+    def __enter__(self) -> '_Groups':
+        return self
+
+    def __call__(self, group: Optional[str]) -> None:
+        path: List[str] = []
+        if group:
+            separator = self.writer.group_separator
+            path = group.split(separator) if separator else [group]
+        common = 0
+        while common < min(len(path), len(self.path)) and path[common] == self.path[common]:
+            common += 1
+        for _ in self.path[common:]:
+            self.writer.close()
+        for name in path[common:]:
+            self.writer.open(f"group {_string(name)}")
+        self.path = path
+
+    def __exit__(self, *args: Any) -> None:
+        self(None)
+
+
+def _instances(node: DeploymentNode) -> Iterator[Any]:
+    yield from node.softwareSystemInstances or []
+    yield from node.containerInstances or []
+
+
+def _elements(model: Model) -> Iterator[Any]:
+    """Yields the elements of the model, nested elements included."""
+    yield from model.people or []
+    for software_system in model.softwareSystems or []:
+        yield software_system
+        for container in software_system.containers or []:
+            yield container
+            yield from container.components or []
+    yield from model.customElements or []
+
+    for node in model.deploymentNodes or []:
+        yield from _deployment_elements(node)
+
+
+def _deployment_elements(node: DeploymentNode) -> Iterator[Any]:
+    """Yields a deployment node and the elements nested in it."""
+    yield node
+    for child in node.children or []:
+        yield from _deployment_elements(child)
+    yield from node.infrastructureNodes or []
+    yield from _instances(node)
@@ -0,0 +1,15 @@
+"""Utilities for testing buildzr and the tools built on it."""
+
+from buildzr.testing.synthetic import (
+    SyntheticConfig,
+    generate_workspace,
+    generate_workspace_dict,
+    write_workspace_json,
+)
+
+__all__ = [
+    "SyntheticConfig",
+    "generate_workspace",
+    "generate_workspace_dict",
+    "write_workspace_json",
+]
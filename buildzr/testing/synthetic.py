@@ -0,0 +1,538 @@
+"""
+Seeded generator of synthetic C4 workspaces, for scale and stress testing.
+
+The generator first draws a plan of the workspace (the elements, their
+groups, the relationships between them and the deployments) from a seeded
+random generator, and then either builds the plan with the DSL
+(`generate_workspace`), or writes it directly as a Structurizr JSON
+workspace (`generate_workspace_dict` and `write_workspace_json`). The latter
+is much cheaper, and is meant for stress testing the loaders and the
+exporters without the overhead of building the workspace in Python.
+
+Example:
+    >>> from buildzr.testing import SyntheticConfig, generate_workspace
+    >>> config = SyntheticConfig(software_systems=100, distribution='power_law')
+    >>> w = generate_workspace(config)
+"""
+
+import contextlib
+import itertools
+import json
+import random
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from buildzr.dsl import (
+    Workspace,
+    Group,
+    Person,
+    SoftwareSystem,
+    Container,
+    Component,
+    DeploymentEnvironment,
+    DeploymentNode,
+    DeploymentGroup,
+    ContainerInstance,
+)
+from buildzr.dsl.interfaces import DslElement
+
+T = TypeVar('T')
+
+Distribution = Literal['uniform', 'power_law']
+
+_TECHNOLOGIES = ['HTTPS', 'gRPC', 'SQL', 'AMQP', 'Kafka']
+
+@dataclass
+class SyntheticConfig:
+
+    """
+    Configuration of a synthetic workspace.
+
+    Attributes:
+        seed: Seed of the random generator. The same configuration always
+            generates the same workspace.
+        people: Number of people.
+        software_systems: Number of software systems.
+        containers_per_software_system: Number of containers in each software
+            system.
+        components_per_container: Number of components in each container.
+        fan_out: Average number of outgoing relationships of each person (to
+            software systems), container (to containers of other software
+            systems), and component (to sibling components). The actual
+            number for each element is drawn uniformly from `0` to
+            `2 * fan_out`.
+        distribution: How the destinations of the relationships are picked.
+            With `'uniform'`, every candidate is equally likely. With
+            `'power_law'`, the `i`-th candidate is picked with a probability
+            proportional to `1 / (i + 1) ** power_law_exponent`, so that a few
+            hubs receive most of the relationships.
+        power_law_exponent: The exponent of the `'power_law'` distribution.
+        group_depth: Depth of the nested groups that the people and the
+            software systems (and hence their containers and components) are
+            placed in. `0` means no groups.
+        groups_per_level: Number of groups at each level of nesting.
+        deployment_environments: Number of deployment environments.
+        deployment_node_depth: Depth of the chain of nested deployment nodes
+            that each software system is deployed to, in each environment.
+        instances_per_container: Number of container instances of each
+            container in the innermost deployment node (replication).
+        deployment_groups: Number of deployment groups in each environment.
+            The instances of each container are assigned to the groups in a
+            round-robin fashion, and implied relationships are only created
+            between the instances in the same group. `0` means all instances
+            are in the default group.
+    """
+
+    seed: int = 0
+    people: int = 10
+    software_systems: int = 10
+    containers_per_software_system: int = 3
+    components_per_container: int = 3
+    fan_out: int = 2
+    distribution: Distribution = 'uniform'
+    power_law_exponent: float = 1.2
+    group_depth: int = 0
+    groups_per_level: int = 2
+    deployment_environments: int = 0
+    deployment_node_depth: int = 1
+    instances_per_container: int = 1
+    deployment_groups: int = 0
+
+    @classmethod
+    def for_size(cls, size: int, **kwargs: Any) -> 'SyntheticConfig':
+
+        """
+        Returns a configuration for a workspace of approximately `size`
+        elements (people, software systems, containers, and components), with
+        the default shape. Any other attribute can be given as keyword
+        arguments.
+        """
+
+        config = cls(**kwargs)
+        per_software_system = 1 + config.containers_per_software_system * \
+            (1 + config.components_per_container)
+        config.software_systems = max(1, size // per_software_system)
+        config.people = max(1, size - config.software_systems * per_software_system)
+        return config
+
+# An element of the plan is referred to by its path of indices, e.g.,
+# ('container', 3, 1) is the second container of the fourth software system.
+_Ref = Tuple[Any, ...]
+
+@dataclass
+class _PlannedRelationship:
+    source: _Ref
+    destination: _Ref
+    description: str
+    technology: str
+
+@dataclass
+class _PlannedInstance:
+    software_system: int
+    container: int
+    deployment_group: Optional[str]
+
+@dataclass
+class _PlannedNode:
+    name: str
+    children: List['_PlannedNode'] = field(default_factory=list)
+    instances: List[_PlannedInstance] = field(default_factory=list)
+
+@dataclass
+class _Plan:
+    people: List[Tuple[str, List[str]]]
+    software_systems: List[Tuple[str, List[str]]]
+    containers: List[List[Tuple[str, str]]]
+    components: List[List[List[str]]]
+    relationships: List[_PlannedRelationship]
+    environments: List[Tuple[str, List[str], List[_PlannedNode]]]
+
+def _picker(
+    rng: random.Random,
+    candidates: Sequence[T],
+    distribution: Distribution,
+    exponent: float,
+) -> Callable[[int], List[T]]:
+
+    """
+    Returns a function that picks the given number of `candidates` (with
+    replacement) according to the distribution.
+    """
+
+    cum_weights: Optional[List[float]] = None
+    if distribution == 'power_law':
+        cum_weights = list(itertools.accumulate(
+            1 / (i + 1) ** exponent for i in range(len(candidates))
+        ))
+    elif distribution != 'uniform':
+        raise ValueError(f"Invalid distribution: '{distribution}'. Use 'uniform' or 'power_law'.")
+
+    return lambda count: rng.choices(candidates, cum_weights=cum_weights, k=count)
+
+def _make_plan(config: SyntheticConfig) -> _Plan:
+
+    rng = random.Random(config.seed)
+
+    def group_path(i: int) -> List[str]:
+        path: List[str] = []
+        for level in range(config.group_depth):
+            path.append(f"group {level}.{i % config.groups_per_level}")
+            i //= config.groups_per_level
+        return path
+
+    people = [(f"person {i}", group_path(i)) for i in range(config.people)]
+    software_systems = [
+        (f"software system {i}", group_path(i))
+        for i in range(config.software_systems)
+    ]
+    containers = [
+        [
+            (f"container {i}.{j}", rng.choice(_TECHNOLOGIES))
+            for j in range(config.containers_per_software_system)
+        ]
+        for i in range(config.software_systems)
+    ]
+    components = [
+        [
+            [f"component {i}.{j}.{k}" for k in range(config.components_per_container)]
+            for j in range(config.containers_per_software_system)
+        ]
+        for i in range(config.software_systems)
+    ]
+
+    relationships: List[_PlannedRelationship] = []
+
+    def add_relationships(
+        sources: Sequence[_Ref],
+        candidates: Sequence[_Ref],
+        description: str,
+        technology: Optional[str],
+        excluded: Any,
+    ) -> None:
+        if not candidates:
+            return
+        pick = _picker(rng, candidates, config.distribution, config.power_law_exponent)
+        for source in sources:
+            count = rng.randint(0, 2 * config.fan_out)
+            seen = set()
+            for destination in pick(count):
+                if destination in seen or excluded(source, destination):
+                    continue
+                seen.add(destination)
+                relationships.append(_PlannedRelationship(
+                    source=source,
+                    destination=destination,
+                    description=description,
+                    technology=technology if technology is not None else rng.choice(_TECHNOLOGIES),
+                ))
+
+    add_relationships(
+        [('person', i) for i in range(config.people)],
+        [('software_system', i) for i in range(config.software_systems)],
+        "Uses",
+        "",
+        lambda s, d: False,
+    )
+    all_containers = [
+        ('container', i, j)
+        for i in range(config.software_systems)
+        for j in range(config.containers_per_software_system)
+    ]
+    add_relationships(
+        all_containers,
+        all_containers,
+        "Uses",
+        None,
+        lambda s, d: s[1] == d[1],
+    )
+    for i in range(config.software_systems):
+        for j in range(config.containers_per_software_system):
+            siblings = [('component', i, j, k) for k in range(config.components_per_container)]
+            add_relationships(siblings, siblings, "Calls", "", lambda s, d: s == d)
+
+    environments: List[Tuple[str, List[str], List[_PlannedNode]]] = []
+    for e in range(config.deployment_environments):
+        environment = f"environment {e}"
+        deployment_groups = [f"deployment group {e}.{g}" for g in range(config.deployment_groups)]
+        roots: List[_PlannedNode] = []
+        for i in range(config.software_systems):
+            root = node = _PlannedNode(name=f"node {e}.{i}.0")
+            for d in range(1, config.deployment_node_depth):
+                child = _PlannedNode(name=f"node {e}.{i}.{d}")
+                node.children.append(child)
+                node = child
+            for j in range(config.containers_per_software_system):
+                for r in range(config.instances_per_container):
+                    node.instances.append(_PlannedInstance(
+                        software_system=i,
+                        container=j,
+                        deployment_group=deployment_groups[r % len(deployment_groups)] if deployment_groups else None,
+                    ))
+            roots.append(root)
+        environments.append((environment, deployment_groups, roots))
+
+    return _Plan(
+        people=people,
+        software_systems=software_systems,
+        containers=containers,
+        components=components,
+        relationships=relationships,
+        environments=environments,
+    )
+
+@contextlib.contextmanager
+def _groups(path: Sequence[str]) -> Iterator[None]:
+    with contextlib.ExitStack() as stack:
+        for name in path:
+            stack.enter_context(Group(name))
+        yield
+
+def generate_workspace(
+    config: Optional[SyntheticConfig]=None,
+    name: str="Synthetic",
+    implied_relationships: bool=False,
+) -> Workspace:
+
+    """
+    Generates a workspace with the DSL, as described by `config`.
+
+    Args:
+        config: The shape of the workspace. Defaults to `SyntheticConfig()`.
+        name: The name of the workspace.
+        implied_relationships: Passed to the `Workspace`.
+
+    Returns:
+        The generated workspace.
+    """
+
+    plan = _make_plan(config or SyntheticConfig())
+
+    elements: Dict[_Ref, DslElement] = {}
+
+    with Workspace(name, implied_relationships=implied_relationships) as w:
+
+        for i, (person_name, path) in enumerate(plan.people):
+            with _groups(path):
+                elements[('person', i)] = Person(person_name)
+
+        for i, (software_system_name, path) in enumerate(plan.software_systems):
+            with _groups(path):
+                with SoftwareSystem(software_system_name) as software_system:
+                    elements[('software_system', i)] = software_system
+                    for j, (container_name, technology) in enumerate(plan.containers[i]):
+                        with Container(container_name, technology=technology) as container:
+                            elements[('container', i, j)] = container
+                            for k, component_name in enumerate(plan.components[i][j]):
+                                elements[('component', i, j, k)] = Component(component_name)
+
+        for r in plan.relationships:
+            elements[r.source].uses(
+                elements[r.destination],
+                description=r.description,
+                technology=r.technology,
+            )
+
+        for environment_name, deployment_group_names, roots in plan.environments:
+            deployment_groups = {n: DeploymentGroup(n) for n in deployment_group_names}
+
+            def build(node: _PlannedNode) -> None:
+                with DeploymentNode(node.name):
+                    for instance in node.instances:
+                        container = elements[('container', instance.software_system, instance.container)]
+                        assert isinstance(container, Container)
+                        ContainerInstance(
+                            container,
+                            deployment_groups=[deployment_groups[instance.deployment_group]] if instance.deployment_group else None,
+                        )
+                    for child in node.children:
+                        build(child)
+
+            with DeploymentEnvironment(environment_name):
+                for root in roots:
+                    build(root)
+
+    return w
+
+def generate_workspace_dict(
+    config: Optional[SyntheticConfig]=None,
+    name: str="Synthetic",
+) -> Dict[str, Any]:
+
+    """
+    Generates the workspace described by `config` directly as a Structurizr
+    JSON workspace (as a dictionary), without building it with the DSL.
+
+    The result has the same shape as the JSON of the workspace built by
+    `generate_workspace` with the same configuration, including the
+    relationships between the container instances implied from the
+    relationships between their containers. The element IDs may differ.
+    """
+
+    plan = _make_plan(config or SyntheticConfig())
+
+    ids = itertools.count(1)
+    elements: Dict[_Ref, Dict[str, Any]] = {}
+
+    def element(ref: _Ref, tags: str, **fields: Any) -> Dict[str, Any]:
+        e: Dict[str, Any] = {'id': str(next(ids)), **fields, 'tags': tags, 'properties': {}, 'relationships': []}
+        elements[ref] = e
+        return e
+
+    def group(path: Sequence[str]) -> Dict[str, str]:
+        return {'group': '/'.join(path)} if path else {}
+
+    people = [
+        element(('person', i), 'Element,Person', name=person_name, description="", location='Unspecified', **group(path))
+        for i, (person_name, path) in enumerate(plan.people)
+    ]
+
+    software_systems: List[Dict[str, Any]] = []
+    for i, (software_system_name, path) in enumerate(plan.software_systems):
+        software_system = element(
+            ('software_system', i), 'Element,Software System',
+            name=software_system_name, description="", location='Unspecified', **group(path),
+        )
+        software_system['containers'] = []
+        software_system['documentation'] = {}
+        for j, (container_name, technology) in enumerate(plan.containers[i]):
+            container = element(
+                ('container', i, j), 'Element,Container',
+                name=container_name, description="", technology=technology, **group(path),
+            )
+            container['components'] = [
+                element(
+                    ('component', i, j, k), 'Element,Component',
+                    name=component_name, description="", technology="", **group(path),
+                )
+                for k, component_name in enumerate(plan.components[i][j])
+            ]
+            software_system['containers'].append(container)
+        software_systems.append(software_system)
+
+    def relationship(
+        source: Dict[str, Any],
+        destination: Dict[str, Any],
+        description: str,
+        technology: str,
+        **fields: Any,
+    ) -> Dict[str, Any]:
+        r = {
+            'id': str(next(ids)),
+            'description': description,
+            'tags': 'Relationship',
+            'sourceId': source['id'],
+            'destinationId': destination['id'],
+            'technology': technology,
+            **fields,
+        }
+        source['relationships'].append(r)
+        return r
+
+    container_relationships: List[Tuple[_Ref, _Ref, Dict[str, Any]]] = []
+    for r in plan.relationships:
+        model = relationship(elements[r.source], elements[r.destination], r.description, r.technology)
+        if r.source[0] == 'container':
+            container_relationships.append((r.source, r.destination, model))
+
+    deployment_nodes: List[Dict[str, Any]] = []
+    for environment_name, _, roots in plan.environments:
+
+        # Container ref -> [(instance, deployment group)]
+        instances: Dict[_Ref, List[Tuple[Dict[str, Any], str]]] = {}
+
+        def node_dict(node: _PlannedNode) -> Dict[str, Any]:
+            n: Dict[str, Any] = {
+                'id': str(next(ids)),
+                'name': node.name,
+                'description': "",
+                'technology': "",
+                'environment': environment_name,
+                'instances': "1",
+                'tags': 'Element,Deployment Node',
+                'infrastructureNodes': [],
+                'softwareSystemInstances': [],
+                'containerInstances': [],
+            }
+            for instance in node.instances:
+                ref = ('container', instance.software_system, instance.container)
+                deployment_group = instance.deployment_group or "Default"
+                container_instance = {
+                    'id': str(next(ids)),
+                    'containerId': elements[ref]['id'],
+                    'environment': environment_name,
+                    'tags': 'Container Instance',
+                    'deploymentGroups': [deployment_group],
+                    'relationships': [],
+                }
+                n['containerInstances'].append(container_instance)
+                instances.setdefault(ref, []).append((container_instance, deployment_group))
+            n['children'] = [node_dict(child) for child in node.children]
+            return n
+
+        deployment_nodes.extend(node_dict(root) for root in roots)
+
+        for source, destination, model in container_relationships:
+            for source_instance, source_group in instances.get(source, []):
+                for destination_instance, destination_group in instances.get(destination, []):
+                    if source_group != destination_group:
+                        continue
+                    relationship(
+                        source_instance,
+                        destination_instance,
+                        model['description'],
+                        model['technology'],
+                        linkedRelationshipId=model['id'],
+                    )
+
+    return {
+        'id': 1,
+        'name': name,
+        'description': "",
+        'model': {
+            'people': people,
+            'softwareSystems': software_systems,
+            'deploymentNodes': deployment_nodes,
+            'properties': {
+                'structurizr.groupSeparator': '/',
+            },
+        },
+        'documentation': {},
+        'configuration': {
+            'scope': 'SoftwareSystem',
+        },
+    }
+
+def write_workspace_json(
+    path: str,
+    config: Optional[SyntheticConfig]=None,
+    name: str="Synthetic",
+    pretty: bool=False,
+) -> str:
+
+    """
+    Writes the workspace described by `config` directly to a `workspace.json`
+    file. See `generate_workspace_dict`.
+
+    Returns:
+        The path of the written file.
+    """
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(
+            generate_workspace_dict(config, name=name),
+            f,
+            ensure_ascii=False,
+            indent=4 if pretty else None,
+        )
+    return path
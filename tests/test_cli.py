@@ -0,0 +1,255 @@
+import os
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from buildzr.cli import main
+from buildzr.cli.build import Builder, MANIFEST_NAME
+from buildzr.cli.definitions import load_definition
+from buildzr.cli.outputs import atomic_write
+from buildzr.cli.watch import Watcher
+
+MODEL = """
+from buildzr.dsl import Workspace, Person, SoftwareSystem, SystemContextView, SystemLandscapeView
+from names import SYSTEM
+
+with Workspace('My Workspace') as w:
+    user = Person('user')
+    system = SoftwareSystem(SYSTEM)
+    user >> "Uses" >> system
+    SystemContextView(system, key='context', description="Context")
+    SystemLandscapeView(key='landscape', description="Landscape")
+"""
+
+def _write(path: str, content: str) -> None:
+    with open(path, 'w') as f:
+        f.write(content)
+    # Make sure the change is seen even on file systems with a coarse mtime.
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+@pytest.fixture
+def model(tmp_path: Any) -> str:
+    _write(os.path.join(tmp_path, 'names.py'), "SYSTEM = 'system'\n")
+    path = os.path.join(tmp_path, 'model.py')
+    _write(path, MODEL)
+    return path
+
+def test_load_definition(model: str) -> Optional[None]:
+
+    definition = load_definition(model)
+    assert [w.model.name for w in definition.workspaces] == ['My Workspace']
+    assert definition.dependencies == sorted([
+        model,
+        os.path.join(os.path.dirname(model), 'names.py'),
+    ])
+
+    # The local modules are reloaded, and the IDs are the same each time.
+    first_id = definition.workspaces[0].model.model.people[0].id
+    _write(os.path.join(os.path.dirname(model), 'names.py'), "SYSTEM = 'renamed'\n")
+    definition = load_definition(model)
+    assert definition.workspaces[0].model.model.softwareSystems[0].name == 'renamed'
+    assert definition.workspaces[0].model.model.people[0].id == first_id
+
+def test_load_definition_without_workspace(tmp_path: Any) -> Optional[None]:
+
+    path = os.path.join(tmp_path, 'empty.py')
+    _write(path, "x = 1\n")
+    with pytest.raises(ValueError):
+        load_definition(path)
+
+def test_watch_json(model: str, tmp_path: Any) -> Optional[None]:
+
+    out = os.path.join(tmp_path, 'out')
+    watcher = Watcher([model], out=out, format='json')
+
+    assert watcher.rebuild() == [os.path.join(out, 'my_workspace.json')]
+    assert watcher.changed() == []
+    assert watcher.rebuild() == []
+
+    _write(os.path.join(os.path.dirname(model), 'names.py'), "SYSTEM = 'renamed'\n")
+    assert watcher.changed() == [os.path.join(os.path.dirname(model), 'names.py')]
+    assert watcher.rebuild() == [os.path.join(out, 'my_workspace.json')]
+    with open(os.path.join(out, 'my_workspace.json')) as f:
+        assert 'renamed' in f.read()
+
+def test_watch_rerenders_changed_views_only(model: str, tmp_path: Any) -> Optional[None]:
+
+    class FakeSink:
+        def __init__(self) -> None:
+            self.rendered: List[str] = []
+        def export_to_dict(self, workspace: Any) -> Dict[str, str]:
+            assert workspace.views is not None
+            return {
+                str(view.key): f"@startuml\n{view.key} {sorted(e.id for e in view.elements)}\n@enduml"
+                for view in [*(workspace.views.systemContextViews or []), *(workspace.views.systemLandscapeViews or [])]
+            }
+        def render(self, puml: str, format: str) -> bytes:
+            self.rendered.append(puml.splitlines()[1].split()[0])
+            return puml.encode('utf-8')
+
+    out = os.path.join(tmp_path, 'out')
+    sink = FakeSink()
+    watcher = Watcher([model], out=out, format='svg')
+    watcher._sink = sink
+
+    written = watcher.rebuild()
+    assert sorted(os.path.basename(p) for p in written) == [
+        'my_workspace-context.puml', 'my_workspace-context.svg',
+        'my_workspace-landscape.puml', 'my_workspace-landscape.svg',
+    ]
+    assert sorted(sink.rendered) == ['context', 'landscape']
+
+    # Nothing changed: nothing is exported nor rendered.
+    sink.rendered.clear()
+    assert watcher.rebuild() == []
+    assert sink.rendered == []
+
+    # A person only in the landscape view.
+    _write(model, MODEL + "    Person('admin')\n")
+    written = watcher.rebuild()
+    assert sorted(os.path.basename(p) for p in written) == ['my_workspace-landscape.puml', 'my_workspace-landscape.svg']
+    assert sink.rendered == ['landscape']
+
+    # The views of another workspace with the same keys don't overwrite them.
+    _write(model, MODEL + "    Person('admin')\n\nwith Workspace('Other') as other:\n    SystemLandscapeView(key='landscape', description='')\n")
+    written = watcher.rebuild()
+    assert sorted(os.path.basename(p) for p in written) == ['other-landscape.puml', 'other-landscape.svg']
+    assert os.path.exists(os.path.join(out, 'my_workspace-landscape.svg'))
+
+def test_watch_run_survives_errors(model: str, tmp_path: Any) -> Optional[None]:
+
+    logs: List[str] = []
+    _write(model, "raise RuntimeError('broken')\n")
+    watcher = Watcher([model], out=str(tmp_path), format='json', interval=0.01, log=logs.append)
+    watcher.run(max_builds=1)
+    assert any('broken' in log for log in logs)
+    assert watcher.changed() == []
+
+def test_main_requires_a_command() -> Optional[None]:
+
+    with pytest.raises(SystemExit):
+        main([])
+
+def test_build_json(model: str, tmp_path: Any) -> Optional[None]:
+
+    out = os.path.join(tmp_path, 'out')
+    output = os.path.join(out, 'my_workspace.json')
+
+    assert main(['build', model, '--out', out, '--pretty']) == 0
+    assert os.path.exists(output)
+    assert os.path.exists(os.path.join(out, MANIFEST_NAME))
+    mtime = os.stat(output).st_mtime_ns
+
+    # Nothing changed: the workspace isn't even saved again.
+    builder = Builder(out=out, pretty=True, log=lambda _: None)
+    result = builder.build([model])
+    assert result.skipped == ['my_workspace:json']
+    assert result.written == []
+    assert os.stat(output).st_mtime_ns == mtime
+
+    # Forced: the workspace is saved, but the output has the same content.
+    result = Builder(out=out, pretty=True, force=True, log=lambda _: None).build([model])
+    assert result.unchanged == ['my_workspace.json']
+    assert os.stat(output).st_mtime_ns == mtime
+
+    # The output is rewritten when the model or the options change, or when
+    # the output was modified.
+    _write(os.path.join(os.path.dirname(model), 'names.py'), "SYSTEM = 'renamed'\n")
+    assert builder.build([model]).written == ['my_workspace.json']
+    assert Builder(out=out, log=lambda _: None).build([model]).written == ['my_workspace.json']
+    _write(output, "{}")
+    assert Builder(out=out, log=lambda _: None).build([model]).written == ['my_workspace.json']
+
+    # No staging directories nor temporary files are left behind.
+    assert sorted(os.listdir(out)) == [MANIFEST_NAME, 'my_workspace.json']
+
+@pytest.mark.parametrize("hash_seeds", [('1', '2'), ('3', '4')])
+def test_build_is_up_to_date_in_another_process(model: str, tmp_path: Any, hash_seeds: Any) -> Optional[None]:
+
+    # Each process orders the sets of tags differently, which mustn't change
+    # the output.
+    import subprocess
+    import sys
+
+    out = os.path.join(tmp_path, 'out')
+    output = os.path.join(out, 'my_workspace.json')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def build(hash_seed: str) -> None:
+        subprocess.run(
+            [sys.executable, '-c', 'import sys; from buildzr.cli import main; sys.exit(main(sys.argv[1:]))', 'build', model, '--out', out],
+            env={**os.environ, 'PYTHONHASHSEED': hash_seed, 'PYTHONPATH': root},
+            check=True,
+            capture_output=True,
+        )
+
+    build(hash_seeds[0])
+    mtime = os.stat(output).st_mtime_ns
+    build(hash_seeds[1])
+    assert os.stat(output).st_mtime_ns == mtime
+    assert Builder(out=out, log=lambda _: None).build([model]).skipped == ['my_workspace:json']
+
+def test_build_keeps_entries_of_other_definitions(model: str, tmp_path: Any) -> Optional[None]:
+
+    other = os.path.join(tmp_path, 'other.py')
+    _write(other, "from buildzr.dsl import Workspace, Person\nwith Workspace('Other') as w:\n    Person('p')\n")
+
+    out = os.path.join(tmp_path, 'out')
+    builder = Builder(out=out, log=lambda _: None)
+    builder.build([model, other])
+    assert builder.build([model]).skipped == ['my_workspace:json']
+    assert builder.build([other]).skipped == ['other:json']
+    assert sorted(os.listdir(out)) == [MANIFEST_NAME, 'my_workspace.json', 'other.json']
+
+def test_build_duplicate_names_write_nothing(model: str, tmp_path: Any) -> Optional[None]:
+
+    other = os.path.join(tmp_path, 'other.py')
+    _write(other, "from buildzr.dsl import Workspace, Person\nwith Workspace('My Workspace') as w:\n    Person('p')\n")
+
+    out = os.path.join(tmp_path, 'out')
+    with pytest.raises(ValueError, match="More than one workspace is named 'My Workspace'"):
+        Builder(out=out, log=lambda _: None).build([model, other])
+    assert not os.path.exists(out)
+
+def test_build_only_hashes_modified_outputs(model: str, tmp_path: Any, monkeypatch: Any) -> Optional[None]:
+
+    import buildzr.cli.build
+
+    out = os.path.join(tmp_path, 'out')
+    output = os.path.join(out, 'my_workspace.json')
+    builder = Builder(out=out, log=lambda _: None)
+    builder.build([model])
+
+    hashed: List[str] = []
+    file_sha256 = buildzr.cli.build.file_sha256
+    def tracking_file_sha256(path: str) -> str:
+        hashed.append(os.path.basename(path))
+        return file_sha256(path)
+    monkeypatch.setattr(buildzr.cli.build, 'file_sha256', tracking_file_sha256)
+
+    assert builder.build([model]).skipped == ['my_workspace:json']
+    assert hashed == []
+
+    # Touched, but not modified: hashed once, and still up to date.
+    stat = os.stat(output)
+    os.utime(output, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert builder.build([model]).skipped == ['my_workspace:json']
+    assert builder.build([model]).skipped == ['my_workspace:json']
+    assert hashed == ['my_workspace.json']
+
+def test_build_diagram_names() -> Optional[None]:
+
+    builder = Builder(out='out', log=lambda _: None)
+    assert builder._output_name('my_workspace', 'json', 'my_workspace.json') == 'my_workspace.json'
+    assert builder._output_name('my_workspace', 'svg', 'context.svg') == 'my_workspace-context.svg'
+    assert builder._output_name('my_workspace', 'plantuml', 'context.puml') == 'my_workspace-context.puml'
+
+def test_atomic_write(tmp_path: Any) -> Optional[None]:
+
+    path = os.path.join(tmp_path, 'dir', 'file.txt')
+    atomic_write(path, b'first')
+    atomic_write(path, b'second')
+    with open(path, 'rb') as f:
+        assert f.read() == b'second'
+    assert os.listdir(os.path.dirname(path)) == ['file.txt']
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from buildzr.dsl import (
+    Workspace,
+    Group,
+    Person,
+    SoftwareSystem,
+    Container,
+    DeploymentEnvironment,
+    DeploymentNode,
+    ContainerInstance,
+)
+from buildzr.dsl.explorer import Explorer
+from buildzr.dsl.factory import GenerateId
+
+WORKSPACES = 64
+THREADS = 8
+
+def _build(name: str, barrier: Optional[threading.Barrier]=None) -> Workspace:
+
+    """
+    Builds a workspace with nested groups and deployment nodes. With a
+    `barrier`, all the threads enter the contexts before any of them adds
+    elements, to maximize the interleaving.
+    """
+
+    with Workspace(name) as w:
+        with Group(f"{name}-outer"):
+            with Group(f"{name}-inner"):
+                if barrier:
+                    barrier.wait()
+                with SoftwareSystem(f"{name} system") as system:
+                    Container(f"{name} app")
+            Person(f"{name} user")
+        with DeploymentEnvironment('Production'):
+            with DeploymentNode(f"{name} server"):
+                with DeploymentNode(f"{name} runtime"):
+                    if barrier:
+                        barrier.wait()
+                    ContainerInstance(system.children[0])
+    return w
+
+async def _build_async(name: str) -> Workspace:
+
+    """
+    Same as `_build`, but yields to the other tasks inside each context.
+    """
+
+    with Workspace(name) as w:
+        with Group(f"{name}-outer"):
+            await asyncio.sleep(0)
+            with Group(f"{name}-inner"):
+                await asyncio.sleep(0)
+                with SoftwareSystem(f"{name} system") as system:
+                    await asyncio.sleep(0)
+                    Container(f"{name} app")
+            Person(f"{name} user")
+        with DeploymentEnvironment('Production'):
+            with DeploymentNode(f"{name} server"):
+                await asyncio.sleep(0)
+                with DeploymentNode(f"{name} runtime"):
+                    await asyncio.sleep(0)
+                    ContainerInstance(system.children[0])
+    return w
+
+def _check(w: Workspace) -> None:
+
+    name = w.model.name
+    assert w.model.model is not None
+
+    people = w.model.model.people or []
+    software_systems = w.model.model.softwareSystems or []
+    assert [p.name for p in people] == [f"{name} user"]
+    assert [s.name for s in software_systems] == [f"{name} system"]
+    assert people[0].group == f"{name}-outer"
+    assert software_systems[0].group == f"{name}-outer/{name}-inner"
+
+    roots = w.model.model.deploymentNodes or []
+    assert [n.name for n in roots] == [f"{name} server"]
+    children = roots[0].children or []
+    assert [n.name for n in children] == [f"{name} runtime"]
+    instances = children[0].containerInstances or []
+    assert len(instances) == 1
+    assert instances[0].containerId == (software_systems[0].containers or [])[0].id
+    assert not roots[0].containerInstances
+
+    ids = [str(e.model.id) for e in Explorer(w).walk_elements()]
+    ids.extend(str(r.model.id) for r in Explorer(w).walk_relationships())
+    assert len(ids) == len(set(ids))
+
+def _all_ids(workspaces: List[Workspace]) -> List[str]:
+    return [
+        str(e.model.id)
+        for w in workspaces
+        for e in Explorer(w).walk_elements()
+    ]
+
+def test_concurrent_builds_in_threads() -> Optional[None]:
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        workspaces = list(executor.map(_build, [f"w{i}" for i in range(WORKSPACES)]))
+
+    for w in workspaces:
+        _check(w)
+
+    ids = _all_ids(workspaces)
+    assert len(ids) == len(set(ids))
+
+def test_concurrent_builds_in_threads_interleaved() -> Optional[None]:
+
+    barrier = threading.Barrier(THREADS)
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        workspaces = list(executor.map(
+            lambda i: _build(f"w{i}", barrier),
+            range(THREADS),
+        ))
+
+    for w in workspaces:
+        _check(w)
+
+def test_concurrent_builds_in_asyncio_tasks() -> Optional[None]:
+
+    async def build_all() -> List[Workspace]:
+        return await asyncio.gather(*(_build_async(f"w{i}") for i in range(WORKSPACES)))
+
+    workspaces = asyncio.run(build_all())
+
+    for w in workspaces:
+        _check(w)
+
+    ids = _all_ids(workspaces)
+    assert len(ids) == len(set(ids))
+
+def test_concurrent_builds_leave_no_context_state() -> Optional[None]:
+
+    from buildzr.dsl.dsl import (
+        _current_workspace,
+        _current_group_stack,
+        _current_deployment_node_stack,
+    )
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        list(executor.map(_build, [f"w{i}" for i in range(THREADS)]))
+    asyncio.run(_build_async('async'))
+
+    assert _current_workspace.get() is None
+    assert _current_group_stack.get() == ()
+    assert _current_deployment_node_stack.get() == ()
+
+def test_concurrent_id_generation() -> Optional[None]:
+
+    def allocate(_: int) -> List[str]:
+        ids = [GenerateId.for_element() for _ in range(1000)]
+        ids.extend(GenerateId.for_elements(10))
+        return ids
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        ids = [i for batch in executor.map(allocate, range(THREADS * 4)) for i in batch]
+
+    assert len(ids) == len(set(ids))
+
+def test_concurrent_reads() -> Optional[None]:
+
+    from buildzr.dsl import expression
+
+    w = _build('w')
+
+    def read(_: int) -> Tuple[List[str], List[str], bool]:
+        explorer = Explorer(w)
+        elements = [str(e.model.id) for e in explorer.walk_elements()]
+        relationships = [str(r.model.id) for r in explorer.walk_relationships()]
+        e = expression.Expression(include_elements=[lambda w, e: e.type == SoftwareSystem])
+        return elements, relationships, len(list(e.elements(w))) == 1
+
+    expected = read(0)
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        results = list(executor.map(read, range(THREADS * 8)))
+
+    assert all(result == expected for result in results)
+    assert expected[2]
@@ -0,0 +1,94 @@
+import json
+import os
+from typing import Any, Optional
+
+from buildzr.diagnostics import memory_report
+from buildzr.dsl import (
+    Workspace,
+    Person,
+    SoftwareSystem,
+    Container,
+    SystemContextView,
+    ContainerView,
+)
+
+def test_memory_report() -> Optional[None]:
+
+    with Workspace('w') as w:
+        u = Person('user')
+        with SoftwareSystem('system', tags={'Internal'}) as s:
+            app = Container('app')
+            db = Container('db')
+            app >> "reads from" >> db
+        u >> "uses" >> s
+        SystemContextView(
+            software_system_selector=s,
+            key='ssv',
+            description="System context",
+        )
+        ContainerView(
+            software_system_selector=s,
+            key='cv',
+            description="Containers",
+        )
+
+    report = memory_report(w)
+
+    assert report.element_types['Container'].count == 2
+    assert report.element_types['Person'].count == 1
+    assert report.element_types['SoftwareSystem'].count == 1
+    for usage in report.element_types.values():
+        assert usage.wrappers > 0
+        assert usage.models > 0
+        assert usage.tags > 0
+    assert report.element_types['Person'].relationships > 0
+    assert report.element_types['SoftwareSystem'].relationships == 0
+
+    assert set(report.views) == {'ssv', 'cv'}
+    assert report.views['cv'].type == 'ContainerView'
+    assert report.views['cv'].elements == 2
+    assert report.views['cv'].relationships == 1
+    assert report.views['cv'].size > 0
+
+    assert report.subsystems['elements'] == sum(u.total for u in report.element_types.values())
+    assert report.subsystems['views'] == report.views['ssv'].size + report.views['cv'].size
+    assert report.subsystems['extended_model'] == 0
+    assert 'merged_model' not in report.subsystems
+    assert report.total == sum(report.subsystems.values())
+
+    data = json.loads(json.dumps(report.to_dict()))
+    assert data['total'] == report.total
+    assert data['element_types']['Container']['count'] == 2
+
+    text = report.format()
+    assert 'Container' in text
+    assert 'ssv' in text
+
+def test_memory_report_grows_with_the_model() -> Optional[None]:
+
+    def build(n: int) -> Workspace:
+        with Workspace('w') as w:
+            for i in range(n):
+                Person(f"user {i}")
+        return w
+
+    small = memory_report(build(10))
+    large = memory_report(build(100))
+    assert large.element_types['Person'].total > 5 * small.element_types['Person'].total
+
+def test_memory_report_extended_workspace(tmp_path: Any) -> Optional[None]:
+
+    with Workspace('base') as base:
+        Person('admin')
+        SoftwareSystem('legacy')
+    path = os.path.join(tmp_path, 'base.json')
+    base.save(path=path)
+
+    with Workspace('w', extend=path) as w:
+        u = Person('user')
+        u >> "uses" >> w.legacy
+
+    report = memory_report(w, include_merged=True)
+    assert report.element_types['Person'].count == 2
+    assert report.subsystems['extended_model'] > 0
+    assert report.subsystems['merged_model'] > 0
@@ -0,0 +1,182 @@
+import os
+import shutil
+import pytest
+from typing import Any, Optional
+
+from buildzr.dsl import (
+    Workspace,
+    Group,
+    Person,
+    SoftwareSystem,
+    Container,
+    Component,
+    ContainerInstance,
+    DeploymentEnvironment,
+    DeploymentNode,
+    InfrastructureNode,
+    SystemLandscapeView,
+    ContainerView,
+    ComponentView,
+    DeploymentView,
+    DynamicView,
+    StyleElements,
+    StyleRelationships,
+)
+from buildzr.models import Workspace as WorkspaceModel
+from buildzr.sinks import DotSink, DotSinkConfig
+
+@pytest.fixture
+def workspace() -> WorkspaceModel:
+
+    with Workspace('w') as w:
+        with Group('Company'):
+            with Group('Customers'):
+                user = Person('User')
+        with SoftwareSystem('Shop') as shop:
+            web = Container('Web', technology='React')
+            with Container('API', technology='Python') as api:
+                auth = Component('Auth')
+                repository = Component('Repository')
+                auth >> "Reads users from" >> repository
+            database = Container('Database', technology='PostgreSQL', tags={'Database'})
+            web >> "Calls" >> api
+            api >> "Reads from" >> database
+        browses = user >> "Browses" >> web
+        user >> "Buys from" >> shop
+
+        with DeploymentEnvironment('Production') as production:
+            with DeploymentNode('AWS') as aws:
+                with DeploymentNode('EC2', technology='Ubuntu'):
+                    ContainerInstance(api)
+                InfrastructureNode('Load Balancer', technology='ELB')
+
+        SystemLandscapeView(key='landscape', description='', auto_layout='lr')
+        ContainerView(software_system_selector=shop, key='containers', description='')
+        ComponentView(container_selector=api, key='components', description='')
+        DynamicView(key='dynamic', scope=shop, steps=[browses])
+        DeploymentView(production, key='deployment', software_system_selector=shop)
+        StyleElements(on=['Database'], shape='Cylinder', background='#ff0000', border='dashed')
+        StyleRelationships(on=[browses], dashed=False, color='green', thickness=4)
+
+    merged = w._merged_workspace()
+    assert merged.views is not None and merged.views.systemLandscapeViews
+    layout = merged.views.systemLandscapeViews[0].automaticLayout
+    assert layout is not None
+    layout.rankSeparation = 150
+    layout.nodeSeparation = 100
+    return merged
+
+def test_dot_sink_exports_every_view(workspace: WorkspaceModel) -> Optional[None]:
+
+    diagrams = DotSink().export_to_dict(workspace)
+
+    assert set(diagrams) == {'landscape', 'containers', 'components', 'dynamic', 'deployment'}
+    for key, dot in diagrams.items():
+        assert dot.startswith(f'digraph "{key}" {{')
+        assert dot.rstrip().endswith('}')
+        assert dot.count('{') == dot.count('}')
+
+def test_dot_sink_automatic_layout(workspace: WorkspaceModel) -> Optional[None]:
+
+    diagrams = DotSink().export_to_dict(workspace)
+
+    assert 'rankdir="LR"' in diagrams['landscape']
+    assert 'ranksep="2.08"' in diagrams['landscape']
+    assert 'nodesep="1.39"' in diagrams['landscape']
+    assert 'rankdir="TB"' in diagrams['containers']
+
+def test_dot_sink_styles(workspace: WorkspaceModel) -> Optional[None]:
+
+    dot = DotSink().export_to_dict(workspace)['containers']
+    lines = dot.splitlines()
+
+    user = next(line for line in lines if 'label=<<b>User</b>' in line)
+    assert 'fillcolor="#08427b"' in user
+    assert 'style="filled,rounded"' in user
+
+    web = next(line for line in lines if 'label=<<b>Web</b>' in line)
+    assert 'fillcolor="#438dd5"' in web
+    assert '[Container: React]' in web
+
+    database = next(line for line in lines if 'label=<<b>Database</b>' in line)
+    assert 'shape="cylinder"' in database
+    assert 'fillcolor="#ff0000"' in database
+    assert 'dashed' in database
+
+    browses = next(line for line in lines if 'label=<Browses>' in line)
+    assert 'style="solid"' in browses
+    assert 'color="#00ff00"' in browses
+    assert 'penwidth="4"' in browses
+
+    calls = next(line for line in lines if 'label=<Calls>' in line)
+    assert 'style="dashed"' in calls
+
+def test_dot_sink_clusters(workspace: WorkspaceModel) -> Optional[None]:
+
+    diagrams = DotSink().export_to_dict(workspace)
+
+    # Groups are nested clusters.
+    landscape = diagrams['landscape']
+    assert 'label=<Company>' in landscape
+    assert 'label=<Customers>' in landscape
+    assert landscape.index('label=<Company>') < landscape.index('label=<Customers>') < landscape.index('<b>User</b>')
+
+    # The containers are drawn in the boundary of their software system.
+    containers = diagrams['containers']
+    assert 'label=<<b>Shop</b><br/>[Software System]>' in containers
+    assert containers.index('[Software System]>') < containers.index('<b>Web</b>')
+
+    # The components are drawn in the boundary of their container.
+    assert 'label=<<b>API</b><br/>[Container]>' in diagrams['components']
+
+    # The deployment nodes are nested clusters around their instances.
+    deployment = diagrams['deployment']
+    assert deployment.index('<b>AWS</b>') < deployment.index('<b>EC2</b>') < deployment.index('<b>API</b>')
+    assert '[Infrastructure Node: ELB]' in deployment
+    assert deployment.count('subgraph') == 2
+
+def test_dot_sink_dynamic_view_order(workspace: WorkspaceModel) -> Optional[None]:
+
+    dot = DotSink().export_to_dict(workspace)['dynamic']
+    assert 'label=<1: Browses>' in dot
+
+def test_dot_sink_escapes_labels() -> Optional[None]:
+
+    with Workspace('w') as w:
+        a = SoftwareSystem('A & "B"', description='<script>')
+        b = SoftwareSystem('C')
+        a >> "Sends <data>" >> b
+        SystemLandscapeView(key='landscape', description='')
+
+    dot = DotSink().export_to_dict(w._merged_workspace())['landscape']
+    assert '<b>A &amp; &quot;B&quot;</b>' in dot
+    assert '&lt;script&gt;' in dot
+    assert 'label=<Sends &lt;data&gt;>' in dot
+
+def test_dot_sink_write(workspace: WorkspaceModel, tmp_path: Any) -> Optional[None]:
+
+    DotSink().write(workspace, DotSinkConfig(path=str(tmp_path)))
+
+    assert sorted(os.listdir(tmp_path)) == [
+        'components.dot',
+        'containers.dot',
+        'deployment.dot',
+        'dynamic.dot',
+        'landscape.dot',
+    ]
+
+def test_dot_sink_missing_dot_binary(workspace: WorkspaceModel, tmp_path: Any) -> Optional[None]:
+
+    config = DotSinkConfig(path=str(tmp_path), format='svg', dot_binary='no-such-dot-binary')
+    with pytest.raises(FileNotFoundError, match="no-such-dot-binary"):
+        DotSink().write(workspace, config)
+
+@pytest.mark.skipif(shutil.which('dot') is None, reason="Graphviz is not installed")
+def test_dot_sink_render_svg(workspace: WorkspaceModel, tmp_path: Any) -> Optional[None]:
+
+    DotSink().write(workspace, DotSinkConfig(path=str(tmp_path), format='svg'))
+
+    with open(os.path.join(tmp_path, 'containers.svg'), 'r', encoding='utf-8') as f:
+        svg = f.read()
+    assert '<svg' in svg
+    assert 'Shop' in svg
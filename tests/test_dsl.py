@@ -1807,4 +1807,152 @@ def test_style_elements_no_duplicate_tags() -> Optional[None]:
     systems = workspace_json['model']['softwareSystems']
     assert len(systems) == 2
     assert box_style['tag'] in systems[0]['tags']
-    assert box_style['tag'] in systems[1]['tags']
\ No newline at end of file
+    assert box_style['tag'] in systems[1]['tags']
+
+def test_sources_and_destinations_cache_ids() -> Optional[None]:
+
+    from buildzr.dsl.interfaces import ElementList
+
+    with Workspace('w') as w:
+        u = Person('u')
+        s1 = SoftwareSystem('s1')
+        s2 = SoftwareSystem('s2')
+
+        u >> "Uses" >> s1
+
+        assert isinstance(u.destinations, ElementList)
+        assert u.destinations.ids == {s1.model.id}
+        assert cast(ElementList, s1.sources).ids == {u.model.id}
+
+        # Appending keeps the cached set up to date.
+        u >> "Uses" >> s2
+        assert u.destinations.ids == {s1.model.id, s2.model.id}
+
+        # Duplicate relationships don't duplicate sources and destinations.
+        u >> "Also uses" >> s1
+        assert len(u.destinations) == 2
+
+        # Any other mutation invalidates the cached set.
+        u.destinations.remove(s1)
+        assert u.destinations.ids == {s2.model.id}
+        u.destinations[0] = s1
+        assert u.destinations.ids == {s1.model.id}
+        u.destinations.clear()
+        assert not u.destinations.ids
+
+def test_relationships_indexed_by_destination_and_technology() -> Optional[None]:
+
+    from buildzr.dsl.interfaces import RelationshipSet
+
+    with Workspace('w') as w:
+        a = SoftwareSystem('a')
+        b = SoftwareSystem('b')
+        c = SoftwareSystem('c')
+
+        r1 = a >> ("Reads from", "SQL") >> b
+        r2 = a >> ("Subscribes to", "Kafka") >> b
+        r3 = a >> "Notifies" >> c
+
+    relationships = cast(RelationshipSet, a.relationships)
+    assert isinstance(relationships, RelationshipSet)
+
+    assert relationships.find(b.model.id) == [r1, r2]
+    assert relationships.find(b.model.id, technology="Kafka") == [r2]
+    assert relationships.find(c.model.id) == [r3]
+    assert relationships.find(c.model.id, technology="SQL") == []
+
+    # The order the relationships were added in is kept across technologies.
+    with w:
+        r4 = a >> ("Writes to", "SQL") >> b
+    assert relationships.find(b.model.id) == [r1, r2, r4]
+    assert relationships.find(b.model.id, technology="SQL") == [r1, r4]
+    relationships -= {r4}
+    assert relationships.find(b.model.id) == [r1, r2]
+
+    relationships.discard(r1)
+    assert relationships.find(b.model.id) == [r2]
+    assert relationships.find(b.model.id, technology="SQL") == []
+
+    relationships.clear()
+    assert relationships.find(b.model.id) == []
+
+def test_bulk_load() -> Optional[None]:
+
+    from buildzr.dsl import SystemContextView
+
+    with Workspace('w') as w:
+        existing = SoftwareSystem('existing')
+        elements = w.bulk_load(
+            elements=[
+                {'type': 'person', 'name': 'user'},
+                {'type': 'software_system', 'name': 'orders', 'tags': {'internal'}},
+                {'type': 'container', 'name': 'api', 'key': 'orders.api', 'parent': 'orders', 'technology': 'Python'},
+                {'type': 'component', 'name': 'handler', 'parent': 'orders.api'},
+                {'type': Container, 'name': 'db', 'parent': existing},
+            ],
+            relationships={
+                'source': ['user', 'orders.api', 'handler'],
+                'destination': ['orders', 'db', 'db'],
+                'description': ['Places orders with', 'Reads from', 'Writes to'],
+                'technology': [None, 'SQL', 'SQL'],
+            },
+        )
+        SystemContextView(
+            software_system_selector=lambda w: w.software_system().orders,
+            key='orders_context',
+            description='Orders context',
+        )
+
+    user = cast(Person, elements['user'])
+    orders = cast(SoftwareSystem, elements['orders'])
+    api = cast(Container, elements['orders.api'])
+    db = cast(Container, elements['db'])
+
+    assert user.model in w.model.model.people
+    assert orders.model in w.model.model.softwareSystems
+    assert w.software_system().orders is orders
+    assert api.parent is orders
+    assert orders.api is api
+    assert elements['handler'].parent is api
+    assert db.parent is existing
+    assert db.model in existing.model.containers
+
+    assert set(orders.tags) == {'Element', 'Software System', 'internal'}
+    assert api.model.technology == 'Python'
+
+    ids = [e.model.id for e in elements.values()]
+    assert len(set(ids)) == len(ids)
+
+    assert [r.model.description for r in user.relationships] == ['Places orders with']
+    assert orders in user.destinations
+    assert user in orders.sources
+    assert [r.destination for r in api.relationships] == [db]
+    assert w.model.views.systemContextViews[0].relationships[0].id == list(user.relationships)[0].model.id
+
+def test_bulk_load_invalid_records() -> Optional[None]:
+
+    with Workspace('w') as w:
+        with pytest.raises(ValueError):
+            w.bulk_load(elements=[{'type': 'container', 'name': 'api'}])
+        with pytest.raises(ValueError):
+            w.bulk_load(elements=[{'type': 'person', 'name': 'u', 'parent': 'x'}])
+        with pytest.raises(ValueError):
+            w.bulk_load(elements=[{'type': 'person', 'name': 'u'}], relationships=[{'source': 'u', 'destination': 'x'}])
+
+def test_bulk_load_invalid_records_leave_workspace_unchanged() -> Optional[None]:
+
+    with Workspace('w') as w:
+        with pytest.raises(ValueError, match="element 'db' of type 'database'"):
+            w.bulk_load(elements=[
+                {'type': 'person', 'name': 'u'},
+                {'type': 'database', 'name': 'db'},
+            ])
+        with pytest.raises(ValueError, match="destination element key in relationship 1: 'x'"):
+            w.bulk_load(
+                elements=[{'type': 'person', 'name': 'u'}, {'type': 'software_system', 'name': 's'}],
+                relationships=[{'source': 'u', 'destination': 's'}, {'source': 'u', 'destination': 'x'}],
+            )
+
+    assert not w.model.model.people
+    assert not w.model.model.softwareSystems
+    assert not w.children
@@ -0,0 +1,281 @@
+import os
+import pytest
+from typing import Any, Dict, List, Optional
+
+from buildzr.dsl import Workspace, SoftwareSystem
+from buildzr.dsl.factory import GenerateId
+from buildzr.loaders import DslLoader, DslSyntaxError, dsl_loader
+from buildzr.models import Workspace as WorkspaceModel
+from buildzr.models.models import RankDirection, Routing1, Scope, Shape
+
+WORKSPACE = """
+workspace "Shop" "The online shop" {
+    !identifiers hierarchical
+    !const TECH "Python"
+
+    model {
+        properties {
+            "structurizr.groupSeparator" "/"
+        }
+        /*
+            The people, and the systems.
+        */
+        group "Company" {
+            group "Sales" {
+                user = person "User" "A \\"customer\\"" "Customer"
+            }
+        }
+        shop = softwareSystem "Shop" {
+            web = container "Web" "" "React"
+            api = container "API" "" "${TECH}" {
+                auth = component "Auth" "" "JWT"
+            }
+            db = container "Database" "" "PostgreSQL" "Database" {
+                url https://example.com/db
+            }
+            web -> api "Calls" "HTTPS"
+            api -> db "Reads from" {
+                tags "Sync"
+            }
+        }
+        # Relationships can be declared from outside of the elements too.
+        user -> shop.web "Browses"
+
+        production = deploymentEnvironment "Production" {
+            blue = deploymentGroup "Blue"
+            deploymentNode "AWS" {
+                deploymentNode "EC2" "" "Ubuntu" "" 3 {
+                    containerInstance shop.api blue
+                    containerInstance shop.db blue
+                }
+            }
+        }
+    }
+
+    views {
+        systemLandscape "landscape" "All the systems" {
+            include *
+            autoLayout lr 150 100
+        }
+        container shop "containers" {
+            include *
+            exclude "user -> shop.web"
+        }
+        dynamic shop "dynamic" {
+            user -> shop.web "Opens"
+            shop.web -> shop.api
+        }
+        deployment shop production "deployment" {
+            include *
+        }
+        styles {
+            element "Database" {
+                shape cylinder
+                background red
+            }
+            relationship "Sync" {
+                routing orthogonal
+                dashed false
+            }
+        }
+        theme default
+    }
+
+    configuration {
+        scope softwaresystem
+    }
+}
+"""
+
+def _write(path: Any, text: str) -> str:
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return str(path)
+
+def _by_name(elements: Optional[List[Any]]) -> Dict[str, Any]:
+    return {element.name: element for element in elements or []}
+
+@pytest.fixture
+def workspace(tmp_path: Any) -> WorkspaceModel:
+    return DslLoader().load(_write(tmp_path / 'workspace.dsl', WORKSPACE))
+
+def test_dsl_loader_elements(workspace: WorkspaceModel) -> Optional[None]:
+
+    assert workspace.name == 'Shop'
+    assert workspace.description == 'The online shop'
+    assert workspace.model is not None
+
+    user = workspace.model.people[0]
+    assert user.description == 'A "customer"'
+    assert user.tags == 'Element,Person,Customer'
+    assert user.group == 'Company/Sales'
+
+    shop = _by_name(workspace.model.softwareSystems)['Shop']
+    containers = _by_name(shop.containers)
+    assert containers['API'].technology == 'Python'
+    assert containers['Database'].tags == 'Element,Container,Database'
+    assert containers['Database'].url == 'https://example.com/db'
+    assert _by_name(containers['API'].components)['Auth'].technology == 'JWT'
+
+def test_dsl_loader_relationships(workspace: WorkspaceModel) -> Optional[None]:
+
+    assert workspace.model is not None
+    user = workspace.model.people[0]
+    shop = _by_name(workspace.model.softwareSystems)['Shop']
+    containers = _by_name(shop.containers)
+
+    calls = containers['Web'].relationships[0]
+    assert (calls.destinationId, calls.description, calls.technology) == (containers['API'].id, 'Calls', 'HTTPS')
+    assert containers['API'].relationships[0].tags == 'Relationship,Sync'
+
+    # The relationship to the system is implied from the one to its container.
+    browses, implied = user.relationships
+    assert browses.destinationId == containers['Web'].id
+    assert implied.destinationId == shop.id
+    assert implied.linkedRelationshipId == browses.id
+
+def test_dsl_loader_deployment(workspace: WorkspaceModel) -> Optional[None]:
+
+    assert workspace.model is not None
+    shop = _by_name(workspace.model.softwareSystems)['Shop']
+    containers = _by_name(shop.containers)
+
+    aws = workspace.model.deploymentNodes[0]
+    ec2 = aws.children[0]
+    assert (aws.environment, ec2.technology, ec2.instances) == ('Production', 'Ubuntu', '3')
+    api, db = ec2.containerInstances
+    assert api.containerId == containers['API'].id
+    assert api.deploymentGroups == ['Blue']
+    # The instances are related like their containers.
+    assert [r.destinationId for r in api.relationships] == [db.id]
+    assert api.relationships[0].linkedRelationshipId == containers['API'].relationships[0].id
+
+def test_dsl_loader_views(workspace: WorkspaceModel) -> Optional[None]:
+
+    assert workspace.model is not None and workspace.views is not None
+    user = workspace.model.people[0]
+    shop = _by_name(workspace.model.softwareSystems)['Shop']
+    containers = _by_name(shop.containers)
+
+    landscape = workspace.views.systemLandscapeViews[0]
+    assert (landscape.key, landscape.description) == ('landscape', 'All the systems')
+    assert {e.id for e in landscape.elements} == {user.id, shop.id}
+    assert landscape.automaticLayout.rankDirection == RankDirection.LeftRight
+    assert (landscape.automaticLayout.rankSeparation, landscape.automaticLayout.nodeSeparation) == (150, 100)
+
+    container_view = workspace.views.containerViews[0]
+    assert {e.id for e in container_view.elements} == {user.id} | {c.id for c in shop.containers}
+    # The excluded relationship isn't in the view, the others between its
+    # elements are.
+    relationship_ids = {r.id for r in container_view.relationships}
+    assert user.relationships[0].id not in relationship_ids
+    assert containers['Web'].relationships[0].id in relationship_ids
+
+    dynamic = workspace.views.dynamicViews[0]
+    assert [(r.id, r.order, r.description) for r in dynamic.relationships] == [
+        (user.relationships[0].id, '1', 'Opens'),
+        (containers['Web'].relationships[0].id, '2', None),
+    ]
+
+    deployment = workspace.views.deploymentViews[0]
+    assert deployment.environment == 'Production'
+    assert len(deployment.elements) == 4
+    assert len(deployment.relationships) == 1
+
+def test_dsl_loader_styles_and_configuration(workspace: WorkspaceModel) -> Optional[None]:
+
+    assert workspace.views is not None and workspace.views.configuration is not None
+    styles = workspace.views.configuration.styles
+    assert (styles.elements[0].shape, styles.elements[0].background) == (Shape.Cylinder, '#ff0000')
+    assert (styles.relationships[0].routing, styles.relationships[0].dashed) == (Routing1.Orthogonal, False)
+    assert workspace.views.configuration.themes == ['default']
+    assert workspace.configuration.scope == Scope.SoftwareSystem
+
+def test_dsl_loader_include(tmp_path: Any) -> Optional[None]:
+
+    os.makedirs(tmp_path / 'model' / 'systems')
+    _write(tmp_path / 'model' / 'people.dsl', 'user = person "User"\n')
+    _write(tmp_path / 'model' / 'systems' / 'shop.dsl', 'shop = softwareSystem "Shop"\n')
+    _write(tmp_path / 'relationships.dsl', 'user -> shop "Uses"\n')
+    path = _write(tmp_path / 'workspace.dsl', """
+workspace {
+    model {
+        !include model
+        !include relationships.dsl
+    }
+}
+""")
+
+    workspace = DslLoader().load(path)
+
+    assert workspace.model is not None
+    assert [p.name for p in workspace.model.people] == ['User']
+    assert [s.name for s in workspace.model.softwareSystems] == ['Shop']
+    assert workspace.model.people[0].relationships[0].description == 'Uses'
+
+def test_dsl_loader_include_cycle(tmp_path: Any) -> Optional[None]:
+
+    _write(tmp_path / 'a.dsl', '!include b.dsl\n')
+    _write(tmp_path / 'b.dsl', '!include a.dsl\n')
+    path = _write(tmp_path / 'workspace.dsl', 'workspace {\n    model {\n        !include a.dsl\n    }\n}\n')
+
+    with pytest.raises(DslSyntaxError, match='includes itself'):
+        DslLoader().load(path)
+
+def test_dsl_loader_caches_parsed_files(tmp_path: Any, monkeypatch: Any) -> Optional[None]:
+
+    parsed: List[str] = []
+    parse = dsl_loader._parse
+    def counting_parse(text: str, path: str) -> Any:
+        parsed.append(os.path.basename(path))
+        return parse(text, path)
+    monkeypatch.setattr(dsl_loader, '_parse', counting_parse)
+
+    DslLoader.clear_cache()
+    people = _write(tmp_path / 'people.dsl', 'user = person "User"\n')
+    path = _write(tmp_path / 'workspace.dsl', 'workspace {\n    model {\n        !include people.dsl\n    }\n}\n')
+
+    DslLoader().load(path)
+    DslLoader().load(path)
+    assert sorted(parsed) == ['people.dsl', 'workspace.dsl']
+
+    # Only the changed file is parsed again.
+    _write(people, 'user = person "Customer"\n')
+    stat = os.stat(people)
+    os.utime(people, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    workspace = DslLoader().load(path)
+    assert sorted(parsed) == ['people.dsl', 'people.dsl', 'workspace.dsl']
+    assert workspace.model is not None and workspace.model.people[0].name == 'Customer'
+
+@pytest.mark.parametrize('text, line, message', [
+    ('workspace {\n    model {\n        person "User"\n', 3, "Missing '}'"),
+    ('workspace {\n    model {\n        user = person "User\n    }\n}\n', 3, 'Unterminated string'),
+    ('workspace {\n    model {\n        a -> b\n    }\n}\n', 3, "'a' doesn't exist"),
+    ('workspace {\n    model {\n        robot "R2"\n    }\n}\n', 3, "Unexpected 'robot'"),
+    ('workspace {\n    !script groovy {\n    }\n}\n', 2, "isn't supported"),
+])
+def test_dsl_loader_syntax_errors(tmp_path: Any, text: str, line: int, message: str) -> Optional[None]:
+
+    path = _write(tmp_path / 'workspace.dsl', text)
+
+    with pytest.raises(DslSyntaxError, match=message) as e:
+        DslLoader().load(path)
+    assert (e.value.path, e.value.line) == (path, line)
+
+def test_workspace_extends_dsl(tmp_path: Any) -> Optional[None]:
+
+    GenerateId.reset()
+    path = _write(tmp_path / 'workspace.dsl', WORKSPACE)
+
+    with Workspace('Child', extend=path) as w:
+        shop = w.software_system().shop
+        payments = SoftwareSystem('Payments')
+        shop >> "Charges with" >> payments
+        assert shop.web.model.technology == 'React'
+
+    data = w.to_dict()
+    systems = {s['name']: s for s in data['model']['softwareSystems']}
+    assert set(systems) == {'Shop', 'Payments'}
+    # The new elements are numbered after the ones of the parent.
+    assert int(systems['Payments']['id']) > max(int(s['id']) for s in systems.values() if s['name'] == 'Shop')
+    assert systems['Shop']['relationships'][-1]['destinationId'] == systems['Payments']['id']
@@ -122,3 +122,99 @@ def test_walk_relationships(workspace: Workspace) -> Optional[None]:
     descriptions = {r.model.description for r in relationships}
     assert 'sends data to' in descriptions
     assert 'uploads to' in descriptions
+
+def test_walk_elements_is_iterative_on_deep_trees() -> Optional[None]:
+
+    import sys
+
+    depth = sys.getrecursionlimit() + 100
+
+    with Workspace("w") as w:
+        with DeploymentEnvironment('Production'):
+            nodes = []
+            for i in range(depth):
+                node = DeploymentNode(f"node {i}")
+                node.__enter__()
+                nodes.append(node)
+            for node in reversed(nodes):
+                node.__exit__(None, None, None)
+
+    elements = list(Explorer(w).walk_elements())
+    assert len(elements) == depth
+    assert [cast(DeploymentNode, e).model.name for e in elements] == [f"node {i}" for i in range(depth)]
+
+def test_walk_elements_filter_by_types(workspace: Workspace) -> Optional[None]:
+
+    components = list(Explorer(workspace).walk_elements(types=Component))
+    assert [cast(Component, c).model.name for c in components] == ['database layer', 'API layer', 'UI layer']
+
+    instances = list(Explorer(workspace).walk_elements(types=(SoftwareSystemInstance, ContainerInstance)))
+    assert len(instances) == 5
+
+def test_walk_elements_max_depth(workspace: Workspace) -> Optional[None]:
+
+    top_level = list(Explorer(workspace).walk_elements(max_depth=1))
+    assert [type(e) for e in top_level] == [
+        Person,
+        SoftwareSystem,
+        Element,
+        Element,
+        DeploymentNode,
+        DeploymentNode,
+    ]
+
+    containers = list(Explorer(workspace).walk_elements(types=Container, max_depth=2))
+    assert [cast(Container, c).model.name for c in containers] == ['webapp', 'database']
+
+def test_walk_elements_prune(workspace: Workspace) -> Optional[None]:
+
+    elements = list(Explorer(workspace).walk_elements(
+        prune=lambda e: isinstance(e, (SoftwareSystem, DeploymentNode)),
+    ))
+    assert not any(isinstance(e, (Container, Component, ContainerInstance)) for e in elements)
+    assert {e.model.name for e in elements if isinstance(e, SoftwareSystem)} == {'s'}
+    assert len([e for e in elements if isinstance(e, DeploymentNode)]) == 2
+
+def test_walk_elements_environment() -> Optional[None]:
+
+    with Workspace("w") as w:
+        s = SoftwareSystem("s")
+        with DeploymentEnvironment('Production'):
+            with DeploymentNode("Production Server"):
+                SoftwareSystemInstance(s)
+        with DeploymentEnvironment('Staging'):
+            with DeploymentNode("Staging Server"):
+                SoftwareSystemInstance(s)
+
+    elements = list(Explorer(w).walk_elements(environment='Staging'))
+    names = [e.model.name for e in elements if isinstance(e, (SoftwareSystem, DeploymentNode))]
+    assert names == ['s', 'Staging Server']
+    instances = [e for e in elements if isinstance(e, SoftwareSystemInstance)]
+    assert len(instances) == 1
+    assert instances[0].model.environment == 'Staging'
+
+def test_walk_elements_bfs(workspace: Workspace) -> Optional[None]:
+
+    elements = list(Explorer(workspace).walk_elements(types=(SoftwareSystem, Container, Component), order='bfs'))
+    assert [cast(SoftwareSystem, e).model.name for e in elements] == [
+        's',
+        'webapp',
+        'database',
+        'database layer',
+        'API layer',
+        'UI layer',
+    ]
+
+    with pytest.raises(ValueError):
+        list(Explorer(workspace).walk_elements(order='random'))  # type: ignore[arg-type]
+
+def test_walk_relationships_between_included(workspace: Workspace) -> Optional[None]:
+
+    relationships = list(Explorer(workspace).walk_relationships(
+        types=Element,
+        between_included=True,
+    ))
+    assert [r.model.description for r in relationships] == ['sends data to']
+
+    relationships = list(Explorer(workspace).walk_relationships(types=Element))
+    assert {r.model.description for r in relationships} == {'sends data to', 'uploads to'}
@@ -0,0 +1,165 @@
+import gzip
+import json
+import threading
+import time
+import urllib.error
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Generator, List, Optional
+
+from buildzr.dsl import Workspace, SoftwareSystem
+from buildzr.dsl.factory import GenerateId
+from buildzr.loaders import HttpCache, JsonLoader
+
+WORKSPACE = {
+    "id": 0,
+    "name": "Parent",
+    "model": {
+        "softwareSystems": [
+            {"id": "1", "name": "System A", "tags": "Element,Software System"},
+        ],
+    },
+}
+
+class Server:
+    """A stand-in for the server hosting the parent workspace."""
+
+    def __init__(self) -> None:
+        self.body = json.dumps(WORKSPACE).encode('utf-8')
+        self.etag = '"v1"'
+        self.last_modified = 'Mon, 19 Oct 2026 10:00:00 GMT'
+        self.delay = 0.0
+        self.status = 200
+        self.requests: List[Dict[str, Optional[str]]] = []
+        self.statuses: List[int] = []
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                server.requests.append({
+                    'If-None-Match': self.headers.get('If-None-Match'),
+                    'If-Modified-Since': self.headers.get('If-Modified-Since'),
+                    'Accept-Encoding': self.headers.get('Accept-Encoding'),
+                })
+                time.sleep(server.delay)
+                headers: Dict[str, str] = {}
+                if server.status != 200:
+                    status, body = server.status, b''
+                elif self.headers.get('If-None-Match') == server.etag:
+                    status, body = 304, b''
+                else:
+                    body = gzip.compress(server.body)
+                    status = 200
+                    headers = {
+                        'Content-Encoding': 'gzip',
+                        'ETag': server.etag,
+                        'Last-Modified': server.last_modified,
+                    }
+                server.statuses.append(status)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/workspace.json"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def server() -> Generator[Server, None, None]:
+    server = Server()
+    yield server
+    server.stop()
+
+def test_http_cache_conditional_requests(server: Server, tmp_path: Any) -> Optional[None]:
+
+    cache = HttpCache(str(tmp_path))
+
+    assert json.loads(cache.fetch(server.url)) == WORKSPACE
+    assert json.loads(cache.fetch(server.url)) == WORKSPACE
+
+    # The response is compressed, and only downloaded once.
+    assert [r['Accept-Encoding'] for r in server.requests] == ['gzip', 'gzip']
+    assert server.requests[0]['If-None-Match'] is None
+    assert server.requests[1]['If-None-Match'] == '"v1"'
+    assert server.requests[1]['If-Modified-Since'] == server.last_modified
+    assert server.statuses == [200, 304]
+
+def test_http_cache_downloads_changes(server: Server, tmp_path: Any) -> Optional[None]:
+
+    cache = HttpCache(str(tmp_path))
+    cache.fetch(server.url)
+
+    server.body = b'{"name": "Changed"}'
+    server.etag = '"v2"'
+
+    assert cache.fetch(server.url) == b'{"name": "Changed"}'
+    assert cache.fetch(server.url) == b'{"name": "Changed"}'
+    assert server.statuses == [200, 200, 304]
+
+def test_http_cache_offline(server: Server, tmp_path: Any) -> Optional[None]:
+
+    HttpCache(str(tmp_path)).fetch(server.url)
+    offline = HttpCache(str(tmp_path), offline=True)
+
+    assert json.loads(offline.fetch(server.url)) == WORKSPACE
+    assert len(server.requests) == 1
+    with pytest.raises(urllib.error.URLError, match="isn't cached"):
+        offline.fetch(server.url + '?other')
+
+def test_http_cache_uses_stale_copy_on_errors(server: Server, tmp_path: Any) -> Optional[None]:
+
+    cache = HttpCache(str(tmp_path), timeout=0.2)
+    cache.fetch(server.url)
+
+    server.status = 503
+    with pytest.warns(UserWarning, match="using the cached copy"):
+        assert json.loads(cache.fetch(server.url)) == WORKSPACE
+
+    server.status = 200
+    server.delay = 1
+    with pytest.warns(UserWarning, match="using the cached copy"):
+        assert json.loads(cache.fetch(server.url)) == WORKSPACE
+
+    # Without a cached copy, the errors are raised.
+    with pytest.raises(OSError):
+        HttpCache(None, timeout=0.2).fetch(server.url)
+
+def test_http_cache_not_found(server: Server, tmp_path: Any) -> Optional[None]:
+
+    cache = HttpCache(str(tmp_path))
+    cache.fetch(server.url)
+
+    server.status = 404
+    with pytest.raises(urllib.error.HTTPError):
+        cache.fetch(server.url)
+
+def test_workspace_extends_cached_url(server: Server, tmp_path: Any, monkeypatch: Any) -> Optional[None]:
+
+    monkeypatch.setenv('BUILDZR_HTTP_CACHE', str(tmp_path))
+    monkeypatch.delenv('BUILDZR_OFFLINE', raising=False)
+
+    for _ in range(2):
+        GenerateId.reset()
+        with Workspace('Child', extend=server.url) as w:
+            SoftwareSystem('System B') >> "Uses" >> w.software_system().system_a
+
+    assert server.statuses == [200, 304]
+
+    # Offline, the parent workspace is loaded from the cache alone.
+    monkeypatch.setenv('BUILDZR_OFFLINE', '1')
+    server.stop()
+    workspace = JsonLoader().load(server.url, sections={'model'})
+    assert workspace.name == 'Parent'
+    GenerateId.reset()
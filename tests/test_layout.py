@@ -0,0 +1,220 @@
+import random
+import time
+import pytest
+from typing import Any, Dict, List, Optional, Tuple
+
+from buildzr.dsl import (
+    Workspace,
+    Person,
+    SoftwareSystem,
+    SystemLandscapeView,
+)
+from buildzr.layout import layered_layout, layout_workspace, Layout
+from buildzr.models.models import RankDirection
+from buildzr.sinks.model_index import ModelIndex
+
+try:
+    import numpy
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
+def _boxes(layout: Layout, sizes: Dict[str, Tuple[float, float]]) -> List[Tuple[float, float, float, float]]:
+    return [
+        (x, y, x + sizes.get(node, (450, 300))[0], y + sizes.get(node, (450, 300))[1])
+        for node, (x, y) in layout.positions.items()
+    ]
+
+def _overlap(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+@pytest.mark.parametrize('use_numpy', [False, pytest.param(True, marks=pytest.mark.skipif(not has_numpy, reason="NumPy not installed"))])
+def test_layered_layout_chain(use_numpy: bool) -> Optional[None]:
+
+    layout = layered_layout(['a', 'b', 'c'], [('a', 'b'), ('b', 'c')], use_numpy=use_numpy)
+
+    # One element per layer, 300px (rankSeparation) below the previous one.
+    assert layout.positions['a'] == (50, 50)
+    assert layout.positions['b'] == (50, 650)
+    assert layout.positions['c'] == (50, 1250)
+    assert layout.crossings == 0
+
+@pytest.mark.parametrize('rank_direction', ['TopBottom', 'BottomTop', 'LeftRight', 'RightLeft'])
+def test_layered_layout_rank_direction(rank_direction: str) -> Optional[None]:
+
+    layout = layered_layout(['a', 'b'], [('a', 'b')], rank_direction=rank_direction)
+
+    (ax, ay), (bx, by) = layout.positions['a'], layout.positions['b']
+    if rank_direction == 'TopBottom':
+        assert ax == bx and ay < by
+    elif rank_direction == 'BottomTop':
+        assert ax == bx and ay > by
+    elif rank_direction == 'LeftRight':
+        assert ay == by and ax < bx
+    else:
+        assert ay == by and ax > bx
+
+def test_layered_layout_separations() -> Optional[None]:
+
+    sizes = {'a': (200.0, 100.0), 'b': (300.0, 150.0), 'c': (100.0, 100.0)}
+    layout = layered_layout(
+        ['a', 'b', 'c'],
+        [('a', 'b'), ('a', 'c')],
+        sizes=sizes,
+        rank_separation=120,
+        node_separation=80,
+    )
+
+    (ax, ay), (bx, by), (cx, cy) = (layout.positions[node] for node in 'abc')
+    # The elements of a layer are centered on the layer, the tallest one
+    # rankSeparation below the previous layer.
+    assert by == ay + 100 + 120
+    assert cy + 50 == by + 75
+    left, right = sorted([(bx, 300), (cx, 100)])
+    assert right[0] - (left[0] + left[1]) == pytest.approx(80, abs=1)
+    # The parent is centered above its children.
+    assert ax + 100 == pytest.approx(((bx + 150) + (cx + 50)) / 2, abs=1)
+
+def test_layered_layout_breaks_cycles() -> Optional[None]:
+
+    layout = layered_layout(['a', 'b', 'c'], [('a', 'b'), ('b', 'c'), ('c', 'a')])
+
+    ys = sorted(y for _, y in layout.positions.values())
+    assert len(set(ys)) == 3
+    # The edge closing the cycle goes back up, from c to a, through a bend.
+    assert layout.positions['a'][1] < layout.positions['c'][1]
+    assert len(layout.vertices[2]) == 1
+
+def test_layered_layout_vertices() -> Optional[None]:
+
+    layout = layered_layout(
+        ['a', 'b', 'c', 'd'],
+        [('a', 'b'), ('b', 'c'), ('c', 'd'), ('a', 'd'), ('a', 'x')],
+    )
+
+    assert layout.vertices[:3] == [[], [], []]
+    # The long edge bends once per layer crossed, between its ends.
+    bends = layout.vertices[3]
+    assert len(bends) == 2
+    assert [y for _, y in bends] == sorted(y for _, y in bends)
+    assert layout.positions['a'][1] < bends[0][1] < bends[1][1] < layout.positions['d'][1]
+    # Edges to unknown nodes are ignored.
+    assert layout.vertices[4] == []
+
+def test_layered_layout_tree_has_no_crossings() -> Optional[None]:
+
+    random.seed(0)
+    nodes = [str(i) for i in range(200)]
+    edges = [(str(random.randrange(i)), str(i)) for i in range(1, 200)]
+
+    layout = layered_layout(nodes, edges)
+
+    assert layout.crossings == 0
+    boxes = _boxes(layout, {})
+    assert not any(_overlap(a, b) for i, a in enumerate(boxes) for b in boxes[i + 1:])
+
+@pytest.mark.skipif(not has_numpy, reason="NumPy not installed")
+def test_layered_layout_numpy_matches_python() -> Optional[None]:
+
+    random.seed(1)
+    nodes = [str(i) for i in range(100)]
+    edges = [(random.choice(nodes), random.choice(nodes)) for _ in range(150)]
+
+    with_numpy = layered_layout(nodes, edges, use_numpy=True)
+    without_numpy = layered_layout(nodes, edges, use_numpy=False)
+
+    assert with_numpy.crossings == without_numpy.crossings
+    for node in nodes:
+        assert with_numpy.positions[node] == pytest.approx(without_numpy.positions[node], abs=1)
+
+def test_layered_layout_500_elements_performance() -> Optional[None]:
+
+    random.seed(2)
+    nodes = [str(i) for i in range(500)]
+    edges = [(random.choice(nodes), random.choice(nodes)) for _ in range(750)]
+
+    start = time.perf_counter()
+    layout = layered_layout(nodes, edges)
+    elapsed = time.perf_counter() - start
+
+    assert len(layout.positions) == 500
+    # Generous, for slow CI machines.
+    assert elapsed < 5
+
+def test_layout_workspace() -> Optional[None]:
+
+    with Workspace('w') as w:
+        user = Person('User')
+        shop = SoftwareSystem('Shop')
+        payments = SoftwareSystem('Payments')
+        email = SoftwareSystem('Email')
+        user >> "Buys from" >> shop
+        shop >> "Charges with" >> payments
+        user >> "Pays with" >> payments
+        shop >> "Sends with" >> email
+        SystemLandscapeView(key='landscape', description='', auto_layout='lr')
+
+    merged = w._merged_workspace()
+    assert merged.views is not None and merged.views.systemLandscapeViews
+    view = merged.views.systemLandscapeViews[0]
+    assert view.automaticLayout is not None
+    view.automaticLayout.rankSeparation = 100
+
+    layout_workspace(merged)
+
+    assert view.automaticLayout.rankDirection == RankDirection.LeftRight
+    positions = {element.id: (element.x, element.y) for element in view.elements or []}
+    assert positions[user.model.id][0] < positions[shop.model.id][0] < positions[payments.model.id][0]
+    # The layers are 450px (the element width) + 100px apart.
+    assert positions[shop.model.id][0] - positions[user.model.id][0] == 550
+    # The relationship from the user to payments spans two layers.
+    bent = [r for r in view.relationships or [] if r.vertices]
+    assert len(bent) == 1
+    index = ModelIndex(merged)
+    relationship = index.relationships[bent[0].id or '']
+    assert (relationship.sourceId, relationship.destinationId) == (user.model.id, payments.model.id)
+
+def test_workspace_layout_option() -> Optional[None]:
+
+    with Workspace('w', layout=True) as w:
+        user = Person('User')
+        shop = SoftwareSystem('Shop')
+        user >> "Buys from" >> shop
+        SystemLandscapeView(key='landscape', description='')
+
+    data = w.to_dict()
+
+    elements = data['views']['systemLandscapeViews'][0]['elements']
+    assert {(element['x'], element['y']) for element in elements} == {(50, 50), (50, 650)}
+
+def test_workspace_layout_option_lays_out_a_copy_once_per_change(monkeypatch: pytest.MonkeyPatch) -> Optional[None]:
+
+    import buildzr.layout
+
+    calls: List[str] = []
+
+    def counting_layout_workspace(workspace: Any, use_numpy: Optional[bool]=None) -> None:
+        calls.append(workspace.name)
+        layout_workspace(workspace, use_numpy=use_numpy)
+
+    monkeypatch.setattr(buildzr.layout, 'layout_workspace', counting_layout_workspace)
+
+    with Workspace('w', layout=True) as w:
+        user = Person('User')
+        shop = SoftwareSystem('Shop')
+        user >> "Buys from" >> shop
+        view = SystemLandscapeView(key='landscape', description='')
+
+    w.to_dict()
+    w.to_json()
+    assert calls == ['w']
+
+    # The live view isn't laid out.
+    assert {(element.x, element.y) for element in view.model.elements or []} == {(0, 0)}
+
+    with w:
+        SoftwareSystem('Warehouse')
+
+    elements = w.to_dict()['views']['systemLandscapeViews'][0]['elements']
+    assert calls == ['w', 'w']
+    assert len(elements) == 3
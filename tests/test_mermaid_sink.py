@@ -0,0 +1,139 @@
+import os
+import pytest
+from typing import Any, Optional
+
+from buildzr.dsl import (
+    Workspace,
+    Group,
+    Person,
+    SoftwareSystem,
+    Container,
+    Component,
+    ContainerInstance,
+    DeploymentEnvironment,
+    DeploymentNode,
+    SystemLandscapeView,
+    SystemContextView,
+    ContainerView,
+    ComponentView,
+    DeploymentView,
+    DynamicView,
+    StyleElements,
+    StyleRelationships,
+)
+from buildzr.dsl.factory import GenerateId
+from buildzr.models import Workspace as WorkspaceModel
+from buildzr.sinks import MermaidSink, MermaidSinkConfig
+
+@pytest.fixture
+def workspace() -> WorkspaceModel:
+
+    GenerateId.reset()
+    with Workspace('w') as w:
+        with Group('Customers'):
+            user = Person('User', description='A "regular" user')
+        with SoftwareSystem('Shop') as shop:
+            web = Container('Web', technology='React')
+            with Container('API', technology='Python') as api:
+                auth = Component('Auth', technology='JWT')
+                repository = Component('Repository')
+                auth >> "Reads users from" >> repository
+            database = Container('Database', technology='PostgreSQL', tags={'Database'})
+            calls = web >> "Calls" >> api
+            reads = api >> "Reads from" >> database
+        browses = user >> "Browses" >> web
+        user >> "Buys from" >> shop
+
+        with DeploymentEnvironment('Production') as production:
+            with DeploymentNode('AWS'):
+                with DeploymentNode('EC2', technology='Ubuntu', instances='3'):
+                    ContainerInstance(api)
+
+        SystemLandscapeView(key='landscape', description='')
+        SystemContextView(software_system_selector=shop, key='context', description='')
+        ContainerView(software_system_selector=shop, key='containers', description='')
+        ComponentView(container_selector=api, key='components', description='')
+        DynamicView(key='dynamic', scope=shop, steps=[browses, calls, reads])
+        DeploymentView(production, key='deployment', software_system_selector=shop)
+        StyleElements(on=['Database'], shape='Cylinder', background='#ff0000')
+        StyleRelationships(on=[browses], color='green')
+
+    return w._merged_workspace()
+
+def test_mermaid_sink_diagram_types(workspace: WorkspaceModel) -> Optional[None]:
+
+    diagrams = MermaidSink().export_to_dict(workspace)
+
+    assert {key: diagram.splitlines()[0] for key, diagram in diagrams.items()} == {
+        'landscape': 'C4Context',
+        'context': 'C4Context',
+        'containers': 'C4Container',
+        'components': 'C4Component',
+        'dynamic': 'C4Dynamic',
+        'deployment': 'C4Deployment',
+    }
+    for key, diagram in diagrams.items():
+        assert diagram.splitlines()[1] == f"    title {key}"
+        assert diagram.count('{') == diagram.count('}')
+
+def test_mermaid_sink_elements(workspace: WorkspaceModel) -> Optional[None]:
+
+    containers = MermaidSink().export_to_dict(workspace)['containers']
+
+    assert 'Boundary(group_Customers, "Customers", "Group") {' in containers
+    assert 'Person(e1, "User", "A #quot;regular#quot; user")' in containers
+    assert 'System_Boundary(e2, "Shop") {' in containers
+    assert 'Container(e3, "Web", "React", "")' in containers
+    assert 'ContainerDb(e8, "Database", "PostgreSQL", "")' in containers
+
+    components = MermaidSink().export_to_dict(workspace)['components']
+    assert 'Container_Boundary(e4, "API") {' in components
+    assert 'Component(e5, "Auth", "JWT", "")' in components
+
+def test_mermaid_sink_relationships(workspace: WorkspaceModel) -> Optional[None]:
+
+    containers = MermaidSink().export_to_dict(workspace)['containers']
+
+    assert 'Rel(e1, e3, "Browses")' in containers
+    assert 'Rel(e3, e4, "Calls")' in containers
+    # The relationships are written after the elements they connect.
+    assert containers.index('Rel(') > containers.index('ContainerDb(')
+
+def test_mermaid_sink_styles(workspace: WorkspaceModel) -> Optional[None]:
+
+    containers = MermaidSink().export_to_dict(workspace)['containers']
+
+    assert 'UpdateElementStyle(e8, $bgColor="#ff0000")' in containers
+    assert 'UpdateRelStyle(e1, e3, $textColor="#00ff00", $lineColor="#00ff00")' in containers
+    assert 'UpdateElementStyle(e3' not in containers
+
+def test_mermaid_sink_dynamic_view(workspace: WorkspaceModel) -> Optional[None]:
+
+    dynamic = MermaidSink().export_to_dict(workspace)['dynamic']
+    steps = [line.strip() for line in dynamic.splitlines() if 'RelIndex' in line]
+
+    assert steps == [
+        'RelIndex(1, e1, e3, "Browses")',
+        'RelIndex(2, e3, e4, "Calls")',
+        'RelIndex(3, e4, e8, "Reads from")',
+    ]
+
+def test_mermaid_sink_deployment_view(workspace: WorkspaceModel) -> Optional[None]:
+
+    deployment = MermaidSink().export_to_dict(workspace)['deployment']
+
+    aws = deployment.index('Deployment_Node(')
+    ec2 = deployment.index('Deployment_Node(', aws + 1)
+    assert '"AWS"' in deployment[aws:ec2]
+    assert 'Deployment_Node(e14, "EC2 (x3)", "Ubuntu", "") {' in deployment
+    assert deployment.index('Container(', ec2) > ec2
+
+def test_mermaid_sink_write(workspace: WorkspaceModel, tmp_path: Any) -> Optional[None]:
+
+    MermaidSink().write(workspace, MermaidSinkConfig(path=str(tmp_path)))
+
+    diagrams = MermaidSink().export_to_dict(workspace)
+    assert sorted(os.listdir(tmp_path)) == sorted(f"{key}.mmd" for key in diagrams)
+    for key, diagram in diagrams.items():
+        with open(os.path.join(tmp_path, f"{key}.mmd"), 'r', encoding='utf-8') as f:
+            assert f.read() == diagram
@@ -3,7 +3,9 @@
 import json
 import os
 import pytest
+import threading
 from pathlib import Path
+from typing import Any, Dict, List
 from buildzr.dsl import Workspace, SoftwareSystem, Person, Container, SystemContextView
 
 
@@ -153,6 +155,99 @@ class TestPlantUmlMethods:
             assert "plantuml" in str(e).lower()
 
 
+class TestExportCache:
+    """Tests for the caching of the Java workspace and the diagrams."""
+
+    @pytest.fixture
+    def sink_calls(self, monkeypatch: pytest.MonkeyPatch) -> Dict[str, List[str]]:
+        """Replace the Java conversion, export and rendering with fakes that record their calls."""
+        from buildzr.sinks.plantuml_sink import PlantUmlSink
+
+        calls: Dict[str, List[str]] = {'to_java': [], 'render': [], 'render_threads': []}
+
+        def to_java(self: PlantUmlSink, workspace: Any) -> Any:
+            self._ensure_c4plantuml_tags_enabled(workspace)
+            calls['to_java'].append(workspace.name)
+            return workspace
+
+        def export_java(self: PlantUmlSink, java_workspace: Any) -> Dict[str, str]:
+            return {
+                view.key: f"@startuml\n{view.key} {sorted(e.id for e in view.elements)}\n@enduml"
+                for view in java_workspace.views.systemContextViews
+            }
+
+        def render(self: PlantUmlSink, puml: str, format: str) -> bytes:
+            calls['render'].append(puml.splitlines()[1].split()[0])
+            calls['render_threads'].append(threading.current_thread().name)
+            return f"<svg>{puml}</svg>".encode('utf-8')
+
+        monkeypatch.setattr(PlantUmlSink, 'to_java', to_java)
+        monkeypatch.setattr(PlantUmlSink, 'export_java', export_java)
+        monkeypatch.setattr(PlantUmlSink, 'render', render)
+        return calls
+
+    def test_unchanged_workspace_is_not_converted_again(self, sink_calls: Dict[str, List[str]]) -> None:
+        with Workspace("Test") as w:
+            system = SoftwareSystem("System")
+            other = SoftwareSystem("Other")
+            SystemContextView(system, key="context", description="Context view")
+            SystemContextView(other, key="other", description="Other view")
+
+        plantuml = w.to_plantuml()
+        assert w.to_plantuml() == plantuml
+        svgs = w.to_svg()
+        assert w._repr_html_().count('<svg>') == 2
+        assert w.to_svg() == svgs
+
+        assert sink_calls['to_java'] == ["Test"]
+        assert sorted(sink_calls['render']) == ['context', 'other']
+
+    def test_changed_workspace_is_converted_again(self, sink_calls: Dict[str, List[str]]) -> None:
+        with Workspace("Test") as w:
+            system = SoftwareSystem("System")
+            other = SoftwareSystem("Other")
+            SystemContextView(system, key="context", description="Context view")
+            SystemContextView(other, key="other", description="Other view")
+
+        w.to_svg()
+        sink_calls['render'].clear()
+
+        with w:
+            Person("User") >> "Uses" >> system
+
+        w.to_svg()
+        assert sink_calls['to_java'] == ["Test", "Test"]
+        # Only the view whose PlantUML changed is rendered again.
+        assert sink_calls['render'] == ['context']
+
+    def test_relationship_added_outside_context_is_converted_again(self, sink_calls: Dict[str, List[str]]) -> None:
+        with Workspace("Test") as w:
+            system = SoftwareSystem("System")
+            other = SoftwareSystem("Other")
+            SystemContextView(system, key="context", description="Context view")
+
+        w.to_plantuml()
+        other >> "Uses" >> system
+        plantuml = w.to_plantuml()
+
+        assert sink_calls['to_java'] == ["Test", "Test"]
+        assert str(other.model.id) in plantuml['context']
+
+    def test_save_many_renders_images_in_calling_thread(self, tmp_path: Path, sink_calls: Dict[str, List[str]]) -> None:
+        with Workspace("Test") as w:
+            system = SoftwareSystem("System")
+            other = SoftwareSystem("Other")
+            SystemContextView(system, key="context", description="Context view")
+            SystemContextView(other, key="other", description="Other view")
+
+        result = w.save_many(formats=['plantuml', 'svg', 'png'], path=tmp_path, jobs=4)
+
+        assert len(result['svg']) == 2
+        assert len(result['png']) == 2
+        assert len(sink_calls['render']) == 4
+        assert set(sink_calls['render_threads']) == {threading.current_thread().name}
+
+
 class TestPlantUmlWithJpype:
     """Tests that run only if jpype is available."""
 
@@ -298,6 +393,54 @@ class TestSaveMethod:
         with pytest.raises(ValueError, match="Unsupported format"):
             w.save(format='invalid')  # type: ignore
 
+    def test_save_many_json(self, tmp_path: Path) -> None:
+        """save_many() with only JSON doesn't need jpype."""
+        with Workspace("My Test Workspace") as w:
+            Person("User")
+
+        result = w.save_many(formats=['json'], path=tmp_path / 'out', pretty=True)
+
+        assert result == {'json': str(tmp_path / 'out' / 'my_test_workspace.json')}
+        content = Path(str(result['json'])).read_text()
+        assert content == w.to_json(pretty=True)
+
+    def test_save_mermaid(self, tmp_path: Path) -> None:
+        """save(format='mermaid') writes one .mmd file per view without jpype."""
+        with Workspace("Test") as w:
+            user = Person("User")
+            system = SoftwareSystem("System")
+            user >> "Uses" >> system
+            SystemContextView(software_system_selector=system, key="context", description="")
+
+        result = w.save(format='mermaid', path=tmp_path / 'diagrams')
+
+        assert result == [str(tmp_path / 'diagrams' / 'context.mmd')]
+        content = Path(result[0]).read_text()
+        assert content.startswith("C4Context\n")
+        assert 'Rel(' in content
+
+    def test_save_many_mermaid(self, tmp_path: Path) -> None:
+        """save_many() with JSON and Mermaid doesn't need jpype."""
+        with Workspace("Test") as w:
+            system = SoftwareSystem("System")
+            SystemContextView(software_system_selector=system, key="context", description="")
+
+        result = w.save_many(formats=['json', 'mermaid'], path=tmp_path)
+
+        assert result == {
+            'json': str(tmp_path / 'test.json'),
+            'mermaid': [str(tmp_path / 'context.mmd')],
+        }
+
+    def test_save_many_invalid_format_raises(self, tmp_path: Path) -> None:
+        """save_many() with an invalid format raises ValueError before writing anything."""
+        with Workspace("Test") as w:
+            Person("User")
+
+        with pytest.raises(ValueError, match="Unsupported format"):
+            w.save_many(formats=['json', 'invalid'], path=tmp_path)  # type: ignore
+        assert list(tmp_path.iterdir()) == []
+
 
 class TestSaveMethodWithJpype:
     """Tests for save() with diagram formats (requires jpype)."""
@@ -359,6 +502,28 @@ class TestSaveMethodWithJpype:
         for f in result:
             assert Path(f).exists()
 
+    def test_save_many(self, tmp_path: Path, skip_if_no_jpype: None) -> None:
+        """save_many() writes every format from a single export."""
+        from buildzr.dsl import SystemContextView, ContainerView
+        with Workspace("Test") as w:
+            system = SoftwareSystem("System")
+            SystemContextView(system, key="context", description="Context view")
+            with system:
+                Container("Container")
+            ContainerView(system, key="containers", description="Containers view")
+
+        result = w.save_many(formats=['json', 'plantuml', 'svg', 'png'], path=tmp_path)
+
+        assert result['json'] == str(tmp_path / 'test.json')
+        for format, ext in [('plantuml', 'puml'), ('svg', 'svg'), ('png', 'png')]:
+            assert sorted(result[format]) == sorted([
+                str(tmp_path / f"context.{ext}"),
+                str(tmp_path / f"containers.{ext}"),
+            ])
+            for f in result[format]:
+                assert Path(f).exists()
+        assert (tmp_path / 'context.puml').read_text() == w.to_plantuml()['context']
+
     def test_save_plantuml_default_path(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, skip_if_no_jpype: None) -> None:
         """save(format='plantuml') defaults to cwd for output directory."""
         monkeypatch.chdir(tmp_path)
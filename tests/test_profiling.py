@@ -0,0 +1,168 @@
+import json
+import os
+from typing import Any, List, Optional
+
+from buildzr.dsl import Workspace, Person, SoftwareSystem, SystemContextView
+from buildzr.profiling import (
+    Collector,
+    Span,
+    SpanRecorder,
+    add_collector,
+    collecting,
+    is_enabled,
+    remove_collector,
+    span,
+    traced,
+    _install_from_environment,
+    _NOOP_SPAN,
+)
+
+def test_span_is_noop_when_disabled() -> Optional[None]:
+
+    assert not is_enabled()
+    assert span('anything', key='value') is _NOOP_SPAN
+
+    @traced()
+    def f(x: int) -> int:
+        return x + 1
+
+    assert f(1) == 2
+    assert f.__name__ == 'f'
+
+def test_workspace_profile_records_pipeline_spans(tmp_path: Any) -> Optional[None]:
+
+    with Workspace('base', scope=None) as base:
+        Person('u')
+        SoftwareSystem('s')
+    base_path = os.path.join(tmp_path, 'base.json')
+    base.save(path=base_path)
+
+    with Workspace('w', profile=True, extend=base_path) as w:
+        u = Person('user')
+        s = SoftwareSystem('system')
+        u >> "uses" >> s
+        SystemContextView(
+            software_system_selector=s,
+            key='ssv',
+            description="System context",
+        )
+    w.to_json()
+
+    profiler = w.profiler
+    assert profiler is not None
+    names = {s.name for s in profiler.spans}
+    assert not is_enabled()
+
+    assert 'Workspace._imply_relationships' in names
+    assert 'Workspace.update_views' in names
+    assert 'SystemContextView._on_added' in names
+    assert 'JsonEncoder.encode' in names
+    assert 'JsonLoader.load' in names
+    assert 'Workspace._merge_models' in names
+
+    view_span = next(s for s in profiler.spans if s.name == 'SystemContextView._on_added')
+    assert view_span.attributes == {'key': 'ssv'}
+    assert view_span.duration_ns >= 0
+
+def test_workspace_profilers_only_record_their_workspace() -> Optional[None]:
+
+    workspaces = []
+    for i in range(3):
+        with Workspace(f'w{i}', profile=True) as w:
+            SoftwareSystem('s')
+            assert is_enabled()
+        w.to_json()
+        workspaces.append(w)
+
+    assert not is_enabled()
+
+    profilers = [w.profiler for w in workspaces]
+    counts = [len(p.spans) for p in profilers if p is not None]
+    assert all(count > 0 for count in counts)
+
+    with Workspace('other') as other:
+        SoftwareSystem('s')
+    other.to_json()
+    workspaces[0].to_json()
+
+    assert [len(p.spans) for p in profilers if p is not None][1:] == counts[1:]
+    assert profilers[0] is not None and len(profilers[0].spans) > counts[0]
+
+def test_collecting() -> Optional[None]:
+
+    recorder = SpanRecorder()
+    with collecting(recorder):
+        assert is_enabled()
+        with span('inside'):
+            pass
+    with span('outside'):
+        pass
+
+    assert [s.name for s in recorder.spans] == ['inside']
+    assert not is_enabled()
+
+def test_workspace_without_profile_has_no_profiler() -> Optional[None]:
+
+    with Workspace('w') as w:
+        Person('user')
+    assert w.profiler is None
+    assert not is_enabled()
+
+def test_custom_collector() -> Optional[None]:
+
+    class ListCollector(Collector):
+        def __init__(self) -> None:
+            self.names: List[str] = []
+        def on_span(self, span: Span) -> None:
+            self.names.append(span.name)
+
+    collector = ListCollector()
+    add_collector(collector)
+    try:
+        with span('outer'):
+            with span('inner', n=1):
+                pass
+    finally:
+        remove_collector(collector)
+
+    assert collector.names == ['inner', 'outer']
+    assert not is_enabled()
+
+def test_chrome_trace_and_summary(tmp_path: Any) -> Optional[None]:
+
+    recorder = SpanRecorder()
+    recorder.on_span(Span('a', start_ns=1000, end_ns=3000, thread_id=1, attributes={'key': 'k'}))
+    recorder.on_span(Span('a', start_ns=4000, end_ns=8000, thread_id=1))
+    recorder.on_span(Span('b', start_ns=0, end_ns=1000, thread_id=2))
+
+    trace = recorder.to_chrome_trace()
+    assert len(trace['traceEvents']) == 3
+    event = trace['traceEvents'][0]
+    assert event['ph'] == 'X'
+    assert event['ts'] == 1.0
+    assert event['dur'] == 2.0
+    assert event['args'] == {'key': 'k'}
+
+    path = os.path.join(tmp_path, 'trace.json')
+    recorder.write_chrome_trace(path)
+    with open(path) as f:
+        assert json.load(f) == trace
+
+    rows = recorder.summary()
+    assert [row['name'] for row in rows] == ['a', 'b']
+    assert rows[0]['count'] == 2
+    assert rows[0]['max'] == 4e-6
+    assert rows[0]['mean'] == 3e-6
+
+    table = recorder.format_summary()
+    assert table.splitlines()[1].startswith('a ')
+
+    recorder.clear()
+    assert recorder.spans == []
+
+def test_install_from_environment_disabled() -> Optional[None]:
+
+    assert _install_from_environment(None) is None
+    assert _install_from_environment('') is None
+    assert _install_from_environment('0') is None
+    assert not is_enabled()
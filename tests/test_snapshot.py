@@ -0,0 +1,139 @@
+import json
+import os
+import pytest
+from typing import Any, Optional
+
+from buildzr.dsl import (
+    Workspace,
+    Person,
+    SoftwareSystem,
+    Container,
+    ContainerInstance,
+    DeploymentEnvironment,
+    DeploymentNode,
+    SystemLandscapeView,
+    StyleElements,
+)
+from buildzr.dsl.factory import GenerateId
+from buildzr.loaders import JsonLoader, snapshot
+from buildzr.models.models import Shape
+
+@pytest.fixture
+def workspace_json(tmp_path: Any) -> str:
+
+    GenerateId.reset()
+    with Workspace('Shop', description='Ünïcode') as w:
+        user = Person('User')
+        with SoftwareSystem('Shop') as shop:
+            api = Container('API', technology='Python')
+        user >> "Uses" >> shop
+        with DeploymentEnvironment('Production'):
+            with DeploymentNode('Server', instances='2'):
+                ContainerInstance(api)
+        SystemLandscapeView(key='landscape', description='', auto_layout='lr')
+        StyleElements(on=[user], shape='Person', background='#ff0000')
+
+    data = w.to_dict()
+    data['properties'] = {'big': 2**70, 'ratio': 0.5, 'flag': True, 'nested': {'list': [1, None, 'x']}}
+    data['documentation'] = {'images': [{'name': 'diagram.png', 'type': 'image/png', 'content': 'iVBORw0KGgo' * 1000}]}
+    path = os.path.join(tmp_path, 'workspace.json')
+    with open(path, 'w') as f:
+        json.dump(data, f)
+    GenerateId.reset()
+    return path
+
+def test_snapshot_round_trip(workspace_json: str) -> Optional[None]:
+
+    expected = JsonLoader(snapshots=False).load(workspace_json)
+
+    loader = JsonLoader(snapshots=True)
+    assert loader.load(workspace_json) == expected
+    assert os.path.exists(snapshot.snapshot_path(workspace_json))
+
+    loaded = loader.load(workspace_json)
+    assert loaded == expected
+    assert loaded.views is not None
+    assert loaded.views.configuration.styles.elements[0].shape is Shape.Person
+    assert loaded.properties == {'big': 2**70, 'ratio': 0.5, 'flag': True, 'nested': {'list': [1, None, 'x']}}
+
+def test_snapshot_skips_json(workspace_json: str, monkeypatch: Any) -> Optional[None]:
+
+    loader = JsonLoader(snapshots=True)
+    expected = loader.load(workspace_json)
+
+    def fail(*args: Any) -> Any:
+        raise AssertionError("The JSON was parsed")
+    monkeypatch.setattr(JsonLoader, '_read_file', fail)
+    monkeypatch.setattr(JsonLoader, '_load_sections', fail)
+
+    assert loader.load(workspace_json) == expected
+    partial = loader.load(workspace_json, sections={'model'})
+    assert partial.name == 'Shop'
+    assert partial.model == expected.model
+    assert partial.views is None and partial.documentation is None
+
+def test_snapshot_sections_without_snapshot(workspace_json: str) -> Optional[None]:
+
+    partial = JsonLoader(snapshots=True).load(workspace_json, sections={'model'})
+
+    assert partial.model is not None
+    assert partial.views is None and partial.documentation is None
+    # The snapshot is made from the whole workspace.
+    assert JsonLoader(snapshots=True).load(workspace_json) == JsonLoader(snapshots=False).load(workspace_json)
+
+def test_snapshot_source_changes(workspace_json: str) -> Optional[None]:
+
+    loader = JsonLoader(snapshots=True)
+    loader.load(workspace_json)
+
+    with open(workspace_json) as f:
+        data = json.load(f)
+    data['name'] = 'Changed'
+    with open(workspace_json, 'w') as f:
+        json.dump(data, f)
+
+    assert loader.load(workspace_json).name == 'Changed'
+    assert loader.load(workspace_json).name == 'Changed'
+
+def test_snapshot_invalid(workspace_json: str, monkeypatch: Any) -> Optional[None]:
+
+    expected = JsonLoader(snapshots=True).load(workspace_json)
+    path = snapshot.snapshot_path(workspace_json)
+    source_hash = snapshot.content_hash(workspace_json)
+    assert snapshot.read_snapshot(path, source_hash) == expected
+
+    # Snapshots made by other versions are ignored.
+    monkeypatch.setattr(snapshot, 'FORMAT_VERSION', snapshot.FORMAT_VERSION + 1)
+    assert snapshot.read_snapshot(path, source_hash) is None
+    monkeypatch.undo()
+
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) // 2)
+    assert snapshot.read_snapshot(path, source_hash) is None
+    assert JsonLoader(snapshots=True).load(workspace_json) == expected
+
+def test_snapshot_unencodable_workspace_warns(workspace_json: str, monkeypatch: Any) -> Optional[None]:
+
+    def write_snapshot(*args: Any) -> None:
+        raise TypeError("Can't encode object values in a snapshot")
+
+    monkeypatch.setattr(snapshot, 'write_snapshot', write_snapshot)
+    with pytest.warns(UserWarning, match="Couldn't snapshot"):
+        workspace = JsonLoader(snapshots=True).load(workspace_json)
+    assert workspace.name == 'Shop'
+    assert not os.path.exists(snapshot.snapshot_path(workspace_json))
+
+def test_workspace_extends_with_snapshots(workspace_json: str, monkeypatch: Any) -> Optional[None]:
+
+    monkeypatch.setenv('BUILDZR_SNAPSHOTS', '1')
+
+    for _ in range(2):
+        GenerateId.reset()
+        with Workspace('Child', extend=workspace_json) as w:
+            w.person().user >> "Pays with" >> SoftwareSystem('Payments')
+
+        systems = [s['name'] for s in w.to_dict()['model']['softwareSystems']]
+        assert systems == ['Shop', 'Payments']
+
+    assert os.path.exists(snapshot.snapshot_path(workspace_json))
+    GenerateId.reset()
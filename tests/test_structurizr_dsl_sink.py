@@ -0,0 +1,183 @@
+import io
+import os
+import pytest
+from typing import Any, List, Optional
+
+from buildzr.dsl import (
+    Workspace,
+    Group,
+    Person,
+    SoftwareSystem,
+    Container,
+    Component,
+    ContainerInstance,
+    DeploymentEnvironment,
+    DeploymentGroup,
+    DeploymentNode,
+    SystemLandscapeView,
+    ContainerView,
+    DynamicView,
+    DeploymentView,
+    StyleElements,
+)
+from buildzr.dsl.factory import GenerateId
+from buildzr.models import Workspace as WorkspaceModel
+from buildzr.sinks import StructurizrDslSink, StructurizrDslSinkConfig
+
+@pytest.fixture
+def workspace() -> WorkspaceModel:
+
+    GenerateId.reset()
+    with Workspace('Shop', description='The "online" shop') as w:
+        with Group('Company'):
+            with Group('Sales'):
+                user = Person('User', tags={'Customer'})
+            admin = Person('Admin')
+        with SoftwareSystem('Shop') as shop:
+            web = Container('Web', technology='React')
+            with Container('API', technology='Python') as api:
+                auth = Component('Auth', technology='JWT')
+                repository = Component('Repository')
+                auth >> "Reads users from" >> repository
+            database = Container('Database', technology='PostgreSQL', tags={'Database'})
+            calls = web >> ("Calls", "HTTPS") >> api
+            reads = api >> "Reads from" >> database
+        browses = user >> "Browses" >> web
+        admin >> "Manages" >> web
+
+        with DeploymentEnvironment('Production') as production:
+            blue = DeploymentGroup('Blue')
+            with DeploymentNode('AWS'):
+                with DeploymentNode('EC2', technology='Ubuntu', instances='3'):
+                    ContainerInstance(api, deployment_groups=[blue])
+
+        SystemLandscapeView(key='landscape', description='All systems', auto_layout='lr')
+        ContainerView(
+            software_system_selector=shop,
+            key='containers',
+            description='',
+            exclude_relationships=[lambda w, r: r.destination == web and r.source == user],
+        )
+        DynamicView(key='dynamic', scope=shop, steps=[browses, calls, reads])
+        DeploymentView(production, key='deployment', software_system_selector=shop)
+        StyleElements(on=['Database'], shape='Cylinder', background='#ff0000')
+
+    return w._merged_workspace()
+
+def _lines(dsl: str) -> List[str]:
+    return [line.strip() for line in dsl.splitlines()]
+
+def test_structurizr_dsl_sink_model(workspace: WorkspaceModel) -> Optional[None]:
+
+    dsl = StructurizrDslSink().export_to_string(workspace)
+    lines = _lines(dsl)
+
+    assert lines[0] == 'workspace "Shop" "The \\"online\\" shop" {'
+    assert dsl.count('{') == dsl.count('}')
+    assert 'user = person "User" "" "Customer"' in lines
+    assert 'admin = person "Admin"' in lines
+    # The identifiers don't clash with each other, or with the DSL keywords.
+    assert 'shop = softwareSystem "Shop" {' in lines
+    assert 'web = container "Web" "" "React"' in lines
+    assert 'api = container "API" "" "Python" {' in lines
+    assert 'auth = component "Auth" "" "JWT"' in lines
+    assert 'database = container "Database" "" "PostgreSQL" "Database"' in lines
+
+def test_structurizr_dsl_sink_groups(workspace: WorkspaceModel) -> Optional[None]:
+
+    lines = _lines(StructurizrDslSink().export_to_string(workspace))
+
+    company = lines.index('group "Company" {')
+    assert lines[company + 1:company + 6] == [
+        'group "Sales" {',
+        'user = person "User" "" "Customer"',
+        '}',
+        'admin = person "Admin"',
+        '}',
+    ]
+
+def test_structurizr_dsl_sink_relationships(workspace: WorkspaceModel) -> Optional[None]:
+
+    lines = _lines(StructurizrDslSink().export_to_string(workspace))
+
+    assert 'web -> api "Calls" "HTTPS"' in lines
+    assert 'auth -> repository "Reads users from"' in lines
+    # The relationships are written after all the elements they connect.
+    assert lines.index('user -> web "Browses"') > lines.index('api_instance = containerInstance api "blue"')
+    # The relationships of the instances are implied from the ones of the
+    # containers.
+    assert not any(line.startswith('api_instance ->') for line in lines)
+
+def test_structurizr_dsl_sink_deployment(workspace: WorkspaceModel) -> Optional[None]:
+
+    lines = _lines(StructurizrDslSink().export_to_string(workspace))
+
+    environment = lines.index('deploymentEnvironment "Production" {')
+    assert lines[environment + 1:environment + 5] == [
+        'blue = deploymentGroup "Blue"',
+        'aws = deploymentNode "AWS" {',
+        'ec2 = deploymentNode "EC2" "" "Ubuntu" "" "3" {',
+        'api_instance = containerInstance api "blue"',
+    ]
+
+def test_structurizr_dsl_sink_views(workspace: WorkspaceModel) -> Optional[None]:
+
+    lines = _lines(StructurizrDslSink().export_to_string(workspace))
+
+    landscape = lines.index('systemLandscape "landscape" "All systems" {')
+    assert lines[landscape + 1:landscape + 5] == [
+        'include user',
+        'include admin',
+        'include shop',
+        'autoLayout lr 300 300',
+    ]
+
+    containers = lines.index('container shop "containers" {')
+    end = lines.index('}', containers)
+    assert 'include web' in lines[containers:end]
+    assert 'exclude "user -> web"' in lines[containers:end]
+    assert 'exclude "admin -> web"' not in lines[containers:end]
+
+    dynamic = lines.index('dynamic shop "dynamic" {')
+    assert lines[dynamic + 1:dynamic + 4] == [
+        'user -> web "Browses"',
+        'web -> api "Calls" "HTTPS"',
+        'api -> database "Reads from"',
+    ]
+
+    assert 'deployment shop "Production" "deployment" {' in lines
+
+def test_structurizr_dsl_sink_styles(workspace: WorkspaceModel) -> Optional[None]:
+
+    lines = _lines(StructurizrDslSink().export_to_string(workspace))
+
+    style = lines.index('element "Database" {')
+    assert set(lines[style + 1:style + 3]) == {'background #ff0000', 'shape Cylinder'}
+
+def test_structurizr_dsl_sink_write(workspace: WorkspaceModel, tmp_path: Any) -> Optional[None]:
+
+    path = os.path.join(tmp_path, 'out', 'workspace.dsl')
+    StructurizrDslSink().write(workspace, StructurizrDslSinkConfig(path=path))
+
+    with open(path, 'r', encoding='utf-8') as f:
+        assert f.read() == StructurizrDslSink().export_to_string(workspace)
+
+def test_structurizr_dsl_sink_streams_large_workspaces() -> Optional[None]:
+
+    class Stream(io.StringIO):
+        largest = 0
+        def write(self, text: str) -> int:
+            Stream.largest = max(Stream.largest, len(text))
+            return 0
+
+    with Workspace('w') as w:
+        for i in range(2000):
+            with SoftwareSystem('Service'):
+                Container('Service')
+        SystemLandscapeView(key='landscape', description='')
+
+    stream = Stream()
+    StructurizrDslSink().write_to(w._merged_workspace(), stream)
+
+    # Each statement is written on its own.
+    assert 0 < Stream.largest < 100
@@ -0,0 +1,113 @@
+import json
+import os
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from buildzr.dsl import Explorer, Person, SoftwareSystem, Container, Component, ContainerInstance
+from buildzr.loaders import JsonLoader
+from buildzr.testing import (
+    SyntheticConfig,
+    generate_workspace,
+    generate_workspace_dict,
+    write_workspace_json,
+)
+
+def _count(model: Dict[str, Any]) -> Counter:
+    counter: Counter = Counter()
+    def walk(x: Any) -> None:
+        if isinstance(x, dict):
+            if 'sourceId' in x:
+                counter['relationships'] += 1
+            for key, value in x.items():
+                if isinstance(value, list) and key not in ('relationships', 'deploymentGroups'):
+                    counter[key] += len(value)
+                walk(value)
+        elif isinstance(x, list):
+            for value in x:
+                walk(value)
+    walk(model)
+    return counter
+
+def test_generate_workspace_counts() -> Optional[None]:
+
+    config = SyntheticConfig(
+        people=4,
+        software_systems=5,
+        containers_per_software_system=2,
+        components_per_container=3,
+        group_depth=2,
+        deployment_environments=2,
+        deployment_node_depth=3,
+        instances_per_container=2,
+    )
+    w = generate_workspace(config)
+
+    elements = list(Explorer(w).walk_elements())
+    assert sum(isinstance(e, Person) for e in elements) == 4
+    assert sum(isinstance(e, SoftwareSystem) for e in elements) == 5
+    assert sum(isinstance(e, Container) for e in elements) == 10
+    assert sum(isinstance(e, Component) for e in elements) == 30
+    assert sum(isinstance(e, ContainerInstance) for e in elements) == 2 * 10 * 2
+
+    software_system = w.model.model.softwareSystems[0]
+    assert software_system.group == "group 0.0/group 1.0"
+
+    root = w.model.model.deploymentNodes[0]
+    assert root.children[0].children[0].containerInstances
+
+def test_generate_workspace_is_seeded() -> Optional[None]:
+
+    config = SyntheticConfig(seed=7, distribution='power_law')
+    assert generate_workspace_dict(config) == generate_workspace_dict(config)
+    assert generate_workspace_dict(config) != generate_workspace_dict(SyntheticConfig(seed=8, distribution='power_law'))
+
+def test_generate_workspace_power_law_hubs() -> Optional[None]:
+
+    def max_in_degree(distribution: str) -> int:
+        workspace = generate_workspace_dict(SyntheticConfig(
+            people=500,
+            software_systems=50,
+            containers_per_software_system=0,
+            fan_out=1,
+            distribution=distribution,  # type: ignore[arg-type]
+        ))
+        in_degrees = Counter(
+            r['destinationId']
+            for person in workspace['model']['people']
+            for r in person['relationships']
+        )
+        return max(in_degrees.values())
+
+    assert max_in_degree('power_law') > 3 * max_in_degree('uniform')
+
+def test_generate_workspace_dict_matches_dsl(tmp_path: Any) -> Optional[None]:
+
+    config = SyntheticConfig(
+        seed=3,
+        people=5,
+        software_systems=6,
+        group_depth=2,
+        deployment_environments=2,
+        deployment_node_depth=2,
+        instances_per_container=2,
+        deployment_groups=2,
+    )
+
+    from_dsl = json.loads(generate_workspace(config).to_json())
+    direct = generate_workspace_dict(config)
+    assert _count(from_dsl['model']) == _count(direct['model'])
+
+    path = write_workspace_json(os.path.join(tmp_path, 'workspace.json'), config)
+    workspace = JsonLoader().load(path)
+    assert len(workspace.model.people) == 5
+    assert len(workspace.model.softwareSystems) == 6
+    assert not workspace.model.deploymentNodes[0].containerInstances
+    assert workspace.model.deploymentNodes[0].children[0].containerInstances
+
+def test_for_size() -> Optional[None]:
+
+    config = SyntheticConfig.for_size(1000, seed=1)
+    counts = _count(generate_workspace_dict(config)['model'])
+    total = counts['people'] + counts['softwareSystems'] + counts['containers'] + counts['components']
+    assert 950 <= total <= 1050
+    assert config.seed == 1
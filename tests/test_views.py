@@ -1,5 +1,5 @@
 import pytest
-from typing import Optional
+from typing import Optional, Union, Tuple, Set, Dict, List, Any
 from buildzr.dsl import (
     Workspace,
     With,
@@ -2096,4 +2096,213 @@ def test_custom_view_rejects_non_element_types() -> None:
 
     # Verify the valid view was created
     assert len(w.model.views.customViews) == 1
-    assert w.model.views.customViews[0].key == "valid_view"
\ No newline at end of file
+    assert w.model.views.customViews[0].key == "valid_view"
+
+def test_views_are_updated_when_the_model_changes() -> Optional[None]:
+
+    def view_ids(view: Union[SystemLandscapeView, SystemContextView, ContainerView, ComponentView]) -> Tuple[Set[str], Set[str]]:
+        return (
+            {str(e.id) for e in view.model.elements or []},
+            {str(r.id) for r in view.model.relationships or []},
+        )
+
+    with Workspace('w') as w:
+        user = Person('user')
+        with SoftwareSystem('app') as app:
+            Container('web')
+        user >> "Uses" >> app.web
+
+        landscape = SystemLandscapeView(key='landscape', description="Landscape")
+        context = SystemContextView(app, key='context', description="Context")
+        containers = ContainerView(app, key='containers', description="Containers")
+        components = ComponentView(app.web, key='components', description="Components")
+
+        # Changes made after the views are defined.
+        admin = Person('admin')
+        email = SoftwareSystem('email')
+        with app:
+            Container('database')
+        with app.web:
+            Component('controller')
+            Component('repository')
+        app.web.controller >> "Calls" >> app.web.repository
+        app.web.repository >> "Reads from" >> app.database
+        app >> "Sends emails with" >> email
+        admin >> "Administers" >> app
+
+    assert str(admin.model.id) in view_ids(landscape)[0]
+    assert str(email.model.id) in view_ids(context)[0]
+    assert str(app.database.model.id) in view_ids(containers)[0]
+    assert str(app.web.repository.model.id) in view_ids(components)[0]
+
+    # The views end up the same as views computed from scratch.
+    fresh_landscape = SystemLandscapeView(key='landscape', description="Landscape")
+    fresh_context = SystemContextView(app, key='context', description="Context")
+    fresh_containers = ContainerView(app, key='containers', description="Containers")
+    fresh_components = ComponentView(app.web, key='components', description="Components")
+    for fresh in (fresh_landscape, fresh_context, fresh_containers, fresh_components):
+        fresh._on_added(w)
+
+    assert view_ids(landscape) == view_ids(fresh_landscape)
+    assert view_ids(context) == view_ids(fresh_context)
+    assert view_ids(containers) == view_ids(fresh_containers)
+    assert view_ids(components) == view_ids(fresh_components)
+
+    # Views are updated in place when the model is changed outside of the
+    # workspace context, too.
+    element_views = containers.model.elements
+    cache = SoftwareSystem('cache')
+    w.add_model(cache)
+    app.web >> "Caches with" >> cache
+    w.update_views()
+    assert containers.model.elements is element_views
+    assert str(cache.model.id) in view_ids(containers)[0]
+
+def test_deployment_view_is_updated_when_the_model_changes() -> Optional[None]:
+
+    with Workspace('w') as w:
+        with SoftwareSystem('app') as app:
+            Container('web')
+            Container('database')
+        app.web >> "Reads from" >> app.database
+
+        with DeploymentEnvironment('Production') as production:
+            view = DeploymentView(production, key='deployment', software_system_selector=app)
+            with DeploymentNode('Server'):
+                ContainerInstance(app.web)
+                ContainerInstance(app.database)
+
+    fresh = DeploymentView(production, key='deployment', software_system_selector=app)
+    fresh._on_added(w)
+
+    assert view.model.elements
+    assert {e.id for e in view.model.elements} == {e.id for e in fresh.model.elements or []}
+    assert {r.id for r in view.model.relationships or []} == {r.id for r in fresh.model.relationships or []}
+
+@pytest.mark.parametrize("defer_views", [False, True])
+def test_views_drop_dynamic_view_duplicate_relationships(defer_views: bool) -> Optional[None]:
+
+    with Workspace('w', defer_views=defer_views) as w:
+        user = Person('User')
+        system = SoftwareSystem('System')
+        uses = user >> "Uses" >> system
+        context = SystemContextView(system, key='context', description='')
+        if defer_views:
+            w.materialize_views()
+        DynamicView(key='dynamic', scope=system, steps=[user >> "Logs in" >> system])
+
+    data = w.to_dict()
+
+    model_relationship_ids = [r['id'] for r in data['model']['people'][0]['relationships']]
+    assert model_relationship_ids == [uses.model.id]
+    assert [r.id for r in context.model.relationships or []] == [uses.model.id]
+
+def test_deferred_views() -> Optional[None]:
+
+    with Workspace('w', defer_views=True) as w:
+        user = Person('user')
+        with SoftwareSystem('app') as app:
+            Container('web')
+        user >> "Uses" >> app
+
+        context = SystemContextView(app, key='context', description="Context")
+        containers = ContainerView(app, key='containers', description="Containers")
+        dynamic = DynamicView(
+            key='dynamic',
+            description="Dynamic",
+            scope=app,
+            steps=[user >> "Uses" >> app.web],
+        )
+
+        # Added after the views are declared.
+        email = SoftwareSystem('email')
+        with app:
+            Container('database')
+        app >> "Sends emails with" >> email
+
+    # The views are registered, but not computed until the export.
+    assert w.model.views is not None
+    assert [v.key for v in w.model.views.systemContextViews or []] == ['context']
+    assert not context.model.elements
+    assert not containers.model.elements
+    assert not dynamic.model.elements
+
+    w.to_json()
+
+    assert {str(e.id) for e in context.model.elements or []} == {
+        str(user.model.id), str(app.model.id), str(email.model.id),
+    }
+    assert str(app.database.model.id) in {str(e.id) for e in containers.model.elements or []}
+    assert dynamic.model.elements
+
+    # Once materialized, the views are kept up to date.
+    with w:
+        admin = Person('admin')
+        admin >> "Administers" >> app
+    assert str(admin.model.id) in {str(e.id) for e in context.model.elements or []}
+
+def test_materialize_views_in_parallel() -> Optional[None]:
+
+    from buildzr.dsl.factory.gen_id import GenerateId
+
+    def build(jobs: Optional[int]) -> Workspace:
+
+        GenerateId.reset()
+        with Workspace('w', defer_views=True) as w:
+            user = Person('user')
+            systems = []
+            for i in range(8):
+                with SoftwareSystem(f"system {i}") as system:
+                    Container('api')
+                    Container('db')
+                    system.api >> "Reads from" >> system.db
+                user >> "Uses" >> system
+                systems.append(system)
+            for a, b in zip(systems, systems[1:]):
+                a >> "Calls" >> b
+
+            SystemLandscapeView(key='landscape', description="Landscape")
+            for i, system in enumerate(systems):
+                SystemContextView(system, key=f"context {i}", description="Context")
+                ContainerView(system, key=f"containers {i}", description="Containers")
+            DynamicView(
+                key='dynamic',
+                description="Dynamic",
+                scope=systems[0],
+                steps=[systems[0].api >> "Reads from" >> systems[0].db],
+            )
+
+        w.materialize_views(jobs=jobs)
+        return w
+
+    def views(w: Workspace) -> Dict[str, Tuple[Set[str], Set[str]]]:
+        assert w.model.views is not None
+        all_views: List[Any] = [
+            *(w.model.views.systemLandscapeViews or []),
+            *(w.model.views.systemContextViews or []),
+            *(w.model.views.containerViews or []),
+            *(w.model.views.dynamicViews or []),
+        ]
+        return {
+            str(view.key): (
+                {str(e.id) for e in view.elements or []},
+                {str(r.id) for r in view.relationships or []},
+            )
+            for view in all_views
+        }
+
+    serial = views(build(None))
+    parallel_workspace = build(4)
+    parallel = views(parallel_workspace)
+
+    assert len(parallel) == 18
+    assert parallel == serial
+    assert parallel['containers 3'][0]
+    assert parallel['dynamic'][1]
+
+    # The materialized views are kept up to date, in the order they were
+    # declared.
+    assert [view.model.key for view in parallel_workspace._views][:3] == ['landscape', 'context 0', 'containers 0']
+    with parallel_workspace:
+        admin = Person('admin')
+    assert str(admin.model.id) in views(parallel_workspace)['landscape'][0]
@@ -2,9 +2,10 @@
 
 import json
 import os
+import sys
 import tempfile
 import pytest
-from typing import Optional, Generator
+from typing import Any, Optional, Generator
 
 from buildzr.dsl import (
     Workspace,
@@ -112,6 +113,39 @@ class TestJsonLoader:
         # Maximum ID in parent is 6 (User)
         assert max_id == 6
 
+    def test_load_sections(self, parent_workspace_json: str) -> None:
+        """Test loading only some sections of a workspace."""
+        with open(parent_workspace_json) as f:
+            data = json.load(f)
+        data["views"] = {"systemLandscapeViews": [{"key": "landscape", "elements": [{"id": "1"}]}]}
+        data["documentation"] = {
+            "sections": [{"content": "Escaped \"quotes\", \\ and } { ] [", "format": "Markdown"}],
+            "images": [{"name": "diagram.png", "type": "image/png", "content": "iVBORw0KGgo" * 100000}],
+        }
+        with open(parent_workspace_json, 'w') as f:
+            json.dump(data, f, indent=2)
+
+        loader = JsonLoader()
+        workspace = loader.load(parent_workspace_json, sections={'model'})
+
+        assert workspace.name == "Parent Workspace"
+        assert workspace.model == loader.load(parent_workspace_json).model
+        assert workspace.views is None
+        assert workspace.documentation is None
+
+        workspace = loader.load(parent_workspace_json, sections={'views', 'documentation'})
+
+        assert workspace.model is None
+        assert workspace.views is not None
+        assert workspace.views.systemLandscapeViews[0].key == "landscape"
+        assert workspace.documentation is not None
+        assert workspace.documentation.sections[0].content == "Escaped \"quotes\", \\ and } { ] ["
+
+    def test_load_unknown_section(self, parent_workspace_json: str) -> None:
+        """Test loading a section that workspaces don't have."""
+        with pytest.raises(ValueError, match="Unknown workspace sections: modle"):
+            JsonLoader().load(parent_workspace_json, sections={'modle'})
+
 
 class TestWorkspaceExtension:
     """Tests for Workspace with extend parameter."""
@@ -291,3 +325,90 @@ class TestParentElementRelationships:
 
             assert rel.model.sourceId == "2"  # System B
             assert rel.model.destinationId == "1"  # System A
+
+
+class TestLazyParentElements:
+    """Tests for the lazy wrapping of the parent workspace elements."""
+
+    def test_parent_elements_wrapped_on_access(self, parent_workspace_json: str) -> None:
+        """Test that parent elements are only wrapped when they're accessed."""
+        with Workspace("Child", extend=parent_workspace_json) as w:
+            assert w._lazy_children is not None
+            assert w._lazy_children._wrappers == {}
+
+            system_a = w.software_system().system_a
+            assert len(w._lazy_children._wrappers) == 1
+            assert system_a._lazy_children is not None
+            assert system_a._lazy_children._wrappers == {}
+
+            # The same wrapper is returned on every access.
+            assert w.software_system().system_a is system_a
+            assert w['system_a'] is system_a
+            assert system_a.container().container_x is system_a['container_x']
+            assert 'system_b' in dir(w)
+
+    def test_children_include_wrapped_parent_elements(self, parent_workspace_json: str) -> None:
+        """Test that walking the elements wraps the remaining parent elements."""
+        with Workspace("Child", extend=parent_workspace_json) as w:
+            user = w.person().user
+            new_sys = SoftwareSystem("New System")
+
+            assert w.children is not None
+            names = [child.model.name for child in w.children]
+            assert names == ["System A", "System B", "User", "New System"]
+            assert w.children[2] is user
+
+            system_a = w.software_system().system_a
+            assert w.children[0] is system_a
+            assert [c.model.name for c in system_a.children or []] == ["Container X"]
+
+    def test_relationship_from_lazy_element_in_merged_output(self, parent_workspace_json: str) -> None:
+        """Test that relationships from lazily wrapped elements are exported."""
+        with Workspace("Child", extend=parent_workspace_json) as w:
+            new_sys = SoftwareSystem("New System")
+            component_y = w.software_system().system_a.container().container_x.component().component_y
+            component_y >> "Notifies" >> new_sys
+
+        output = w.to_dict()
+        system_a = next(ss for ss in output['model']['softwareSystems'] if ss['name'] == "System A")
+        component = system_a['containers'][0]['components'][0]
+        assert [r['description'] for r in component['relationships']] == ["Notifies"]
+        assert component['relationships'][0]['destinationId'] == new_sys.model.id
+
+    def test_parent_elements_wrapped_once_by_parallel_views(self, tmp_path: str) -> None:
+        """Test that views materialized in parallel wrap the parent elements once."""
+        from buildzr.dsl import SystemContextView, SystemLandscapeView
+
+        with Workspace("Parent") as parent:
+            for i in range(32):
+                with SoftwareSystem(f"System {i}"):
+                    Container("API")
+                    Container("Database")
+        path = os.path.join(tmp_path, 'parent.json')
+        with open(path, 'w') as f:
+            json.dump(parent.to_dict(), f)
+
+        def system(i: int) -> Any:
+            # Looked up when the view is computed, in the threads.
+            return lambda e: getattr(e.software_system(), f"system_{i}")
+
+        # The threads are switched as often as possible, to interleave them.
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for _ in range(20):
+                with Workspace("Child", extend=path, defer_views=True) as w:
+                    for i in range(15):
+                        SystemContextView(system(i), key=f"context {i}", description="")
+                    SystemLandscapeView(key='landscape', description="")
+                w.materialize_views(jobs=8)
+
+                assert w.children is not None
+                ids = [child.model.id for child in w.children]
+                assert len(ids) == len(set(ids)) == 32
+                assert w.model.views is not None
+                for view in w.model.views.systemLandscapeViews or []:
+                    element_ids = [e.id for e in view.elements or []]
+                    assert len(element_ids) == len(set(element_ids)) == 32
+        finally:
+            sys.setswitchinterval(switch_interval)